@@ -8,6 +8,7 @@ Changes in this revision
 - Register export_bp  (GET /api/export/...)
 - Register alerts_bp  (GET|POST|DELETE /api/alerts)
 - Register admin_bp   (GET /admin/health, /admin/health/json, /admin/ping)
+- Register metrics_bp (GET /metrics) and per-request latency / query metrics
 - Schedule weekly archival task via APScheduler
 - Schedule alert evaluation every 15 minutes
 """
@@ -52,12 +53,20 @@ def create_app(
     from app.routes.api_export import export_bp
     from app.routes.api_alerts import alerts_bp
     from app.routes.admin import admin_bp
+    from app.routes.metrics import metrics_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(api_bp)
     app.register_blueprint(export_bp)
     app.register_blueprint(alerts_bp)
     app.register_blueprint(admin_bp)
+    app.register_blueprint(metrics_bp)
+
+    # ------------------------------------------------------------------
+    # Metrics  (app/utils/metrics.py)
+    # ------------------------------------------------------------------
+    from app.utils import metrics
+    metrics.init_app(app)
 
     # ------------------------------------------------------------------
     # Scheduler  (APScheduler)
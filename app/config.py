@@ -33,6 +33,71 @@ class Config:
     SCRAPER_DELAY_MIN = int(os.environ.get('SCRAPER_DELAY_MIN', 2))
     SCRAPER_DELAY_MAX = int(os.environ.get('SCRAPER_DELAY_MAX', 5))
     SCRAPER_REQUESTS_PER_MINUTE = int(os.environ.get('SCRAPER_REQUESTS_PER_MINUTE', 10))
+    # Async scrapers (app/scrapers/async_http.py): shared pool settings
+    SCRAPER_PER_HOST_CONCURRENCY = int(os.environ.get('SCRAPER_PER_HOST_CONCURRENCY', 4))
+    SCRAPER_HTTP2 = os.environ.get('SCRAPER_HTTP2', 'true').lower() == 'true'
+    # Requests a scraper may send back-to-back before its retailer's
+    # requests_per_minute / min_delay_seconds pacing applies (per host)
+    SCRAPER_RATE_BURST = int(os.environ.get('SCRAPER_RATE_BURST', 4))
+    # Conditional-GET cache (ETag / Last-Modified) for scraper fetches;
+    # directory defaults to <instance>/http_cache
+    SCRAPER_HTTP_CACHE = os.environ.get('SCRAPER_HTTP_CACHE', 'true').lower() == 'true'
+    SCRAPER_HTTP_CACHE_DIR = os.environ.get('SCRAPER_HTTP_CACHE_DIR')
+    # Streaming pipeline (app/scrapers/pipeline.py): scrapers yield pages into
+    # bounded queues; validation and batched writes run as separate stages
+    SCRAPER_STREAMING = os.environ.get('SCRAPER_STREAMING', 'false').lower() == 'true'
+    SCRAPER_PIPELINE_QUEUE_SIZE = int(os.environ.get('SCRAPER_PIPELINE_QUEUE_SIZE', 8))
+    SCRAPER_PIPELINE_BATCH = int(os.environ.get('SCRAPER_PIPELINE_BATCH', 500))
+    # Worker processes for HTML listing parses (app/scrapers/html_parse.py);
+    # 0 parses inline on the scraper's thread
+    SCRAPER_PARSE_PROCESSES = int(os.environ.get('SCRAPER_PARSE_PROCESSES', 0))
+    # Circuit breaker (app/utils/circuit_breaker.py): consecutive failures that
+    # open a retailer's circuit, and how long it stays open before a probe
+    SCRAPER_CIRCUIT_FAILURES = int(os.environ.get('SCRAPER_CIRCUIT_FAILURES', 5))
+    SCRAPER_CIRCUIT_COOLDOWN_SECONDS = int(os.environ.get('SCRAPER_CIRCUIT_COOLDOWN_SECONDS', 1800))
+    # Archival (app/tasks/archival.py): rows moved per short transaction, the
+    # time budget of one run (the next run resumes where it stopped), a pause
+    # between batches for concurrent writers, and a Postgres lock wait cap
+    ARCHIVAL_BATCH_SIZE = int(os.environ.get('ARCHIVAL_BATCH_SIZE', 2000))
+    ARCHIVAL_MAX_SECONDS = float(os.environ.get('ARCHIVAL_MAX_SECONDS', 900))
+    ARCHIVAL_PAUSE_SECONDS = float(os.environ.get('ARCHIVAL_PAUSE_SECONDS', 0.05))
+    ARCHIVAL_LOCK_TIMEOUT_MS = int(os.environ.get('ARCHIVAL_LOCK_TIMEOUT_MS', 5000))
+    SCRAPE_LOG_RETENTION_DAYS = int(os.environ.get('SCRAPE_LOG_RETENTION_DAYS', 90))
+    # Cold tier (app/utils/cold_store.py): archived months as compressed
+    # columnar files, kept after the archive is purged. COLD_STORE_DIR must be
+    # persistent storage (a mounted volume, not the container disk); while it
+    # is unset the tier is off and the archive is never purged
+    COLD_STORE_ENABLED = os.environ.get('COLD_STORE_ENABLED', 'true').lower() == 'true'
+    COLD_STORE_DIR = os.environ.get('COLD_STORE_DIR')
+    PRICE_SYNC_LOG_RETENTION_DAYS = int(os.environ.get('PRICE_SYNC_LOG_RETENTION_DAYS', 180))
+    # Longest /api/prices/<id> window plotted from raw rows; longer windows
+    # use the price_daily rollup (resolution=auto)
+    CHART_RAW_MAX_DAYS = int(os.environ.get('CHART_RAW_MAX_DAYS', 31))
+    # Seconds /admin/health serves a cached snapshot of scrape_runs
+    HEALTH_CACHE_SECONDS = int(os.environ.get('HEALTH_CACHE_SECONDS', 30))
+    # Days of scrape_runs telemetry kept by the archival task
+    SCRAPE_RUNS_RETENTION_DAYS = int(os.environ.get('SCRAPE_RUNS_RETENTION_DAYS', 90))
+
+    # /metrics (app/utils/metrics.py). With several gunicorn workers, point
+    # METRICS_MULTIPROC_DIR at a directory they share so /metrics sums them.
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_MULTIPROC_DIR = (os.environ.get('METRICS_MULTIPROC_DIR')
+                             or os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+    # Bulk price writes (PriceService.bulk_upsert)
+    PRICE_BULK_BATCH_SIZE = int(os.environ.get('PRICE_BULK_BATCH_SIZE', 1000))
+    # Postgres only: batches at least this large are COPY-ed into a staging table
+    PRICE_BULK_COPY_THRESHOLD = int(os.environ.get('PRICE_BULK_COPY_THRESHOLD', 5000))
+    # Only append price_history when price / currency / stock changed; unchanged
+    # scrapes just bump latest_prices.last_seen_at.
+    PRICE_CHANGE_ONLY = os.environ.get('PRICE_CHANGE_ONLY', 'true').lower() == 'true'
+    # (product, retailer) pairs whose last written state is kept in memory
+    PRICE_STATE_CACHE_SIZE = int(os.environ.get('PRICE_STATE_CACHE_SIZE', 50000))
+
+    # Price validation: reject a scraped price more than this fraction away from
+    # the other retailers' current USD median (e.g. 0.5 = ±50%). Unset = off.
+    PRICE_CONSENSUS_BAND = (float(os.environ['PRICE_CONSENSUS_BAND'])
+                            if os.environ.get('PRICE_CONSENSUS_BAND') else None)
 
     # Daily email (Resend)
     RESEND_API_KEY = os.environ.get('RESEND_API_KEY')
@@ -142,6 +207,10 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     ENABLE_IN_PROCESS_SCHEDULER = False
+    SCRAPER_HTTP_CACHE = False
+    HEALTH_CACHE_SECONDS = 0
+    ARCHIVAL_PAUSE_SECONDS = 0
+    COLD_STORE_ENABLED = False
 
 
 config = {
@@ -9,17 +9,29 @@ metadata before db.create_all() / Alembic migrations run.
 from app.models.product import Product
 from app.models.retailer import Retailer
 from app.models.price import PriceHistory
+from app.models.price_archive import PriceArchive
+from app.models.latest_price import LatestPrice
+from app.models.price_daily import PriceDaily
 from app.models.scrape_log import ScrapeLog
+from app.models.scrape_run import ScrapeRun
+from app.models.scraper_circuit import ScraperCircuit
 from app.models.alert import PriceAlert
 from app.models.price_sync_log import PriceSyncLog
 from app.models.weekly_report_run import WeeklyReportRun
+from app.models.archival_progress import ArchivalProgress
 
 __all__ = [
     'Product',
     'Retailer',
     'PriceHistory',
+    'PriceArchive',
+    'LatestPrice',
+    'PriceDaily',
     'ScrapeLog',
+    'ScrapeRun',
+    'ScraperCircuit',
     'PriceAlert',
     'PriceSyncLog',
     'WeeklyReportRun',
+    'ArchivalProgress',
 ]
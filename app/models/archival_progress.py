@@ -0,0 +1,25 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class ArchivalProgress(db.Model):
+    """Keyset position of one archival job, one row per job name.
+
+    Updated in the same transaction as every batch the job moves, so a run
+    that is interrupted (crash, deploy, time budget) resumes after the last
+    committed id with the cutoff it started with. See ``app.tasks.archival``.
+    """
+    __tablename__ = 'archival_progress'
+
+    job = db.Column(db.String(50), primary_key=True)   # price_history, scrape_logs, ...
+    cutoff = db.Column(db.DateTime, nullable=False)
+    last_id = db.Column(db.BigInteger, nullable=False, default=0)
+    rows_done = db.Column(db.BigInteger, nullable=False, default=0)
+    batches = db.Column(db.Integer, nullable=False, default=0)
+    seconds = db.Column(db.Float, nullable=False, default=0.0)
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)     # NULL while a run is still in progress
+
+    def __repr__(self):
+        return f'<ArchivalProgress {self.job}: {self.rows_done} rows>'
@@ -0,0 +1,34 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class LatestPrice(db.Model):
+    """Denormalized current price: one row per (product, retailer).
+
+    Maintained on write alongside ``price_history`` (see
+    ``app.services.price_service.upsert_latest_prices``) so read paths that
+    only need "the price right now" are a primary-key lookup instead of a
+    range scan over the ever-growing history table. Rebuild it from history
+    with ``python scripts/rebuild_latest_prices.py``.
+
+    ``scraped_at`` is when the current price was first written; a scrape that
+    finds the same price, currency and stock flag only moves ``last_seen_at``
+    (see ``PriceService.bulk_upsert``), so freshness checks read that column.
+    """
+    __tablename__ = 'latest_prices'
+
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    retailer_id = db.Column(db.Integer, db.ForeignKey('retailers.id'), primary_key=True, index=True)
+
+    price = db.Column(db.Numeric(10, 2), nullable=False)
+    price_usd = db.Column(db.Numeric(10, 2))
+    currency = db.Column(db.String(3), default='JPY')
+    in_stock = db.Column(db.Boolean, default=True)
+    source_url = db.Column(db.String(1000))
+    scraped_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    retailer = db.relationship('Retailer')
+
+    def __repr__(self):
+        return f'<LatestPrice {self.product_id} @ {self.retailer_id}: {self.price}>'
@@ -0,0 +1,321 @@
+"""
+app/models/partitioning.py
+
+Monthly range partitioning of ``price_history`` on ``scraped_at`` (Postgres).
+
+Layout on a partitioned database::
+
+    price_history                      PARTITION BY RANGE (scraped_at)
+      price_history_p2026_09           [2026-09-01, 2026-10-01)
+      price_history_p2026_10           [2026-10-01, 2026-11-01)
+      ...                              (PARTITION_MONTHS_AHEAD future months)
+      price_history_default            anything else (NULL-free, out of range)
+
+Postgres only allows a unique index on a partitioned table when it contains
+the partition key, so the primary key becomes (id, scraped_at) and the
+scrape dedupe index (product_id, retailer_id, scrape_bucket) lives on every
+leaf instead of the parent. Buckets are whole hours and months start on an
+hour, so one bucket never spans two leaves: bulk upserts write straight to
+the leaf of their timestamp (``insert_table``) and keep their ON CONFLICT
+target. Range filters on ``scraped_at`` (charts, exports) prune to the
+matching leaves; archival detaches whole leaves (app/tasks/archival.py).
+
+SQLite, and a Postgres database that has not been converted yet, keep the
+single-table layout and every helper here is a no-op for them. A fresh
+Postgres database is converted by ``ensure_schema`` while ``price_history``
+is still empty; a populated one with ``scripts/partition_price_history.py``
+(the rows are copied under an exclusive lock, so pick a quiet window).
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Column, MetaData, Table, text
+
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Future months that always have a partition ready.
+PARTITION_MONTHS_AHEAD: int = 3
+
+PARENT = "price_history"
+DEFAULT_PARTITION = "price_history_default"
+
+# Indexes of the single-table layout that exist per leaf once partitioned.
+LEAF_ONLY_INDEXES = {"uq_price_product_retailer_bucket"}
+
+_LEAF_NAME = re.compile(r"^price_history_p(\d{4})_(\d{2})$")
+
+# Indexes on the partitioned parent (cascaded to every leaf by Postgres).
+_PARENT_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_price_history_product_id ON price_history (product_id)",
+    "CREATE INDEX IF NOT EXISTS ix_price_history_retailer_id ON price_history (retailer_id)",
+    "CREATE INDEX IF NOT EXISTS ix_price_history_scraped_at ON price_history (scraped_at)",
+    "CREATE INDEX IF NOT EXISTS idx_price_product_retailer_date "
+    "ON price_history (product_id, retailer_id, scraped_at)",
+]
+
+_lock = threading.Lock()
+_state: Dict[str, Tuple[bool, Set[str]]] = {}   # engine url → (partitioned, leaf names)
+
+
+# ---------------------------------------------------------------------------
+# Month arithmetic / naming
+# ---------------------------------------------------------------------------
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(moment: datetime) -> str:
+    """Leaf holding *moment*, e.g. ``price_history_p2026_10``."""
+    return f"{PARENT}_p{moment.year:04d}_{moment.month:02d}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    """First day of the month a leaf (or its detached archive) covers."""
+    match = _LEAF_NAME.match(name.replace("price_archive_p", f"{PARENT}_p", 1))
+    return datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def months_between(first: datetime, last: datetime) -> List[datetime]:
+    """Month starts from *first*'s month through *last*'s, inclusive."""
+    month, end = month_start(first), month_start(last)
+    months = []
+    while month <= end:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def partition_ddl(month: datetime) -> List[str]:
+    """CREATE statements for one monthly leaf and its dedupe index."""
+    name = partition_name(month)
+    upper = add_months(month, 1)
+    return [
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')",
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {name}_bucket_key "
+        f"ON {name} (product_id, retailer_id, scrape_bucket)",
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Catalog lookups
+# ---------------------------------------------------------------------------
+
+def _is_postgres() -> bool:
+    return db.engine.dialect.name == "postgresql"
+
+
+def _load_state() -> Tuple[bool, Set[str]]:
+    partitioned = bool(db.session.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :parent AND pg_table_is_visible(c.oid)"
+    ), {"parent": PARENT}).scalar())
+    leaves: Set[str] = set()
+    if partitioned:
+        leaves = {row[0] for row in db.session.execute(text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "WHERE parent.relname = :parent AND pg_table_is_visible(parent.oid)"
+        ), {"parent": PARENT})}
+    return partitioned, leaves
+
+
+def _cached_state() -> Tuple[bool, Set[str]]:
+    key = str(db.engine.url)
+    with _lock:
+        cached = _state.get(key)
+    if cached is None:
+        cached = _load_state()
+        with _lock:
+            _state[key] = cached
+    return cached
+
+
+def invalidate() -> None:
+    """Forget cached catalog lookups (after DDL, and in tests)."""
+    with _lock:
+        _state.clear()
+
+
+def is_partitioned() -> bool:
+    """True when ``price_history`` is a partitioned Postgres table."""
+    return _is_postgres() and _cached_state()[0]
+
+
+def monthly_partitions() -> List[Tuple[str, datetime]]:
+    """Attached monthly leaves as (name, month start), oldest first."""
+    if not is_partitioned():
+        return []
+    leaves = []
+    for name in _cached_state()[1]:
+        month = partition_month(name)
+        if month is not None:
+            leaves.append((name, month))
+    return sorted(leaves, key=lambda leaf: leaf[1])
+
+
+# ---------------------------------------------------------------------------
+# Maintenance
+# ---------------------------------------------------------------------------
+
+def ensure_partitions(months_ahead: int = PARTITION_MONTHS_AHEAD,
+                      now: Optional[datetime] = None) -> List[str]:
+    """
+    Create the leaves for this month and the next *months_ahead* months.
+
+    Safe to run from every start-up and the weekly archival job; returns the
+    statements executed (empty when nothing was missing or the table is not
+    partitioned).
+    """
+    if not is_partitioned():
+        return []
+    now = now or datetime.utcnow()
+    existing = _cached_state()[1]
+    missing = [month for month in months_between(now, add_months(month_start(now), months_ahead))
+               if partition_name(month) not in existing]
+    applied: List[str] = []
+    if missing:
+        # Own connection: callers may be mid-transaction (bulk_upsert).
+        with db.engine.begin() as conn:
+            for month in missing:
+                for stmt in partition_ddl(month):
+                    conn.execute(text(stmt))
+                    applied.append(stmt)
+    if applied:
+        invalidate()
+        for stmt in applied:
+            logger.info("ensure_partitions: %s", stmt)
+    return applied
+
+
+def partition_price_history(months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """
+    Convert a plain Postgres ``price_history`` into the partitioned layout.
+
+    Runs in one transaction: the old table is renamed, a partitioned parent
+    is created from its definition (columns, defaults, id sequence), leaves
+    are created for every month from the oldest row through *months_ahead*
+    months from now, the rows are copied and the old table dropped. Returns
+    the statements executed; empty on SQLite or when already partitioned.
+    """
+    if not _is_postgres():
+        return []
+    invalidate()
+    if is_partitioned():
+        return []
+
+    old = f"{PARENT}_unpartitioned"
+    applied: List[str] = []
+
+    def run(stmt: str) -> None:
+        db.session.execute(text(stmt))
+        applied.append(stmt)
+
+    run(f"LOCK TABLE {PARENT} IN ACCESS EXCLUSIVE MODE")
+    sequence = db.session.execute(
+        text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": PARENT}).scalar()
+    first = db.session.execute(text(f"SELECT MIN(scraped_at) FROM {PARENT}")).scalar()
+    old_indexes = [row[0] for row in db.session.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE tablename = :table "
+        "AND indexname <> :pkey"), {"table": PARENT, "pkey": f"{PARENT}_pkey"})]
+
+    # Index and constraint names are schema-wide: free them for the parent.
+    for name in old_indexes:
+        run(f"DROP INDEX IF EXISTS {name}")
+    run(f"ALTER TABLE {PARENT} RENAME CONSTRAINT {PARENT}_pkey TO {old}_pkey")
+    run(f"ALTER TABLE {PARENT} RENAME TO {old}")
+    if sequence:
+        run(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+
+    run(f"CREATE TABLE {PARENT} (LIKE {old} INCLUDING DEFAULTS) "
+        f"PARTITION BY RANGE (scraped_at)")
+    run(f"ALTER TABLE {PARENT} ALTER COLUMN scraped_at SET NOT NULL")
+    run(f"ALTER TABLE {PARENT} ADD CONSTRAINT {PARENT}_pkey PRIMARY KEY (id, scraped_at)")
+    run(f"ALTER TABLE {PARENT} ADD CONSTRAINT {PARENT}_product_id_fkey "
+        f"FOREIGN KEY (product_id) REFERENCES products (id)")
+    run(f"ALTER TABLE {PARENT} ADD CONSTRAINT {PARENT}_retailer_id_fkey "
+        f"FOREIGN KEY (retailer_id) REFERENCES retailers (id)")
+    for stmt in _PARENT_INDEXES:
+        run(stmt)
+
+    now = datetime.utcnow()
+    for month in months_between(first or now, add_months(month_start(now), months_ahead)):
+        for stmt in partition_ddl(month):
+            run(stmt)
+    run(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT")
+
+    columns = [row[0] for row in db.session.execute(text(
+        "SELECT column_name FROM information_schema.columns WHERE table_name = :table "
+        "ORDER BY ordinal_position"), {"table": old})]
+    col_list = ", ".join(columns)
+    select_list = ", ".join(
+        "COALESCE(scraped_at, now() AT TIME ZONE 'utc')" if col == "scraped_at" else col
+        for col in columns)
+    run(f"INSERT INTO {PARENT} ({col_list}) SELECT {select_list} FROM {old}")
+    if sequence:
+        run(f"ALTER SEQUENCE {sequence} OWNED BY {PARENT}.id")
+    run(f"DROP TABLE {old}")
+    run(f"ANALYZE {PARENT}")
+
+    db.session.commit()
+    invalidate()
+    for stmt in applied:
+        logger.info("partition_price_history: %s", stmt)
+    return applied
+
+
+def partition_if_empty(months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """Convert ``price_history`` while converting is free (fresh Postgres database)."""
+    if not _is_postgres() or is_partitioned():
+        return []
+    if db.session.execute(text(f"SELECT 1 FROM {PARENT} LIMIT 1")).first() is not None:
+        logger.info("price_history holds rows; run scripts/partition_price_history.py "
+                    "to switch to monthly partitions")
+        return []
+    return partition_price_history(months_ahead)
+
+
+# ---------------------------------------------------------------------------
+# Writes
+# ---------------------------------------------------------------------------
+
+_leaf_tables: Dict[str, Table] = {}
+
+
+def insert_table(scraped_at: datetime) -> Table:
+    """
+    Table bulk upserts for *scraped_at* should INSERT ... ON CONFLICT into.
+
+    ``price_history`` itself unless it is partitioned; then the monthly leaf
+    holding *scraped_at*, created on the spot if the weekly job fell behind.
+    """
+    from app.models.price import PriceHistory
+
+    if not is_partitioned():
+        return PriceHistory.__table__
+    name = partition_name(scraped_at)
+    if name not in _cached_state()[1]:
+        ensure_partitions(0, now=scraped_at)
+    with _lock:
+        table = _leaf_tables.get(name)
+        if table is None:
+            table = _leaf_tables[name] = Table(
+                name, MetaData(),
+                *(Column(col.name, col.type, primary_key=col.primary_key)
+                  for col in PriceHistory.__table__.columns))
+    return table
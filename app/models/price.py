@@ -1,6 +1,17 @@
 from datetime import datetime
 from app.extensions import db
 
+# Width of the dedupe window for bulk scrape writes. Rows written by
+# PriceService.bulk_upsert carry scrape_bucket = epoch seconds // this, and a
+# replayed scrape inside the same bucket updates the row instead of adding one.
+SCRAPE_BUCKET_SECONDS = 3600
+
+
+def scrape_bucket(scraped_at: datetime) -> int:
+    """Return the dedupe bucket number for a naive-UTC timestamp."""
+    epoch = (scraped_at - datetime(1970, 1, 1)).total_seconds()
+    return int(epoch // SCRAPE_BUCKET_SECONDS)
+
 
 class PriceHistory(db.Model):
     __tablename__ = 'price_history'
@@ -21,9 +32,17 @@ class PriceHistory(db.Model):
     # Source tracking
     source_url = db.Column(db.String(1000))
     scraped_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # Set only by the bulk scrape path; NULL rows (manual ingest, uploads) are
+    # never deduplicated because NULLs don't collide in a unique index.
+    scrape_bucket = db.Column(db.Integer)
 
+    # On Postgres the table may be range-partitioned by month on scraped_at
+    # (app/models/partitioning.py): the primary key is then (id, scraped_at)
+    # and the bucket index exists per monthly partition.
     __table_args__ = (
         db.Index('idx_price_product_retailer_date', 'product_id', 'retailer_id', 'scraped_at'),
+        db.Index('uq_price_product_retailer_bucket', 'product_id', 'retailer_id', 'scrape_bucket',
+                 unique=True),
     )
 
     def __repr__(self):
@@ -0,0 +1,25 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class PriceArchive(db.Model):
+    """price_history rows moved out by the weekly archival task.
+
+    Rows keep their price_history id, so a batch that is copied twice (a
+    crashed run being resumed) is skipped instead of duplicated. See
+    ``app.tasks.archival``.
+    """
+    __tablename__ = 'price_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    product_id = db.Column(db.Integer)
+    retailer_id = db.Column(db.Integer)
+    price = db.Column(db.Numeric(10, 2))
+    price_usd = db.Column(db.Numeric(10, 2))
+    currency = db.Column(db.String(3))
+    in_stock = db.Column(db.Boolean)
+    scraped_at = db.Column(db.DateTime, index=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<PriceArchive {self.product_id} @ {self.retailer_id}: {self.price}>'
@@ -0,0 +1,43 @@
+from app.extensions import db
+
+
+class PriceDaily(db.Model):
+    """Daily OHLC rollup of ``price_history``: one row per (product, retailer, day).
+
+    Maintained on write next to ``latest_prices`` (see
+    ``app.services.rollup_service.upsert_price_daily``) so long-range charts
+    read one row per day instead of every scrape. ``open_at`` / ``close_at``
+    keep the rollup order-independent: a late write only becomes the open or
+    close when it is earlier / later than the current one. Fill in missing
+    days from history with ``python scripts/backfill_price_daily.py``. Rows outlive
+    the archival of the history they were built from.
+    """
+    __tablename__ = 'price_daily'
+
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    retailer_id = db.Column(db.Integer, db.ForeignKey('retailers.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+
+    open = db.Column(db.Numeric(10, 2), nullable=False)
+    high = db.Column(db.Numeric(10, 2), nullable=False)
+    low = db.Column(db.Numeric(10, 2), nullable=False)
+    close = db.Column(db.Numeric(10, 2), nullable=False)
+    min_in_stock = db.Column(db.Numeric(10, 2))        # NULL: never in stock that day
+    price_sum = db.Column(db.Numeric(14, 2), nullable=False)
+    samples = db.Column(db.Integer, nullable=False)
+    currency = db.Column(db.String(3))
+    open_at = db.Column(db.DateTime, nullable=False)
+    close_at = db.Column(db.DateTime, nullable=False)
+    # scrape_bucket of the close: a scrape replayed in it replaces, not adds, a sample.
+    last_bucket = db.Column(db.Integer)
+
+    __table_args__ = (
+        db.Index('ix_price_daily_product_day', 'product_id', 'day'),
+    )
+
+    @property
+    def avg(self):
+        return self.price_sum / self.samples if self.samples else None
+
+    def __repr__(self):
+        return f'<PriceDaily {self.product_id} @ {self.retailer_id} {self.day}: {self.close}>'
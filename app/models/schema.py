@@ -0,0 +1,93 @@
+"""
+app/models/schema.py
+
+Idempotent, additive schema upgrades.
+
+``db.create_all()`` creates missing tables but never alters existing ones, so
+columns and indexes added to an existing model are applied here instead.
+Every statement is guarded (column inspection / ``IF NOT EXISTS``) and safe to
+run on every start-up of a script or cron job. On Postgres it also keeps the
+monthly ``price_history`` partitions in place (app/models/partitioning.py).
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import List
+
+from sqlalchemy import inspect, text
+
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+# (table, column, column DDL)
+_ADDED_COLUMNS = [
+    ("price_history", "scrape_bucket", "INTEGER"),
+    ("latest_prices", "last_seen_at", "TIMESTAMP"),
+    ("price_daily", "last_bucket", "INTEGER"),
+]
+
+# (table, column, UPDATE run once, right after the column is added)
+_BACKFILLS = [
+    ("latest_prices", "last_seen_at",
+     "UPDATE latest_prices SET last_seen_at = scraped_at WHERE last_seen_at IS NULL"),
+]
+
+# (table, index name, CREATE INDEX statement)
+_ADDED_INDEXES = [
+    ("price_history", "uq_price_product_retailer_bucket",
+     "CREATE UNIQUE INDEX IF NOT EXISTS uq_price_product_retailer_bucket "
+     "ON price_history (product_id, retailer_id, scrape_bucket)"),
+    ("latest_prices", "ix_latest_prices_last_seen_at",
+     "CREATE INDEX IF NOT EXISTS ix_latest_prices_last_seen_at "
+     "ON latest_prices (last_seen_at)"),
+]
+
+
+def has_column(table: str, column: str) -> bool:
+    inspector = inspect(db.engine)
+    if not inspector.has_table(table):
+        return False
+    return any(c["name"] == column for c in inspector.get_columns(table))
+
+
+def ensure_schema() -> List[str]:
+    """Apply any missing additive changes; returns the statements executed."""
+    applied: List[str] = []
+    inspector = inspect(db.engine)
+    for table, column, ddl in _ADDED_COLUMNS:
+        if not inspector.has_table(table):
+            continue
+        if any(c["name"] == column for c in inspector.get_columns(table)):
+            continue
+        stmt = f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"
+        db.session.execute(text(stmt))
+        applied.append(stmt)
+        for b_table, b_column, backfill in _BACKFILLS:
+            if (b_table, b_column) == (table, column):
+                db.session.execute(text(backfill))
+                applied.append(backfill)
+
+    from app.models import partitioning
+
+    partitioned = partitioning.is_partitioned()
+    for table, name, stmt in _ADDED_INDEXES:
+        if not inspector.has_table(table):
+            continue
+        if partitioned and table == partitioning.PARENT and name in partitioning.LEAF_ONLY_INDEXES:
+            continue
+        if any(ix["name"] == name for ix in inspector.get_indexes(table)):
+            continue
+        db.session.execute(text(stmt))
+        applied.append(stmt)
+
+    db.session.commit()
+    for stmt in applied:
+        logger.info("ensure_schema: %s", stmt)
+
+    # Postgres: monthly price_history partitions (no-op on SQLite).
+    if inspector.has_table(partitioning.PARENT):
+        applied += partitioning.partition_if_empty()
+        applied += partitioning.ensure_partitions()
+    return applied
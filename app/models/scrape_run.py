@@ -0,0 +1,70 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class ScrapeRun(db.Model):
+    """Telemetry for one retailer in one ScraperManager run.
+
+    Written by ``ScraperManager`` when a run ends (see
+    ``app.scrapers.telemetry``) and read back, grouped per retailer, by the
+    health dashboard (``app.services.health_service``).
+    """
+    __tablename__ = 'scrape_runs'
+
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_SKIPPED = 'skipped'     # circuit open
+
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.String(32), nullable=False, index=True)   # shared by one run's rows
+    retailer_slug = db.Column(db.String(50), nullable=False)
+    retailer_name = db.Column(db.String(100), nullable=False)
+    mode = db.Column(db.String(10), nullable=False, default='batch')   # batch, streaming
+    status = db.Column(db.String(10), nullable=False, default=STATUS_COMPLETED)
+
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    # Network
+    pages_fetched = db.Column(db.Integer, nullable=False, default=0)
+    bytes_fetched = db.Column(db.BigInteger, nullable=False, default=0)
+    fetch_seconds = db.Column(db.Float, nullable=False, default=0.0)
+
+    # Records
+    records_parsed = db.Column(db.Integer, nullable=False, default=0)
+    records_accepted = db.Column(db.Integer, nullable=False, default=0)
+    records_rejected = db.Column(db.Integer, nullable=False, default=0)
+    db_seconds = db.Column(db.Float, nullable=False, default=0.0)
+
+    error = db.Column(db.Text)
+
+    __table_args__ = (
+        db.Index('ix_scrape_runs_slug_started', 'retailer_slug', 'started_at'),
+    )
+
+    def __repr__(self):
+        return f'<ScrapeRun {self.retailer_slug} {self.status} @ {self.started_at}>'
+
+    @property
+    def duration_seconds(self):
+        if self.finished_at and self.started_at:
+            return (self.finished_at - self.started_at).total_seconds()
+        return None
+
+    def to_dict(self):
+        return {
+            'run_id': self.run_id,
+            'mode': self.mode,
+            'status': self.status,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'duration_seconds': self.duration_seconds,
+            'pages_fetched': self.pages_fetched,
+            'bytes_fetched': self.bytes_fetched,
+            'fetch_seconds': self.fetch_seconds,
+            'records_parsed': self.records_parsed,
+            'records_accepted': self.records_accepted,
+            'records_rejected': self.records_rejected,
+            'db_seconds': self.db_seconds,
+            'error': self.error,
+        }
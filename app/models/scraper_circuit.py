@@ -0,0 +1,24 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class ScraperCircuit(db.Model):
+    """Persisted circuit-breaker state, one row per retailer slug.
+
+    Loaded by ``ScraperManager`` at the start of each run and written back at
+    the end (see ``app.utils.circuit_breaker``), so a retailer that is down
+    stays short-circuited across runs, processes and restarts.
+    """
+    __tablename__ = 'scraper_circuits'
+
+    retailer_slug = db.Column(db.String(50), primary_key=True)
+    state = db.Column(db.String(10), nullable=False, default='closed')  # closed, open, half_open
+    consecutive_failures = db.Column(db.Integer, nullable=False, default=0)
+    opened_at = db.Column(db.DateTime)
+    last_failure_at = db.Column(db.DateTime)
+    last_success_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ScraperCircuit {self.retailer_slug}: {self.state}>'
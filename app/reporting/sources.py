@@ -12,6 +12,8 @@ from urllib.parse import quote
 
 import requests
 
+from app.utils import metrics
+
 
 logger = logging.getLogger(__name__)
 
@@ -306,8 +308,10 @@ class ShopifyReportClient:
         return str(self.token)
 
     def _post(self, payload: dict):
+        operation = metrics.graphql_operation(payload.get("query", ""))
         last_error = None
         for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
             try:
                 response = self.session.post(
                     self.endpoint,
@@ -325,7 +329,13 @@ class ShopifyReportClient:
                     break
                 self.sleeper(min((2 ** attempt) + random.random(), 10.0))
                 continue
+            finally:
+                metrics.SHOPIFY_GRAPHQL_SECONDS.observe(
+                    time.perf_counter() - started, client="report", operation=operation
+                )
 
+            if response.status_code == 429:
+                metrics.SHOPIFY_THROTTLED.inc(client="report")
             if response.status_code == 429 or response.status_code >= 500:
                 last_error = ReportSourceError(
                     f"Shopify returned HTTP {response.status_code}"
@@ -363,6 +373,7 @@ class ShopifyReportClient:
                 return body.get("data") or {}
 
             if all((error.get("extensions") or {}).get("code") == "THROTTLED" for error in errors):
+                metrics.SHOPIFY_THROTTLED.inc(client="report")
                 last_errors = errors
                 if attempt < self.max_retries:
                     self.sleeper(min((2 ** attempt) + random.random(), 10.0))
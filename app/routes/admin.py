@@ -7,13 +7,13 @@ Admin / internal routes, including the scraper-health dashboard.
 from __future__ import annotations
 
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from flask import Blueprint, jsonify, render_template, request, current_app
 
+from app.models.latest_price import LatestPrice
 from app.models.price import PriceHistory
 from app.models.retailer import Retailer
-from app.scrapers.scraper_manager import ScraperManager
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -44,52 +44,26 @@ def _gate_admin_writes():
 
 @admin_bp.route("/health")
 def health_dashboard():
-    manager = ScraperManager()
-    statuses = manager.get_all_statuses()
-
-    since = datetime.utcnow() - timedelta(hours=24)
-    for name, status in statuses.items():
-        retailer = Retailer.query.filter_by(name=name).first()
-        if retailer:
-            status["prices_last_24h"] = (
-                PriceHistory.query
-                .filter(
-                    PriceHistory.retailer_id == retailer.id,
-                    PriceHistory.scraped_at >= since,
-                )
-                .count()
-            )
-        else:
-            status["prices_last_24h"] = 0
-
-    return render_template("admin/health.html", statuses=statuses)
+    from app.services.health_service import scraper_health
+
+    return render_template("admin/health.html", statuses=scraper_health())
+
+
+def _isoformat(status: dict) -> dict:
+    return {key: val.isoformat() if isinstance(val, datetime) else val
+            for key, val in status.items()}
 
 
 @admin_bp.route("/health/json")
 def health_json():
-    manager = ScraperManager()
-    statuses = manager.get_all_statuses()
-
-    since = datetime.utcnow() - timedelta(hours=24)
-    for name, status in statuses.items():
-        retailer = Retailer.query.filter_by(name=name).first()
-        if retailer:
-            status["prices_last_24h"] = (
-                PriceHistory.query
-                .filter(
-                    PriceHistory.retailer_id == retailer.id,
-                    PriceHistory.scraped_at >= since,
-                )
-                .count()
-            )
-        else:
-            status["prices_last_24h"] = 0
-
-        for key in ("last_run", "last_success", "last_failure"):
-            val = status.get(key)
-            if isinstance(val, datetime):
-                status[key] = val.isoformat()
-
+    from app.services.health_service import scraper_health
+
+    statuses = scraper_health()
+    for status in statuses.values():
+        status.update(_isoformat(status))
+        for key in ("circuit", "last_run_stats"):
+            if status.get(key):
+                status[key] = _isoformat(status[key])
     return jsonify(statuses)
 
 
@@ -397,28 +371,38 @@ def ingest_fuji():
     if not expected or request.headers.get("X-Ingest-Key") != expected:
         return jsonify({"error": "unauthorized"}), 401
 
-    fuji = Retailer.query.filter_by(slug="fujicardshop").first()
-    if fuji is None:
+    from app.services.price_service import upsert_latest_prices
+    from app.services.rollup_service import upsert_price_daily
+    from app.utils.identity_index import product_id_for, retailer_id_for
+
+    fuji_id = retailer_id_for(slug="fujicardshop")
+    if fuji_id is None:
         return jsonify({"error": "fujicardshop retailer not found"}), 404
 
     recs = (request.get_json(force=True, silent=True) or {}).get("fuji", [])
     now = datetime.utcnow()
     n = 0
+    staged = []
     for f in recs:
         sc, pt = f.get("set_code"), f.get("product_type")
         price = f.get("price_usd")
         if not sc or not pt or price is None:
             continue
-        prod = Product.query.filter_by(set_code=sc, product_type=pt).first()
-        if prod is None:
+        product_id = product_id_for(sc, pt)
+        if product_id is None:
             prod = Product(set_code=sc, set_name=f.get("set_name") or sc, product_type=pt)
             _db.session.add(prod)
-            _db.session.flush()
-        _db.session.add(PriceHistory(
-            product_id=prod.id, retailer_id=fuji.id, price=price, price_usd=price,
+            _db.session.flush()   # drops the identity index; the next lookup sees it
+            product_id = prod.id
+        row = PriceHistory(
+            product_id=product_id, retailer_id=fuji_id, price=price, price_usd=price,
             currency="USD", in_stock=bool(f.get("in_stock", True)),
-            source_url=f.get("source_url"), scraped_at=now))
+            source_url=f.get("source_url"), scraped_at=now)
+        _db.session.add(row)
+        staged.append(row)
         n += 1
+    upsert_latest_prices(staged)
+    upsert_price_daily(staged)
     _db.session.commit()
     return jsonify({"ingested": n, "scraped_at": now.isoformat()})
 
@@ -430,30 +414,13 @@ def fuji_urls_route():
     Lightweight (single query, no storefront fetch) so it won't block the web
     worker. The RCJ side of the price map is joined client-side."""
     from app.models.product import Product
-    from app.models.price import PriceHistory
-    from sqlalchemy import func
 
     fuji = Retailer.query.filter_by(slug="fujicardshop").first()
     if fuji is None:
         return jsonify({"error": "fujicardshop retailer not found"}), 404
 
-    # Latest Fuji price row per product (one grouped query + join).
-    subq = (
-        PriceHistory.query.session.query(
-            PriceHistory.product_id.label("pid"),
-            func.max(PriceHistory.scraped_at).label("latest"),
-        )
-        .filter(PriceHistory.retailer_id == fuji.id)
-        .group_by(PriceHistory.product_id)
-        .subquery()
-    )
-    rows = (
-        PriceHistory.query
-        .join(subq, (PriceHistory.product_id == subq.c.pid)
-              & (PriceHistory.scraped_at == subq.c.latest))
-        .filter(PriceHistory.retailer_id == fuji.id)
-        .all()
-    )
+    # Current Fuji price per product: one primary-key range on latest_prices.
+    rows = LatestPrice.query.filter(LatestPrice.retailer_id == fuji.id).all()
     out = []
     for r in rows:
         prod = Product.query.get(r.product_id)
@@ -465,7 +432,8 @@ def fuji_urls_route():
             "source_url": r.source_url,
             "price_usd": float(r.price_usd) if r.price_usd is not None else (float(r.price) if r.price else None),
             "in_stock": bool(r.in_stock),
-            "scraped_at": r.scraped_at.isoformat() if r.scraped_at else None,
+            "scraped_at": ((r.last_seen_at or r.scraped_at).isoformat()
+                           if (r.last_seen_at or r.scraped_at) else None),
         })
     return jsonify({"count": len(out), "fuji": out})
 
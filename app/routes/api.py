@@ -2,7 +2,7 @@ from flask import Blueprint, jsonify, request
 from app.models.product import Product
 from app.models.price import PriceHistory
 from app.models.retailer import Retailer
-from app.services.chart_service import ChartService
+from app.services.chart_service import RESOLUTIONS, ChartService
 from app.services.price_service import PriceService
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
@@ -13,12 +13,16 @@ def get_price_history(product_id):
     """Get price history for Chart.js"""
     days = request.args.get('days', 30, type=int)
     retailer_id = request.args.get('retailer_id', type=int)
+    resolution = request.args.get('resolution', 'auto')
+    if resolution not in RESOLUTIONS:
+        return jsonify({'error': f"resolution must be one of {', '.join(RESOLUTIONS)}"}), 400
 
     chart_service = ChartService()
     data = chart_service.get_price_chart_data(
         product_id=product_id,
         days=days,
-        retailer_id=retailer_id
+        retailer_id=retailer_id,
+        resolution=resolution,
     )
 
     return jsonify(data)
@@ -64,10 +68,11 @@ def list_products():
     products = query.order_by(Product.set_code).all()
 
     price_service = PriceService()
+    best_prices = price_service.get_best_prices([p.id for p in products])
 
     result = []
     for product in products:
-        best = price_service.get_best_price(product.id)
+        best = best_prices.get(product.id)
         result.append({
             'id': product.id,
             'set_code': product.set_code,
@@ -115,22 +120,24 @@ def upload_prices():
     from datetime import datetime
     from app.extensions import db
     from app.models.price import PriceHistory
-    from app.models.product import Product
-    from app.models.retailer import Retailer
+    from app.services.price_service import upsert_latest_prices
+    from app.services.rollup_service import upsert_price_daily
+    from app.utils.identity_index import product_id_for, retailer_id_for
 
     data = request.get_json()
     if not data or 'prices' not in data:
         return jsonify({'error': 'Missing prices data'}), 400
 
     added = 0
+    staged = []
     for item in data['prices']:
-        product = Product.query.filter_by(set_code=item['set_code'], product_type=item['product_type']).first()
-        retailer = Retailer.query.filter_by(slug=item['retailer_slug']).first()
+        product_id = product_id_for(item['set_code'], item['product_type'])
+        retailer_id = retailer_id_for(slug=item['retailer_slug'])
 
-        if product and retailer:
+        if product_id and retailer_id:
             price_history = PriceHistory(
-                product_id=product.id,
-                retailer_id=retailer.id,
+                product_id=product_id,
+                retailer_id=retailer_id,
                 price=item['price'],
                 currency=item.get('currency', 'JPY'),
                 in_stock=item.get('in_stock', True),
@@ -138,7 +145,10 @@ def upload_prices():
                 scraped_at=datetime.utcnow()
             )
             db.session.add(price_history)
+            staged.append(price_history)
             added += 1
 
+    upsert_latest_prices(staged)
+    upsert_price_daily(staged)
     db.session.commit()
     return jsonify({'status': 'success', 'prices_added': added})
@@ -2,6 +2,11 @@
 app/routes/api_export.py
 
 Data-export endpoints – CSV and JSON downloads for price history.
+
+Exports include archived months kept in the cold store
+(app/utils/cold_store.py) ahead of the rows still in the database. History
+only logs price changes, so a ``since`` window also starts with the row in
+effect at ``since`` for every retailer (a steady price has none after it).
 """
 
 from __future__ import annotations
@@ -14,6 +19,8 @@ from flask import Blueprint, jsonify, make_response, request
 
 from app.models.product import Product
 from app.models.price import PriceHistory
+from app.models.retailer import Retailer
+from app.utils.cold_store import get_cold_store
 
 export_bp = Blueprint("export", __name__, url_prefix="/api/export")
 
@@ -39,6 +46,56 @@ def _price_rows(prices):
         }
 
 
+def _cold_rows(product_ids=None, since=None):
+    """Cold-store rows in the same shape as _price_rows (all products by default)."""
+    store = get_cold_store()
+    if store is None:
+        return []
+    ids = store.product_ids() if product_ids is None else product_ids
+    if not ids:
+        return []
+    products = {p.id: p for p in Product.query.filter(Product.id.in_(ids)).all()}
+    names = dict(Retailer.query.with_entities(Retailer.id, Retailer.name).all())
+    rows = []
+    for product_id in ids:
+        product = products.get(product_id)
+        for c in store.read(product_id, since=since):
+            rows.append({
+                "product_id": product_id,
+                "set_code": product.set_code if product else "",
+                "set_name": product.set_name if product else "",
+                "product_type": product.product_type if product else "",
+                "retailer": names.get(c.retailer_id, ""),
+                "price": float(c.price) if c.price else None,
+                "price_usd": float(c.price_usd) if c.price_usd else None,
+                "currency": c.currency,
+                "in_stock": c.in_stock,
+                "scraped_at": c.scraped_at.isoformat(),
+            })
+    rows.sort(key=lambda r: r["scraped_at"])
+    return rows
+
+
+def _carry_in_rows(product_ids=None, since=None):
+    """The last row before *since* per (product, retailer): the prices the window opens with."""
+    if since is None:
+        return []
+    from app.services.price_service import latest_price_rows
+
+    before = latest_price_rows(product_ids=product_ids, before=since)
+    return list(_price_rows(sorted(before.values(), key=lambda p: (p.scraped_at, p.id))))
+
+
+def _since_arg():
+    since = request.args.get("since")
+    if not since:
+        return None
+    try:
+        return datetime.fromisoformat(since)
+    except ValueError:
+        return None
+
+
 def _build_csv_response(rows, filename: str):
     """Return a Flask Response with CSV content and download headers."""
     output = io.StringIO()
@@ -80,18 +137,15 @@ def export_products():
 def export_prices_csv(product_id: int):
     """Download price history for a single product as CSV."""
     product = Product.query.get_or_404(product_id)
-    since = request.args.get("since")
+    since = _since_arg()
 
     q = PriceHistory.query.filter_by(product_id=product_id).order_by(PriceHistory.scraped_at.asc())
     if since:
-        try:
-            since_dt = datetime.fromisoformat(since)
-            q = q.filter(PriceHistory.scraped_at >= since_dt)
-        except ValueError:
-            pass
+        q = q.filter(PriceHistory.scraped_at >= since)
 
     prices = q.all()
-    rows = list(_price_rows(prices))
+    rows = (_carry_in_rows([product_id], since) + _cold_rows([product_id], since)
+            + list(_price_rows(prices)))
     filename = f"prices_{product.set_code}_{product_id}_{datetime.utcnow().strftime('%Y%m%d')}.csv"
     return _build_csv_response(rows, filename)
 
@@ -100,30 +154,24 @@ def export_prices_csv(product_id: int):
 def export_prices_json(product_id: int):
     """Download price history for a single product as JSON."""
     Product.query.get_or_404(product_id)
-    since = request.args.get("since")
+    since = _since_arg()
 
     q = PriceHistory.query.filter_by(product_id=product_id).order_by(PriceHistory.scraped_at.asc())
     if since:
-        try:
-            since_dt = datetime.fromisoformat(since)
-            q = q.filter(PriceHistory.scraped_at >= since_dt)
-        except ValueError:
-            pass
+        q = q.filter(PriceHistory.scraped_at >= since)
 
-    return jsonify(list(_price_rows(q.all())))
+    return jsonify(_carry_in_rows([product_id], since) + _cold_rows([product_id], since)
+                   + list(_price_rows(q.all())))
 
 
 @export_bp.route("/prices/all.csv")
 def export_all_prices_csv():
     """Download the full price history as a single CSV."""
-    since = request.args.get("since")
+    since = _since_arg()
     q = PriceHistory.query.order_by(PriceHistory.scraped_at.asc())
     if since:
-        try:
-            q = q.filter(PriceHistory.scraped_at >= datetime.fromisoformat(since))
-        except ValueError:
-            pass
+        q = q.filter(PriceHistory.scraped_at >= since)
 
-    rows = list(_price_rows(q.all()))
+    rows = _carry_in_rows(since=since) + _cold_rows(since=since) + list(_price_rows(q.all()))
     filename = f"prices_all_{datetime.utcnow().strftime('%Y%m%d')}.csv"
     return _build_csv_response(rows, filename)
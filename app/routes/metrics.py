@@ -0,0 +1,21 @@
+"""
+app/routes/metrics.py
+
+GET /metrics – the app.utils.metrics registry in the Prometheus text format,
+summed across processes when METRICS_MULTIPROC_DIR is set.
+"""
+
+from __future__ import annotations
+
+from flask import Blueprint, Response
+
+from app.utils.metrics import REGISTRY
+
+metrics_bp = Blueprint("metrics", __name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@metrics_bp.route("/metrics")
+def metrics():
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
@@ -3,26 +3,26 @@ import re
 import logging
 from bs4 import BeautifulSoup
 
-from app.scrapers.base_scraper import BaseScraper
+from app.scrapers.batch_scraper import SearchScraper
 
 logger = logging.getLogger(__name__)
 
 
-class AmazonJPScraper(BaseScraper):
-    """Scraper for Amazon Japan (amazon.co.jp)"""
+class AmazonJPScraper(SearchScraper):
+    """Scraper for Amazon Japan (amazon.co.jp) - one search per product"""
 
+    RETAILER_NAME = "Amazon Japan"
+    RETAILER_SLUG = "amazon-jp"
     SEARCH_URL_TEMPLATE = "https://www.amazon.co.jp/s?k={query}&i=toys"
 
-    def __init__(self, retailer_config: Dict[str, Any]):
-        super().__init__(retailer_config)
-        self.selectors.update({
-            'search_result': '[data-component-type="s-search-result"]',
-            'product_title': 'h2 a span',
-            'price_whole': '.a-price-whole',
-            'price_fraction': '.a-price-fraction',
-            'out_of_stock': '.a-color-price',
-            'product_link': 'h2 a',
-        })
+    SELECTORS = {
+        'search_result': '[data-component-type="s-search-result"]',
+        'product_title': 'h2 a span',
+        'price_whole': '.a-price-whole',
+        'price_fraction': '.a-price-fraction',
+        'out_of_stock': '.a-color-price',
+        'product_link': 'h2 a',
+    }
 
     def build_search_url(self, product) -> str:
         """Build Amazon Japan search URL"""
@@ -42,10 +42,10 @@ class AmazonJPScraper(BaseScraper):
     def parse_price(self, soup: BeautifulSoup, product) -> Optional[Dict[str, Any]]:
         """Parse price from Amazon Japan search results"""
         try:
-            results = soup.select('[data-component-type="s-search-result"]')
+            results = soup.select(self.selectors['search_result'])
 
             for result in results[:5]:
-                title_elem = result.select_one('h2 a span')
+                title_elem = result.select_one(self.selectors['product_title'])
                 if not title_elem:
                     continue
 
@@ -65,14 +65,19 @@ class AmazonJPScraper(BaseScraper):
                     continue
 
                 # Extract price
-                price_elem = result.select_one('.a-price-whole')
+                price_elem = result.select_one(self.selectors['price_whole'])
                 if price_elem:
                     price_text = price_elem.get_text()
                     price = int(re.sub(r'[^\d]', '', price_text))
 
+                    link = result.select_one(self.selectors['product_link'])
                     return {
                         'price': price,
                         'currency': 'JPY',
+                        'source_url': (
+                            'https://www.amazon.co.jp' + link.get('href', '')
+                            if link and link.get('href', '').startswith('/') else None
+                        ),
                     }
 
             return None
@@ -83,7 +88,7 @@ class AmazonJPScraper(BaseScraper):
 
     def parse_stock_status(self, soup: BeautifulSoup) -> bool:
         """Check if product is in stock"""
-        out_of_stock_elem = soup.select_one('.a-color-price')
+        out_of_stock_elem = soup.select_one(self.selectors['out_of_stock'])
         if out_of_stock_elem:
             text = out_of_stock_elem.get_text().lower()
             if '在庫切れ' in text or 'out of stock' in text:
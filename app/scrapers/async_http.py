@@ -0,0 +1,157 @@
+"""
+app/scrapers/async_http.py
+
+Async HTTP layer for scrapers (httpx + asyncio).
+
+One :class:`AsyncFetcher` wraps a single ``httpx.AsyncClient``: HTTP/2 when
+the ``h2`` package is installed, keep-alive connections pooled across every
+scraper that runs on the same event loop, and an ``asyncio.Semaphore`` per
+host so a burst of page requests never opens more than
+``per_host_concurrency`` connections to one retailer.
+
+Retries mirror the ``requests`` session in BaseScraper: MAX_RETRIES
+attempts with exponential backoff on RETRY_STATUS_CODES and on transport
+errors, honouring a numeric ``Retry-After``.
+
+Usage
+-----
+    async with AsyncFetcher() as http:
+        pages = await asyncio.gather(*(http.get(u, headers=h) for u in urls))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.scrapers.base_scraper import (
+    BACKOFF_FACTOR,
+    MAX_RETRIES,
+    REQUEST_TIMEOUT,
+    RETRY_STATUS_CODES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Simultaneous requests allowed to a single host.
+PER_HOST_CONCURRENCY: int = 4
+
+# Pool-wide connection cap across all hosts.
+MAX_CONNECTIONS: int = 20
+
+# Connection-specific headers are illegal in HTTP/2 and meaningless to httpx.
+_HOP_BY_HOP = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _brotli_available() -> bool:
+    for name in ("brotli", "brotlicffi"):
+        try:
+            __import__(name)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+class AsyncFetcher:
+    """Shared async HTTP client with per-host concurrency limits."""
+
+    def __init__(
+        self,
+        per_host_concurrency: int = PER_HOST_CONCURRENCY,
+        max_connections: int = MAX_CONNECTIONS,
+        http2: bool = True,
+        timeout: float = REQUEST_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.per_host_concurrency = per_host_concurrency
+        self.http2 = http2 and _http2_available()
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        if transport is None:
+            # Record / replay harness (app.scrapers.cassette) when one is active
+            from app.scrapers import cassette
+            transport = cassette.async_transport(http2=self.http2, limits=limits)
+        self._client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=limits,
+            timeout=timeout,
+            follow_redirects=True,
+            transport=transport,
+        )
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _limit_for(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        sem = self._host_limits.get(host)
+        if sem is None:
+            sem = self._host_limits[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return sem
+
+    @staticmethod
+    def _clean_headers(headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+        out = {k: v for k, v in (headers or {}).items() if k.lower() not in _HOP_BY_HOP}
+        if not _brotli_available():
+            for k in list(out):
+                if k.lower() == "accept-encoding":
+                    out[k] = "gzip, deflate"
+        return out
+
+    async def request(self, method: str, url: str,
+                      headers: Optional[Dict[str, str]] = None, **kwargs) -> httpx.Response:
+        """
+        Send one request (retrying as BaseScraper.fetch does) and return the
+        response. Raises httpx.HTTPStatusError on a final 4xx/5xx; a 304 is
+        returned as-is for the caller's conditional-GET cache.
+        """
+        headers = self._clean_headers(headers)
+        attempt = 0
+        async with self._limit_for(url):
+            while True:
+                try:
+                    response = await self._client.request(method, url, headers=headers, **kwargs)
+                except httpx.TransportError as exc:
+                    if attempt >= MAX_RETRIES:
+                        raise
+                    delay = BACKOFF_FACTOR * (2 ** attempt)
+                    logger.debug("%s %s failed (%s); retrying in %.1fs", method, url, exc, delay)
+                else:
+                    if response.status_code not in RETRY_STATUS_CODES or attempt >= MAX_RETRIES:
+                        if response.status_code != 304:   # conditional GET hit
+                            response.raise_for_status()
+                        return response
+                    delay = BACKOFF_FACTOR * (2 ** attempt)
+                    retry_after = response.headers.get("Retry-After", "")
+                    if retry_after.isdigit():
+                        delay = float(retry_after)
+                    logger.debug("%s %s -> %d; retrying in %.1fs",
+                                 method, url, response.status_code, delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+                  **kwargs) -> httpx.Response:
+        return await self.request("GET", url, headers=headers, **kwargs)
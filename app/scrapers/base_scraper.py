@@ -9,22 +9,54 @@ Key improvements in this revision
 2. Rotating / updated User-Agent pool (Chrome 124 strings, mid-2024).
 3. ScraperStatus dataclass for structured health tracking.
 4. Price validation via app.utils.price_validator before persisting.
+5. Per-host token-bucket rate limiting (app.utils.rate_limiter), configured
+   from the Retailer row via configure_rate_limit().
+6. Conditional GETs through an on-disk ETag / Last-Modified cache
+   (app.scrapers.http_cache) with parse_cached() to skip re-parsing
+   unchanged pages.
+7. Optional async path: scrapers may implement scrape_async() on top of
+   fetch_async() (app.scrapers.async_http); ScraperManager runs those on one
+   event loop with a shared connection pool. scrape() keeps working for
+   every scraper, migrated or not.
+8. Streaming: scrape_pages() / scrape_pages_async() yield records a page
+   at a time into ScraperManager's pipeline (app.scrapers.pipeline). The
+   defaults adapt list-returning scrapers by yielding scrape() as one page.
+9. Per-product retailers build on the batched contract in
+   app.scrapers.batch_scraper (CollectionScraper / SearchScraper).
+10. CPU-bound HTML parses go through parse_html() / parse_html_async(),
+    which hand them to a process pool when one is attached
+    (app.scrapers.html_parse); inline otherwise.
+11. Sessions and async fetchers are routed through an active record /
+    replay cassette (app.scrapers.cassette) for offline runs and benchmarks.
+12. An attached circuit breaker (app.utils.circuit_breaker) gates every
+    fetch: open circuits fail fast, and fetch / run outcomes drive it.
+13. fetch() / fetch_async() count pages, bytes and time in FetchStats for
+    the scrape_runs telemetry (take_fetch_stats()) and observe the
+    scraper_fetch_seconds histogram (app.utils.metrics).
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 import random
+import threading
 import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+if TYPE_CHECKING:  # pragma: no cover
+    from app.scrapers.http_cache import HttpCache
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -111,6 +143,21 @@ class ScraperStatus:
         }
 
 
+@dataclass
+class FetchStats:
+    """Network counters for one run, read by ScraperManager's run telemetry."""
+    pages: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, nbytes: int, seconds: float) -> None:
+        with self._lock:
+            self.pages += 1
+            self.bytes += nbytes
+            self.seconds += seconds
+
+
 # ---------------------------------------------------------------------------
 # Base scraper
 # ---------------------------------------------------------------------------
@@ -122,14 +169,28 @@ class BaseScraper(ABC):
     Subclasses must implement:
       - retailer_name (property) – unique string identifier
       - scrape()                 – do the actual work, return list of dicts
+
+    Subclasses may also implement ``async scrape_async()`` and fetch with
+    :meth:`fetch_async`; their ``scrape()`` can then simply be
+    ``return self.run_sync(self.scrape_async)``.
     """
 
     # Override in subclass if the retailer requires a custom set of headers
     EXTRA_HEADERS: Dict[str, str] = {}
 
+    # Bump when the subclass parses pages differently: records the HTTP cache
+    # kept from an older parser are not reused (see parse_version).
+    PARSE_VERSION: int = 1
+
     def __init__(self) -> None:
         self._status = ScraperStatus(name=self.retailer_name)
         self._session: Optional[requests.Session] = None
+        self._http = None   # AsyncFetcher while an async scrape is running
+        self._rate_limit: Optional[Tuple[int, float, int]] = None
+        self._http_cache = None   # HttpCache when enabled
+        self._parse_pool = None   # ProcessPoolExecutor for parse_html()
+        self._circuit = None      # CircuitBreaker for this retailer
+        self._fetch_stats = FetchStats()
 
     # ------------------------------------------------------------------
     # Abstract interface
@@ -146,7 +207,8 @@ class BaseScraper(ABC):
         Perform the scrape and return a list of raw price dicts.
 
         Each dict should contain at minimum:
-          {"card_id": int, "price": float, "currency": str, "in_stock": bool}
+          {"set_code": str, "product_type": str, "price": float,
+           "currency": str, "in_stock": bool}
         """
 
     # ------------------------------------------------------------------
@@ -171,7 +233,8 @@ class BaseScraper(ABC):
         session.mount("https://", adapter)
         session.mount("http://", adapter)
 
-        self._session = session
+        from app.scrapers import cassette
+        self._session = cassette.mount(session)
         return session
 
     def _get_headers(self) -> Dict[str, str]:
@@ -185,62 +248,369 @@ class BaseScraper(ABC):
         headers.update(self.EXTRA_HEADERS)
         return headers
 
+    def configure_rate_limit(self, requests_per_minute: int, min_delay_seconds: float = 0,
+                             burst: int = 1) -> None:
+        """
+        Throttle every fetch to the hosts this scraper hits: *burst* requests
+        back-to-back, then *requests_per_minute* (no closer than
+        *min_delay_seconds* apart). Buckets are per host and process-wide.
+        Unconfigured scrapers are not throttled.
+        """
+        self._rate_limit = (requests_per_minute, min_delay_seconds, burst)
+
+    def _limiter(self, url: str):
+        if not self._rate_limit:
+            return None
+        from app.utils.rate_limiter import limiter_for
+        return limiter_for(urlsplit(url).netloc, *self._rate_limit)
+
+    def enable_http_cache(self, cache) -> None:
+        """Send conditional GETs through *cache* (an HttpCache); None disables."""
+        self._http_cache = cache
+
+    def _observe_fetch(self, response, seconds: float) -> None:
+        from app.utils.metrics import FETCH_SECONDS
+
+        self._fetch_stats.add(len(response.content or b""), seconds)
+        FETCH_SECONDS.observe(seconds, retailer=getattr(self, "retailer_slug", None)
+                              or self.retailer_name)
+
+    def take_fetch_stats(self) -> FetchStats:
+        """Return the counters gathered since the last call and start new ones."""
+        stats, self._fetch_stats = self._fetch_stats, FetchStats()
+        return stats
+
+    def attach_circuit(self, breaker) -> None:
+        """Gate every fetch on *breaker* (app.utils.circuit_breaker); None detaches."""
+        self._circuit = breaker
+
+    @contextlib.contextmanager
+    def _circuit_guard(self):
+        """Report the wrapped request's outcome to the attached circuit breaker."""
+        circuit = self._circuit
+        if circuit is None:
+            yield
+            return
+        from app.utils.circuit_breaker import is_failure
+
+        try:
+            yield
+        except Exception as exc:
+            if is_failure(exc):
+                circuit.record_failure(f"{type(exc).__name__}: {exc}")
+                exc._circuit_recorded = True   # not counted again by the run
+            else:
+                circuit.record_success()
+            raise
+        circuit.record_success()
+
+    def _cache_for(self, kwargs) -> Optional["HttpCache"]:
+        # Only plain GETs are cached: the URL alone must identify the response.
+        return None if kwargs else self._http_cache
+
     def fetch(self, url: str, **kwargs) -> requests.Response:
         """
-        Fetch *url* with retry / timeout / random user-agent.
+        Fetch *url* with rate limit / retry / timeout / random user-agent.
+
+        With an HTTP cache enabled the request is conditional; a 304 comes
+        back as the cached 200 and ``response.not_modified`` is True (also
+        for a 200 with an identical body); a 304 whose cached body is gone
+        is fetched again unconditionally. *headers* are merged over the
+        defaults (and bypass the cache).
 
         Raises requests.HTTPError on 4xx/5xx after all retries are exhausted.
         """
-        session = self._get_session()
-        headers = self._get_headers()
-        response = session.get(
-            url,
-            headers=headers,
-            timeout=REQUEST_TIMEOUT,
-            **kwargs,
-        )
-        response.raise_for_status()
-        return response
+        if self._circuit is not None:
+            self._circuit.before_request()
+        with self._circuit_guard():
+            limiter = self._limiter(url)
+            if limiter is not None:
+                limiter.wait()
+            extra = kwargs.pop("headers", None)
+            cache = None if extra else self._cache_for(kwargs)
+            session = self._get_session()
+            headers = {**self._get_headers(), **(extra or {})}
+            conditional = cache.request_headers(url) if cache is not None else {}
+            start = time.perf_counter()
+            response = session.get(
+                url,
+                headers={**headers, **conditional},
+                timeout=REQUEST_TIMEOUT,
+                **kwargs,
+            )
+            self._observe_fetch(response, time.perf_counter() - start)
+            response.not_modified = False
+            if cache is not None:
+                status, hdrs, content, not_modified = cache.on_response(
+                    url, response.status_code, response.headers, response.content
+                )
+                if status == 304:
+                    # The validators outlived the cached body: fetch it in full.
+                    logger.info("%s: cached body for %s is gone; refetching",
+                                self.retailer_name, url)
+                    if limiter is not None:
+                        limiter.wait()
+                    start = time.perf_counter()
+                    response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+                    self._observe_fetch(response, time.perf_counter() - start)
+                    response.not_modified = False
+                    status, hdrs, content, not_modified = cache.on_response(
+                        url, response.status_code, response.headers, response.content
+                    )
+                if status != response.status_code:
+                    replay = requests.Response()
+                    replay.status_code, replay.url, replay._content = status, url, content
+                    replay.headers = requests.structures.CaseInsensitiveDict(hdrs)
+                    replay.encoding = requests.utils.get_encoding_from_headers(replay.headers)
+                    replay.request = response.request
+                    response = replay
+                response.not_modified = not_modified
+            response.raise_for_status()
+            return response
+
+    @property
+    def parse_version(self) -> str:
+        """Scraper class, PARSE_VERSION and title classifier that produce the parse output."""
+        from app.scrapers.classify import CLASSIFIER_VERSION
+
+        cls = type(self)
+        return f"{cls.__module__}.{cls.__qualname__}:{self.PARSE_VERSION}:{CLASSIFIER_VERSION}"
+
+    def parse_cached(self, url: str, response, parse):
+        """
+        Return ``parse(response)``, or the records parsed from the same bytes
+        last time when *response* is ``not_modified`` and they were parsed
+        under the current :attr:`parse_version`. Parse output must be
+        JSON-serialisable to be cached.
+        """
+        cache = self._http_cache
+        if cache is not None and getattr(response, "not_modified", False):
+            cached = cache.parsed(url, self.parse_version)
+            if cached is not None:
+                return cached
+        result = parse(response)
+        if cache is not None:
+            cache.store_parsed(url, result, self.parse_version)
+        return result
+
+    def enable_parse_pool(self, pool) -> None:
+        """Run :meth:`parse_html` calls in *pool* (a ProcessPoolExecutor); None = inline."""
+        self._parse_pool = pool
+
+    def parse_html(self, fn: Callable, *args):
+        """
+        ``fn(*args)``, in the parse pool when one is attached. *fn* must be a
+        module-level function and *args* / its result picklable (see
+        app.scrapers.html_parse).
+        """
+        if self._parse_pool is None:
+            return fn(*args)
+        return self._parse_pool.submit(fn, *args).result()
+
+    async def parse_html_async(self, fn: Callable, *args):
+        """Await ``fn(*args)`` in the parse pool (or a worker thread) off the event loop."""
+        if self._parse_pool is None:
+            return await asyncio.to_thread(fn, *args)
+        return await asyncio.wrap_future(self._parse_pool.submit(fn, *args))
 
     # ------------------------------------------------------------------
-    # Run wrapper  (records status, validates prices)
+    # Async helpers
+    # ------------------------------------------------------------------
+
+    @property
+    def supports_async(self) -> bool:
+        """True when the subclass implements its own scrape_async()."""
+        return type(self).scrape_async is not BaseScraper.scrape_async
+
+    async def scrape_async(self) -> List[dict]:
+        """
+        Async counterpart of :meth:`scrape`. The default runs the sync
+        scrape() in a worker thread, so unmigrated scrapers work unchanged.
+        """
+        return await asyncio.to_thread(self.scrape)
+
+    async def fetch_async(self, url: str, **kwargs):
+        """
+        Async :meth:`fetch`: same rate limit, headers, retries and
+        raise-on-error, through the AsyncFetcher bound by :meth:`run_async` /
+        :meth:`run_sync`.
+        """
+        if self._http is None:
+            raise RuntimeError(f"{self.retailer_name}: fetch_async outside run_async/run_sync")
+        if self._circuit is not None:
+            await self._circuit.before_request_async()
+        with self._circuit_guard():
+            limiter = self._limiter(url)
+            if limiter is not None:
+                await limiter.wait_async()
+            extra = kwargs.pop("headers", None)
+            cache = None if extra else self._cache_for(kwargs)
+            headers = {**self._get_headers(), **(extra or {})}
+            conditional = cache.request_headers(url) if cache is not None else {}
+            start = time.perf_counter()
+            response = await self._http.get(url, headers={**headers, **conditional}, **kwargs)
+            self._observe_fetch(response, time.perf_counter() - start)
+            if cache is None:
+                response.not_modified = False
+                return response
+
+            status, hdrs, content, not_modified = cache.on_response(
+                url, response.status_code, response.headers, response.content
+            )
+            if status == 304:
+                # The validators outlived the cached body: fetch it in full.
+                logger.info("%s: cached body for %s is gone; refetching",
+                            self.retailer_name, url)
+                if limiter is not None:
+                    await limiter.wait_async()
+                start = time.perf_counter()
+                response = await self._http.get(url, headers=headers)
+                self._observe_fetch(response, time.perf_counter() - start)
+                status, hdrs, content, not_modified = cache.on_response(
+                    url, response.status_code, response.headers, response.content
+                )
+            if status != response.status_code:
+                import httpx
+                response = httpx.Response(status, headers=hdrs, content=content,
+                                          request=response.request)
+            response.not_modified = not_modified
+            return response
+
+    def run_sync(self, coro_fn, fetcher=None):
+        """
+        Run ``coro_fn()`` to completion on a private event loop with an
+        AsyncFetcher bound, for sync callers of a migrated scraper.
+        """
+        from app.scrapers.async_http import AsyncFetcher
+
+        async def _main():
+            http = fetcher or AsyncFetcher()
+            self._http = http
+            try:
+                return await coro_fn()
+            finally:
+                self._http = None
+                if fetcher is None:
+                    await http.aclose()
+
+        return asyncio.run(_main())
+
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+
+    @property
+    def supports_streaming(self) -> bool:
+        """True when the subclass yields its own pages."""
+        cls = type(self)
+        return (cls.scrape_pages is not BaseScraper.scrape_pages
+                or cls.scrape_pages_async is not BaseScraper.scrape_pages_async)
+
+    def scrape_pages(self) -> Iterator[List[dict]]:
+        """
+        Yield price records one page at a time. The default adapts a
+        list-returning scraper: the whole of :meth:`scrape` is one page.
+        """
+        yield self.scrape()
+
+    async def scrape_pages_async(self) -> AsyncIterator[List[dict]]:
+        """Async :meth:`scrape_pages`; the default yields :meth:`scrape_async` as one page."""
+        yield await self.scrape_async()
+
+    def run_stream(self, emit: Callable[[List[dict]], None]) -> int:
+        """
+        :meth:`run` for the streaming pipeline: hand each page from
+        :meth:`scrape_pages` to *emit* (which may block for backpressure).
+        Returns the number of records emitted.
+        """
+        emitted = 0
+        try:
+            for page in self.scrape_pages():
+                emitted += len(page)
+                emit(page)
+        except Exception as exc:  # pylint: disable=broad-except
+            self._record_failure(exc)
+            logger.error("%s scrape failed: %s", self.retailer_name, exc, exc_info=True)
+            return emitted
+        self._record_success()
+        return emitted
+
+    async def run_stream_async(self, fetcher, emit) -> int:
+        """
+        :meth:`run_stream` for async scrapers. *emit* is a coroutine
+        function, so waiting on a full pipeline never blocks the event loop.
+        """
+        self._http = fetcher
+        emitted = 0
+        try:
+            async for page in self.scrape_pages_async():
+                emitted += len(page)
+                await emit(page)
+        except Exception as exc:  # pylint: disable=broad-except
+            self._record_failure(exc)
+            logger.error("%s scrape failed: %s", self.retailer_name, exc, exc_info=True)
+            return emitted
+        finally:
+            self._http = None
+        self._record_success()
+        return emitted
+
+    # ------------------------------------------------------------------
+    # Run wrapper  (records status)
     # ------------------------------------------------------------------
 
     def run(self) -> List[dict]:
         """
         Execute :meth:`scrape`, record status, and return results.
 
-        Validates each price with :func:`app.utils.price_validator.validate_price`
-        before passing it downstream; anomalous prices are logged and skipped.
+        Prices are validated downstream, once the records carry product and
+        retailer ids (:meth:`ScraperManager._drop_anomalies`).
         """
-        from app.utils.price_validator import validate_price_for_card
-
         try:
             results = self.scrape()
         except Exception as exc:  # pylint: disable=broad-except
-            self._status.record_failure(str(exc))
+            self._record_failure(exc)
             logger.error("%s scrape failed: %s", self.retailer_name, exc, exc_info=True)
             return []
 
-        # Validate prices and filter out anomalies
-        clean: List[dict] = []
-        for item in results:
-            card_id = item.get("card_id")
-            price_usd = item.get("price_usd") or item.get("price")
-            if card_id is not None and price_usd is not None:
-                vr = validate_price_for_card(card_id, float(price_usd))
-                if vr.is_anomaly:
-                    logger.warning(
-                        "%s: skipping anomalous price for card_id=%s: %s",
-                        self.retailer_name,
-                        card_id,
-                        vr.reasons,
-                    )
-                    continue
-            clean.append(item)
+        self._record_success()
+        return results
 
+    async def run_async(self, fetcher) -> List[dict]:
+        """:meth:`run` for the async path, fetching through the shared *fetcher*."""
+        self._http = fetcher
+        try:
+            results = await self.scrape_async()
+        except Exception as exc:  # pylint: disable=broad-except
+            self._record_failure(exc)
+            logger.error("%s scrape failed: %s", self.retailer_name, exc, exc_info=True)
+            return []
+        finally:
+            self._http = None
+
+        self._record_success()
+        return results
+
+    def _record_failure(self, exc: Exception) -> None:
+        """A run raised: update the status and, if the retailer is unreachable, the circuit."""
+        self._status.record_failure(str(exc))
+        if self._circuit is not None:
+            from app.utils.circuit_breaker import is_failure
+            if is_failure(exc) and not getattr(exc, "_circuit_recorded", False):
+                self._circuit.record_failure(f"{type(exc).__name__}: {exc}")
+
+    def _record_success(self) -> None:
+        """
+        A run completed. Fetch outcomes already drove the circuit; a half-open
+        circuit that saw no fetch (a client outside fetch(), e.g. RCJ's Admin
+        API) is closed by the run succeeding.
+        """
         self._status.record_success()
-        return clean
+        circuit = self._circuit
+        if circuit is not None:
+            from app.utils.circuit_breaker import HALF_OPEN
+            if circuit.state == HALF_OPEN:
+                circuit.record_success()
 
     # ------------------------------------------------------------------
     # Status access
@@ -251,4 +621,7 @@ class BaseScraper(ABC):
         return self._status
 
     def get_status(self) -> dict:
-        return self._status.to_dict()
+        status = self._status.to_dict()
+        if self._circuit is not None:
+            status["circuit"] = self._circuit.to_dict()
+        return status
@@ -0,0 +1,279 @@
+"""
+app/scrapers/batch_scraper.py
+
+Batched "scrape many products" contract on top of BaseScraper.
+
+Retailers without a JSON catalogue (app.scrapers.catalog_scraper) are
+scraped per tracked product: each Product (set_code, product_type) is
+looked up on the retailer and turned into one price record. Two shapes
+cover them:
+
+  CollectionScraper – one collection / catalogue page lists every product.
+                      It is fetched once and parsed once; each product is
+                      then a dict lookup (A Hidden Fortress).
+  SearchScraper     – one search (or product) URL per product (eBay, Amazon
+                      JP, TCGRepublic, PriceCharting). The searches run
+                      concurrently on the async path, so the per-host
+                      semaphore in AsyncFetcher and the retailer's rate
+                      limit are the only budget; each product's record is
+                      streamed to the pipeline as soon as its page parses.
+
+ScraperManager hands every batch scraper the run's tracked products
+(:meth:`BatchScraper.set_products`); a scraper used on its own loads them
+from the database.
+
+Records carry ``set_code`` / ``product_type`` (resolved to ids by the
+manager) plus ``product_id`` for callers that already have it. Listings
+that fail the hard price bounds of :class:`PriceValidator` are dropped at
+parse time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from abc import abstractmethod
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from bs4 import BeautifulSoup
+
+from app.scrapers.base_scraper import BaseScraper
+from app.utils.currency import convert_to_usd
+from app.utils.price_validator import PriceValidator
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ProductRef:
+    """The product fields a batch scraper needs, detached from any session."""
+    id: int
+    set_code: str
+    product_type: str
+
+
+def tracked_products() -> List[ProductRef]:
+    """Active products, ordered by set. Requires an application context."""
+    from app.extensions import db
+    from app.models.product import Product
+
+    rows = (
+        db.session.query(Product.id, Product.set_code, Product.product_type)
+        .filter(Product.is_active.is_(True))
+        .order_by(Product.set_code, Product.product_type)
+        .all()
+    )
+    return [ProductRef(*row) for row in rows]
+
+
+def product_key(set_code: str, product_type: str) -> str:
+    return f"{set_code}_{product_type}"
+
+
+class BatchScraper(BaseScraper):
+    """
+    Base for per-product scrapers.
+
+    Subclasses set ``RETAILER_NAME`` / ``RETAILER_SLUG`` and implement
+    :meth:`scrape_all_products`. *retailer_config* is the optional legacy
+    dict (``selectors``, ``requests_per_minute``, ``min_delay_seconds``, …);
+    ScraperManager overrides its rate limit from the Retailer row.
+    """
+
+    RETAILER_NAME: str = ""
+    RETAILER_SLUG: str = ""
+
+    # Selector defaults; retailer_config["selectors"] overrides per key.
+    SELECTORS: Dict[str, str] = {}
+
+    def __init__(self, retailer_config: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__()
+        self.retailer_config: Dict[str, Any] = dict(retailer_config or {})
+        self.selectors: Dict[str, str] = {**self.SELECTORS,
+                                          **(self.retailer_config.get("selectors") or {})}
+        self._products: Optional[List] = None
+        self._validator = PriceValidator()
+        rpm = self.retailer_config.get("requests_per_minute")
+        if rpm:
+            self.configure_rate_limit(rpm, self.retailer_config.get("min_delay_seconds") or 0)
+
+    @property
+    def retailer_name(self) -> str:
+        return self.RETAILER_NAME
+
+    @property
+    def retailer_slug(self) -> str:
+        return self.RETAILER_SLUG
+
+    # ------------------------------------------------------------------
+    # Products
+    # ------------------------------------------------------------------
+
+    def set_products(self, products: Optional[Sequence]) -> None:
+        """Scrape *products* (anything with id / set_code / product_type) next run."""
+        self._products = list(products) if products is not None else None
+
+    def products(self) -> List:
+        if self._products is None:
+            self._products = tracked_products()
+        return self._products
+
+    # ------------------------------------------------------------------
+    # Scrape
+    # ------------------------------------------------------------------
+
+    def scrape(self) -> List[dict]:
+        return self.scrape_all_products(self.products())
+
+    @abstractmethod
+    def scrape_all_products(self, products: Sequence) -> List[dict]:  # pragma: no cover
+        """Return one price record per product the retailer lists."""
+
+    def _record(self, product, data: Optional[Dict[str, Any]],
+                source_url: Optional[str] = None) -> Optional[dict]:
+        """Build the price record for *product* from parsed *data*, or None."""
+        if not data or data.get("price") is None:
+            return None
+        currency = data.get("currency", "USD")
+        ok, reason = self._validator.validate_price(
+            product_id=getattr(product, "id", None),
+            retailer_id=None,
+            price=data["price"],
+            currency=currency,
+            product_type=product.product_type,
+        )
+        if not ok:
+            logger.warning("%s: dropping %s %s: %s", self.retailer_name,
+                           product.set_code, product.product_type, reason)
+            return None
+        return {
+            "product_id": getattr(product, "id", None),
+            "set_code": product.set_code,
+            "product_type": product.product_type,
+            "price": data["price"],
+            "price_usd": convert_to_usd(float(data["price"]), currency),
+            "currency": currency,
+            "in_stock": data.get("in_stock", True),
+            "source_url": data.get("source_url") or source_url,
+        }
+
+
+class CollectionScraper(BatchScraper):
+    """One collection page, parsed once, answers every product."""
+
+    COLLECTION_URL: str = ""
+
+    def build_search_url(self, product) -> str:
+        return self.COLLECTION_URL
+
+    @abstractmethod
+    def parse_collection(self, soup: BeautifulSoup) -> Dict[str, Dict[str, Any]]:  # pragma: no cover
+        """Return ``{product_key(set_code, product_type): {price, currency, in_stock, source_url}}``."""
+
+    def parse_price(self, soup: BeautifulSoup, product) -> Optional[Dict[str, Any]]:
+        try:
+            return self.parse_collection(soup).get(product_key(product.set_code,
+                                                               product.product_type))
+        except Exception as e:
+            logger.error("Error parsing %s: %s", self.retailer_name, e)
+            return None
+
+    def parse_stock_status(self, soup: BeautifulSoup) -> bool:
+        """Stock is read per listing in parse_collection."""
+        return True
+
+    def scrape_all_products(self, products: Sequence) -> List[dict]:
+        try:
+            response = self.fetch(self.COLLECTION_URL)
+        except Exception as e:
+            logger.error("Error scraping %s: %s", self.retailer_name, e)
+            return []
+        catalogue = self.parse_cached(
+            self.COLLECTION_URL, response,
+            lambda r: self.parse_collection(BeautifulSoup(r.text, "lxml")),
+        )
+        results = []
+        for product in products:
+            rec = self._record(product,
+                               catalogue.get(product_key(product.set_code, product.product_type)),
+                               self.COLLECTION_URL)
+            if rec:
+                results.append(rec)
+        return results
+
+
+class SearchScraper(BatchScraper):
+    """
+    One request per product. Subclasses implement :meth:`build_search_url`
+    and :meth:`parse_price` (and optionally :meth:`parse_stock_status`), or
+    override :meth:`scrape_product_async` for non-HTML sources.
+    """
+
+    @abstractmethod
+    def build_search_url(self, product) -> Optional[str]:  # pragma: no cover
+        """Return the search / product URL for *product*, or None to skip it."""
+
+    @abstractmethod
+    def parse_price(self, soup: BeautifulSoup, product) -> Optional[Dict[str, Any]]:  # pragma: no cover
+        """Return ``{price, currency, in_stock, source_url}`` for *product*, or None."""
+
+    def parse_stock_status(self, soup: BeautifulSoup) -> bool:
+        return True
+
+    def is_blocked(self, soup: BeautifulSoup) -> bool:
+        """True when the page is a bot wall rather than results."""
+        return False
+
+    def parse_response(self, response, product) -> Optional[Dict[str, Any]]:
+        soup = BeautifulSoup(response.text, "lxml")
+        if self.is_blocked(soup):
+            logger.warning("%s: request blocked for %s", self.retailer_name, product.set_code)
+            return None
+        data = self.parse_price(soup, product)
+        if data is not None and "in_stock" not in data:
+            data = {**data, "in_stock": self.parse_stock_status(soup)}
+        return data
+
+    async def scrape_product_async(self, product) -> Optional[dict]:
+        """Fetch and parse one product's page; None when there is no listing."""
+        url = self.build_search_url(product)
+        if not url:
+            return None
+        response = await self.fetch_async(url)
+        data = await asyncio.to_thread(self.parse_response, response, product)
+        return self._record(product, data, url)
+
+    async def _scrape_one(self, product) -> List[dict]:
+        try:
+            rec = await self.scrape_product_async(product)
+        except Exception as e:
+            logger.error("%s: %s %s failed: %s", self.retailer_name,
+                         product.set_code, product.product_type, e)
+            return []
+        return [rec] if rec else []
+
+    async def prepare_async(self) -> None:
+        """Hook run once before the searches fan out (e.g. fetch an API token)."""
+
+    async def scrape_pages_async(self) -> AsyncIterator[List[dict]]:
+        """Search every product concurrently; yield each one's record as it lands."""
+        products = self.products()
+        await self.prepare_async()
+        for done in asyncio.as_completed([self._scrape_one(p) for p in products]):
+            page = await done
+            if page:
+                yield page
+
+    async def scrape_async(self) -> List[dict]:
+        results: List[dict] = []
+        async for page in self.scrape_pages_async():
+            results.extend(page)
+        return results
+
+    def scrape_all_products(self, products: Sequence) -> List[dict]:
+        self.set_products(products)
+        return self.run_sync(self.scrape_async)
+
+    def scrape(self) -> List[dict]:
+        return self.run_sync(self.scrape_async)
@@ -0,0 +1,414 @@
+"""
+app/scrapers/cassette.py
+
+Record / replay HTTP harness for running scrapers offline.
+
+A :class:`Cassette` sits under every HTTP path the scrapers use:
+
+  * BaseScraper.fetch        – mounted on the scraper's requests Session
+  * BaseScraper.fetch_async  – the AsyncFetcher's httpx transport
+  * app.services.rcj_shopify – mounted on the client's requests Session
+
+In ``record`` mode requests go to the network and each response (status,
+headers, decoded body) is appended to the cassette. In ``replay`` mode they
+are answered from disk; a request the cassette has never seen gets a 404
+marked ``X-Cassette-Miss`` and is counted in ``misses``.
+
+Interactions are keyed by method, URL (query sorted) and request body
+(JSON bodies canonicalised, so GraphQL cursors match). Repeats of a key are
+replayed in recorded order, the last one sticking.
+
+Replays can be made realistic:
+
+    cassette = Cassette("run.jsonl", latency=Latency(p50_ms=80, p95_ms=300),
+                        faults=[Fault(429, every=10, retry_after=0),
+                                Fault(503, rate=0.02, match="pvpshoppe.com")])
+    with use_cassette(cassette):
+        ScraperManager().run_all()
+
+Faults are injected in front of the recorded answer, so the scrapers'
+retry / backoff paths run exactly as against a throttling server.
+
+File format: JSON Lines, one interaction per line
+``{"method", "url", "body_key", "status", "headers", "text" | "b64"}``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import contextlib
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Stored bodies are decoded, so framing headers no longer describe them.
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection",
+                 "set-cookie"}
+
+
+# ---------------------------------------------------------------------------
+# Latency / fault models
+# ---------------------------------------------------------------------------
+
+class Latency:
+    """
+    Log-normal per-request delay fitted to a median and a 95th percentile
+    (milliseconds). Seeded, so a replay's delays are reproducible.
+    """
+
+    def __init__(self, p50_ms: float, p95_ms: Optional[float] = None, seed: int = 0) -> None:
+        self.mu = math.log(max(p50_ms, 0.001) / 1000)
+        self.sigma = math.log(max(p95_ms or p50_ms, p50_ms) / max(p50_ms, 0.001)) / 1.645
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, url: str) -> float:
+        with self._lock:
+            return self._rng.lognormvariate(self.mu, self.sigma)
+
+
+@dataclass
+class Fault:
+    """
+    Answer matching requests with *status* instead of the recording: every
+    *every*-th match, or each match with probability *rate*. *match* is a
+    substring of the URL (empty = all). *retry_after* adds a Retry-After
+    header (seconds).
+    """
+    status: int
+    every: int = 0
+    rate: float = 0.0
+    match: str = ""
+    retry_after: Optional[int] = None
+
+    @classmethod
+    def parse(cls, spec: str) -> "Fault":
+        """``"429@0.05"`` (rate), ``"503/10"`` (every 10th), optional ``":host"`` suffix."""
+        spec, _, match = spec.partition(":")
+        if "@" in spec:
+            status, rate = spec.split("@", 1)
+            return cls(int(status), rate=float(rate), match=match, retry_after=0)
+        if "/" in spec:
+            status, every = spec.split("/", 1)
+            return cls(int(status), every=int(every), match=match, retry_after=0)
+        raise ValueError(f"fault spec {spec!r}: expected STATUS@RATE or STATUS/EVERY")
+
+
+# ---------------------------------------------------------------------------
+# Cassette
+# ---------------------------------------------------------------------------
+
+def _canonical_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+def _body_key(body: Optional[bytes]) -> str:
+    if not body:
+        return ""
+    if isinstance(body, str):
+        body = body.encode()
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+    except ValueError:
+        pass
+    return hashlib.sha1(body).hexdigest()
+
+
+@dataclass
+class Interaction:
+    method: str
+    url: str
+    body_key: str
+    status: int
+    headers: Dict[str, str]
+    content: bytes
+
+    def to_json(self) -> dict:
+        out = {"method": self.method, "url": self.url, "body_key": self.body_key,
+               "status": self.status, "headers": self.headers}
+        try:
+            out["text"] = self.content.decode("utf-8")
+        except UnicodeDecodeError:
+            out["b64"] = base64.b64encode(self.content).decode("ascii")
+        return out
+
+    @classmethod
+    def from_json(cls, row: dict) -> "Interaction":
+        content = (base64.b64decode(row["b64"]) if "b64" in row
+                   else row.get("text", "").encode("utf-8"))
+        return cls(row["method"], row["url"], row.get("body_key", ""), int(row["status"]),
+                   dict(row.get("headers") or {}), content)
+
+
+class Cassette:
+    """Recorded HTTP interactions plus the latency / fault model for replay."""
+
+    def __init__(self, path: Optional[str] = None, mode: str = REPLAY,
+                 latency: Union[None, float, Callable[[str], float]] = None,
+                 faults: Sequence[Fault] = (), seed: int = 0) -> None:
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"cassette mode must be {RECORD!r} or {REPLAY!r}")
+        self.path = path
+        self.mode = mode
+        self.latency = (lambda url, s=float(latency): s) if isinstance(latency, (int, float)) \
+            else latency
+        self.faults = list(faults)
+        self.misses: List[str] = []
+        self.served = 0
+        self.faulted = 0
+        self._rng = random.Random(seed)
+        self._fault_counts = [0] * len(self.faults)
+        self._recorded: Dict[Tuple[str, str, str], List[Interaction]] = {}
+        self._cursor: Dict[Tuple[str, str, str], int] = {}
+        self._new: List[Interaction] = []
+        self._lock = threading.Lock()
+        if path and mode == REPLAY:
+            self.load(path)
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def load(self, path: str) -> None:
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    self.add(Interaction.from_json(json.loads(line)))
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Append the interactions recorded this session to *path*."""
+        path = path or self.path
+        if not path or not self._new:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._lock, open(path, "a", encoding="utf-8") as fh:
+            for interaction in self._new:
+                fh.write(json.dumps(interaction.to_json()) + "\n")
+            self._new = []
+
+    def add(self, interaction: Interaction) -> None:
+        key = (interaction.method, interaction.url, interaction.body_key)
+        self._recorded.setdefault(key, []).append(interaction)
+
+    def add_response(self, method: str, url: str, status: int = 200,
+                     body: Union[bytes, str, dict, list] = b"",
+                     headers: Optional[Dict[str, str]] = None,
+                     request_body: Union[None, bytes, str, dict] = None) -> None:
+        """Add one interaction by hand (fixtures, synthetic benchmarks)."""
+        headers = dict(headers or {})
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+            headers.setdefault("Content-Type", "application/json")
+        if isinstance(request_body, (dict, list)):
+            request_body = json.dumps(request_body)
+        self.add(Interaction(method.upper(), _canonical_url(url), _body_key(request_body),
+                             status, headers,
+                             body.encode("utf-8") if isinstance(body, str) else body))
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._recorded.values())
+
+    # ------------------------------------------------------------------
+    # Serving
+    # ------------------------------------------------------------------
+
+    def _fault(self, url: str) -> Optional[Fault]:
+        with self._lock:
+            for i, fault in enumerate(self.faults):
+                if fault.match and fault.match not in url:
+                    continue
+                self._fault_counts[i] += 1
+                if (fault.every and self._fault_counts[i] % fault.every == 0) or \
+                        (fault.rate and self._rng.random() < fault.rate):
+                    self.faulted += 1
+                    return fault
+        return None
+
+    def delay_for(self, url: str) -> float:
+        return self.latency(url) if self.latency else 0.0
+
+    def replay(self, method: str, url: str,
+               body: Optional[bytes]) -> Tuple[int, Dict[str, str], bytes]:
+        """The (status, headers, content) to answer a request with."""
+        fault = self._fault(url)
+        if fault is not None:
+            headers = {"Retry-After": str(fault.retry_after)} if fault.retry_after is not None else {}
+            return fault.status, headers, b""
+
+        key = (method.upper(), _canonical_url(url), _body_key(body))
+        with self._lock:
+            recorded = self._recorded.get(key)
+            if not recorded:
+                self.misses.append(f"{method} {url}")
+                logger.warning("cassette miss: %s %s", method, url)
+                return 404, {"X-Cassette-Miss": "1"}, b""
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            self.served += 1
+            hit = recorded[min(index, len(recorded) - 1)]
+        return hit.status, dict(hit.headers), hit.content
+
+    def record(self, method: str, url: str, body: Optional[bytes], status: int,
+               headers, content: bytes) -> None:
+        kept = {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS}
+        interaction = Interaction(method.upper(), _canonical_url(url), _body_key(body),
+                                  status, kept, content)
+        with self._lock:
+            self.add(interaction)
+            self._new.append(interaction)
+
+    # ------------------------------------------------------------------
+    # Transports
+    # ------------------------------------------------------------------
+
+    def mount(self, session: requests.Session) -> requests.Session:
+        """Route *session* through this cassette (keeping its retry adapter for recording)."""
+        for prefix in ("https://", "http://"):
+            session.mount(prefix, CassetteAdapter(self, session.get_adapter(prefix)))
+        return session
+
+    def async_transport(self, **transport_kwargs) -> "CassetteTransport":
+        """httpx transport over this cassette; *transport_kwargs* build the real one when recording."""
+        inner = httpx.AsyncHTTPTransport(**transport_kwargs) if self.mode == RECORD else None
+        return CassetteTransport(self, inner)
+
+
+class CassetteAdapter(BaseAdapter):
+    """requests adapter that records through *inner* or replays from the cassette."""
+
+    def __init__(self, cassette: Cassette, inner: Optional[BaseAdapter] = None) -> None:
+        super().__init__()
+        self.cassette = cassette
+        self.inner = inner or HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        cassette = self.cassette
+        body = request.body.encode() if isinstance(request.body, str) else request.body
+        if cassette.mode == RECORD:
+            response = self.inner.send(request, **kwargs)
+            cassette.record(request.method, request.url, body, response.status_code,
+                            response.headers, response.content)
+            return response
+
+        # Replay: retry throttles / 5xx as the session's own urllib3 Retry
+        # would (BaseScraper mounts one; a bare Session does not retry).
+        retry = getattr(self.inner, "max_retries", None)
+        retries = (retry.total or 0) if retry is not None else 0
+        force = set(getattr(retry, "status_forcelist", None) or ())
+        backoff = getattr(retry, "backoff_factor", 0) or 0
+
+        attempt = 0
+        while True:
+            delay = cassette.delay_for(request.url)
+            if delay:
+                time.sleep(delay)
+            status, headers, content = cassette.replay(request.method, request.url, body)
+            if status not in force or attempt >= retries:
+                break
+            retry_after = headers.get("Retry-After", "")
+            time.sleep(float(retry_after) if retry_after.isdigit() else backoff * (2 ** attempt))
+            attempt += 1
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = content
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.reason = "Cassette"
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """httpx transport counterpart of :class:`CassetteAdapter` (AsyncFetcher retries above it)."""
+
+    def __init__(self, cassette: Cassette,
+                 inner: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        self.cassette = cassette
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        cassette = self.cassette
+        body = await request.aread()
+        url = str(request.url)
+        if self.inner is not None:
+            response = await self.inner.handle_async_request(request)
+            content = await response.aread()
+            headers = {k: v for k, v in response.headers.items()
+                       if k.lower() not in _DROP_HEADERS}
+            cassette.record(request.method, url, body, response.status_code, headers, content)
+            return httpx.Response(response.status_code, headers=headers, content=content,
+                                  request=request)
+
+        delay = cassette.delay_for(url)
+        if delay:
+            await asyncio.sleep(delay)
+        status, headers, content = cassette.replay(request.method, url, body)
+        return httpx.Response(status, headers=headers, content=content, request=request)
+
+    async def aclose(self) -> None:
+        if self.inner is not None:
+            await self.inner.aclose()
+
+
+# ---------------------------------------------------------------------------
+# Process-wide activation
+# ---------------------------------------------------------------------------
+
+_ACTIVE: Optional[Cassette] = None
+
+
+def active() -> Optional[Cassette]:
+    return _ACTIVE
+
+
+@contextlib.contextmanager
+def use_cassette(cassette: Cassette) -> Iterator[Cassette]:
+    """
+    Route every HTTP session / AsyncFetcher created inside the block through
+    *cassette*; a recording cassette is saved on exit.
+    """
+    global _ACTIVE
+    previous, _ACTIVE = _ACTIVE, cassette
+    try:
+        yield cassette
+    finally:
+        _ACTIVE = previous
+        if cassette.mode == RECORD:
+            cassette.save()
+
+
+def mount(session: requests.Session) -> requests.Session:
+    """*session*, routed through the active cassette when there is one."""
+    return _ACTIVE.mount(session) if _ACTIVE is not None else session
+
+
+def async_transport(**transport_kwargs) -> Optional[httpx.AsyncBaseTransport]:
+    """A transport over the active cassette, or None to let httpx use the network."""
+    return _ACTIVE.async_transport(**transport_kwargs) if _ACTIVE is not None else None
@@ -0,0 +1,328 @@
+"""
+app/scrapers/catalog_scraper.py
+
+Config-driven scrapers for stores that expose a JSON product catalogue.
+
+  ShopifyCatalogScraper – ``/collections/<handle>/products.json``. No page
+                          count, so pages are requested PAGE_WINDOW at a time
+                          until one comes back short.
+  WooStoreApiScraper    – WooCommerce Store API ``/wp-json/wc/store/v1/products``.
+                          Page 1 reports X-WP-TotalPages; the rest are fetched
+                          concurrently.
+
+Both stream each page into the pipeline as it is parsed, keep only the few
+fields a price record needs (title, price, stock, link) so the HTTP cache
+stores slim records instead of whole product payloads, and classify titles
+with the shared classifier (app.scrapers.classify).
+
+A new store needs no code: set ``Retailer.scraper_config`` and the manager
+builds the scraper (see :func:`catalog_scraper_for`)::
+
+    {"engine": "shopify",                 # or "woocommerce"
+     "collections": ["one-piece-booster-box"],   # shopify; default ["all"]
+     "category": "one-piece",             # woocommerce; optional
+     "currency": "USD",                   # store currency; default Retailer.currency
+     "languages": ["japanese"],           # accepted title languages; null = any,
+                                          #   a null entry = unlabelled titles
+     "require_product_type": false,       # skip titles that are neither box nor case
+     "min_price_usd": 10, "max_price_usd": 2000,
+     "per_page": 250, "headers": {...}}
+
+Retailer name / slug / base_url come from the Retailer row.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import html as _html
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.scrapers.base_scraper import BaseScraper
+from app.scrapers.classify import classify
+from app.utils.currency import convert_to_usd
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogScraper(BaseScraper):
+    """Base for JSON catalogue engines; subclasses page and decode one API."""
+
+    ENGINE: str = ""
+
+    # Defaults merged under the per-retailer config (subclasses may extend).
+    CONFIG: Dict[str, Any] = {
+        "currency": "USD",
+        "languages": ["japanese"],
+        "require_product_type": False,
+        "min_price_usd": 10,
+        "max_price_usd": 2000,
+    }
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
+        self.config: Dict[str, Any] = {**CatalogScraper.CONFIG, **self.CONFIG, **(config or {})}
+        super().__init__()
+        self.base_url = (self.config.get("base_url") or "").rstrip("/")
+        if self.config.get("headers"):
+            self.EXTRA_HEADERS = {**self.EXTRA_HEADERS, **self.config["headers"]}
+
+    @property
+    def retailer_name(self) -> str:
+        return self.config.get("name", "")
+
+    @property
+    def retailer_slug(self) -> str:
+        return self.config.get("slug", "")
+
+    # ------------------------------------------------------------------
+    # Scrape
+    # ------------------------------------------------------------------
+
+    def scrape(self) -> List[dict]:
+        return self.run_sync(self.scrape_async)
+
+    async def scrape_async(self) -> List[dict]:
+        """All pages from :meth:`scrape_pages_async`, as one list."""
+        results = [rec async for page in self.scrape_pages_async() for rec in page]
+        logger.info("%s: found %d sealed price records", self.retailer_name, len(results))
+        return results
+
+    # ------------------------------------------------------------------
+    # Records
+    # ------------------------------------------------------------------
+
+    def make_record(self, title: str, price: Optional[float], currency: str,
+                    in_stock: bool, source_url: Optional[str]) -> Optional[dict]:
+        """Classify *title* and build a price record, or None when filtered out."""
+        if price is None:
+            return None
+        set_code, product_type, language = classify(_html.unescape(title or ""))
+        if not set_code:
+            return None
+        languages = self.config.get("languages")
+        if languages is not None and language not in languages:
+            return None
+        if product_type is None and self.config.get("require_product_type"):
+            return None
+
+        price_usd = price if currency == "USD" else convert_to_usd(price, currency)
+        if not (self.config["min_price_usd"] < price_usd < self.config["max_price_usd"]):
+            return None
+
+        return {
+            "set_code": set_code,
+            "product_type": product_type or "box",
+            "price": round(price, 2),
+            "price_usd": round(price_usd, 2),
+            "currency": currency,
+            "in_stock": bool(in_stock),
+            "source_url": source_url,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Shopify
+# ---------------------------------------------------------------------------
+
+class ShopifyCatalogScraper(CatalogScraper):
+    """Shopify storefront ``products.json`` for one or more collections."""
+
+    ENGINE = "shopify"
+    PER_PAGE = 250            # Shopify's maximum
+    PAGE_WINDOW = 3           # pages requested at once per collection
+
+    EXTRA_HEADERS = {
+        "Accept": "application/json",
+        # requests cannot decompress brotli
+        "Accept-Encoding": "gzip, deflate",
+    }
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(config)
+        self.per_page = int(self.config.get("per_page") or self.PER_PAGE)
+        self.collections: List[str] = list(self.config.get("collections") or ["all"])
+        self.failed_pages = 0
+
+    def _page_url(self, collection: str, page: int) -> str:
+        return (f"{self.base_url}/collections/{collection}/products.json"
+                f"?limit={self.per_page}&page={page}")
+
+    async def scrape_pages_async(self) -> AsyncIterator[List[dict]]:
+        """Walk every collection concurrently; de-duplicate products listed in several."""
+        self.failed_pages = 0
+        queue: "asyncio.Queue" = asyncio.Queue()
+        seen: set = set()
+
+        async def _walk(collection: str) -> None:
+            try:
+                page = 1
+                while True:
+                    window = await asyncio.gather(*(
+                        self._fetch_page(collection, n)
+                        for n in range(page, page + self.PAGE_WINDOW)
+                    ))
+                    for parsed in window:
+                        await queue.put(parsed["records"])
+                        if parsed["count"] < self.per_page:
+                            return
+                    page += self.PAGE_WINDOW
+            finally:
+                await queue.put(None)
+
+        tasks = [asyncio.create_task(_walk(c)) for c in self.collections]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                records = await queue.get()
+                if records is None:
+                    remaining -= 1
+                    continue
+                fresh = [r for r in records if r["source_url"] not in seen]
+                seen.update(r["source_url"] for r in fresh)
+                if fresh:
+                    yield fresh
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_page(self, collection: str, page: int) -> dict:
+        url = self._page_url(collection, page)
+        try:
+            return self.parse_cached(url, await self.fetch_async(url), self._parse_page)
+        except Exception as e:
+            self.failed_pages += 1
+            logger.error("%s: error fetching %s (page %d): %s",
+                         self.retailer_name, collection, page, e)
+            return {"count": 0, "records": []}
+
+    def _parse_page(self, response) -> dict:
+        """{"count": products on the page, "records": parsed price records}."""
+        products = (response.json() or {}).get("products") or []
+        records = [rec for rec in map(self._parse_product, products) if rec]
+        return {"count": len(products), "records": records}
+
+    def _parse_product(self, p: dict) -> Optional[dict]:
+        prices = []
+        in_stock = False
+        for variant in p.get("variants") or ():
+            try:
+                prices.append(float(variant.get("price")))
+            except (TypeError, ValueError):
+                continue
+            in_stock = in_stock or bool(variant.get("available"))
+        if not prices:
+            return None
+        handle = p.get("handle", "")
+        return self.make_record(
+            p.get("title", ""), min(prices), self.config["currency"], in_stock,
+            f"{self.base_url}/products/{handle}" if handle else self.base_url,
+        )
+
+
+# ---------------------------------------------------------------------------
+# WooCommerce
+# ---------------------------------------------------------------------------
+
+class WooStoreApiScraper(CatalogScraper):
+    """WooCommerce Store API (``wp-json/wc/store/v1/products``)."""
+
+    ENGINE = "woocommerce"
+    PER_PAGE = 100            # Store API maximum
+    API_PATH = "/wp-json/wc/store/v1/products"
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(config)
+        self.per_page = int(self.config.get("per_page") or self.PER_PAGE)
+
+    def _page_url(self, page: int) -> str:
+        url = f"{self.base_url}{self.API_PATH}?per_page={self.per_page}&page={page}"
+        if self.config.get("category"):
+            url += f"&category={self.config['category']}"
+        return f"{url}&currency={self.config['currency']}"
+
+    async def scrape_pages_async(self) -> AsyncIterator[List[dict]]:
+        """
+        Fetch page 1, read X-WP-TotalPages, then fetch the rest concurrently,
+        yielding each page's records as soon as it is parsed.
+        """
+        url = self._page_url(1)
+        try:
+            first = await self.fetch_async(url)
+            page = self.parse_cached(url, first, self._parse_page)
+        except Exception as e:
+            logger.error("%s API error (page 1): %s", self.retailer_name, e)
+            return
+        yield page["records"]
+
+        try:
+            total_pages = int(first.headers.get("X-WP-TotalPages", ""))
+        except ValueError:
+            total_pages = None
+
+        if total_pages is not None:
+            for fetched in asyncio.as_completed(
+                [self._fetch_page(n) for n in range(2, total_pages + 1)]
+            ):
+                yield (await fetched)["records"]
+        else:
+            # No page count (proxy stripped it): walk pages until a short one.
+            number = 1
+            while page["count"] >= self.per_page:
+                number += 1
+                page = await self._fetch_page(number)
+                yield page["records"]
+
+    async def _fetch_page(self, page: int) -> dict:
+        url = self._page_url(page)
+        try:
+            return self.parse_cached(url, await self.fetch_async(url), self._parse_page)
+        except Exception as e:
+            logger.error("%s API error (page %d): %s", self.retailer_name, page, e)
+            return {"count": 0, "records": []}
+
+    def _parse_page(self, response) -> dict:
+        """{"count": products on the page, "records": parsed price records}."""
+        products = response.json() or []
+        records = [rec for rec in map(self._parse_api_product, products) if rec]
+        return {"count": len(products), "records": records}
+
+    def _parse_api_product(self, p: dict) -> Optional[dict]:
+        prices = p.get("prices", {}) or {}
+        try:
+            minor = int(prices.get("currency_minor_unit", 2))
+            value = int(prices.get("price")) / (10 ** minor)
+        except (TypeError, ValueError):
+            return None
+        return self.make_record(
+            p.get("name", ""), value, prices.get("currency_code") or self.config["currency"],
+            p.get("is_in_stock"), p.get("permalink"),
+        )
+
+
+# ---------------------------------------------------------------------------
+# Config-only retailers
+# ---------------------------------------------------------------------------
+
+ENGINES = {cls.ENGINE: cls for cls in (ShopifyCatalogScraper, WooStoreApiScraper)}
+
+
+def catalog_scraper_for(retailer) -> Optional[CatalogScraper]:
+    """
+    Build the scraper described by ``retailer.scraper_config``, or None when
+    the row names no known ``engine`` (or its JSON is unreadable).
+    """
+    try:
+        config = retailer.config
+    except ValueError as exc:
+        logger.error("%s: invalid scraper_config: %s", retailer.slug, exc)
+        return None
+    engine = ENGINES.get((config or {}).get("engine"))
+    if engine is None:
+        return None
+    return engine({
+        "name": retailer.name,
+        "slug": retailer.slug,
+        "base_url": retailer.base_url,
+        "currency": retailer.currency or "USD",
+        **config,
+    })
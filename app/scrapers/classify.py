@@ -0,0 +1,124 @@
+"""
+app/scrapers/classify.py
+
+One title classifier shared by every scraper.
+
+Each scraper used to carry its own ``SET_PATTERNS`` dict and run one
+``re.search`` per set per title; the dicts drifted apart (``kingdom`` vs
+``kingdoms``, ``awakening`` vs ``awakening of the new era``). Here every
+set alias, product-type word and language word is compiled into a single
+alternation with one named group per token, so one ``finditer`` pass over
+a title yields all three answers. Results are memoised by title.
+
+Precedence
+----------
+* An explicit set code (``OP-05``, ``OP05``, ``EB-01``, ``PRB-02``) beats a
+  set-name alias anywhere in the title; otherwise the first alias wins.
+* ``case`` / ``carton`` / ``12 box`` make a case, else ``box`` makes a box,
+  else product_type is None (callers that assume boxes use ``or "box"``).
+
+Usage
+-----
+    from app.scrapers.classify import classify
+    set_code, product_type, language = classify("OP-09 Japanese Booster Box")
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+
+# Set code -> set-name aliases (lower-case regex fragments; titles are lower-cased).
+# The union of the per-scraper dicts, each set in its most specific form: the
+# aliases apply to every retailer, so a bare "awakening" or "kami" would
+# claim unrelated listings. Every alias is anchored on word boundaries.
+SET_ALIASES: Dict[str, str] = {
+    "OP-01": r"romance\s*dawn",
+    "OP-02": r"paramount\s*war",
+    "OP-03": r"pillars\s*of\s*strength",
+    "OP-04": r"kingdoms?\s*of\s*intrigue",
+    "OP-05": r"awakening\s*of\s*the\s*new\s*era",
+    "OP-06": r"wings\s*of\s*the\s*captain|twin\s*champions",
+    "OP-07": r"500\s*years",
+    "OP-08": r"two\s*legends",
+    "OP-09": r"four\s*emperors|emperors?\s*in\s*the\s*new\s*world",
+    "OP-10": r"royal\s*blood",
+    "OP-11": r"fist\s*of\s*divine|divine\s*speed",
+    "OP-12": r"legacy\s*of\s*the\s*master",
+    "OP-13": r"carrying\s*on\s*his\s*will",
+    "OP-14": r"azure\s*sea|seven\s*heroes",
+    "OP-15": r"adventure\s*on\s*kami",
+    "OP-16": r"decisive\s*battle",
+    "OP-17": r"world.?s\s*strongest\s*warriors",
+    "EB-01": r"memorial\s*collection",
+    "EB-02": r"anime\s*25th",
+    "EB-03": r"heroines",
+    "EB-04": r"egghead",
+    # PRB-01 must NOT match "The Best vol.2" (that's PRB-02) — negative lookahead.
+    "PRB-01": r"the\s*best(?!\s*vol)",
+    "PRB-02": r"the\s*best\s*vol\.?\s*2|premium\s*vol\.?\s*2",
+}
+
+_LANGUAGES = {
+    "japanese": r"japan(?:ese)?|\bjp",
+    "english": r"english|\beng?\b",
+    "chinese": r"chinese|simplified",
+    "korean": r"korean",
+}
+
+
+class Classification(NamedTuple):
+    set_code: Optional[str]
+    product_type: Optional[str]   # "box", "case" or None
+    language: Optional[str]       # "japanese", "english", ... or None
+
+
+def _group(code: str) -> str:
+    return "s_" + code.replace("-", "_")
+
+
+def _build() -> "re.Pattern[str]":
+    parts = [r"(?P<setcode>(?<![a-z])(?P<prefix>op|eb|prb)-?(?P<num>\d{2})(?!\d))"]
+    parts += [f"(?P<{_group(code)}>(?:{alias})\\b)" for code, alias in SET_ALIASES.items()]
+    parts += [
+        r"(?P<case>\b(?:cases?|cartons?)\b|\b12\s*-?\s*box)",
+        r"(?P<box>\bbox(?:es)?\b)",
+    ]
+    parts += [f"(?P<l_{lang}>{pattern})" for lang, pattern in _LANGUAGES.items()]
+    # Every token starts a word, so positions inside words are rejected by the
+    # leading \b before any branch is tried.
+    # Titles are lower-cased once instead of compiling with IGNORECASE: plain
+    # literals let the engine skip a branch on its first character.
+    return re.compile(r"\b(?:" + "|".join(parts) + ")")
+
+
+TITLE_RE = _build()
+# Changes with any alias or token word; parse output cached under another
+# classifier is parsed again (BaseScraper.parse_version).
+CLASSIFIER_VERSION = hashlib.sha256(TITLE_RE.pattern.encode()).hexdigest()[:12]
+_ALIAS_GROUPS = {_group(code): code for code in SET_ALIASES}
+
+
+@lru_cache(maxsize=20000)
+def classify(title: str) -> Classification:
+    """Return (set_code, product_type, language) for a product title in one pass."""
+    code = alias = language = None
+    is_case = is_box = False
+    for m in TITLE_RE.finditer((title or "").lower()):
+        kind = m.lastgroup
+        if kind == "setcode":
+            candidate = f"{m.group('prefix').upper()}-{m.group('num')}"
+            if code is None and candidate in SET_ALIASES:
+                code = candidate
+        elif kind == "case":
+            is_case = True
+        elif kind == "box":
+            is_box = True
+        elif kind.startswith("l_"):
+            language = language or kind[2:]
+        elif alias is None:
+            alias = _ALIAS_GROUPS[kind]
+    product_type = "case" if is_case else ("box" if is_box else None)
+    return Classification(code or alias, product_type, language)
@@ -1,15 +1,17 @@
+import asyncio
 import base64
 import os
 import re
 import time
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any
 from urllib.parse import quote_plus
 
+import httpx
 import requests
 from bs4 import BeautifulSoup
 
-from app.scrapers.base_scraper import BaseScraper
+from app.scrapers.batch_scraper import SearchScraper
 
 logger = logging.getLogger(__name__)
 
@@ -17,36 +19,36 @@ logger = logging.getLogger(__name__)
 _ebay_token_cache: Optional[Dict[str, Any]] = None
 
 
-class EbayScraper(BaseScraper):
+class EbayScraper(SearchScraper):
     """Scraper for eBay - uses Browse API when credentials are set, otherwise falls back to HTML scraping.
 
     Set EBAY_APP_ID + EBAY_CERT_ID for auto token refresh (recommended), or EBAY_ACCESS_TOKEN for manual token.
     Get credentials from: developer.ebay.com
+    One search per product; the token is fetched once per batch.
     """
 
+    RETAILER_NAME = "eBay"
+    RETAILER_SLUG = "ebay"
     API_BASE = "https://api.ebay.com/buy/browse/v1"
     TOKEN_URL = "https://api.ebay.com/identity/v1/oauth2/token"
     SCOPE = "https://api.ebay.com/oauth/api_scope"
 
-    def __init__(self, retailer_config: Dict[str, Any]):
+    SELECTORS = {
+        'listing': '.s-item, li.s-item',
+        'title': '.s-item__title',
+        'price': '.s-item__price',
+    }
+
+    def __init__(self, retailer_config: Optional[Dict[str, Any]] = None):
         super().__init__(retailer_config)
         self.app_id = os.environ.get("EBAY_APP_ID")
         self.cert_id = os.environ.get("EBAY_CERT_ID")
         self.access_token = os.environ.get("EBAY_ACCESS_TOKEN")
-        self.selectors.update({
-            'listing': '.s-item, li.s-item',
-            'title': '.s-item__title',
-            'price': '.s-item__price',
-        })
+        self._token: Optional[str] = None
 
     def build_search_url(self, product) -> str:
         """Build eBay search URL (for HTML fallback)"""
-        query_parts = ["One Piece Card Game", product.set_code, "Japanese"]
-        if product.product_type == 'box':
-            query_parts.append("Booster Box")
-        elif product.product_type == 'case':
-            query_parts.append("Case")
-        query = quote_plus(" ".join(query_parts))
+        query = quote_plus(self._api_query(product))
         return (
             f"https://www.ebay.com/sch/i.html?"
             f"_nkw={query}&LH_ItemCondition=1000&LH_BIN=1&_sop=15"
@@ -95,24 +97,26 @@ class EbayScraper(BaseScraper):
             logger.error(f"eBay OAuth error: {e}")
             return None
 
-    def _fetch_via_api(self, product) -> Optional[Dict[str, Any]]:
-        """Use eBay Browse API to search and get lowest price"""
-        token = self._get_access_token()
-        if not token:
-            return None
-
-        self.rate_limiter.wait()
-
+    def _api_query(self, product) -> str:
         query_parts = ["One Piece Card Game", product.set_code, "Japanese"]
         if product.product_type == 'box':
             query_parts.append("Booster Box")
         elif product.product_type == 'case':
             query_parts.append("Case")
-        q = " ".join(query_parts)
+        return " ".join(query_parts)
+
+    async def prepare_async(self) -> None:
+        """Fetch (or reuse) the OAuth token once for the whole batch."""
+        self._token = await asyncio.to_thread(self._get_access_token)
+
+    async def _fetch_via_api(self, product) -> Optional[Dict[str, Any]]:
+        """Use eBay Browse API to search and get the median Buy-It-Now price"""
+        token = self._token
+        if not token:
+            return None
 
-        url = f"{self.API_BASE}/item_summary/search"
         params = {
-            "q": q,
+            "q": self._api_query(product),
             "filter": "buyingOptions:{FIXED_PRICE},conditionIds:{1000}",  # Buy It Now, New
             "sort": "price",  # Lowest first
             "limit": 20,
@@ -125,95 +129,87 @@ class EbayScraper(BaseScraper):
         }
 
         try:
-            resp = self.session.get(url, params=params, headers=headers, timeout=30)
-            if resp.status_code == 401:
+            resp = await self.fetch_async(f"{self.API_BASE}/item_summary/search",
+                                          params=params, headers=headers)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 401:
                 global _ebay_token_cache
                 _ebay_token_cache = None  # force refresh
+                self._token = None
                 logger.warning("eBay API: Invalid/expired token. Check EBAY_APP_ID/EBAY_CERT_ID or EBAY_ACCESS_TOKEN.")
-                return None
-            if resp.status_code != 200:
-                logger.error(f"eBay API error {resp.status_code}: {resp.text[:200]}")
-                return None
-
-            data = resp.json()
-            items = data.get("itemSummaries", [])
-
-            valid_prices = []
-            for item in items:
-                title = (item.get("title") or "").upper()
-                if product.set_code.upper() not in title:
-                    continue
-                if "JAPANESE" not in title and "JP" not in title and "JPN" not in title:
-                    continue
-
-                price_node = item.get("price") or item.get("currentBidPrice")
-                if price_node:
-                    value = price_node.get("value")
-                    if value:
-                        try:
-                            price = float(value)
-                            if 10 < price < 1000:
-                                valid_prices.append(price)
-                        except (ValueError, TypeError):
-                            pass
-
-            if valid_prices:
-                valid_prices.sort()
-                median_idx = len(valid_prices) // 2
-                item_url = items[0].get("itemWebUrl") or self.build_search_url(product)
-                return {
-                    "price": valid_prices[median_idx],
-                    "currency": "USD",
-                    "source_url": item_url,
-                }
+            else:
+                logger.error(f"eBay API error {e.response.status_code}: {e.response.text[:200]}")
             return None
-
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"eBay API request failed: {e}")
             return None
+
+        try:
+            return self._parse_api(resp.json(), product)
         except Exception as e:
             logger.error(f"eBay API parse error: {e}")
             return None
 
-    def scrape_product(self, product) -> Optional[Dict[str, Any]]:
+    def _parse_api(self, data: Dict[str, Any], product) -> Optional[Dict[str, Any]]:
+        items = data.get("itemSummaries", [])
+
+        valid_prices = []
+        for item in items:
+            title = (item.get("title") or "").upper()
+            if product.set_code.upper() not in title:
+                continue
+            if "JAPANESE" not in title and "JP" not in title and "JPN" not in title:
+                continue
+
+            price_node = item.get("price") or item.get("currentBidPrice")
+            if price_node:
+                value = price_node.get("value")
+                if value:
+                    try:
+                        price = float(value)
+                        if 10 < price < 1000:
+                            valid_prices.append(price)
+                    except (ValueError, TypeError):
+                        pass
+
+        if valid_prices:
+            valid_prices.sort()
+            median_idx = len(valid_prices) // 2
+            item_url = items[0].get("itemWebUrl") or self.build_search_url(product)
+            return {
+                "price": valid_prices[median_idx],
+                "currency": "USD",
+                "in_stock": True,
+                "source_url": item_url,
+            }
+        return None
+
+    async def scrape_product_async(self, product) -> Optional[dict]:
         """Try API first, fall back to HTML scraping"""
-        result = self._fetch_via_api(product)
-        if result:
-            result["in_stock"] = True
-            return result
+        data = await self._fetch_via_api(product)
+        if data:
+            return self._record(product, data)
 
         # Fallback to HTML scraping (often blocked)
-        return super().scrape_product(product)
-
-    def scrape_all_products(self, products: List) -> List[Dict[str, Any]]:
-        """Scrape all products, respecting rate limits"""
-        results = []
-        for product in products:
-            result = self.scrape_product(product)
-            if result:
-                result["product_id"] = product.id
-                results.append(result)
-            time.sleep(self.get_random_delay())
-        return results
-
-    def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
-        """Override to detect eBay bot-blocking"""
-        soup = super().fetch_page(url)
-        if soup and "Service Unavailable" in soup.get_text():
+        return await super().scrape_product_async(product)
+
+    def is_blocked(self, soup: BeautifulSoup) -> bool:
+        """Detect eBay bot-blocking"""
+        if "Service Unavailable" in soup.get_text():
             logger.warning("eBay HTML blocked. Set EBAY_ACCESS_TOKEN for API-based scraping.")
-            return None
-        return soup
+            return True
+        return False
 
     def parse_price(self, soup: BeautifulSoup, product) -> Optional[Dict[str, Any]]:
         """Parse price from HTML (fallback when API not used)"""
         try:
-            listings = soup.select(".s-item, li.s-item")
+            listings = soup.select(self.selectors['listing'])
             if not listings:
                 return None
 
             valid_prices = []
             for listing in listings[1:11]:
-                title_elem = listing.select_one(".s-item__title")
+                title_elem = listing.select_one(self.selectors['title'])
                 if not title_elem:
                     continue
                 title = title_elem.get_text().upper()
@@ -222,7 +218,7 @@ class EbayScraper(BaseScraper):
                 if "JAPANESE" not in title and "JP" not in title and "JPN" not in title:
                     continue
 
-                price_elem = listing.select_one(".s-item__price")
+                price_elem = listing.select_one(self.selectors['price'])
                 if price_elem:
                     price_match = re.search(r"\$([\d,]+\.?\d*)", price_elem.get_text())
                     if price_match:
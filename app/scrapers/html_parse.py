@@ -0,0 +1,194 @@
+"""
+app/scrapers/html_parse.py
+
+HTML listing parsers that can run in a worker process.
+
+Parsing a collection page with BeautifulSoup is CPU-bound and holds the
+GIL, so in ScraperManager's thread pool it stalls every other scraper's
+fetching. The parsers here are plain module-level functions over raw HTML,
+built on lxml with precompiled XPath, and return compact JSON-safe records:
+
+    parse_pvpshoppe(html, cad_to_usd)  -> [record, ...]
+    parse_fptradingcards(html)         -> [record, ...]
+
+Each card's text is extracted once (``text_content()``) and reused for the
+stock checks.
+
+They run inline by default. With ``SCRAPER_PARSE_PROCESSES`` > 0 the
+manager attaches :func:`parse_pool` to the scrapers and
+:meth:`BaseScraper.parse_html` submits the HTML to that ProcessPoolExecutor
+instead: fetching stays on threads / the event loop, parsing scales with
+cores. Anything a worker needs that lives in the parent (FX rates) is
+passed in as an argument.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import lxml.html
+from lxml import etree
+
+from app.scrapers.classify import classify
+
+logger = logging.getLogger(__name__)
+
+_PRICE = re.compile(r"[\d,]+\.?\d*")
+
+
+def _cls(name: str) -> str:
+    """XPath test equivalent to the CSS class selector ``.name``."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _first(node, xpath: etree.XPath):
+    found = xpath(node)
+    return found[0] if found else None
+
+
+def _price(text: str) -> Optional[float]:
+    match = _PRICE.search(text)
+    return float(match.group().replace(",", "")) if match else None
+
+
+# ---------------------------------------------------------------------------
+# PVP Shoppe (Shopify theme, CAD)
+# ---------------------------------------------------------------------------
+
+PVPSHOPPE_URL = "https://pvpshoppe.com"
+PVPSHOPPE_COLLECTION_URL = f"{PVPSHOPPE_URL}/collections/one-piece-sealed-product-1"
+
+# .product-card, .card-wrapper, [class*="product-card"]
+_PVP_CARDS = etree.XPath(f"//*[contains(@class, 'product-card') or {_cls('card-wrapper')}]")
+# .product-card__title, .card-information__text, [class*="title"]
+_PVP_TITLE = etree.XPath(f".//*[{_cls('card-information__text')} or contains(@class, 'title')]")
+# .price, .price__regular, [class*="price"]
+_PVP_PRICE = etree.XPath(".//*[contains(@class, 'price')]")
+_PVP_LINK = etree.XPath(".//a[contains(@href, '/products/')]")
+
+
+def parse_pvpshoppe(html: str, cad_to_usd: float) -> List[dict]:
+    """Japanese sealed listings from a PVP Shoppe collection page."""
+    records = []
+    for card in _PVP_CARDS(lxml.html.fromstring(html)):
+        title_elem = _first(card, _PVP_TITLE)
+        if title_elem is None:
+            continue
+
+        set_code, product_type, language = classify(title_elem.text_content())
+        if language != "japanese" or not set_code:
+            continue
+
+        price_elem = _first(card, _PVP_PRICE)
+        price_cad = _price(price_elem.text_content()) if price_elem is not None else None
+        if price_cad is None:
+            continue
+        price_usd = round(price_cad * cad_to_usd, 4)   # as convert_to_usd
+        if not 10 < price_usd < 500:
+            continue
+
+        text = card.text_content().lower()
+        link = _first(card, _PVP_LINK)
+        records.append({
+            "set_code": set_code,
+            "product_type": product_type or "box",
+            "price": price_cad,
+            "price_usd": price_usd,
+            "currency": "CAD",
+            "in_stock": "sold out" not in text and "out of stock" not in text,
+            "source_url": (PVPSHOPPE_URL + link.get("href", "")
+                           if link is not None else PVPSHOPPE_COLLECTION_URL),
+        })
+    return records
+
+
+# ---------------------------------------------------------------------------
+# FP Trading Cards (WooCommerce theme, USD)
+# ---------------------------------------------------------------------------
+
+FPTRADINGCARDS_SHOP_URL = "https://www.fptradingcards.com/shop/"
+
+# .product, .type-product, li.product
+_FP_ITEMS = etree.XPath(f"//*[{_cls('product')} or {_cls('type-product')}]")
+# .woocommerce-loop-product__title, .product_title, h2, h3
+_FP_TITLE = etree.XPath(f".//*[{_cls('woocommerce-loop-product__title')} or {_cls('product_title')}"
+                        " or self::h2 or self::h3]")
+# .price .amount, .woocommerce-Price-amount, bdi
+_FP_PRICE = etree.XPath(f".//*[({_cls('amount')} and ancestor::*[{_cls('price')}])"
+                        f" or {_cls('woocommerce-Price-amount')} or self::bdi]")
+_FP_LINK = etree.XPath(".//a[contains(@href, 'product')]")
+
+
+def parse_fptradingcards(html: str) -> List[dict]:
+    """Japanese sealed listings from the FP Trading Cards shop page."""
+    records = []
+    for item in _FP_ITEMS(lxml.html.fromstring(html)):
+        title_elem = _first(item, _FP_TITLE)
+        if title_elem is None:
+            continue
+
+        set_code, product_type, language = classify(title_elem.text_content())
+        if language != "japanese" or not set_code:
+            continue
+
+        price_elem = _first(item, _FP_PRICE)
+        price = _price(price_elem.text_content()) if price_elem is not None else None
+        if price is None or not 10 < price < 500:
+            continue
+
+        link = _first(item, _FP_LINK)
+        records.append({
+            "set_code": set_code,
+            "product_type": product_type or "box",
+            "price": price,
+            "price_usd": price,
+            "currency": "USD",
+            "in_stock": "out of stock" not in item.text_content().lower(),
+            "source_url": (link.get("href", FPTRADINGCARDS_SHOP_URL)
+                           if link is not None else FPTRADINGCARDS_SHOP_URL),
+        })
+    return records
+
+
+# ---------------------------------------------------------------------------
+# Process pool
+# ---------------------------------------------------------------------------
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_SIZE = 0
+_POOL_LOCK = threading.Lock()
+
+
+def parse_pool(processes: int) -> Optional[ProcessPoolExecutor]:
+    """
+    The shared parse pool with *processes* workers (created on first use,
+    reused across runs); None when *processes* < 1. Workers are spawned,
+    not forked, because the parent is multi-threaded.
+    """
+    global _POOL, _POOL_SIZE
+    if processes < 1:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_SIZE != processes:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = ProcessPoolExecutor(max_workers=processes,
+                                        mp_context=multiprocessing.get_context("spawn"))
+            _POOL_SIZE = processes
+            logger.info("parse pool: started %d worker processes", processes)
+        return _POOL
+
+
+@atexit.register
+def shutdown_parse_pool() -> None:
+    global _POOL, _POOL_SIZE
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True, cancel_futures=True)
+        _POOL, _POOL_SIZE = None, 0
@@ -0,0 +1,180 @@
+"""
+app/scrapers/http_cache.py
+
+On-disk conditional-GET cache for scraper fetches.
+
+For every URL the cache keeps the validators the server sent (ETag,
+Last-Modified), a SHA-256 of the body, the body itself (zlib-compressed)
+and, optionally, the records a scraper parsed from it together with the
+parser version that produced them. The next fetch sends If-None-Match /
+If-Modified-Since; on a 304 — or a 200 whose body hashes the same — the
+response is marked ``not_modified`` and :meth:`BaseScraper.parse_cached`
+hands back the stored records instead of parsing again, as long as the
+scraper's ``parse_version`` still matches.
+
+Layout: one ``<sha256(url)>.json`` (metadata + parsed records) and one
+``<sha256(url)>.body`` per URL under the cache directory. Writes go through
+a temp file + os.replace, so concurrent scrapers never see a torn entry.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth replaying on a 304 (pagination counts, content type).
+_SKIP_HEADERS = {"set-cookie", "content-encoding", "content-length", "transfer-encoding",
+                 "connection", "keep-alive"}
+
+
+def body_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class HttpCache:
+    """Per-URL validators, body and parsed output, stored under *root*."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0      # 304s and identical bodies
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _path(self, url: str, suffix: str) -> str:
+        return os.path.join(self.root, hashlib.sha256(url.encode()).hexdigest() + suffix)
+
+    def _write(self, path: str, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.root)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def entry(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the stored metadata for *url*, or None."""
+        try:
+            with open(self._path(url, ".json"), "rb") as fh:
+                return json.loads(fh.read())
+        except (OSError, ValueError):
+            return None
+
+    def body(self, url: str) -> Optional[bytes]:
+        try:
+            with open(self._path(url, ".body"), "rb") as fh:
+                return zlib.decompress(fh.read())
+        except (OSError, zlib.error):
+            return None
+
+    def _save_entry(self, url: str, entry: Dict[str, Any]) -> None:
+        self._write(self._path(url, ".json"), json.dumps(entry).encode())
+
+    def forget(self, url: str) -> None:
+        for suffix in (".json", ".body"):
+            try:
+                os.unlink(self._path(url, suffix))
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Request / response hooks
+    # ------------------------------------------------------------------
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """Conditional headers for the next GET of *url*."""
+        entry = self.entry(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def on_response(self, url: str, status: int, headers,
+                    content: bytes) -> Tuple[int, Dict[str, str], bytes, bool]:
+        """
+        Record a response and return ``(status, headers, content, not_modified)``.
+
+        A 304 is swapped for the cached 200 body and headers; if that body is
+        gone the entry is forgotten and the 304 comes back as-is, for the
+        caller to re-request without validators. A 200 whose body hash
+        matches the stored one keeps its content but is flagged as not
+        modified. Anything else replaces the entry (dropping any parsed
+        records).
+        """
+        entry = self.entry(url)
+        if status == 304 and entry:
+            cached = self.body(url)
+            if cached is not None:
+                with self._lock:
+                    self.hits += 1
+                return 200, entry.get("headers", {}), cached, True
+            # Body lost: forget the validators so the next fetch is a full GET.
+            self.forget(url)
+
+        if status != 200:
+            return status, dict(headers), content, False
+
+        digest = body_hash(content)
+        kept = {k: v for k, v in headers.items() if k.lower() not in _SKIP_HEADERS}
+        if entry and entry.get("hash") == digest:
+            # Same bytes: refresh validators, keep the parsed records.
+            entry.update(etag=headers.get("ETag"), last_modified=headers.get("Last-Modified"),
+                         headers=kept)
+            self._save_entry(url, entry)
+            with self._lock:
+                self.hits += 1
+            return status, dict(headers), content, True
+
+        self._write(self._path(url, ".body"), zlib.compress(content))
+        self._save_entry(url, {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "hash": digest,
+            "headers": kept,
+            "parsed": None,
+        })
+        with self._lock:
+            self.misses += 1
+        return status, dict(headers), content, False
+
+    # ------------------------------------------------------------------
+    # Parsed output
+    # ------------------------------------------------------------------
+
+    def parsed(self, url: str, version: Optional[str] = None) -> Any:
+        """Stored parse output for *url*, or None if there is none from parser *version*."""
+        entry = self.entry(url)
+        if not entry or entry.get("parsed_version") != version:
+            return None
+        return entry.get("parsed")
+
+    def store_parsed(self, url: str, parsed: Any, version: Optional[str] = None) -> None:
+        """Attach JSON-serialisable parse output, made by parser *version*, to the current entry."""
+        entry = self.entry(url)
+        if entry is None:
+            return
+        entry["parsed"] = parsed
+        entry["parsed_version"] = version
+        try:
+            self._save_entry(url, entry)
+        except (TypeError, ValueError) as exc:
+            logger.debug("http cache: parsed output for %s not cacheable: %s", url, exc)
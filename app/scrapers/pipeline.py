@@ -0,0 +1,185 @@
+"""
+app/scrapers/pipeline.py
+
+Streaming producer/consumer pipeline for a scrape run.
+
+    scrapers ──pages──▶ [raw queue] ──▶ validate ──▶ [clean queue] ──▶ persist
+     (producers)         bounded        (1 thread)      bounded        (1 thread)
+
+Producers push one page of records at a time with :meth:`ScrapePipeline.submit`.
+The queues are bounded, so a producer that gets ahead of validation or of
+the database blocks on ``put`` (backpressure) instead of piling pages up in
+memory. Validation (id resolution + rolling-median checks) and persistence
+run on their own threads: a slow commit delays only the persist stage,
+not the next scraper's fetches, until the queues fill.
+
+The persist stage groups records from every scraper into batches of
+``persist_batch`` and flushes early when a scraper finishes or the queue
+goes quiet, so the first rows land while later pages are still downloading.
+
+Stage functions are supplied by the caller (ScraperManager):
+
+    validate(name, records) -> records   # runs in the validate thread
+    write(records) -> int                # runs in the persist thread
+
+Both threads run inside ``flask_app.app_context()`` when an app is given.
+An exception in a stage is logged and that page or batch dropped; the
+pipeline keeps draining so producers can never deadlock on a full queue.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pages buffered between stages before producers block.
+QUEUE_SIZE: int = 8
+
+# Records written per bulk_upsert call.
+PERSIST_BATCH: int = 500
+
+# Persist whatever is buffered when no page has arrived for this long.
+IDLE_FLUSH_SECONDS: float = 0.5
+
+_STOP = object()
+
+
+class ScrapePipeline:
+    """Bounded two-stage consumer for pages streamed by scrapers."""
+
+    def __init__(
+        self,
+        validate: Callable[[str, List[dict]], List[dict]],
+        write: Callable[[List[dict]], int],
+        flask_app=None,
+        queue_size: int = QUEUE_SIZE,
+        persist_batch: int = PERSIST_BATCH,
+        keep_results: bool = True,
+    ) -> None:
+        self._validate = validate
+        self._write = write
+        self._flask_app = flask_app
+        self.persist_batch = persist_batch
+        self.keep_results = keep_results
+
+        self._raw: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._clean: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+        self.results: Dict[str, List[dict]] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.db_seconds: Dict[str, float] = {}   # per scraper, its share of each write
+        self.batches_written = 0
+        self.first_write_at: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def start(self) -> "ScrapePipeline":
+        for target, name in ((self._validate_loop, "validate"), (self._persist_loop, "persist")):
+            thread = threading.Thread(target=target, name=f"scrape-pipeline-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, name: str, records: List[dict]) -> None:
+        """Queue one page from scraper *name*; blocks while the pipeline is full."""
+        with self._lock:
+            stats = self.stats.setdefault(name, {"scraped": 0, "accepted": 0, "written": 0})
+            stats["scraped"] += len(records)
+            self.results.setdefault(name, [])
+        if records:
+            self._raw.put((name, records))
+
+    def finish(self, name: str) -> None:
+        """Mark scraper *name* as done, so its tail is persisted promptly."""
+        with self._lock:
+            self.stats.setdefault(name, {"scraped": 0, "accepted": 0, "written": 0})
+            self.results.setdefault(name, [])
+        self._raw.put((name, None))
+
+    def close(self) -> Dict[str, List[dict]]:
+        """Drain both stages and stop the threads; returns accepted records per scraper."""
+        self._raw.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        return self.results
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+
+    def _context(self):
+        return self._flask_app.app_context() if self._flask_app else contextlib.nullcontext()
+
+    def _validate_loop(self) -> None:
+        with self._context():
+            while True:
+                item = self._raw.get()
+                if item is _STOP:
+                    self._clean.put(_STOP)
+                    return
+                name, records = item
+                if records is None:            # end of one scraper
+                    self._clean.put(item)
+                    continue
+                try:
+                    accepted = self._validate(name, records)
+                except Exception as exc:  # pylint: disable=broad-except
+                    logger.error("%s: pipeline validation failed: %s", name, exc, exc_info=True)
+                    continue
+                with self._lock:
+                    self.stats[name]["accepted"] += len(accepted)
+                    if self.keep_results:
+                        self.results[name].extend(accepted)
+                if accepted:
+                    self._clean.put((name, accepted))
+
+    def _persist_loop(self) -> None:
+        buffer: List[tuple] = []   # (name, record)
+        with self._context():
+            while True:
+                try:
+                    item = self._clean.get(timeout=IDLE_FLUSH_SECONDS)
+                except queue.Empty:
+                    self._flush(buffer)
+                    continue
+                if item is _STOP:
+                    self._flush(buffer)
+                    return
+                name, records = item
+                if records is None:
+                    self._flush(buffer)
+                    continue
+                buffer.extend((name, rec) for rec in records)
+                if len(buffer) >= self.persist_batch:
+                    self._flush(buffer)
+
+    def _flush(self, buffer: List[tuple]) -> None:
+        if not buffer:
+            return
+        batch, buffer[:] = list(buffer), []
+        start = time.perf_counter()
+        try:
+            self._write([rec for _, rec in batch])
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("pipeline: failed to persist %d records: %s", len(batch), exc,
+                         exc_info=True)
+            return
+        # A batch mixes scrapers; each is charged its share of the write.
+        per_record = (time.perf_counter() - start) / len(batch)
+        if self.first_write_at is None:
+            self.first_write_at = time.monotonic()
+        with self._lock:
+            self.batches_written += 1
+            for name, _ in batch:
+                self.stats[name]["written"] += 1
+                self.db_seconds[name] = self.db_seconds.get(name, 0.0) + per_record
@@ -3,13 +3,16 @@ import re
 import logging
 from bs4 import BeautifulSoup
 
-from app.scrapers.base_scraper import BaseScraper
+from app.scrapers.batch_scraper import SearchScraper
 
 logger = logging.getLogger(__name__)
 
 
-class PriceChartingScraper(BaseScraper):
-    """Scraper for PriceCharting.com - tracks historical market prices"""
+class PriceChartingScraper(SearchScraper):
+    """Scraper for PriceCharting.com - tracks historical market prices (one page per product)"""
+
+    RETAILER_NAME = "PriceCharting"
+    RETAILER_SLUG = "pricecharting"
 
     # Map set codes to PriceCharting URL slugs
     SET_SLUGS = {
@@ -33,10 +36,7 @@ class PriceChartingScraper(BaseScraper):
         'PRB-01': 'one-piece-japanese-premium-booster',
     }
 
-    def __init__(self, retailer_config: Dict[str, Any]):
-        super().__init__(retailer_config)
-
-    def build_search_url(self, product) -> str:
+    def build_search_url(self, product) -> Optional[str]:
         """Build PriceCharting URL for a specific product"""
         slug = self.SET_SLUGS.get(product.set_code)
         if not slug:
@@ -11,45 +11,18 @@ prices are converted via app.utils.currency.convert_to_usd.
 
 from __future__ import annotations
 
+import asyncio
 import logging
-import re
-import time
 from typing import List, Optional
 
 from app.scrapers.base_scraper import BaseScraper
+from app.scrapers.classify import classify
 from app.utils.currency import convert_to_usd
 
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://www.rarecardsjapan.com"
 
-# Set codes to detect in product titles
-SET_PATTERNS = {
-    "OP-01": r"OP-?01|romance\s*dawn",
-    "OP-02": r"OP-?02|paramount\s*war",
-    "OP-03": r"OP-?03|pillars\s*of\s*strength",
-    "OP-04": r"OP-?04|kingdoms\s*of\s*intrigue",
-    "OP-05": r"OP-?05|awakening\s*of\s*the\s*new\s*era",
-    "OP-06": r"OP-?06|wings\s*of\s*the\s*captain",
-    "OP-07": r"OP-?07|500\s*years",
-    "OP-08": r"OP-?08|two\s*legends",
-    "OP-09": r"OP-?09|emperors",
-    "OP-10": r"OP-?10|royal\s*blood",
-    "OP-11": r"OP-?11|fist\s*of\s*divine|divine\s*speed",
-    "OP-12": r"OP-?12|legacy\s*of\s*the\s*master",
-    "OP-13": r"OP-?13|carrying\s*on\s*his\s*will",
-    "OP-14": r"OP-?14|azure\s*sea",
-    "OP-15": r"OP-?15|kami",
-    "OP-16": r"OP-?16|hour\s*of\s*decisive\s*battle|decisive\s*battle",
-    "EB-01": r"EB-?01|memorial\s*collection",
-    "EB-02": r"EB-?02|anime\s*25th",
-    "EB-03": r"EB-?03|heroines",
-    "EB-04": r"EB-?04|egghead",
-    # PRB-01 must NOT match "The Best vol.2" (that's PRB-02) — negative lookahead.
-    "PRB-01": r"PRB-?01|the\s*best(?!\s*vol)",
-    "PRB-02": r"PRB-?02|the\s*best\s*vol\.?\s*2",
-}
-
 COLLECTION_PATHS = [
     "/collections/booster-boxes/products.json",
     "/collections/all/products.json",
@@ -85,52 +58,58 @@ class RareCardsJapanScraper(BaseScraper):
             logger.warning("RareCardsJapan: could not fetch shop currency (%s); assuming USD", exc)
             return "USD"
 
-    def _fetch_products_page(self, path: str, page: int) -> list:
+    # Pages requested at once per collection. products.json has no page count,
+    # so pages are fetched in windows until one comes back short.
+    PAGE_WINDOW = 3
+
+    async def _fetch_products_page(self, path: str, page: int) -> list:
         """Fetch one page of products from a Shopify collection JSON endpoint."""
         url = f"{BASE_URL}{path}?limit=250&currency=USD"
         if page > 1:
             url += f"&page={page}"
         try:
-            resp = self.fetch(url)
-            return resp.json().get("products", [])
+            resp = await self.fetch_async(url)
+            return self.parse_cached(url, resp, lambda r: r.json().get("products", []))
         except Exception as exc:
             logger.error("RareCardsJapan: error fetching %s (page %d): %s", path, page, exc)
             return []
 
-    def _fetch_all_products(self) -> List[dict]:
-        """Fetch all products across all configured collection paths."""
+    async def _fetch_collection(self, path: str) -> List[dict]:
+        products: List[dict] = []
+        page = 1
+        while True:
+            window = await asyncio.gather(
+                *(self._fetch_products_page(path, n) for n in range(page, page + self.PAGE_WINDOW))
+            )
+            for batch in window:
+                products.extend(batch)
+                if len(batch) < 250:
+                    return products
+            page += self.PAGE_WINDOW
+
+    async def _fetch_all_products_async(self) -> List[dict]:
+        """Fetch every collection path concurrently, de-duplicated by product id."""
         seen_ids: set = set()
         all_products: List[dict] = []
-
-        for path in COLLECTION_PATHS:
-            page = 1
-            while True:
-                products = self._fetch_products_page(path, page)
-                if not products:
-                    break
-                for p in products:
-                    if p["id"] not in seen_ids:
-                        seen_ids.add(p["id"])
-                        all_products.append(p)
-                if len(products) < 250:
-                    break
-                page += 1
-                time.sleep(0.5)
-
+        collections = await asyncio.gather(*(self._fetch_collection(p) for p in COLLECTION_PATHS))
+        for products in collections:
+            for p in products:
+                if p["id"] not in seen_ids:
+                    seen_ids.add(p["id"])
+                    all_products.append(p)
         return all_products
 
+    def _fetch_all_products(self) -> List[dict]:
+        """Fetch all products across all configured collection paths."""
+        return self.run_sync(self._fetch_all_products_async)
+
     def _detect_set_code(self, title: str) -> Optional[str]:
-        """Return the first matching set code found in the product title."""
-        for set_code, pattern in SET_PATTERNS.items():
-            if re.search(pattern, title, re.IGNORECASE):
-                return set_code
-        return None
+        """Return the set code found in the product title (see app.scrapers.classify)."""
+        return classify(title).set_code
 
     def _detect_product_type(self, title: str) -> str:
         """Detect whether the product is a 'case' or 'box' from the title."""
-        if re.search(r"\bcase\b", title, re.IGNORECASE):
-            return "case"
-        return "box"
+        return classify(title).product_type or "box"
 
     def scrape(self) -> List[dict]:
         """Scrape RCJ One Piece prices via the authenticated Admin API.
@@ -143,8 +122,7 @@ class RareCardsJapanScraper(BaseScraper):
         products = rcj_shopify.fetch_products_admin()
         results: List[dict] = []
         for p in products:
-            title = p.get("title", "")
-            set_code = self._detect_set_code(title)
+            set_code, product_type, _ = classify(p.get("title", ""))
             if not set_code:
                 continue
             try:
@@ -156,7 +134,7 @@ class RareCardsJapanScraper(BaseScraper):
             handle = p.get("handle", "")
             results.append({
                 "set_code": set_code,
-                "product_type": self._detect_product_type(title),
+                "product_type": product_type or "box",
                 "price": price,
                 "price_usd": price,
                 "currency": "USD",
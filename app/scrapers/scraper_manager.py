@@ -9,12 +9,37 @@ Key improvements in this revision
 2. Per-scraper error isolation  – one failed scraper doesn’t abort others.
 3. Exposed get_all_statuses() for the health dashboard.
 4. Seeds / updates the DB with scraped prices using PriceService.
+5. Validates prices against per-(product, retailer) rolling medians that
+   are warmed once per run and shared by the worker threads.
+6. Scrapers with an async scrape_async() run together on one event loop
+   with a shared HTTP/2 connection pool (app.scrapers.async_http); sync
+   scrapers keep their own worker thread.
+7. Streaming mode (SCRAPER_STREAMING): scrapers feed pages into a bounded
+   producer/consumer pipeline (app.scrapers.pipeline) so validation and
+   batched writes overlap the fetching instead of waiting for it.
+8. Per-product retailers (app.scrapers.batch_scraper) get the run's
+   tracked products once; their searches fan out on the async loop.
+9. Shopify / WooCommerce stores configured only through
+   Retailer.scraper_config (app.scrapers.catalog_scraper) are added to
+   each run.
+10. SCRAPER_PARSE_PROCESSES > 0 moves HTML listing parses into a process
+    pool (app.scrapers.html_parse) so they stop holding the GIL the
+    fetching threads need.
+11. Per-retailer circuit breakers (app.utils.circuit_breaker), persisted in
+    scraper_circuits: a retailer that keeps failing is skipped until its
+    cooldown passes instead of burning the run on retries.
+12. Each run leaves one scrape_runs row per retailer (app.scrapers.telemetry):
+    pages, bytes, records parsed / accepted / rejected, fetch and DB time.
+13. Validation and persist durations feed the /metrics histograms
+    (app.utils.metrics).
 """
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
 import logging
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional
 
@@ -24,11 +49,25 @@ def _DummyContext():
     yield
 
 from app.scrapers.base_scraper import BaseScraper
+from app.scrapers.batch_scraper import BatchScraper, tracked_products
+from app.scrapers.catalog_scraper import catalog_scraper_for
 from app.scrapers.pvpshoppe_scraper import PVPShoppeScraper
+from app.scrapers.telemetry import RunTelemetry
 from app.scrapers.fptradingcards_scraper import FPTradingCardsScraper
 from app.scrapers.rarecardsjapan_scraper import RareCardsJapanScraper
 from app.scrapers.fujicardshop_scraper import FujiCardShopScraper
+from app.scrapers.ahiddenfortress_scraper import AHiddenFortressScraper
+from app.scrapers.amazon_jp_scraper import AmazonJPScraper
+from app.scrapers.ebay_scraper import EbayScraper
+from app.scrapers.japantcg_scraper import JapanTCGScraper
+from app.scrapers.pricecharting_scraper import PriceChartingScraper
+from app.scrapers.tcghobby_scraper import TCGHobbyScraper
+from app.scrapers.tcgrepublic_scraper import TCGRepublicScraper
 from app.services.price_service import PriceService
+from app.utils import metrics
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.identity_index import identity_index
+from app.utils.rolling_median import MedianCache
 
 logger = logging.getLogger(__name__)
 
@@ -47,8 +86,20 @@ class ScraperManager:
             FPTradingCardsScraper(),
             RareCardsJapanScraper(),
             FujiCardShopScraper(),
+            # Per-product (batched) retailers
+            JapanTCGScraper(),
+            TCGHobbyScraper(),
+            AHiddenFortressScraper(),
+            EbayScraper(),
+            AmazonJPScraper(),
+            TCGRepublicScraper(),
+            PriceChartingScraper(),
         ]
+        self._configured: List[BaseScraper] = []   # from Retailer.scraper_config
         self._max_workers = max_workers
+        self._medians: Optional[MedianCache] = None
+        self._circuits: Dict[str, CircuitBreaker] = {}
+        self._telemetry: Optional[RunTelemetry] = None
 
     # ------------------------------------------------------------------
     # Core run methods
@@ -65,80 +116,213 @@ class ScraperManager:
         # Capture the real Flask app object now (while we're in a request context)
         # so worker threads can push their own app contexts.
         flask_app = current_app._get_current_object()
+        if flask_app.config.get("SCRAPER_STREAMING", False):
+            return self.run_streaming()
+        self._telemetry = RunTelemetry("batch")
+        self._prepare_run()
+        try:
+            return self._run_all(flask_app)
+        finally:
+            self._save_circuits()
+            self._save_telemetry()
 
-        results: Dict[str, List[dict]] = {}
+    def _run_all(self, flask_app) -> Dict[str, List[dict]]:
+        runnable, skipped = self._runnable()
+        results: Dict[str, List[dict]] = {s.retailer_name: [] for s in skipped}
+        async_scrapers = [s for s in runnable if s.supports_async]
+        sync_scrapers = [s for s in runnable if not s.supports_async]
 
         with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
-            future_to_scraper = {
-                pool.submit(self._run_one, scraper, flask_app): scraper
-                for scraper in self._scrapers
+            future_to_scrapers = {
+                pool.submit(self._run_one, scraper, flask_app): [scraper]
+                for scraper in sync_scrapers
             }
-            for future in as_completed(future_to_scraper):
-                scraper = future_to_scraper[future]
+            if async_scrapers:
+                future = pool.submit(self._run_async_group, async_scrapers, flask_app)
+                future_to_scrapers[future] = async_scrapers
+
+            for future in as_completed(future_to_scrapers):
+                scrapers = future_to_scrapers[future]
                 try:
-                    name, data = future.result()
-                    results[name] = data
+                    outcome = future.result()
+                    for name, data in (outcome if isinstance(outcome, list) else [outcome]):
+                        results[name] = data
                 except Exception as exc:  # pylint: disable=broad-except
-                    logger.error(
-                        "ScraperManager: unhandled error from %s: %s",
-                        scraper.retailer_name,
-                        exc,
-                        exc_info=True,
-                    )
-                    results[scraper.retailer_name] = []
+                    for scraper in scrapers:
+                        logger.error(
+                            "ScraperManager: unhandled error from %s: %s",
+                            scraper.retailer_name,
+                            exc,
+                            exc_info=True,
+                        )
+                        results[scraper.retailer_name] = []
 
         return results
 
+    def run_streaming(self) -> Dict[str, List[dict]]:
+        """
+        Run every scraper as a producer into one :class:`ScrapePipeline`:
+        pages are validated and bulk-written while other pages are still
+        being fetched. Returns retailer_name → accepted records, like run_all.
+        """
+        from flask import current_app
+
+        flask_app = current_app._get_current_object()
+        self._telemetry = RunTelemetry("streaming")
+        self._prepare_run()
+        try:
+            return self._run_streaming(flask_app, flask_app.config)
+        finally:
+            self._save_circuits()
+            self._save_telemetry()
+
+    def _run_streaming(self, flask_app, config) -> Dict[str, List[dict]]:
+        from app.scrapers.pipeline import PERSIST_BATCH, QUEUE_SIZE, ScrapePipeline
+
+        pipeline = ScrapePipeline(
+            validate=self._accept,
+            write=self._write,
+            flask_app=flask_app,
+            queue_size=config.get("SCRAPER_PIPELINE_QUEUE_SIZE", QUEUE_SIZE),
+            persist_batch=config.get("SCRAPER_PIPELINE_BATCH", PERSIST_BATCH),
+        ).start()
+
+        runnable, skipped = self._runnable()
+        async_scrapers = [s for s in runnable if s.supports_async]
+        sync_scrapers = [s for s in runnable if not s.supports_async]
+
+        def _produce(scraper):
+            logger.info("Starting scraper: %s (streaming)", scraper.retailer_name)
+            self._telemetry.begin(scraper)
+            try:
+                scraper.run_stream(lambda page: pipeline.submit(scraper.retailer_name, page))
+            finally:
+                pipeline.finish(scraper.retailer_name)
+                self._telemetry.end(scraper)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            futures = [pool.submit(_produce, s) for s in sync_scrapers]
+            if async_scrapers:
+                futures.append(pool.submit(self._stream_async_group, async_scrapers,
+                                           pipeline, flask_app))
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as exc:  # pylint: disable=broad-except
+                    logger.error("ScraperManager: streaming producer failed: %s", exc,
+                                 exc_info=True)
+
+        results = pipeline.close()
+        for scraper in skipped:
+            results.setdefault(scraper.retailer_name, [])
+        for name, stats in pipeline.stats.items():
+            self._telemetry.parsed(name, stats["scraped"])
+            self._telemetry.persisted(name, stats["accepted"], pipeline.db_seconds.get(name, 0.0))
+            logger.info("%s: streamed %d records, %d accepted, %d written",
+                        name, stats["scraped"], stats["accepted"], stats["written"])
+        return results
+
+    def _stream_async_group(self, scrapers: List[BaseScraper], pipeline, flask_app=None) -> None:
+        """Async producers for run_streaming(), sharing one loop and AsyncFetcher."""
+        from app.scrapers.async_http import PER_HOST_CONCURRENCY, AsyncFetcher
+
+        config = flask_app.config if flask_app else {}
+
+        async def _one(scraper, http):
+            name = scraper.retailer_name
+            logger.info("Starting scraper: %s (async, streaming)", name)
+            self._telemetry.begin(scraper)
+
+            async def _emit(page):
+                # A full pipeline parks this coroutine, not the event loop.
+                await asyncio.to_thread(pipeline.submit, name, page)
+
+            try:
+                await scraper.run_stream_async(http, _emit)
+            finally:
+                pipeline.finish(name)
+                self._telemetry.end(scraper)
+
+        async def _main():
+            async with AsyncFetcher(
+                per_host_concurrency=config.get("SCRAPER_PER_HOST_CONCURRENCY",
+                                                PER_HOST_CONCURRENCY),
+                http2=config.get("SCRAPER_HTTP2", True),
+            ) as http:
+                await asyncio.gather(*(_one(s, http) for s in scrapers))
+
+        asyncio.run(_main())
+
+    def _run_async_group(self, scrapers: List[BaseScraper], flask_app=None):
+        """
+        Run every async-capable scraper concurrently on one event loop that
+        shares a single AsyncFetcher, persisting each as it finishes. Returns
+        a list of (retailer_name, results_list).
+        """
+        from app.scrapers.async_http import PER_HOST_CONCURRENCY, AsyncFetcher
+
+        config = flask_app.config if flask_app else {}
+
+        async def _one(scraper, http):
+            logger.info("Starting scraper: %s (async)", scraper.retailer_name)
+            self._begin(scraper)
+            results = await scraper.run_async(http)
+            await asyncio.to_thread(self._persist, scraper, results, flask_app)
+            self._end(scraper)
+            return scraper.retailer_name, results
+
+        async def _main():
+            async with AsyncFetcher(
+                per_host_concurrency=config.get("SCRAPER_PER_HOST_CONCURRENCY",
+                                                PER_HOST_CONCURRENCY),
+                http2=config.get("SCRAPER_HTTP2", True),
+            ) as http:
+                return await asyncio.gather(*(_one(s, http) for s in scrapers))
+
+        return list(asyncio.run(_main()))
+
     def _run_one(self, scraper: BaseScraper, flask_app=None):
         """
         Run a single scraper, persist its results, and return
         (retailer_name, results_list).
         """
-        from app.models.product import Product
-        from app.models.retailer import Retailer
-
         name = scraper.retailer_name
         logger.info("Starting scraper: %s", name)
+        self._begin(scraper)
         results = scraper.run()   # run() already handles exceptions internally
+        self._persist(scraper, results, flask_app)
+        self._end(scraper)
+        return name, results
 
+    def _begin(self, scraper: BaseScraper) -> None:
+        if self._telemetry is not None:
+            self._telemetry.begin(scraper)
+
+    def _end(self, scraper: BaseScraper) -> None:
+        if self._telemetry is not None:
+            self._telemetry.end(scraper)
+
+    def _persist(self, scraper: BaseScraper, results: List[dict], flask_app=None) -> None:
+        """Resolve ids, validate and bulk-upsert one scraper's results."""
+        name = scraper.retailer_name
+        telemetry = self._telemetry
+        if telemetry is not None:
+            telemetry.parsed(name, len(results))
         if results:
             try:
                 # Worker threads don't have a Flask app context; use the one
                 # captured in run_all (from the originating request context).
                 with (flask_app.app_context() if flask_app else _DummyContext()):
-                    # Resolve retailer_id — try slug first (reliable), then name
-                    slug = getattr(scraper, "retailer_slug", None)
-                    if slug:
-                        retailer = Retailer.query.filter_by(slug=slug).first()
-                    else:
-                        retailer = Retailer.query.filter_by(name=name).first()
-                    if retailer is None:
-                        logger.error("%s: retailer not found in DB; skipping persist", name)
-                        return name, results
-
-                    # Build a lookup cache: (set_code, product_type) -> product_id
-                    product_cache: dict = {}
-                    for rec in results:
-                        key = (rec.get("set_code", ""), rec.get("product_type", "box"))
-                        if key not in product_cache:
-                            product = Product.query.filter_by(
-                                set_code=key[0], product_type=key[1]
-                            ).first()
-                            product_cache[key] = product.id if product else None
-
-                    # Inject IDs and filter out unresolvable records
-                    enriched = []
-                    for rec in results:
-                        key = (rec.get("set_code", ""), rec.get("product_type", "box"))
-                        pid = product_cache.get(key)
-                        if pid is None:
-                            logger.debug("%s: no product for %s; skipping", name, key)
-                            continue
-                        enriched.append({**rec, "product_id": pid, "retailer_id": retailer.id})
-
+                    label = getattr(scraper, "retailer_slug", None) or name
+                    with metrics.VALIDATE_SECONDS.time(retailer=label):
+                        enriched = self._accept(name, results, scraper)
                     if enriched:
-                        svc = PriceService()
-                        svc.bulk_upsert(enriched)
+                        start = time.perf_counter()
+                        self._write(enriched)
+                        elapsed = time.perf_counter() - start
+                        metrics.PERSIST_SECONDS.observe(elapsed, retailer=label)
+                        if telemetry is not None:
+                            telemetry.persisted(name, len(enriched), elapsed)
                         logger.info("%s: persisted %d price records", name, len(enriched))
                     else:
                         logger.warning("%s: no records matched known products", name)
@@ -146,10 +330,226 @@ class ScraperManager:
                 logger.error(
                     "%s: failed to persist results: %s", name, exc, exc_info=True
                 )
+                if telemetry is not None:
+                    telemetry.failed(name, f"persist: {exc}")
         else:
             logger.warning("%s: no results returned", name)
 
-        return name, results
+    def _accept(self, name: str, results: List[dict],
+                scraper: Optional[BaseScraper] = None) -> List[dict]:
+        """Attach product/retailer ids and drop unresolvable or anomalous records."""
+        scraper = scraper or self.get_scraper(name)
+        # Resolve retailer_id — try slug first (reliable), then name
+        index = identity_index()
+        retailer_id = index.retailer_id(slug=getattr(scraper, "retailer_slug", None), name=name)
+        if retailer_id is None:
+            logger.error("%s: retailer not found in DB; skipping persist", name)
+            return []
+
+        # Inject IDs and filter out unresolvable records
+        enriched = []
+        for rec in results:
+            key = (rec.get("set_code", ""), rec.get("product_type", "box"))
+            pid = index.product_id(*key)
+            if pid is None:
+                logger.debug("%s: no product for %s; skipping", name, key)
+                continue
+            enriched.append({**rec, "product_id": pid, "retailer_id": retailer_id})
+
+        return self._drop_anomalies(name, enriched)
+
+    @staticmethod
+    def _write(records: List[dict]) -> int:
+        from app.extensions import db
+
+        try:
+            return PriceService().bulk_upsert(records)
+        except Exception:
+            db.session.rollback()
+            raise
+
+    # ------------------------------------------------------------------
+    # Validation
+    # ------------------------------------------------------------------
+
+    def _prepare_run(self) -> None:
+        """
+        Read this run's Retailer rows once: add the config-only scrapers,
+        apply each retailer's rate limit to its scraper and warm the
+        rolling-median windows. Also attach the conditional-GET cache and
+        the HTML parse pool, restore each retailer's circuit breaker and hand
+        batch scrapers the tracked products.
+        """
+        import os
+
+        from flask import current_app
+
+        from app.models.retailer import Retailer
+        from app.scrapers.html_parse import parse_pool
+        from app.scrapers.http_cache import HttpCache
+
+        config = current_app.config
+        self._medians = MedianCache(consensus_band=config.get("PRICE_CONSENSUS_BAND"))
+        self._load_configured_scrapers()
+
+        if config.get("SCRAPER_HTTP_CACHE", True):
+            root = config.get("SCRAPER_HTTP_CACHE_DIR") or os.path.join(
+                current_app.instance_path, "http_cache")
+            try:
+                cache = HttpCache(root)
+                for scraper in self._scrapers:
+                    scraper.enable_http_cache(cache)
+            except OSError as exc:
+                logger.error("ScraperManager: HTTP cache disabled (%s): %s", root, exc)
+
+        pool = parse_pool(config.get("SCRAPER_PARSE_PROCESSES", 0))
+        for scraper in self._scrapers:
+            scraper.enable_parse_pool(pool)
+
+        self._attach_circuits(config)
+
+        batch = [s for s in self._scrapers if isinstance(s, BatchScraper)]
+        if batch:
+            try:
+                products = tracked_products()
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.error("ScraperManager: could not load products: %s", exc)
+                products = []
+            for scraper in batch:
+                scraper.set_products(products)
+
+        slugs = [s.retailer_slug for s in self._scrapers if getattr(s, "retailer_slug", None)]
+        try:
+            retailers = {r.slug: r for r in Retailer.query.filter(Retailer.slug.in_(slugs)).all()}
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("ScraperManager: could not load retailers: %s", exc)
+            return
+
+        for scraper in self._scrapers:
+            retailer = retailers.get(getattr(scraper, "retailer_slug", None))
+            if retailer is not None and retailer.requests_per_minute:
+                scraper.configure_rate_limit(
+                    retailer.requests_per_minute,
+                    retailer.min_delay_seconds or 0,
+                    burst=config.get("SCRAPER_RATE_BURST", 1),
+                )
+
+        try:
+            loaded = self._medians.warm(retailer_ids=[r.id for r in retailers.values()])
+            logger.info("ScraperManager: warmed %d price windows", loaded)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("ScraperManager: could not warm price windows: %s", exc)
+
+    def _attach_circuits(self, config) -> None:
+        """Give every scraper its retailer's persisted circuit breaker."""
+        from app.utils.circuit_breaker import load_circuits
+
+        slugs = [s.retailer_slug for s in self._scrapers if getattr(s, "retailer_slug", None)]
+        try:
+            self._circuits = load_circuits(
+                slugs,
+                failure_threshold=config.get("SCRAPER_CIRCUIT_FAILURES", 5),
+                cooldown_seconds=config.get("SCRAPER_CIRCUIT_COOLDOWN_SECONDS", 1800),
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("ScraperManager: could not load circuit breakers: %s", exc)
+            self._circuits = {}
+        for scraper in self._scrapers:
+            scraper.attach_circuit(self._circuits.get(getattr(scraper, "retailer_slug", None)))
+
+    def _runnable(self):
+        """Split the scrapers into (to run, skipped because their circuit is open)."""
+        run, skipped = [], []
+        for scraper in self._scrapers:
+            circuit = self._circuits.get(getattr(scraper, "retailer_slug", None))
+            if circuit is not None and not circuit.allow_run():
+                logger.warning("%s: circuit open after %d failures; skipping until %s",
+                               scraper.retailer_name, circuit.consecutive_failures,
+                               circuit.retry_at())
+                if self._telemetry is not None:
+                    self._telemetry.skip(scraper, f"circuit open until {circuit.retry_at()}")
+                skipped.append(scraper)
+            else:
+                run.append(scraper)
+        return run, skipped
+
+    def _save_circuits(self) -> None:
+        from app.extensions import db
+        from app.utils.circuit_breaker import save_circuits
+
+        if not self._circuits:
+            return
+        try:
+            save_circuits(self._circuits.values())
+        except Exception as exc:  # pylint: disable=broad-except
+            db.session.rollback()
+            logger.error("ScraperManager: could not save circuit breakers: %s", exc)
+
+    def _save_telemetry(self) -> None:
+        from app.extensions import db
+        from app.services.health_service import invalidate_health_cache
+
+        if self._telemetry is None:
+            return
+        try:
+            saved = self._telemetry.save()
+            logger.info("ScraperManager: recorded %d scrape runs (%s)", saved,
+                        self._telemetry.run_id)
+        except Exception as exc:  # pylint: disable=broad-except
+            db.session.rollback()
+            logger.error("ScraperManager: could not record scrape runs: %s", exc)
+        invalidate_health_cache()
+
+    def _load_configured_scrapers(self) -> None:
+        """
+        (Re)build the scrapers for active retailers whose scraper_config names
+        a catalogue engine, skipping slugs a registered scraper already covers.
+        """
+        from app.models.retailer import Retailer
+
+        self._scrapers = [s for s in self._scrapers if s not in self._configured]
+        self._configured = []
+        known = {getattr(s, "retailer_slug", None) for s in self._scrapers}
+        try:
+            retailers = Retailer.query.filter(
+                Retailer.is_active.is_(True), Retailer.scraper_config.isnot(None)
+            ).all()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("ScraperManager: could not load configured retailers: %s", exc)
+            return
+        for retailer in retailers:
+            if retailer.slug in known:
+                continue
+            scraper = catalog_scraper_for(retailer)
+            if scraper is not None:
+                self._configured.append(scraper)
+        if self._configured:
+            logger.info("ScraperManager: %d config-only scrapers: %s", len(self._configured),
+                        ", ".join(s.retailer_name for s in self._configured))
+        self._scrapers.extend(self._configured)
+
+    def _drop_anomalies(self, name: str, records: List[dict]) -> List[dict]:
+        """Drop records whose price fails validation; accepted prices extend the windows."""
+        clean = []
+        for rec in records:
+            price_usd = rec.get("price_usd") or rec.get("price")
+            if price_usd is not None and self._medians is not None:
+                vr = self._medians.check_and_add(
+                    rec["product_id"],
+                    rec["retailer_id"],
+                    price_usd,
+                    price=rec.get("price"),
+                    # Same default bulk_upsert stores when a scraper omits it.
+                    currency=rec.get("currency", "JPY"),
+                )
+                if vr.is_anomaly:
+                    logger.warning(
+                        "%s: skipping anomalous price for product_id=%s: %s",
+                        name, rec["product_id"], vr.reasons,
+                    )
+                    continue
+            clean.append(rec)
+        return clean
 
     # ------------------------------------------------------------------
     # Status / health
@@ -3,25 +3,25 @@ import re
 import logging
 from bs4 import BeautifulSoup
 
-from app.scrapers.base_scraper import BaseScraper
+from app.scrapers.batch_scraper import SearchScraper
 
 logger = logging.getLogger(__name__)
 
 
-class TCGRepublicScraper(BaseScraper):
-    """Scraper for TCGRepublic"""
+class TCGRepublicScraper(SearchScraper):
+    """Scraper for TCGRepublic - one search per product"""
 
+    RETAILER_NAME = "TCGRepublic"
+    RETAILER_SLUG = "tcgrepublic"
     SEARCH_URL_TEMPLATE = "https://tcgrepublic.com/product/search.html?q={query}"
 
-    def __init__(self, retailer_config: Dict[str, Any]):
-        super().__init__(retailer_config)
-        self.selectors.update({
-            'product_card': '.product_unit',
-            'product_title': '.product_name a',
-            'price': '.figure',
-            'stock_status': '.stock_status',
-            'add_to_cart': '.add_to_cart_button',
-        })
+    SELECTORS = {
+        'product_card': '.product_unit',
+        'product_title': '.product_name a',
+        'price': '.figure',
+        'stock_status': '.stock_status',
+        'add_to_cart': '.add_to_cart_button',
+    }
 
     def build_search_url(self, product) -> str:
         """Build TCGRepublic search URL"""
@@ -41,10 +41,10 @@ class TCGRepublicScraper(BaseScraper):
     def parse_price(self, soup: BeautifulSoup, product) -> Optional[Dict[str, Any]]:
         """Parse price from TCGRepublic"""
         try:
-            products = soup.select('.product_unit')
+            products = soup.select(self.selectors['product_card'])
 
             for prod_elem in products[:10]:
-                title_elem = prod_elem.select_one('.product_name a')
+                title_elem = prod_elem.select_one(self.selectors['product_title'])
                 if not title_elem:
                     continue
 
@@ -61,15 +61,22 @@ class TCGRepublicScraper(BaseScraper):
                     continue
 
                 # Extract price (TCGRepublic shows USD)
-                price_elem = prod_elem.select_one('.figure')
+                price_elem = prod_elem.select_one(self.selectors['price'])
                 if price_elem:
                     price_text = price_elem.get_text()
                     price_match = re.search(r'[\d,]+\.?\d*', price_text)
                     if price_match:
                         price = float(price_match.group().replace(',', ''))
+                        href = title_elem.get('href', '')
                         return {
                             'price': price,
                             'currency': 'USD',
+                            # Stock is per listing: the page may hold several
+                            'in_stock': prod_elem.select_one(
+                                self.selectors['add_to_cart']) is not None,
+                            'source_url': (
+                                'https://tcgrepublic.com' + href if href.startswith('/') else None
+                            ),
                         }
 
             return None
@@ -80,5 +87,5 @@ class TCGRepublicScraper(BaseScraper):
 
     def parse_stock_status(self, soup: BeautifulSoup) -> bool:
         """Check stock status on TCGRepublic"""
-        add_to_cart = soup.select_one('.add_to_cart_button')
+        add_to_cart = soup.select_one(self.selectors['add_to_cart'])
         return add_to_cart is not None
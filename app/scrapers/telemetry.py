@@ -0,0 +1,113 @@
+"""
+app/scrapers/telemetry.py
+
+Per-retailer telemetry for one ScraperManager run, saved to ``scrape_runs``.
+
+The manager's worker threads report into a :class:`RunTelemetry` as each
+scraper starts, parses and persists; nothing touches the database until
+:meth:`RunTelemetry.save` writes one :class:`ScrapeRun` row per retailer
+from the main thread when the run ends.
+
+    begin(scraper)                  – start the clock, reset its FetchStats
+    parsed(name, n)                 – records the scraper returned
+    persisted(name, accepted, s)    – records that passed validation, DB time
+    end(scraper, error=None)        – stop the clock, collect FetchStats
+    skip(scraper, reason)           – circuit open; no run happened
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RunTelemetry:
+    """Thread-safe accumulator of one run's per-retailer counters."""
+
+    def __init__(self, mode: str = "batch") -> None:
+        self.run_id = uuid.uuid4().hex
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._rows: Dict[str, dict] = {}
+
+    def _row(self, scraper_or_name) -> dict:
+        name = getattr(scraper_or_name, "retailer_name", scraper_or_name)
+        row = self._rows.get(name)
+        if row is None:
+            row = self._rows[name] = {
+                "retailer_name": name,
+                "retailer_slug": getattr(scraper_or_name, "retailer_slug", None) or name,
+                "status": "completed",
+                "started_at": datetime.utcnow(),
+                "records_parsed": 0,
+                "records_accepted": 0,
+                "db_seconds": 0.0,
+            }
+        return row
+
+    def begin(self, scraper) -> None:
+        scraper.take_fetch_stats()
+        with self._lock:
+            row = self._row(scraper)
+            row["started_at"] = datetime.utcnow()
+
+    def parsed(self, name: str, count: int) -> None:
+        with self._lock:
+            self._row(name)["records_parsed"] += count
+
+    def persisted(self, name: str, accepted: int, db_seconds: float = 0.0) -> None:
+        with self._lock:
+            row = self._row(name)
+            row["records_accepted"] += accepted
+            row["db_seconds"] += db_seconds
+
+    def failed(self, name: str, error: str) -> None:
+        with self._lock:
+            row = self._row(name)
+            row["status"], row["error"] = "failed", error[:2000]
+
+    def end(self, scraper, error: Optional[str] = None) -> None:
+        """Close *scraper*'s row; a run that recorded a failure since begin() is failed."""
+        stats = scraper.take_fetch_stats()
+        status = scraper._status
+        with self._lock:
+            row = self._row(scraper)
+            row["finished_at"] = datetime.utcnow()
+            row.update(pages_fetched=stats.pages, bytes_fetched=stats.bytes,
+                       fetch_seconds=round(stats.seconds, 4))
+            if error is None and status.last_failure and status.last_failure >= row["started_at"]:
+                error = status.recent_errors[-1] if status.recent_errors else "scrape failed"
+            if error is not None:
+                row["status"], row["error"] = "failed", error[:2000]
+
+    def skip(self, scraper, reason: str) -> None:
+        with self._lock:
+            row = self._row(scraper)
+            row.update(status="skipped", error=reason, finished_at=row["started_at"])
+
+    def rows(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: dict(row) for name, row in self._rows.items()}
+
+    def save(self) -> int:
+        """Write one scrape_runs row per retailer. Requires an app context."""
+        from app.extensions import db
+        from app.models.scrape_run import ScrapeRun
+
+        rows = self.rows()
+        for row in rows.values():
+            accepted = row["records_accepted"]
+            db.session.add(ScrapeRun(
+                run_id=self.run_id,
+                mode=self.mode,
+                records_rejected=max(0, row["records_parsed"] - accepted),
+                db_seconds=round(row.pop("db_seconds"), 4),
+                **row,
+            ))
+        db.session.commit()
+        return len(rows)
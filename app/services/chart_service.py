@@ -2,6 +2,12 @@
 app/services/chart_service.py
 
 ChartService – builds chart-ready data from price history.
+
+Short windows (up to CHART_RAW_MAX_DAYS) plot every price_history row; longer
+ones plot one point per retailer and day from the ``price_daily`` rollup
+(app/services/rollup_service.py), falling back to raw rows until the rollup
+has been backfilled for the product. Raw windows reaching back past the
+archive horizon also read the cold store (app/utils/cold_store.py).
 """
 
 from __future__ import annotations
@@ -11,8 +17,11 @@ from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+from app.models.latest_price import LatestPrice
 from app.models.price import PriceHistory
+from app.models.price_daily import PriceDaily
 from app.models.retailer import Retailer
+from app.utils.cold_store import get_cold_store
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +53,21 @@ RETAILER_COLORS: Dict[str, str] = {
 
 DEFAULT_COLOR = "#adb5bd"
 
+# Longest window (days) the "auto" resolution still plots raw rows for.
+CHART_RAW_MAX_DAYS: int = 31
+
+RESOLUTIONS = ("auto", "raw", "daily")
+
+
+def chart_resolution(days: int, resolution: str = "auto") -> str:
+    """Resolution ("raw" or "daily") of a *days*-long chart."""
+    if resolution != "auto":
+        return resolution
+    from flask import current_app
+
+    raw_max = current_app.config.get("CHART_RAW_MAX_DAYS", CHART_RAW_MAX_DAYS)
+    return "raw" if days <= raw_max else "daily"
+
 
 class ChartService:
 
@@ -52,9 +76,15 @@ class ChartService:
         product_id: int,
         days: int = 30,
         retailer_id: Optional[int] = None,
+        resolution: str = "auto",
     ) -> dict:
         """Build a Chart.js-compatible dataset for a product."""
         since = datetime.utcnow() - timedelta(days=days)
+        if chart_resolution(days, resolution) == "daily":
+            series = self._daily_series(product_id, since, retailer_id)
+            if series:
+                return {"datasets": self._datasets(series), "resolution": "daily"}
+
         q = PriceHistory.query.filter(
             PriceHistory.product_id == product_id,
             PriceHistory.scraped_at >= since,
@@ -66,13 +96,92 @@ class ChartService:
         prices = q.all()
 
         series: Dict[str, List] = defaultdict(list)
+        if days > 0:
+            self._carry_in(series, product_id, since, retailer_id)
+        store = get_cold_store()
+        cold = store.read(product_id, since=since, retailer_id=retailer_id) if store else []
+        if cold:
+            names = dict(Retailer.query.with_entities(Retailer.id, Retailer.name).all())
+            for c in cold:
+                series[names.get(c.retailer_id, "Unknown")].append({
+                    "x": c.scraped_at.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "y": float(c.price) if c.price else 0,
+                })
         for p in prices:
             retailer_name = p.retailer.name if p.retailer else "Unknown"
             series[retailer_name].append({
                 "x": p.scraped_at.strftime("%Y-%m-%dT%H:%M:%S"),
                 "y": float(p.price) if p.price else 0,
             })
+        if days > 0:
+            self._confirmed_until(series, product_id, since, retailer_id)
+        for points in series.values():
+            points.sort(key=lambda point: point["x"])
+
+        return {"datasets": self._datasets(series), "resolution": "raw"}
+
+    @staticmethod
+    def _carry_in(series: Dict[str, List], product_id: int, since: datetime,
+                  retailer_id: Optional[int]) -> None:
+        """Open each retailer's line at *since* with the price then in effect.
+
+        History only logs changes (PRICE_CHANGE_ONLY), so a steady price may
+        have no row inside the window at all.
+        """
+        from app.services.price_service import latest_price_rows
+
+        before = latest_price_rows(product_ids=[product_id],
+                                   retailer_ids=[retailer_id] if retailer_id else None,
+                                   before=since)
+        for row in before.values():
+            name = row.retailer.name if row.retailer else "Unknown"
+            series[name].append({
+                "x": since.strftime("%Y-%m-%dT%H:%M:%S"),
+                "y": float(row.price) if row.price else 0,
+            })
 
+    @staticmethod
+    def _confirmed_until(series: Dict[str, List], product_id: int, since: datetime,
+                         retailer_id: Optional[int]) -> None:
+        """Extend each line to the last scrape that re-confirmed the current price."""
+        q = LatestPrice.query.filter(LatestPrice.product_id == product_id,
+                                     LatestPrice.last_seen_at >= since)
+        if retailer_id:
+            q = q.filter(LatestPrice.retailer_id == retailer_id)
+        for latest in q.all():
+            name = latest.retailer.name if latest.retailer else "Unknown"
+            x = latest.last_seen_at.strftime("%Y-%m-%dT%H:%M:%S")
+            if not any(point["x"] >= x for point in series[name]):
+                series[name].append({"x": x, "y": float(latest.price) if latest.price else 0})
+
+    @staticmethod
+    def _daily_series(product_id: int, since: datetime,
+                      retailer_id: Optional[int]) -> Dict[str, List]:
+        q = (
+            PriceDaily.query
+            .join(Retailer, PriceDaily.retailer_id == Retailer.id)
+            .with_entities(Retailer.name, PriceDaily.day, PriceDaily.open, PriceDaily.high,
+                           PriceDaily.low, PriceDaily.close)
+            .filter(PriceDaily.product_id == product_id, PriceDaily.day >= since.date())
+            .order_by(PriceDaily.day.asc())
+        )
+        if retailer_id:
+            q = q.filter(PriceDaily.retailer_id == retailer_id)
+
+        series: Dict[str, List] = defaultdict(list)
+        for name, day, open_, high, low, close in q.all():
+            series[name].append({
+                "x": day.isoformat(),
+                "y": float(close),
+                "o": float(open_),
+                "h": float(high),
+                "l": float(low),
+                "c": float(close),
+            })
+        return series
+
+    @staticmethod
+    def _datasets(series: Dict[str, List]) -> List[dict]:
         datasets = []
         for retailer, points in sorted(series.items()):
             color = RETAILER_COLORS.get(retailer, DEFAULT_COLOR)
@@ -83,29 +192,28 @@ class ChartService:
                 "backgroundColor": color + "33",
                 "tension": 0.3,
             })
-
-        return {"datasets": datasets}
+        return datasets
 
     def get_comparison_data(self, product_id: int) -> dict:
         """Get current price comparison across retailers."""
-        retailers = Retailer.query.filter_by(is_active=True).all()
+        rows = (
+            LatestPrice.query
+            .join(Retailer, LatestPrice.retailer_id == Retailer.id)
+            .filter(LatestPrice.product_id == product_id, Retailer.is_active.is_(True))
+            .order_by(Retailer.id)
+            .all()
+        )
 
         comparisons = []
-        for retailer in retailers:
-            latest = (
-                PriceHistory.query
-                .filter_by(product_id=product_id, retailer_id=retailer.id)
-                .order_by(PriceHistory.scraped_at.desc())
-                .first()
-            )
-            if latest:
-                comparisons.append({
-                    "retailer": retailer.name,
-                    "price": float(latest.price),
-                    "price_usd": float(latest.price_usd) if latest.price_usd else None,
-                    "currency": latest.currency,
-                    "in_stock": latest.in_stock,
-                    "scraped_at": latest.scraped_at.isoformat(),
-                })
+        for latest in rows:
+            comparisons.append({
+                "retailer": latest.retailer.name,
+                "price": float(latest.price),
+                "price_usd": float(latest.price_usd) if latest.price_usd else None,
+                "currency": latest.currency,
+                "in_stock": latest.in_stock,
+                # Unchanged prices are re-confirmed via last_seen_at, not rewritten.
+                "scraped_at": (latest.last_seen_at or latest.scraped_at).isoformat(),
+            })
 
         return {"product_id": product_id, "comparisons": comparisons}
@@ -27,7 +27,7 @@ from flask import current_app
 from sqlalchemy import func
 
 from app.extensions import db
-from app.models.price import PriceHistory
+from app.models.latest_price import LatestPrice
 from app.models.product import Product
 from app.models.retailer import Retailer
 
@@ -45,13 +45,8 @@ def _get_rcj_retailer() -> Optional[Retailer]:
     return Retailer.query.filter_by(slug="rarecardsjapan").first()
 
 
-def _latest_rcj_price(product_id: int, rcj_retailer_id: int) -> Optional[PriceHistory]:
-    return (
-        PriceHistory.query
-        .filter_by(product_id=product_id, retailer_id=rcj_retailer_id)
-        .order_by(PriceHistory.scraped_at.desc())
-        .first()
-    )
+def _latest_rcj_price(product_id: int, rcj_retailer_id: int) -> Optional[LatestPrice]:
+    return _latest_retailer_price(product_id, rcj_retailer_id)
 
 
 _FRESH_SINCE_DAYS = 7  # ignore competitor prices older than this (dead scrapers)
@@ -59,17 +54,18 @@ _FRESH_SINCE_DAYS = 7  # ignore competitor prices older than this (dead scrapers
 
 def _cheapest_competitor(product_id: int, exclude_retailer_id: int) -> tuple:
     """Cheapest IN-STOCK, recent competitor price (excluding the given retailer)."""
-    effective = func.coalesce(PriceHistory.price_usd, PriceHistory.price)
+    effective = func.coalesce(LatestPrice.price_usd, LatestPrice.price)
     fresh = datetime.utcnow() - timedelta(days=_FRESH_SINCE_DAYS)
     result = (
         db.session.query(effective, Retailer.name)
-        .join(Retailer, PriceHistory.retailer_id == Retailer.id)
+        .join(Retailer, LatestPrice.retailer_id == Retailer.id)
         .filter(
-            PriceHistory.product_id == product_id,
-            PriceHistory.retailer_id != exclude_retailer_id,
+            LatestPrice.product_id == product_id,
+            LatestPrice.retailer_id != exclude_retailer_id,
             effective.isnot(None),
-            PriceHistory.in_stock.is_(True),
-            PriceHistory.scraped_at >= fresh,
+            LatestPrice.in_stock.is_(True),
+            # Unchanged prices are re-confirmed via last_seen_at, not rewritten.
+            LatestPrice.last_seen_at >= fresh,
         )
         .order_by(effective.asc())
         .first()
@@ -81,34 +77,16 @@ def _cheapest_competitor(product_id: int, exclude_retailer_id: int) -> tuple:
 
 def _avg_market_price(product_id: int, exclude_retailer_id: int) -> Optional[float]:
     """Return AVG(price_usd or price) using the latest price per retailer."""
-    effective = func.coalesce(PriceHistory.price_usd, PriceHistory.price)
-    # Use latest price per retailer (subquery: max scraped_at per retailer)
-    subq = (
-        db.session.query(
-            PriceHistory.retailer_id,
-            func.max(PriceHistory.scraped_at).label("latest"),
-        )
-        .filter(
-            PriceHistory.product_id == product_id,
-            PriceHistory.retailer_id != exclude_retailer_id,
-        )
-        .group_by(PriceHistory.retailer_id)
-        .subquery()
-    )
+    effective = func.coalesce(LatestPrice.price_usd, LatestPrice.price)
     fresh = datetime.utcnow() - timedelta(days=_FRESH_SINCE_DAYS)
     result = (
         db.session.query(func.avg(effective))
-        .join(
-            subq,
-            (PriceHistory.retailer_id == subq.c.retailer_id)
-            & (PriceHistory.scraped_at == subq.c.latest),
-        )
         .filter(
-            PriceHistory.product_id == product_id,
-            PriceHistory.retailer_id != exclude_retailer_id,
+            LatestPrice.product_id == product_id,
+            LatestPrice.retailer_id != exclude_retailer_id,
             effective.isnot(None),
-            PriceHistory.in_stock.is_(True),
-            PriceHistory.scraped_at >= fresh,
+            LatestPrice.in_stock.is_(True),
+            LatestPrice.last_seen_at >= fresh,
         )
         .scalar()
     )
@@ -121,13 +99,9 @@ def _pct_diff(market_price: float, rcj_price: float) -> float:
     return (market_price - rcj_price) / rcj_price * 100
 
 
-def _latest_retailer_price(product_id: int, retailer_id: int) -> Optional[PriceHistory]:
-    return (
-        PriceHistory.query
-        .filter_by(product_id=product_id, retailer_id=retailer_id)
-        .order_by(PriceHistory.scraped_at.desc())
-        .first()
-    )
+def _latest_retailer_price(product_id: int, retailer_id: int) -> Optional[LatestPrice]:
+    """Current price row for the pair — a primary-key lookup on latest_prices."""
+    return db.session.get(LatestPrice, (product_id, retailer_id))
 
 
 def _build_fuji_rows(rcj_id: int) -> list:
@@ -142,9 +116,8 @@ def _build_fuji_rows(rcj_id: int) -> list:
     # Products that have a FujiCardShop price
     products_with_fuji: List[Product] = (
         db.session.query(Product)
-        .join(PriceHistory, PriceHistory.product_id == Product.id)
-        .filter(PriceHistory.retailer_id == fuji.id)
-        .distinct()
+        .join(LatestPrice, LatestPrice.product_id == Product.id)
+        .filter(LatestPrice.retailer_id == fuji.id)
         .all()
     )
 
@@ -214,9 +187,8 @@ def _build_report() -> dict:
 
     products_with_rcj: List[Product] = (
         db.session.query(Product)
-        .join(PriceHistory, PriceHistory.product_id == Product.id)
-        .filter(PriceHistory.retailer_id == rcj.id)
-        .distinct()
+        .join(LatestPrice, LatestPrice.product_id == Product.id)
+        .filter(LatestPrice.retailer_id == rcj.id)
         .all()
     )
 
@@ -308,14 +280,19 @@ def _scraper_freshness_html() -> str:
 
     Only the scrapers that actually run — dormant seed retailers would false-alarm."""
     now = datetime.utcnow()
+    retailers = Retailer.query.filter(Retailer.slug.in_(_ACTIVE_SCRAPER_SLUGS)).all()
+    # last_seen_at moves on every scrape; price_history only gets a row on a change.
+    seen = dict(
+        db.session.query(LatestPrice.retailer_id,
+                         func.max(func.coalesce(LatestPrice.last_seen_at, LatestPrice.scraped_at)))
+        .filter(LatestPrice.retailer_id.in_([r.id for r in retailers]))
+        .group_by(LatestPrice.retailer_id)
+        .all()
+    )
     rows = []
-    for r in Retailer.query.filter(Retailer.slug.in_(_ACTIVE_SCRAPER_SLUGS)).all():
-        latest = (
-            PriceHistory.query.filter_by(retailer_id=r.id)
-            .order_by(PriceHistory.scraped_at.desc()).first()
-        )
-        age = ((now - latest.scraped_at).total_seconds() / 3600
-               if latest and latest.scraped_at else None)
+    for r in retailers:
+        latest = seen.get(r.id)
+        age = (now - latest).total_seconds() / 3600 if latest else None
         rows.append((r.name, age))
     if not rows:
         return ""
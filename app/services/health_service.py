@@ -0,0 +1,163 @@
+"""
+app/services/health_service.py
+
+Scraper health for /admin/health, read from the ``scrape_runs`` telemetry.
+
+Every active retailer gets its run counts, last run / success / failure
+and consecutive failed runs over the last ``RECENT_RUNS_DAYS``, and prices
+seen in the last 24 h, from one grouped query; the latest run's telemetry
+and recent errors come from one more query over the same window, and its
+circuit breaker from ``scraper_circuits``. The result is cached in-process for
+``HEALTH_CACHE_SECONDS`` and dropped whenever a run is recorded, so the
+dashboard stays cheap under auto-refresh and agrees across processes.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import case, func
+
+from app.extensions import db
+from app.models.latest_price import LatestPrice
+from app.models.retailer import Retailer
+from app.models.scrape_run import ScrapeRun
+
+logger = logging.getLogger(__name__)
+
+# Seconds a computed health snapshot is served before it is rebuilt.
+HEALTH_CACHE_SECONDS: int = 30
+
+# How far back the run counts, latest run and recent errors look. Older
+# rows are only kept for the archival task to trim (scrape_runs retention).
+RECENT_RUNS_DAYS: int = 7
+
+_RECENT_ERRORS: int = 3
+_EPOCH = datetime(1970, 1, 1)
+
+_lock = threading.Lock()
+_cache: Optional[Tuple[float, str, Dict[str, dict]]] = None   # (expires, engine url, data)
+
+
+def invalidate_health_cache() -> None:
+    global _cache
+    with _lock:
+        _cache = None
+
+
+def scraper_health(ttl: Optional[float] = None) -> Dict[str, dict]:
+    """retailer name → health dict, served from cache for *ttl* seconds."""
+    global _cache
+    from flask import current_app
+
+    ttl = current_app.config.get("HEALTH_CACHE_SECONDS", HEALTH_CACHE_SECONDS) if ttl is None else ttl
+    key = str(db.engine.url)
+    with _lock:
+        cached = _cache
+    if cached is not None and cached[1] == key and cached[0] > time.monotonic():
+        return _copy(cached[2])
+
+    data = _build()
+    if ttl > 0:
+        with _lock:
+            _cache = (time.monotonic() + ttl, key, data)
+    return _copy(data)
+
+
+def _copy(data: Dict[str, dict]) -> Dict[str, dict]:
+    # Callers decorate / serialise the dicts; keep the cached ones pristine.
+    return {name: {**status, "recent_errors": list(status["recent_errors"]),
+                   "last_run_stats": dict(status["last_run_stats"] or {}) or None,
+                   "circuit": dict(status["circuit"] or {}) or None}
+            for name, status in data.items()}
+
+
+def _build() -> Dict[str, dict]:
+    now = datetime.utcnow()
+    since = now - timedelta(days=RECENT_RUNS_DAYS)
+    ok = ScrapeRun.status == ScrapeRun.STATUS_COMPLETED
+    failed = ScrapeRun.status == ScrapeRun.STATUS_FAILED
+
+    last_ok = (
+        db.session.query(ScrapeRun.retailer_slug.label("slug"),
+                         func.max(ScrapeRun.started_at).label("started_at"))
+        .filter(ok, ScrapeRun.started_at >= since)
+        .group_by(ScrapeRun.retailer_slug)
+        .subquery()
+    )
+    seen = (
+        db.session.query(LatestPrice.retailer_id.label("retailer_id"),
+                         func.count().label("n"))
+        .filter(LatestPrice.last_seen_at >= now - timedelta(hours=24))
+        .group_by(LatestPrice.retailer_id)
+        .subquery()
+    )
+    rows = (
+        db.session.query(
+            Retailer.name,
+            Retailer.slug,
+            func.count(ScrapeRun.id),
+            func.sum(case((ok, 1), else_=0)),
+            func.sum(case((failed, 1), else_=0)),
+            func.max(ScrapeRun.started_at),
+            func.max(case((ok, ScrapeRun.finished_at))),
+            func.max(case((failed, ScrapeRun.finished_at))),
+            func.sum(case((failed & (ScrapeRun.started_at
+                                     > func.coalesce(last_ok.c.started_at, _EPOCH)), 1),
+                          else_=0)),
+            func.max(seen.c.n),
+        )
+        .outerjoin(ScrapeRun, (ScrapeRun.retailer_slug == Retailer.slug)
+                   & (ScrapeRun.started_at >= since))
+        .outerjoin(last_ok, last_ok.c.slug == Retailer.slug)
+        .outerjoin(seen, seen.c.retailer_id == Retailer.id)
+        .filter(Retailer.is_active.is_(True))
+        .group_by(Retailer.id, Retailer.name, Retailer.slug)
+        .all()
+    )
+
+    latest: Dict[str, ScrapeRun] = {}
+    errors: Dict[str, list] = {}
+    recent = (
+        ScrapeRun.query
+        .filter(ScrapeRun.started_at >= since)
+        .order_by(ScrapeRun.started_at.desc())
+        .all()
+    )
+    for run in recent:
+        latest.setdefault(run.retailer_slug, run)
+        if run.status == ScrapeRun.STATUS_FAILED and run.error:
+            slug_errors = errors.setdefault(run.retailer_slug, [])
+            if len(slug_errors) < _RECENT_ERRORS:
+                slug_errors.insert(0, f"{run.started_at.isoformat()} {run.error}")
+
+    from flask import current_app
+
+    from app.utils.circuit_breaker import circuit_states
+
+    circuits = circuit_states(current_app.config.get("SCRAPER_CIRCUIT_COOLDOWN_SECONDS", 1800))
+
+    health: Dict[str, dict] = {}
+    for (name, slug, runs, successes, failures, last_run, last_success, last_failure,
+         consecutive, seen_24h) in rows:
+        run = latest.get(slug)
+        health[name] = {
+            "name": name,
+            "slug": slug,
+            "last_run": last_run,
+            "last_success": last_success,
+            "last_failure": last_failure,
+            "consecutive_failures": int(consecutive or 0),
+            "total_runs": int(runs or 0),
+            "total_successes": int(successes or 0),
+            "total_failures": int(failures or 0),
+            "recent_errors": errors.get(slug, []),
+            "prices_last_24h": int(seen_24h or 0),
+            "last_run_stats": run.to_dict() if run is not None else None,
+            "circuit": circuits.get(slug),
+        }
+    return health
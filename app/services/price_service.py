@@ -6,31 +6,323 @@ PriceService – price retrieval, comparison, and persistence layer.
 
 from __future__ import annotations
 
+import csv
+import io
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Optional
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import and_, bindparam, func, or_
 
 from app.extensions import db
+from app.models.latest_price import LatestPrice
+from app.models.partitioning import insert_table
 from app.models.product import Product
-from app.models.price import PriceHistory
+from app.models.price import PriceHistory, scrape_bucket
 from app.models.retailer import Retailer
+from app.models.schema import has_column
+from app.services.rollup_service import upsert_price_daily
 
 logger = logging.getLogger(__name__)
 
+# engine URL -> whether price_history has the scrape_bucket upsert key
+_BULK_UPSERT_READY: Dict[str, bool] = {}
+
+
+def _bulk_upsert_supported() -> bool:
+    engine = db.engine
+    if engine.dialect.name not in ("postgresql", "sqlite"):
+        return False
+    key = str(engine.url)
+    if key not in _BULK_UPSERT_READY:
+        _BULK_UPSERT_READY[key] = has_column("price_history", "scrape_bucket")
+    return _BULK_UPSERT_READY[key]
+
+
+# ---------------------------------------------------------------------------
+# Last written state per (product, retailer)
+# ---------------------------------------------------------------------------
+
+# (price to the cent, currency, in_stock) — what counts as a price change.
+StateSignature = Tuple[Optional[str], str, bool]
+
+
+def state_signature(price, currency, in_stock) -> StateSignature:
+    try:
+        cents = None if price is None else str(Decimal(str(price)).quantize(Decimal("0.01")))
+    except InvalidOperation:
+        cents = str(price)
+    return cents, currency or "JPY", True if in_stock is None else bool(in_stock)
+
+
+class _LatestStateCache:
+    """Bounded LRU of the signature last written to ``latest_prices``.
+
+    Lets :meth:`PriceService.bulk_upsert` tell an unchanged scrape from a
+    price change without reading ``latest_prices`` every run. Entries are
+    hints only: a stale one is caught by the guarded heartbeat UPDATE.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._entries: "OrderedDict[Tuple[int, int], StateSignature]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple[int, int]) -> Optional[StateSignature]:
+        with self._lock:
+            sig = self._entries.get(key)
+            if sig is not None:
+                self._entries.move_to_end(key)
+            return sig
+
+    def put(self, key: Tuple[int, int], sig: StateSignature) -> None:
+        with self._lock:
+            self._entries[key] = sig
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Tuple[int, int]) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_STATE_CACHE = _LatestStateCache(50000)
+
+# engine URL -> whether latest_prices has the last_seen_at heartbeat column
+_CHANGE_ONLY_READY: Dict[str, bool] = {}
+
+
+def reset_latest_state_cache() -> None:
+    """Drop every cached signature (tests, bulk repairs of latest_prices)."""
+    _STATE_CACHE.clear()
+
+
+def _change_only_enabled() -> bool:
+    cfg = current_app.config
+    if not cfg.get("PRICE_CHANGE_ONLY", True):
+        return False
+    _STATE_CACHE.size = max(1, cfg.get("PRICE_STATE_CACHE_SIZE", 50000))
+    key = str(db.engine.url)
+    if key not in _CHANGE_ONLY_READY:
+        _CHANGE_ONLY_READY[key] = has_column("latest_prices", "last_seen_at")
+    return _CHANGE_ONLY_READY[key]
+
+
+def latest_price_rows(
+    product_ids: Optional[Iterable[int]] = None,
+    retailer_ids: Optional[Iterable[int]] = None,
+    in_stock_only: bool = False,
+    before: Optional[datetime] = None,
+) -> Dict[Tuple[int, int], PriceHistory]:
+    """Resolve the latest PriceHistory row for every (product, retailer) pair.
+
+    One grouped-max subquery over ``idx_price_product_retailer_date`` joined
+    back to ``price_history``, so the whole matrix costs a single round trip
+    regardless of how many products or retailers are tracked.
+
+    *product_ids* / *retailer_ids* narrow the matrix (None = no filter).
+    With *in_stock_only* the latest **in-stock** row is resolved instead;
+    with *before* the latest row older than that moment (the price in effect
+    when a chart or export window opens).
+    Returns ``{(product_id, retailer_id): PriceHistory}``.
+    """
+    filters = []
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return {}
+        filters.append(PriceHistory.product_id.in_(product_ids))
+    if retailer_ids is not None:
+        retailer_ids = list(retailer_ids)
+        if not retailer_ids:
+            return {}
+        filters.append(PriceHistory.retailer_id.in_(retailer_ids))
+    if in_stock_only:
+        filters.append(PriceHistory.in_stock.is_(True))
+    if before is not None:
+        filters.append(PriceHistory.scraped_at < before)
+
+    subq = (
+        db.session.query(
+            PriceHistory.product_id.label("pid"),
+            PriceHistory.retailer_id.label("rid"),
+            func.max(PriceHistory.scraped_at).label("latest"),
+        )
+        .filter(*filters)
+        .group_by(PriceHistory.product_id, PriceHistory.retailer_id)
+        .subquery()
+    )
+    rows = (
+        PriceHistory.query
+        .join(subq, (PriceHistory.product_id == subq.c.pid)
+              & (PriceHistory.retailer_id == subq.c.rid)
+              & (PriceHistory.scraped_at == subq.c.latest))
+        .filter(*filters)
+        .all()
+    )
+
+    # Two rows can share a scraped_at (same bulk insert); keep the newest id.
+    latest: Dict[Tuple[int, int], PriceHistory] = {}
+    for row in rows:
+        key = (row.product_id, row.retailer_id)
+        if key not in latest or row.id > latest[key].id:
+            latest[key] = row
+    return latest
+
+
+def seen_times(matrix: Dict[Tuple[int, int], PriceHistory]) -> Dict[Tuple[int, int], datetime]:
+    """When each history row of *matrix* was last confirmed by a scrape.
+
+    Change-only writes re-confirm an unchanged price through
+    ``latest_prices.last_seen_at`` instead of appending history, so a row
+    that is still the current state was last seen then; an older row (the
+    last in-stock one, say) at its own ``scraped_at``.
+    """
+    seen = {key: row.scraped_at for key, row in matrix.items()}
+    if not matrix:
+        return seen
+    pids = {pid for pid, _ in matrix}
+    rids = {rid for _, rid in matrix}
+    rows = (
+        db.session.query(LatestPrice.product_id, LatestPrice.retailer_id,
+                         LatestPrice.scraped_at, LatestPrice.last_seen_at)
+        .filter(LatestPrice.product_id.in_(pids), LatestPrice.retailer_id.in_(rids))
+        .all()
+    )
+    for pid, rid, written, last_seen in rows:
+        row = matrix.get((pid, rid))
+        if row is not None and last_seen is not None and row.scraped_at >= written:
+            seen[(pid, rid)] = max(row.scraped_at, last_seen)
+    return seen
+
+
+_LATEST_COLUMNS = ("price", "price_usd", "currency", "in_stock", "source_url", "scraped_at")
+_LATEST_BATCH_SIZE = 1000
+
+
+def _field(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def upsert_latest_prices(rows: Iterable) -> int:
+    """Stage ``latest_prices`` upserts in the current session's transaction.
+
+    *rows* are the PriceHistory objects (or equivalent column dicts) just
+    written.  A row only replaces the stored one when its ``scraped_at`` is
+    not older, so late or replayed writes cannot roll the current price
+    backwards.  The caller commits.
+    """
+    latest: Dict[Tuple[int, int], dict] = {}
+    for row in rows:
+        key = (_field(row, "product_id"), _field(row, "retailer_id"))
+        current = latest.get(key)
+        if current is None or _field(row, "scraped_at") >= current["scraped_at"]:
+            latest[key] = {
+                "product_id": key[0],
+                "retailer_id": key[1],
+                **{col: _field(row, col) for col in _LATEST_COLUMNS},
+            }
+    if not latest:
+        return 0
+
+    values = list(latest.values())
+    for rec in values:
+        rec["last_seen_at"] = rec["scraped_at"]
+        # Only a hint: an older write that loses the WHERE below leaves the
+        # cache wrong until the next heartbeat misses and corrects it.
+        _STATE_CACHE.put((rec["product_id"], rec["retailer_id"]),
+                         state_signature(rec["price"], rec["currency"], rec["in_stock"]))
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(LatestPrice.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["product_id", "retailer_id"],
+            set_={col: stmt.excluded[col] for col in _LATEST_COLUMNS + ("last_seen_at",)},
+            where=LatestPrice.__table__.c.scraped_at <= stmt.excluded.scraped_at,
+        )
+        for start in range(0, len(values), _LATEST_BATCH_SIZE):
+            db.session.execute(stmt, values[start:start + _LATEST_BATCH_SIZE])
+    else:
+        for rec in values:
+            existing = db.session.get(LatestPrice, (rec["product_id"], rec["retailer_id"]))
+            if existing is None:
+                db.session.add(LatestPrice(**rec))
+            elif existing.scraped_at is None or existing.scraped_at <= rec["scraped_at"]:
+                for col in _LATEST_COLUMNS + ("last_seen_at",):
+                    setattr(existing, col, rec[col])
+    return len(values)
+
+
+def rebuild_latest_prices() -> int:
+    """Rebuild ``latest_prices`` from ``price_history`` and commit.
+
+    Used for the initial backfill and as a repair tool; safe to re-run.
+    """
+    matrix = latest_price_rows()
+    db.session.query(LatestPrice).delete(synchronize_session=False)
+    db.session.add_all(
+        LatestPrice(
+            product_id=row.product_id,
+            retailer_id=row.retailer_id,
+            last_seen_at=row.scraped_at,
+            **{col: getattr(row, col) for col in _LATEST_COLUMNS},
+        )
+        for row in matrix.values()
+    )
+    db.session.commit()
+    reset_latest_state_cache()
+    logger.info("rebuild_latest_prices: materialised %d rows", len(matrix))
+    return len(matrix)
+
+
+def _copy_value(value):
+    """Encode one value for COPY ... WITH (FORMAT csv); an empty field is NULL."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
 
 class PriceService:
 
     def get_dashboard_summary(self) -> List[dict]:
         """Return summary data for the dashboard."""
         products = Product.query.filter_by(is_active=True).all()
+        matrix = latest_price_rows(product_ids=[p.id for p in products])
+        seen = seen_times(matrix)
+
+        newest: Dict[int, PriceHistory] = {}
+        updated: Dict[int, datetime] = {}
+        for (product_id, retailer_id), row in matrix.items():
+            current = newest.get(product_id)
+            if current is None or (row.scraped_at, row.id) > (current.scraped_at, current.id):
+                newest[product_id] = row
+            updated[product_id] = max(updated.get(product_id, row.scraped_at),
+                                      seen[(product_id, retailer_id)])
+
         summary = []
         for product in products:
-            latest = (
-                PriceHistory.query
-                .filter_by(product_id=product.id)
-                .order_by(PriceHistory.scraped_at.desc())
-                .first()
-            )
+            latest = newest.get(product.id)
             summary.append({
                 "product_id": product.id,
                 "set_code": product.set_code,
@@ -38,21 +330,21 @@ class PriceService:
                 "latest_price": float(latest.price) if latest else None,
                 "price_usd": float(latest.price_usd) if latest and latest.price_usd else None,
                 "currency": latest.currency if latest else None,
-                "last_updated": latest.scraped_at.isoformat() if latest else None,
+                "last_updated": updated[product.id].isoformat() if latest else None,
             })
         return summary
 
     def get_latest_prices(self, product_id: int) -> List[dict]:
         """Get latest price from each active retailer for a product."""
         retailers = Retailer.query.filter_by(is_active=True).all()
+        matrix = latest_price_rows(
+            product_ids=[product_id],
+            retailer_ids=[r.id for r in retailers],
+        )
+        seen = seen_times(matrix)
         prices = []
         for retailer in retailers:
-            latest = (
-                PriceHistory.query
-                .filter_by(product_id=product_id, retailer_id=retailer.id)
-                .order_by(PriceHistory.scraped_at.desc())
-                .first()
-            )
+            latest = matrix.get((product_id, retailer.id))
             if latest:
                 prices.append({
                     "retailer": retailer.name,
@@ -62,51 +354,262 @@ class PriceService:
                     "currency": latest.currency,
                     "in_stock": latest.in_stock,
                     "source_url": latest.source_url,
-                    "scraped_at": latest.scraped_at.isoformat(),
+                    "scraped_at": seen[(product_id, retailer.id)].isoformat(),
                 })
         return prices
 
     def get_best_price(self, product_id: int) -> Optional[dict]:
         """Get the lowest in-stock price across all retailers."""
+        return self.get_best_prices([product_id]).get(product_id)
+
+    def get_best_prices(self, product_ids: Iterable[int]) -> Dict[int, Optional[dict]]:
+        """Batch form of :meth:`get_best_price`: ``{product_id: best or None}``."""
+        product_ids = list(product_ids)
         retailers = Retailer.query.filter_by(is_active=True).all()
-        best = None
-        for retailer in retailers:
-            latest = (
-                PriceHistory.query
-                .filter_by(product_id=product_id, retailer_id=retailer.id, in_stock=True)
-                .order_by(PriceHistory.scraped_at.desc())
-                .first()
-            )
-            if latest and (best is None or latest.price < best["price"]):
-                best = {
-                    "retailer": retailer.name,
-                    "retailer_id": retailer.id,
-                    "price": float(latest.price),
-                    "price_usd": float(latest.price_usd) if latest.price_usd else None,
-                    "currency": latest.currency,
-                    "source_url": latest.source_url,
-                    "scraped_at": latest.scraped_at.isoformat(),
-                }
-        return best
+        matrix = latest_price_rows(
+            product_ids=product_ids,
+            retailer_ids=[r.id for r in retailers],
+            in_stock_only=True,
+        )
+        seen = seen_times(matrix)
+        best_by_product: Dict[int, Optional[dict]] = {}
+        for product_id in product_ids:
+            best = None
+            for retailer in retailers:
+                latest = matrix.get((product_id, retailer.id))
+                if latest and (best is None or latest.price < best["price"]):
+                    best = {
+                        "retailer": retailer.name,
+                        "retailer_id": retailer.id,
+                        "price": float(latest.price),
+                        "price_usd": float(latest.price_usd) if latest.price_usd else None,
+                        "currency": latest.currency,
+                        "source_url": latest.source_url,
+                        "scraped_at": seen[(product_id, retailer.id)].isoformat(),
+                    }
+            best_by_product[product_id] = best
+        return best_by_product
 
-    def bulk_upsert(self, records: List[dict]) -> int:
-        """Insert price records from scrapers."""
-        written = 0
+    def bulk_upsert(self, records: List[dict], batch_size: Optional[int] = None) -> int:
+        """Upsert price records from scrapers and refresh ``latest_prices`` / ``price_daily``.
+
+        On Postgres and SQLite rows are written with batched
+        ``INSERT ... ON CONFLICT`` keyed on (product_id, retailer_id,
+        scrape_bucket), so replaying a scrape inside the same bucket updates
+        the existing rows instead of duplicating them.  Large Postgres
+        batches are streamed with COPY into a staging table first.  Other
+        dialects (or a database not yet upgraded by ``ensure_schema``) fall
+        back to the ORM loop.
+
+        With ``PRICE_CHANGE_ONLY`` (the default) a record whose price,
+        currency and stock flag match the current ``latest_prices`` row is
+        not appended to history; its ``last_seen_at`` (plus ``price_usd`` and
+        ``source_url``) is bumped instead.  Returns the number of records
+        accepted, written or heartbeat.
+        """
+        if not records:
+            return 0
+
+        now = datetime.utcnow()
+        bucket = scrape_bucket(now)
+        rows: Dict[Tuple[int, int], dict] = {}
         for rec in records:
-            price = PriceHistory(
-                product_id=rec["product_id"],
-                retailer_id=rec["retailer_id"],
-                price=rec["price"],
-                price_usd=rec.get("price_usd"),
-                currency=rec.get("currency", "JPY"),
-                in_stock=rec.get("in_stock", True),
-                source_url=rec.get("source_url"),
-                scraped_at=datetime.utcnow(),
+            # Last record wins for a repeated (product, retailer) in one call;
+            # a single ON CONFLICT statement may not touch the same key twice.
+            rows[(rec["product_id"], rec["retailer_id"])] = {
+                "product_id": rec["product_id"],
+                "retailer_id": rec["retailer_id"],
+                "price": rec["price"],
+                "price_usd": rec.get("price_usd"),
+                "currency": rec.get("currency", "JPY"),
+                "in_stock": rec.get("in_stock", True),
+                "source_url": rec.get("source_url"),
+                "scraped_at": now,
+                "scrape_bucket": bucket,
+            }
+        values = list(rows.values())
+
+        seen = 0
+        confirmed: List[dict] = []
+        if _change_only_enabled():
+            values, unchanged = self._split_unchanged(values)
+            seen = self._heartbeat(unchanged, now)
+            confirmed = unchanged[:seen]
+            values.extend(unchanged[seen:])   # stale cache hints: write them after all
+
+        written = 0
+        if values:
+            if _bulk_upsert_supported():
+                written = self._bulk_insert(values, batch_size)
+            else:
+                written = self._bulk_insert_orm(values)
+            upsert_latest_prices(values)
+        # Unchanged scrapes skip history but are still samples of their day.
+        upsert_price_daily(values + confirmed)
+        db.session.commit()
+        logger.info("PriceService.bulk_upsert: wrote %d rows, %d unchanged", written, seen)
+        return written + seen
+
+    # ------------------------------------------------------------------
+    # Change detection
+    # ------------------------------------------------------------------
+
+    def _split_unchanged(self, values: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """Partition *values* into (changed, unchanged) against latest_prices."""
+        known: Dict[Tuple[int, int], StateSignature] = {}
+        missing = []
+        for rec in values:
+            key = (rec["product_id"], rec["retailer_id"])
+            sig = _STATE_CACHE.get(key)
+            if sig is None:
+                missing.append(key)
+            else:
+                known[key] = sig
+        if missing:
+            known.update(self._load_states(missing))
+
+        changed, unchanged = [], []
+        for rec in values:
+            key = (rec["product_id"], rec["retailer_id"])
+            sig = state_signature(rec["price"], rec["currency"], rec["in_stock"])
+            (unchanged if known.get(key) == sig else changed).append(rec)
+        return changed, unchanged
+
+    def _load_states(self, keys: List[Tuple[int, int]]) -> Dict[Tuple[int, int], StateSignature]:
+        """Read signatures for *keys* from latest_prices (one query per retailer) and cache them."""
+        by_retailer: Dict[int, List[int]] = {}
+        for pid, rid in keys:
+            by_retailer.setdefault(rid, []).append(pid)
+        states: Dict[Tuple[int, int], StateSignature] = {}
+        for rid, pids in by_retailer.items():
+            for start in range(0, len(pids), _LATEST_BATCH_SIZE):
+                rows = (
+                    db.session.query(LatestPrice.product_id, LatestPrice.price,
+                                     LatestPrice.currency, LatestPrice.in_stock)
+                    .filter(LatestPrice.retailer_id == rid,
+                            LatestPrice.product_id.in_(pids[start:start + _LATEST_BATCH_SIZE]))
+                    .all()
+                )
+                for pid, price, currency, in_stock in rows:
+                    sig = state_signature(price, currency, in_stock)
+                    states[(pid, rid)] = sig
+                    _STATE_CACHE.put((pid, rid), sig)
+        return states
+
+    def _heartbeat(self, unchanged: List[dict], now: datetime) -> int:
+        """
+        Bump ``last_seen_at`` for rows believed unchanged.
+
+        The UPDATE only matches while the stored price, currency and stock
+        flag still equal the record's, so a stale cache entry can never mark
+        a changed price as seen. Records that matched nothing are moved to
+        the end of *unchanged* (in place) and their cache entries dropped;
+        returns how many were confirmed.
+        """
+        if not unchanged:
+            return 0
+        table = LatestPrice.__table__
+        stmt = (
+            table.update()
+            .where(and_(
+                table.c.product_id == bindparam("b_pid"),
+                table.c.retailer_id == bindparam("b_rid"),
+                table.c.price == bindparam("b_price"),
+                table.c.currency == bindparam("b_currency"),
+                table.c.in_stock == bindparam("b_in_stock"),
+            ))
+            .values(last_seen_at=bindparam("b_seen"),
+                    price_usd=bindparam("b_price_usd"),
+                    source_url=func.coalesce(bindparam("b_url"), table.c.source_url))
+        )
+        params = [{
+            "b_pid": rec["product_id"], "b_rid": rec["retailer_id"],
+            "b_price": Decimal(state_signature(rec["price"], None, None)[0]),
+            "b_currency": rec["currency"], "b_in_stock": bool(rec["in_stock"]),
+            "b_seen": now, "b_price_usd": rec["price_usd"], "b_url": rec["source_url"],
+        } for rec in unchanged]
+        result = db.session.execute(stmt, params)
+
+        dialect = db.session.get_bind().dialect
+        if dialect.supports_sane_multi_rowcount and result.rowcount == len(unchanged):
+            return len(unchanged)
+
+        # Some rows no longer hold the cached state; find which by re-reading.
+        seen_keys = set()
+        for start in range(0, len(unchanged), _LATEST_BATCH_SIZE):
+            chunk = unchanged[start:start + _LATEST_BATCH_SIZE]
+            seen_keys.update(
+                db.session.query(LatestPrice.product_id, LatestPrice.retailer_id)
+                .filter(or_(*(and_(LatestPrice.product_id == rec["product_id"],
+                                   LatestPrice.retailer_id == rec["retailer_id"])
+                              for rec in chunk)),
+                        LatestPrice.last_seen_at == now)
+                .all()
+            )
+        confirmed = [r for r in unchanged if (r["product_id"], r["retailer_id"]) in seen_keys]
+        stale = [r for r in unchanged if (r["product_id"], r["retailer_id"]) not in seen_keys]
+        for rec in stale:
+            _STATE_CACHE.discard((rec["product_id"], rec["retailer_id"]))
+        unchanged[:] = confirmed + stale
+        return len(confirmed)
+
+    def _bulk_insert(self, values: List[dict], batch_size: Optional[int] = None) -> int:
+        cfg = current_app.config
+        batch_size = batch_size or cfg.get("PRICE_BULK_BATCH_SIZE", 1000)
+        dialect = db.session.get_bind().dialect.name
+        if dialect == "postgresql" and len(values) >= cfg.get("PRICE_BULK_COPY_THRESHOLD", 5000):
+            return self._bulk_copy(values)
+
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        # The monthly leaf on a partitioned Postgres table, which carries the dedupe index.
+        stmt = insert(insert_table(values[0]["scraped_at"]))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["product_id", "retailer_id", "scrape_bucket"],
+            set_={col: stmt.excluded[col] for col in _LATEST_COLUMNS},
+        )
+        for start in range(0, len(values), batch_size):
+            # executemany; SQLAlchemy folds it into multi-row VALUES on Postgres.
+            db.session.execute(stmt, values[start:start + batch_size])
+        return len(values)
+
+    def _bulk_copy(self, values: List[dict]) -> int:
+        """COPY *values* into a temp staging table, then upsert in one statement."""
+        columns = ("product_id", "retailer_id", "scrape_bucket") + _LATEST_COLUMNS
+        col_list = ", ".join(columns)
+        updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in _LATEST_COLUMNS)
+        target = insert_table(values[0]["scraped_at"]).name
+
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for rec in values:
+            writer.writerow([_copy_value(rec[col]) for col in columns])
+        buf.seek(0)
+
+        cursor = db.session.connection().connection.cursor()
+        try:
+            cursor.execute("DROP TABLE IF EXISTS _price_history_stage")
+            cursor.execute(
+                "CREATE TEMP TABLE _price_history_stage "
+                f"ON COMMIT DROP AS SELECT {col_list} FROM price_history WITH NO DATA"
+            )
+            cursor.copy_expert(
+                f"COPY _price_history_stage ({col_list}) FROM STDIN WITH (FORMAT csv)", buf
+            )
+            cursor.execute(
+                f"INSERT INTO {target} ({col_list}) "
+                f"SELECT {col_list} FROM _price_history_stage "
+                "ON CONFLICT (product_id, retailer_id, scrape_bucket) "
+                f"DO UPDATE SET {updates}"
             )
-            db.session.add(price)
-            written += 1
+        finally:
+            cursor.close()
+        return len(values)
 
-        if written:
-            db.session.commit()
-            logger.info("PriceService.bulk_upsert: wrote %d rows", written)
-        return written
+    def _bulk_insert_orm(self, values: List[dict]) -> int:
+        """Row-at-a-time ORM path (no dedupe); also the benchmark baseline."""
+        for rec in values:
+            db.session.add(PriceHistory(**rec))
+        return len(values)
@@ -25,12 +25,12 @@ from flask import current_app
 from sqlalchemy import func
 
 from app.extensions import db
-from app.models.price import PriceHistory
+from app.models.latest_price import LatestPrice
 from app.models.price_sync_log import PriceSyncLog
-from app.models.product import Product
 from app.models.retailer import Retailer
 from app.services import rcj_shopify
 from app.services.price_sync_config import load_price_map, load_price_floors
+from app.utils.identity_index import product_id_for
 
 logger = logging.getLogger(__name__)
 
@@ -56,26 +56,19 @@ def _latest_fuji_price(fuji_retailer_id: int, set_code: str, product_type: str,
     Matches on the product identity, not the Fuji URL — so a changed Fuji
     permalink can't silently drop a product from the sync. (set_code, product_type)
     is unique per Fuji product, and set-code detection is now reliable."""
-    prod = Product.query.filter_by(set_code=set_code, product_type=product_type).first()
-    if prod is None:
+    product_id = product_id_for(set_code, product_type)
+    if product_id is None:
         return None
-    row = (
-        PriceHistory.query
-        .filter(
-            PriceHistory.retailer_id == fuji_retailer_id,
-            PriceHistory.product_id == prod.id,
-            PriceHistory.scraped_at >= fresh_since,
-        )
-        .order_by(PriceHistory.scraped_at.desc())
-        .first()
-    )
-    if row is None:
+    row = db.session.get(LatestPrice, (product_id, fuji_retailer_id))
+    # An unchanged price is only re-confirmed (last_seen_at), not rewritten.
+    seen_at = (row.last_seen_at or row.scraped_at) if row is not None else None
+    if seen_at is None or seen_at < fresh_since:
         return None
     price = row.price_usd if row.price_usd is not None else row.price
     if price is None:
         return None
     return {"price": float(price), "in_stock": bool(row.in_stock),
-            "scraped_at": row.scraped_at, "source_url": row.source_url}
+            "scraped_at": seen_at, "source_url": row.source_url}
 
 
 def run_price_sync() -> dict:
@@ -209,12 +202,13 @@ def run_price_sync() -> dict:
     # Data-freshness alarm keyed on the AGE OF THE NEWEST Fuji row overall (a scrape
     # outage), NOT per-product skips — a product Fuji simply doesn't carry must not
     # trip the alarm. This is what makes a silent outage impossible to miss.
+    # latest_prices.last_seen_at moves on every scrape, even when no price changed.
     fresh_hours = cfg.get("FUJI_FRESH_HOURS", 48)
-    newest = (
-        PriceHistory.query.filter_by(retailer_id=fuji.id)
-        .order_by(PriceHistory.scraped_at.desc()).first()
+    newest_at = (
+        db.session.query(func.max(func.coalesce(LatestPrice.last_seen_at, LatestPrice.scraped_at)))
+        .filter(LatestPrice.retailer_id == fuji.id)
+        .scalar()
     )
-    newest_at = newest.scraped_at if newest else None
     age_hours = (round((datetime.utcnow() - newest_at).total_seconds() / 3600, 1)
                  if newest_at is not None else None)
     summary["fuji_last_scraped"] = newest_at.isoformat() if newest_at else None
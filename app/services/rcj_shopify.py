@@ -19,11 +19,14 @@ from __future__ import annotations
 
 import logging
 import os
+import time
 from typing import Dict, Optional, Tuple
 
 import requests
 from flask import current_app
 
+from app.utils import metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,6 +61,13 @@ class ShopifyConfigError(RuntimeError):
     pass
 
 
+def _session() -> requests.Session:
+    """A keep-alive session for one call's requests (routed through an active
+    record/replay cassette, see app.scrapers.cassette)."""
+    from app.scrapers import cassette
+    return cassette.mount(requests.Session())
+
+
 # ---------------------------------------------------------------------------
 # Read side (public products.json)
 # ---------------------------------------------------------------------------
@@ -68,35 +78,36 @@ def fetch_current_prices() -> Dict[int, dict]:
     rate-limited (429) from shared/cloud IPs. Prefer fetch_prices_by_variant_ids()
     (authenticated Admin API) for the sync; this remains for local/offline use."""
     out: Dict[int, dict] = {}
-    for path in _COLLECTION_PATHS:
-        page = 1
-        while True:
-            url = f"{_STOREFRONT}{path}?limit=250&currency=USD"
-            if page > 1:
-                url += f"&page={page}"
-            resp = requests.get(url, headers=_HEADERS, timeout=30)
-            resp.raise_for_status()
-            products = resp.json().get("products", [])
-            if not products:
-                break
-            for p in products:
-                for v in p.get("variants", []):
-                    vid = v.get("id")
-                    if vid is None:
-                        continue
-                    try:
-                        price = float(v.get("price"))
-                    except (TypeError, ValueError):
-                        continue
-                    out[int(vid)] = {
-                        "price": price,
-                        "product_id": p.get("id"),
-                        "available": bool(v.get("available")),
-                        "title": p.get("title"),
-                    }
-            if len(products) < 250:
-                break
-            page += 1
+    with _session() as http:
+        for path in _COLLECTION_PATHS:
+            page = 1
+            while True:
+                url = f"{_STOREFRONT}{path}?limit=250&currency=USD"
+                if page > 1:
+                    url += f"&page={page}"
+                resp = http.get(url, headers=_HEADERS, timeout=30)
+                resp.raise_for_status()
+                products = resp.json().get("products", [])
+                if not products:
+                    break
+                for p in products:
+                    for v in p.get("variants", []):
+                        vid = v.get("id")
+                        if vid is None:
+                            continue
+                        try:
+                            price = float(v.get("price"))
+                        except (TypeError, ValueError):
+                            continue
+                        out[int(vid)] = {
+                            "price": price,
+                            "product_id": p.get("id"),
+                            "available": bool(v.get("available")),
+                            "title": p.get("title"),
+                        }
+                if len(products) < 250:
+                    break
+                page += 1
     return out
 
 
@@ -132,34 +143,31 @@ def fetch_products_admin() -> list:
         raise ShopifyConfigError("SHOPIFY_ADMIN_TOKEN is not configured")
 
     out, cursor = [], None
-    while True:
-        resp = requests.post(
-            _graphql_endpoint(),
-            headers={"X-Shopify-Access-Token": token, "Content-Type": "application/json"},
-            json={"query": _PRODUCTS_QUERY, "variables": {"cursor": cursor}},
-            timeout=30,
-        )
-        resp.raise_for_status()
-        body = resp.json()
-        if body.get("errors"):
-            raise RuntimeError(f"Admin API errors: {body['errors']}")
-        data = (body.get("data") or {}).get("products") or {}
-        for node in data.get("nodes", []):
-            variants = (node.get("variants") or {}).get("nodes") or []
-            if not variants:
-                continue
-            v = variants[0]
-            out.append({
-                "title": node.get("title", ""),
-                "handle": node.get("handle", ""),
-                "price": v.get("price"),
-                "inventory": v.get("inventoryQuantity"),
-                "available": bool(v.get("availableForSale")),
-            })
-        page = data.get("pageInfo") or {}
-        if not page.get("hasNextPage"):
-            break
-        cursor = page.get("endCursor")
+    with _session() as http:
+        while True:
+            resp = _graphql_post(http, token, _PRODUCTS_QUERY, {"cursor": cursor}, timeout=30,
+                                 operation="products")
+            resp.raise_for_status()
+            body = resp.json()
+            if body.get("errors"):
+                raise RuntimeError(f"Admin API errors: {body['errors']}")
+            data = (body.get("data") or {}).get("products") or {}
+            for node in data.get("nodes", []):
+                variants = (node.get("variants") or {}).get("nodes") or []
+                if not variants:
+                    continue
+                v = variants[0]
+                out.append({
+                    "title": node.get("title", ""),
+                    "handle": node.get("handle", ""),
+                    "price": v.get("price"),
+                    "inventory": v.get("inventoryQuantity"),
+                    "available": bool(v.get("availableForSale")),
+                })
+            page = data.get("pageInfo") or {}
+            if not page.get("hasNextPage"):
+                break
+            cursor = page.get("endCursor")
     return out
 
 
@@ -173,33 +181,30 @@ def fetch_prices_by_variant_ids(variant_ids) -> Dict[int, dict]:
 
     ids = [int(v) for v in variant_ids]
     out: Dict[int, dict] = {}
-    for i in range(0, len(ids), 200):
-        chunk = ids[i:i + 200]
-        gids = [_gid("ProductVariant", v) for v in chunk]
-        resp = requests.post(
-            _graphql_endpoint(),
-            headers={"X-Shopify-Access-Token": token, "Content-Type": "application/json"},
-            json={"query": _VARIANTS_QUERY, "variables": {"ids": gids}},
-            timeout=30,
-        )
-        resp.raise_for_status()
-        body = resp.json()
-        if body.get("errors"):
-            raise RuntimeError(f"Admin API errors: {body['errors']}")
-        for node in (body.get("data") or {}).get("nodes") or []:
-            if not node or "id" not in node:
-                continue
-            try:
-                vid = int(str(node["id"]).split("/")[-1])
-                price = float(node["price"])
-            except (TypeError, ValueError):
-                continue
-            out[vid] = {
-                "price": price,
-                "product_id": node.get("product", {}).get("id"),
-                "available": bool(node.get("availableForSale")),
-                "inventory": node.get("inventoryQuantity"),
-            }
+    with _session() as http:
+        for i in range(0, len(ids), 200):
+            chunk = ids[i:i + 200]
+            gids = [_gid("ProductVariant", v) for v in chunk]
+            resp = _graphql_post(http, token, _VARIANTS_QUERY, {"ids": gids}, timeout=30,
+                                 operation="variants")
+            resp.raise_for_status()
+            body = resp.json()
+            if body.get("errors"):
+                raise RuntimeError(f"Admin API errors: {body['errors']}")
+            for node in (body.get("data") or {}).get("nodes") or []:
+                if not node or "id" not in node:
+                    continue
+                try:
+                    vid = int(str(node["id"]).split("/")[-1])
+                    price = float(node["price"])
+                except (TypeError, ValueError):
+                    continue
+                out[vid] = {
+                    "price": price,
+                    "product_id": node.get("product", {}).get("id"),
+                    "available": bool(node.get("availableForSale")),
+                    "inventory": node.get("inventoryQuantity"),
+                }
     return out
 
 
@@ -232,6 +237,27 @@ def _graphql_endpoint() -> str:
     return f"https://{shop}/admin/api/{version}/graphql.json"
 
 
+def _graphql_post(http, token: str, query: str, variables: dict, timeout: float,
+                  operation: str) -> requests.Response:
+    """POST one Admin GraphQL request, timing it and counting throttles for /metrics."""
+    start = time.perf_counter()
+    resp = http.post(
+        _graphql_endpoint(),
+        headers={"X-Shopify-Access-Token": token, "Content-Type": "application/json"},
+        json={"query": query, "variables": variables},
+        timeout=timeout,
+    )
+    metrics.SHOPIFY_GRAPHQL_SECONDS.observe(time.perf_counter() - start, client="rcj",
+                                            operation=operation)
+    try:
+        body = resp.json() if resp.status_code != 429 else None
+    except ValueError:
+        body = None
+    if metrics.is_throttled(resp.status_code, body):
+        metrics.SHOPIFY_THROTTLED.inc(client="rcj")
+    return resp
+
+
 def update_variant_price(product_id, variant_id, price: float,
                          force_live: bool = False) -> Tuple[bool, Optional[str]]:
     """Set a variant's price. Returns (ok, error_message).
@@ -254,12 +280,9 @@ def update_variant_price(product_id, variant_id, price: float,
         "variants": [{"id": _gid("ProductVariant", variant_id), "price": price_str}],
     }
     try:
-        resp = requests.post(
-            _graphql_endpoint(),
-            headers={"X-Shopify-Access-Token": token, "Content-Type": "application/json"},
-            json={"query": _MUTATION, "variables": variables},
-            timeout=20,
-        )
+        with _session() as http:
+            resp = _graphql_post(http, token, _MUTATION, variables, timeout=20,
+                                 operation="setPrice")
         resp.raise_for_status()
         body = resp.json()
     except Exception as exc:
@@ -0,0 +1,226 @@
+"""
+app/services/rollup_service.py
+
+Daily OHLC rollup of price history (``price_daily``).
+
+``upsert_price_daily`` folds just-written ``price_history`` rows -- and the
+scrapes ``bulk_upsert`` only confirmed as unchanged, which never reach
+history -- into their day's bar inside the caller's transaction; every
+ingestion path calls it next to ``upsert_latest_prices``. A bar remembers
+the scrape bucket of its close, so a scrape replayed inside that bucket
+replaces its earlier sample instead of counting twice.
+
+``backfill_price_daily`` fills in, from history, the days of a date range
+that have no bar yet (initial load, gaps), one window of days per
+transaction. History holds price changes only, so it never replaces a bar
+the writers maintain: a day on which the price did not change has no
+history, only the heartbeat samples in its bar. Long-range charts read the
+rollup (see ChartService).
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, case, func
+
+from app.extensions import db
+from app.models.price import PriceHistory
+from app.models.price_daily import PriceDaily
+
+logger = logging.getLogger(__name__)
+
+# Days of history aggregated per backfill transaction.
+BACKFILL_WINDOW_DAYS: int = 7
+
+_BATCH_SIZE = 1000
+_BAR_COLUMNS = ("open", "high", "low", "close", "min_in_stock", "price_sum", "samples",
+                "currency", "open_at", "close_at", "last_bucket")
+
+BarKey = Tuple[int, int, date]
+
+
+def _field(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def _decimal(value) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _bucket(row) -> Optional[int]:
+    return row.get("scrape_bucket") if isinstance(row, dict) else getattr(row, "scrape_bucket", None)
+
+
+def _bar(price: Decimal, in_stock: bool, at: datetime, currency: Optional[str],
+         bucket: Optional[int] = None) -> dict:
+    return {"open": price, "high": price, "low": price, "close": price,
+            "min_in_stock": price if in_stock else None,
+            "price_sum": price, "samples": 1, "currency": currency,
+            "open_at": at, "close_at": at, "last_bucket": bucket}
+
+
+def merge_bars(into: dict, other: dict) -> dict:
+    """Fold bar *other* into *into* (in place); the result does not depend on order."""
+    if other["open_at"] < into["open_at"]:
+        into["open"], into["open_at"] = other["open"], other["open_at"]
+    if other["close_at"] >= into["close_at"]:
+        into["close"], into["close_at"] = other["close"], other["close_at"]
+        into["currency"], into["last_bucket"] = other["currency"], other["last_bucket"]
+    into["high"] = max(into["high"], other["high"])
+    into["low"] = min(into["low"], other["low"])
+    if other["min_in_stock"] is not None and (
+            into["min_in_stock"] is None or other["min_in_stock"] < into["min_in_stock"]):
+        into["min_in_stock"] = other["min_in_stock"]
+    into["price_sum"] += other["price_sum"]
+    into["samples"] += other["samples"]
+    return into
+
+
+def fold_bar(stored: dict, new: dict) -> dict:
+    """
+    Fold *new* into the *stored* bar (in place), treating a *new* bar from
+    the stored close's scrape bucket as a replay of that sample.
+
+    A replay takes the place of the close it repeats: a single-sample bar is
+    replaced outright, otherwise the old close leaves ``price_sum`` /
+    ``samples`` before *new* is merged (its high / low stay, which only
+    matters when the replay changed the price).
+    """
+    if new["last_bucket"] is None or stored["last_bucket"] != new["last_bucket"]:
+        return merge_bars(stored, new)
+    if stored["samples"] == 1:
+        stored.update(new)
+        return stored
+    stored["price_sum"] -= stored["close"]
+    stored["samples"] -= 1
+    return merge_bars(stored, new)
+
+
+def daily_bars(rows: Iterable) -> Dict[BarKey, dict]:
+    """Aggregate history rows (PriceHistory objects or column dicts) into day bars."""
+    bars: Dict[BarKey, dict] = {}
+    for row in rows:
+        price, at = _field(row, "price"), _field(row, "scraped_at")
+        if price is None or at is None:
+            continue
+        key = (_field(row, "product_id"), _field(row, "retailer_id"), at.date())
+        bar = _bar(_decimal(price), bool(_field(row, "in_stock")), at, _field(row, "currency"),
+                   _bucket(row))
+        if key in bars:
+            merge_bars(bars[key], bar)
+        else:
+            bars[key] = bar
+    return bars
+
+
+def upsert_price_daily(rows: Iterable) -> int:
+    """
+    Stage ``price_daily`` updates for *rows* (written history rows or
+    confirmed-unchanged scrapes, each with its ``scrape_bucket`` when it has
+    one); the caller commits.
+    """
+    bars = daily_bars(rows)
+    if not bars:
+        return 0
+
+    values = [{"product_id": pid, "retailer_id": rid, "day": day, **bar}
+              for (pid, rid, day), bar in bars.items()]
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        table = PriceDaily.__table__
+        stmt = insert(table)
+        cur, new = table.c, stmt.excluded
+        later = new.close_at >= cur.close_at
+        earlier = new.open_at < cur.open_at
+        # Same semantics as fold_bar: a replay of the close's bucket replaces
+        # that sample, and replaces the whole bar when it was the only one.
+        replay = and_(new.last_bucket.isnot(None), cur.last_bucket == new.last_bucket)
+        sole = and_(replay, cur.samples == 1)
+        # Every SET expression reads the row as it was before this update.
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["product_id", "retailer_id", "day"],
+            set_={
+                "open": case((sole, new.open), (earlier, new.open), else_=cur.open),
+                "open_at": case((sole, new.open_at), (earlier, new.open_at), else_=cur.open_at),
+                "close": case((later, new.close), else_=cur.close),
+                "close_at": case((later, new.close_at), else_=cur.close_at),
+                "currency": case((later, new.currency), else_=cur.currency),
+                "last_bucket": case((later, new.last_bucket), else_=cur.last_bucket),
+                "high": case((sole, new.high), (new.high > cur.high, new.high), else_=cur.high),
+                "low": case((sole, new.low), (new.low < cur.low, new.low), else_=cur.low),
+                "min_in_stock": case(
+                    (sole, new.min_in_stock),
+                    (cur.min_in_stock.is_(None), new.min_in_stock),
+                    (new.min_in_stock < cur.min_in_stock, new.min_in_stock),
+                    else_=cur.min_in_stock),
+                "price_sum": case((replay, cur.price_sum - cur.close + new.price_sum),
+                                  else_=cur.price_sum + new.price_sum),
+                "samples": case((replay, cur.samples - 1 + new.samples),
+                                else_=cur.samples + new.samples),
+            },
+        )
+        for start in range(0, len(values), _BATCH_SIZE):
+            db.session.execute(stmt, values[start:start + _BATCH_SIZE])
+    else:
+        for rec in values:
+            existing = db.session.get(PriceDaily, (rec["product_id"], rec["retailer_id"], rec["day"]))
+            if existing is None:
+                db.session.add(PriceDaily(**rec))
+                continue
+            merged = fold_bar({col: getattr(existing, col) for col in _BAR_COLUMNS}, rec)
+            for col in _BAR_COLUMNS:
+                setattr(existing, col, merged[col])
+    return len(values)
+
+
+def backfill_price_daily(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                         window_days: int = BACKFILL_WINDOW_DAYS) -> int:
+    """
+    Build the missing ``price_daily`` bars for [*since*, *until*) from price_history.
+
+    Defaults to everything still in history. Each window of *window_days*
+    is filled in its own transaction; existing bars, and days whose history
+    has been archived, are left as they are, so it is safe to re-run.
+    Returns the number of bars written.
+    """
+    if since is None:
+        since = db.session.query(func.min(PriceHistory.scraped_at)).scalar()
+        if since is None:
+            return 0
+    until = until or datetime.utcnow() + timedelta(days=1)
+    start = datetime.combine(since.date(), datetime.min.time())
+    end = datetime.combine(until.date(), datetime.min.time())
+
+    written = 0
+    while start < end:
+        stop = min(start + timedelta(days=window_days), end)
+        rows = (
+            db.session.query(PriceHistory.product_id, PriceHistory.retailer_id,
+                             PriceHistory.price, PriceHistory.in_stock,
+                             PriceHistory.currency, PriceHistory.scraped_at,
+                             PriceHistory.scrape_bucket)
+            .filter(PriceHistory.scraped_at >= start, PriceHistory.scraped_at < stop)
+            .yield_per(5000)
+        )
+        bars = daily_bars(row._mapping for row in rows)
+        existing = set(
+            db.session.query(PriceDaily.product_id, PriceDaily.retailer_id, PriceDaily.day)
+            .filter(PriceDaily.day >= start.date(), PriceDaily.day < stop.date())
+        )
+        missing = [{"product_id": pid, "retailer_id": rid, "day": day, **bar}
+                   for (pid, rid, day), bar in bars.items() if (pid, rid, day) not in existing]
+        db.session.bulk_insert_mappings(PriceDaily, missing)
+        db.session.commit()
+        written += len(missing)
+        logger.info("backfill_price_daily: %s..%s -> %d bars", start.date(), stop.date(),
+                    len(missing))
+        start = stop
+    return written
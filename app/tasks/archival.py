@@ -8,92 +8,452 @@ Strategy
 - Prices older than ARCHIVE_AFTER_DAYS (default 90) are moved to the
   `price_archive` table.
 - Prices older than DELETE_AFTER_DAYS (default 365) are hard-deleted
-  from the archive.
+  from the archive -- with the cold store enabled, only months whose cold
+  file exists (``ColdStore.has_month``); the rest wait for their export.
+- `scrape_logs`, `scrape_runs` and `price_sync_log` rows older than their
+  retention (SCRAPE_LOG_RETENTION_DAYS / SCRAPE_RUNS_RETENTION_DAYS /
+  PRICE_SYNC_LOG_RETENTION_DAYS) are deleted.
+- Every archived month is written to the cold store (app/utils/cold_store.py)
+  once all of its rows have left price_history, before anything is purged,
+  so history is kept indefinitely outside the database.
 - The task is idempotent and safe to run multiple times.
 - Intended to be scheduled weekly via APScheduler.
+
+Engine
+------
+Every table is trimmed by ``run_job`` in keyset batches on its id: each
+batch of ARCHIVAL_BATCH_SIZE rows below the cutoff is copied (price_history
+only) and deleted in its own short transaction, together with the job's
+``archival_progress`` row. Writers only ever wait for one batch, and a run
+that dies, or stops at ARCHIVAL_MAX_SECONDS, resumes after the last
+committed id with the cutoff it started with. The statements are SQLAlchemy
+Core, so they run on SQLite and Postgres alike; on Postgres a batch is one
+``DELETE ... RETURNING`` feeding the archive INSERT, and waits at most
+ARCHIVAL_LOCK_TIMEOUT_MS for a lock. Each job logs rows, batches and rows/s.
+
+Partitioned Postgres (app/models/partitioning.py)
+-------------------------------------------------
+- A monthly leaf is archived once its whole month is older than
+  ARCHIVE_AFTER_DAYS: it is detached from ``price_history`` and renamed
+  ``price_archive_pYYYY_MM``. No rows are copied or deleted, so there is
+  nothing for autovacuum to clean up afterwards.
+- An archived month whose whole range is older than DELETE_AFTER_DAYS is
+  dropped.
+- Each run first creates the partitions for the coming months.
 """
 
 from __future__ import annotations
 
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Optional
 
-from sqlalchemy import text
+from flask import current_app
+from sqlalchemy import (DateTime, Table, and_, column, exists, func, inspect, literal, select,
+                        table as table_clause, text)
 
 from app.extensions import db
+from app.models import partitioning
+from app.models.archival_progress import ArchivalProgress
+from app.models.price import PriceHistory
+from app.models.price_archive import PriceArchive
+from app.models.price_sync_log import PriceSyncLog
+from app.models.scrape_log import ScrapeLog
+from app.models.scrape_run import ScrapeRun
+from app.utils.cold_store import get_cold_store
 
 logger = logging.getLogger(__name__)
 
 ARCHIVE_AFTER_DAYS: int = 90
 DELETE_AFTER_DAYS: int = 365
+SCRAPE_LOG_RETENTION_DAYS: int = 90
+SCRAPE_RUNS_RETENTION_DAYS: int = 90
+PRICE_SYNC_LOG_RETENTION_DAYS: int = 180
 
+# Engine defaults (overridden by the ARCHIVAL_* config keys).
+ARCHIVAL_BATCH_SIZE: int = 2000
+ARCHIVAL_MAX_SECONDS: float = 900.0
+ARCHIVAL_PAUSE_SECONDS: float = 0.05
+ARCHIVAL_LOCK_TIMEOUT_MS: int = 5000
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ArchivalJob:
+    """One table trimmed by ``run_job``: rows whose *column* is before the cutoff."""
+
+    name: str
+    table: Table
+    column: str
+    archive: Optional[Table] = None     # rows are copied here first; None = delete only
+
+
+@dataclass
+class ArchivalResult:
+    job: str
+    cutoff: datetime
+    rows: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    resumed: bool = False
+    finished: bool = False
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "job": self.job,
+            "cutoff": self.cutoff.isoformat(),
+            "rows": self.rows,
+            "batches": self.batches,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "resumed": self.resumed,
+            "finished": self.finished,
+        }
+
+
+PRICE_HISTORY_JOB = ArchivalJob("price_history", PriceHistory.__table__, "scraped_at",
+                                archive=PriceArchive.__table__)
+PRICE_ARCHIVE_JOB = ArchivalJob("price_archive", PriceArchive.__table__, "scraped_at")
+SCRAPE_LOGS_JOB = ArchivalJob("scrape_logs", ScrapeLog.__table__, "started_at")
+SCRAPE_RUNS_JOB = ArchivalJob("scrape_runs", ScrapeRun.__table__, "started_at")
+PRICE_SYNC_LOG_JOB = ArchivalJob("price_sync_log", PriceSyncLog.__table__, "created_at")
+
+
+def _setting(name: str, default):
+    return current_app.config.get(name, default)
 
-_CREATE_ARCHIVE_TABLE_SQL = """
-CREATE TABLE IF NOT EXISTS price_archive (
-    id               INTEGER PRIMARY KEY,
-    product_id       INTEGER,
-    retailer_id      INTEGER,
-    price            NUMERIC(10, 2),
-    price_usd        NUMERIC(10, 2),
-    currency         TEXT,
-    in_stock         INTEGER,
-    scraped_at       DATETIME,
-    archived_at      DATETIME DEFAULT CURRENT_TIMESTAMP
-);
-"""
 
+def _ensure_tables() -> None:
+    for table in (PriceArchive.__table__, ArchivalProgress.__table__):
+        table.create(bind=db.engine, checkfirst=True)
 
-def _ensure_archive_table() -> None:
-    db.session.execute(text(_CREATE_ARCHIVE_TABLE_SQL))
+
+def _start(job: ArchivalJob, cutoff: datetime) -> tuple:
+    """The job's progress row, resumed if its last run did not finish."""
+    progress = db.session.get(ArchivalProgress, job.name)
+    resumed = progress is not None and progress.finished_at is None
+    if progress is None:
+        progress = ArchivalProgress(job=job.name)
+        db.session.add(progress)
+    if not resumed:
+        progress.cutoff = cutoff
+        progress.last_id = 0
+        progress.rows_done = 0
+        progress.batches = 0
+        progress.seconds = 0.0
+        progress.started_at = datetime.utcnow()
+        progress.finished_at = None
     db.session.commit()
+    return progress, resumed
+
+
+def _move_batch(job: ArchivalJob, window, postgres: bool) -> int:
+    """Copy (if archiving) and delete the rows in *window*; returns rows removed."""
+    table = job.table
+    if job.archive is None:
+        return db.session.execute(table.delete().where(window)).rowcount
+
+    archive = job.archive
+    columns = [c.name for c in archive.columns if c.name in table.c]
+    now = literal(datetime.utcnow(), DateTime)
+    if postgres:
+        from sqlalchemy.dialects.postgresql import insert
+
+        moved = table.delete().where(window).returning(*(table.c[n] for n in columns)).cte("moved")
+        stmt = insert(archive).from_select(
+            columns + ["archived_at"], select(*(moved.c[n] for n in columns), now))
+        # Rows already archived by an interrupted run are dropped, not duplicated.
+        return db.session.execute(stmt.on_conflict_do_nothing(index_elements=["id"])).rowcount
+
+    fresh = ~exists().where(archive.c.id == table.c.id)
+    db.session.execute(archive.insert().from_select(
+        columns + ["archived_at"],
+        select(*(table.c[n] for n in columns), now).where(window, fresh)))
+    return db.session.execute(table.delete().where(window)).rowcount
+
+
+def run_job(job: ArchivalJob, cutoff: datetime, batch_size: Optional[int] = None,
+            max_seconds: Optional[float] = None) -> ArchivalResult:
+    """
+    Remove *job*'s rows older than *cutoff* in keyset batches.
+
+    Resumes an unfinished previous run (keeping its cutoff). Stops early, with
+    ``finished`` False, once *max_seconds* have passed; the next call carries
+    on from there.
+    """
+    _ensure_tables()
+    batch_size = batch_size or _setting("ARCHIVAL_BATCH_SIZE", ARCHIVAL_BATCH_SIZE)
+    if max_seconds is None:
+        max_seconds = _setting("ARCHIVAL_MAX_SECONDS", ARCHIVAL_MAX_SECONDS)
+    pause = _setting("ARCHIVAL_PAUSE_SECONDS", ARCHIVAL_PAUSE_SECONDS)
+    lock_timeout = int(_setting("ARCHIVAL_LOCK_TIMEOUT_MS", ARCHIVAL_LOCK_TIMEOUT_MS))
+    postgres = db.engine.dialect.name == "postgresql"
+
+    progress, resumed = _start(job, cutoff)
+    result = ArchivalResult(job.name, progress.cutoff, resumed=resumed)
+    key, stamp = job.table.c.id, job.table.c[job.column]
+    after = progress.last_id
+    started = time.monotonic()
+    try:
+        while not (max_seconds and time.monotonic() - started >= max_seconds):
+            batch_started = time.monotonic()
+            ids = db.session.execute(
+                select(key).where(stamp < progress.cutoff, key > after)
+                .order_by(key).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                result.finished = True
+                break
+            if postgres:
+                db.session.execute(text(f"SET LOCAL lock_timeout = {lock_timeout}"))
+            window = and_(key > after, key <= ids[-1], stamp < progress.cutoff)
+            removed = _move_batch(job, window, postgres)
+
+            after = ids[-1]
+            progress.last_id = after
+            progress.rows_done += removed
+            progress.batches += 1
+            progress.seconds += time.monotonic() - batch_started
+            db.session.commit()
+            result.rows += removed
+            result.batches += 1
+            if pause:
+                time.sleep(pause)
+        if result.finished:
+            progress.finished_at = datetime.utcnow()
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        result.seconds = time.monotonic() - started
+
+    logger.info(
+        "archival %s: %d rows in %d batches, %.1fs (%.0f rows/s)%s%s",
+        job.name, result.rows, result.batches, result.seconds, result.rows_per_second,
+        " [resumed]" if result.resumed else "",
+        "" if result.finished else " [time budget reached; resumes next run]",
+    )
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Jobs
+# ---------------------------------------------------------------------------
 
+def archive_old_prices(archive_after_days: int = ARCHIVE_AFTER_DAYS) -> dict:
+    """
+    Move price_history rows older than *archive_after_days* out of the table.
 
-def archive_old_prices(archive_after_days: int = ARCHIVE_AFTER_DAYS) -> int:
-    _ensure_archive_table()
+    Returns records_removed, plus the engine's batches, seconds,
+    rows_per_second and finished. Nothing counts the whole table: on the
+    partitioned path records_removed is the planner's estimate for the
+    detached months.
+    """
     cutoff = datetime.utcnow() - timedelta(days=archive_after_days)
+    if partitioning.is_partitioned():
+        started = time.monotonic()
+        result = ArchivalResult(PRICE_HISTORY_JOB.name, cutoff, finished=True)
+        result.rows = _detach_old_partitions(cutoff)
+        result.seconds = time.monotonic() - started
+    else:
+        result = run_job(PRICE_HISTORY_JOB, cutoff)
+    stats = result.to_dict()
+    stats["records_removed"] = result.rows
+    return stats
 
-    insert_sql = text("""
-        INSERT OR IGNORE INTO price_archive
-            (id, product_id, retailer_id, price, price_usd,
-             currency, in_stock, scraped_at)
-        SELECT id, product_id, retailer_id, price, price_usd,
-               currency, in_stock, scraped_at
-        FROM   price_history
-        WHERE  scraped_at < :cutoff
-    """)
-    db.session.execute(insert_sql, {"cutoff": cutoff})
-
-    delete_sql = text("""
-        DELETE FROM price_history
-        WHERE  scraped_at < :cutoff
-    """)
-    result = db.session.execute(delete_sql, {"cutoff": cutoff})
-    db.session.commit()
 
-    moved = result.rowcount
-    logger.info("Archived %d price rows older than %s", moved, cutoff.date())
-    return moved
+def _cold_confirmed(cutoff: datetime) -> datetime:
+    """
+    *cutoff*, pulled back to the start of the first archived month the cold
+    store does not hold yet. Unchanged with the cold tier switched off.
+    """
+    if not _setting("COLD_STORE_ENABLED", True):
+        return cutoff
+    first = _first_archived_month()
+    if first is None:
+        return cutoff
+    store = get_cold_store()
+    if store is None:
+        logger.warning("cold store enabled without COLD_STORE_DIR; archive is not purged")
+        return first
+    month = first
+    while month < cutoff and store.has_month(month):
+        month = partitioning.add_months(month, 1)
+    if month < cutoff:
+        logger.info("purge: %s is not in the cold store yet; keeping it and later months",
+                    month.strftime("%Y-%m"))
+    return min(month, cutoff)
 
 
 def purge_old_archive(delete_after_days: int = DELETE_AFTER_DAYS) -> int:
-    _ensure_archive_table()
-    cutoff = datetime.utcnow() - timedelta(days=delete_after_days)
-
-    purge_sql = text("""
-        DELETE FROM price_archive
-        WHERE  scraped_at < :cutoff
-    """)
-    result = db.session.execute(purge_sql, {"cutoff": cutoff})
-    db.session.commit()
+    cutoff = _cold_confirmed(datetime.utcnow() - timedelta(days=delete_after_days))
+    progress = db.session.get(ArchivalProgress, PRICE_ARCHIVE_JOB.name)
+    if progress is not None and progress.finished_at is None and progress.cutoff > cutoff:
+        # An unfinished run would resume past what the cold store confirms now.
+        progress.finished_at = datetime.utcnow()
+        db.session.commit()
+    dropped = _drop_archived_partitions(cutoff) if partitioning.is_partitioned() else 0
+    return run_job(PRICE_ARCHIVE_JOB, cutoff).rows + dropped
+
+
+def cleanup_stale_scrape_logs(days: Optional[int] = None) -> int:
+    days = days or _setting("SCRAPE_LOG_RETENTION_DAYS", SCRAPE_LOG_RETENTION_DAYS)
+    return run_job(SCRAPE_LOGS_JOB, datetime.utcnow() - timedelta(days=days)).rows
+
+
+def cleanup_scrape_runs(days: Optional[int] = None) -> int:
+    days = days or _setting("SCRAPE_RUNS_RETENTION_DAYS", SCRAPE_RUNS_RETENTION_DAYS)
+    return run_job(SCRAPE_RUNS_JOB, datetime.utcnow() - timedelta(days=days)).rows
+
+
+def cleanup_price_sync_log(days: Optional[int] = None) -> int:
+    days = days or _setting("PRICE_SYNC_LOG_RETENTION_DAYS", PRICE_SYNC_LOG_RETENTION_DAYS)
+    return run_job(PRICE_SYNC_LOG_JOB, datetime.utcnow() - timedelta(days=days)).rows
+
+
+# ---------------------------------------------------------------------------
+# Cold store
+# ---------------------------------------------------------------------------
+
+_ARCHIVE_COLUMNS = ("product_id", "retailer_id", "price", "price_usd", "currency",
+                    "in_stock", "scraped_at")
+
+
+def _archived_rows(month: datetime, end: datetime) -> list:
+    """Archived rows of one month, from price_archive and its detached partition."""
+    tables = []
+    if inspect(db.engine).has_table(PriceArchive.__tablename__):
+        tables.append(PriceArchive.__tablename__)
+    if partitioning.is_partitioned():
+        detached = partitioning.partition_name(month).replace(
+            f"{partitioning.PARENT}_p", "price_archive_p", 1)
+        if inspect(db.engine).has_table(detached):
+            tables.append(detached)
+    rows = []
+    for name in tables:
+        # Typed columns, so every dialect hands back datetimes and decimals.
+        table = table_clause(name, *(column(c, PriceArchive.__table__.c[c].type)
+                                     for c in _ARCHIVE_COLUMNS))
+        rows.extend(dict(row._mapping) for row in db.session.execute(
+            select(*table.c).where(table.c.scraped_at >= month, table.c.scraped_at < end)))
+    return rows
+
+
+def _first_archived_month() -> Optional[datetime]:
+    firsts = []
+    if inspect(db.engine).has_table(PriceArchive.__tablename__):
+        firsts.append(db.session.query(func.min(PriceArchive.scraped_at)).scalar())
+    if partitioning.is_partitioned():
+        firsts.extend(partitioning.partition_month(name) for name in _archived_partitions())
+    firsts = [f for f in firsts if f is not None]
+    return partitioning.month_start(min(firsts)) if firsts else None
+
+
+def export_cold_months(archive_after_days: int = ARCHIVE_AFTER_DAYS) -> int:
+    """
+    Write every fully archived month that is not in the cold store yet.
+
+    A month qualifies once it ends before the archive cutoff and
+    price_history holds none of its rows (an archival run that stopped at
+    its time budget is finished first). Returns the rows written.
+    """
+    store = get_cold_store()
+    if store is None:
+        return 0
+    first = _first_archived_month()
+    if first is None:
+        return 0
+    limit = partitioning.month_start(datetime.utcnow() - timedelta(days=archive_after_days))
+
+    written = 0
+    month = first
+    while month < limit:
+        end = partitioning.add_months(month, 1)
+        if not store.has_month(month):
+            pending = db.session.query(PriceHistory.id).filter(
+                PriceHistory.scraped_at < end).first()
+            if pending is not None:
+                logger.info("cold store: %s still has rows in price_history; not exported yet",
+                            month.strftime("%Y-%m"))
+                break
+            # Empty months get a file too: it is what lets the purge pass them.
+            written += store.write_month(month, _archived_rows(month, end))
+        month = end
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Partitioned Postgres
+# ---------------------------------------------------------------------------
+
+def _estimated_rows(table: str) -> int:
+    # Planner statistics: counting an old month would scan it.
+    rows = db.session.execute(
+        text("SELECT reltuples FROM pg_class WHERE relname = :table"), {"table": table}
+    ).scalar()
+    return max(int(rows or 0), 0)
+
+
+def _detach_old_partitions(cutoff: datetime) -> int:
+    """Detach the monthly leaves that end before *cutoff*; returns ~rows moved."""
+    moved = 0
+    for name, month in partitioning.monthly_partitions():
+        if partitioning.add_months(month, 1) > cutoff:
+            break
+        archive = name.replace(f"{partitioning.PARENT}_p", "price_archive_p", 1)
+        moved += _estimated_rows(name)
+        db.session.execute(text(f"ALTER TABLE {partitioning.PARENT} DETACH PARTITION {name}"))
+        db.session.execute(text(f"ALTER TABLE {name} RENAME TO {archive}"))
+        db.session.commit()
+        logger.info("Archived partition %s as %s", name, archive)
+    partitioning.invalidate()
+    logger.info("Archived ~%d price rows older than %s by detaching partitions",
+                moved, cutoff.date())
+    return moved
+
+
+def _archived_partitions() -> list:
+    return sorted(row[0] for row in db.session.execute(text(
+        "SELECT tablename FROM pg_tables WHERE tablename LIKE 'price\\_archive\\_p%' "
+        "AND schemaname = ANY (current_schemas(false))")))
+
 
-    deleted = result.rowcount
-    logger.info("Purged %d rows from price_archive older than %s", deleted, cutoff.date())
-    return deleted
+def _drop_archived_partitions(cutoff: datetime) -> int:
+    """Drop detached archive months that end before *cutoff*; returns ~rows dropped."""
+    dropped = 0
+    for name in _archived_partitions():
+        month = partitioning.partition_month(name)
+        if month is None or partitioning.add_months(month, 1) > cutoff:
+            continue
+        dropped += _estimated_rows(name)
+        db.session.execute(text(f"DROP TABLE {name}"))
+        db.session.commit()
+        logger.info("Dropped archived partition %s", name)
+    return dropped
 
 
 def run_archival_task() -> dict:
-    moved = archive_old_prices()
-    purged = purge_old_archive()
-    summary = {"archived": moved, "purged": purged}
+    partitioning.ensure_partitions()
+    archived = archive_old_prices()
+    summary = {
+        "archived": archived["records_removed"],
+        "archived_rows_per_second": archived["rows_per_second"],
+        # Before the purge, so months are on disk before they leave the database.
+        "cold_rows": export_cold_months(),
+        "purged": purge_old_archive(),
+        "scrape_logs": cleanup_stale_scrape_logs(),
+        "scrape_runs": cleanup_scrape_runs(),
+        "price_sync_log": cleanup_price_sync_log(),
+    }
     logger.info("Archival task complete: %s", summary)
     return summary
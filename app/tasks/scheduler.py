@@ -7,7 +7,7 @@ Scheduled jobs
 --------------
 * Daily at 00:00 UTC  - scrape_all_retailers   (full price scrape)
 * Weekly Sun 03:00 UTC - weekly_maintenance     (archive old prices +
-                                                 purge stale scrape logs)
+                                                 purge stale scrape / sync logs)
 """
 
 import logging
@@ -44,19 +44,24 @@ def init_scheduler(app):
         Run weekly housekeeping:
           - Archive/deduplicate price_history rows older than 180 days.
           - Purge scrape_log rows older than 90 days.
+          - Purge price_sync_log rows past PRICE_SYNC_LOG_RETENTION_DAYS.
         """
         with app.app_context():
             logger.info("Starting weekly maintenance job")
 
-            from app.tasks.archival import archive_old_prices, cleanup_stale_scrape_logs
+            from app.tasks.archival import (
+                archive_old_prices,
+                cleanup_price_sync_log,
+                cleanup_stale_scrape_logs,
+            )
 
             try:
-                archive_stats = archive_old_prices(days_threshold=180)
+                archive_stats = archive_old_prices(archive_after_days=180)
                 logger.info(
-                    "archive_old_prices complete: before=%d  removed=%d  after=%d",
-                    archive_stats["records_before"],
+                    "archive_old_prices complete: removed=%d  batches=%d  finished=%s",
                     archive_stats["records_removed"],
-                    archive_stats["records_after"],
+                    archive_stats["batches"],
+                    archive_stats["finished"],
                 )
             except Exception as exc:
                 logger.error("archive_old_prices failed: %s", exc, exc_info=True)
@@ -67,6 +72,12 @@ def init_scheduler(app):
             except Exception as exc:
                 logger.error("cleanup_stale_scrape_logs failed: %s", exc, exc_info=True)
 
+            try:
+                sync_deleted = cleanup_price_sync_log()
+                logger.info("cleanup_price_sync_log complete: deleted=%d", sync_deleted)
+            except Exception as exc:
+                logger.error("cleanup_price_sync_log failed: %s", exc, exc_info=True)
+
             logger.info("Weekly maintenance job completed")
 
     scheduler.start()
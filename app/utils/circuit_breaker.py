@@ -0,0 +1,241 @@
+"""
+app/utils/circuit_breaker.py
+
+Per-retailer circuit breaker for the scrapers.
+
+    closed     – requests flow; each failure bumps ``consecutive_failures``,
+                 a success resets it. ``failure_threshold`` in a row opens.
+    open       – every fetch fails fast with :class:`CircuitOpenError` (no
+                 request, no retry backoff) and ScraperManager skips the
+                 retailer's run, until ``cooldown`` has passed since opening.
+    half_open  – after the cooldown one probe request is let through; other
+                 callers wait for it. A good probe closes the circuit, a bad
+                 one re-opens it for another cooldown.
+
+A failure is a transport error, a 403 (bot wall), a 429 or a 5xx – the
+retailer is unreachable, not merely missing one product (404s count as
+successes). A whole run raising one of those counts as one failure too;
+anything else a run raises (a parser ``KeyError``, say) is the scraper's
+fault, not the retailer's, and leaves the circuit alone.
+
+Breakers live in memory for the length of a run; ScraperManager loads them
+from the ``scraper_circuits`` table before it (:func:`load_circuits`) and
+writes them back after (:func:`save_circuits`), so state survives restarts
+and is shared by every process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+import httpx
+import requests
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Consecutive failures that open a circuit.
+FAILURE_THRESHOLD: int = 5
+
+# How long an open circuit stays open before a probe is allowed.
+COOLDOWN_SECONDS: int = 1800
+
+# How long a caller waits on someone else's half-open probe.
+PROBE_WAIT_SECONDS: float = 60.0
+
+_FAILURE_STATUSES = {403, 429}
+
+# The request never got an answer: connection refused / reset, DNS, timeouts.
+_TRANSPORT_ERRORS = (requests.ConnectionError, requests.Timeout,
+                     requests.exceptions.ChunkedEncodingError, httpx.TransportError)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request to a retailer whose circuit is open."""
+
+
+def is_failure(exc: BaseException) -> bool:
+    """True when *exc* means the retailer is unreachable (see module docstring)."""
+    if isinstance(exc, _TRANSPORT_ERRORS):
+        return True
+    if not isinstance(exc, (requests.HTTPError, httpx.HTTPStatusError)):
+        return False   # parser bugs, open circuits, ...: not the retailer's fault
+    status = getattr(exc.response, "status_code", None)
+    return status is not None and (status in _FAILURE_STATUSES or status >= 500)
+
+
+class CircuitBreaker:
+    """Thread-safe breaker for one retailer (see module docstring)."""
+
+    def __init__(self, key: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 cooldown_seconds: float = COOLDOWN_SECONDS, state: str = CLOSED,
+                 consecutive_failures: int = 0, opened_at: Optional[datetime] = None,
+                 last_failure_at: Optional[datetime] = None,
+                 last_success_at: Optional[datetime] = None,
+                 last_error: Optional[str] = None) -> None:
+        self.key = key
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = timedelta(seconds=cooldown_seconds)
+        self.state = state if state in (CLOSED, OPEN, HALF_OPEN) else CLOSED
+        self.consecutive_failures = consecutive_failures or 0
+        self.opened_at = opened_at
+        self.last_failure_at = last_failure_at
+        self.last_success_at = last_success_at
+        self.last_error = last_error
+        self._probing = False
+        self._cond = threading.Condition()
+
+    # ------------------------------------------------------------------
+    # Gates
+    # ------------------------------------------------------------------
+
+    def _cooled_down(self) -> bool:
+        return self.opened_at is None or datetime.utcnow() - self.opened_at >= self.cooldown
+
+    def _refresh(self) -> None:
+        if self.state == OPEN and self._cooled_down():
+            logger.info("circuit %s: cooldown over; half-open", self.key)
+            self.state, self._probing = HALF_OPEN, False
+
+    def allow_run(self) -> bool:
+        """False while the circuit is open (the run should be skipped)."""
+        with self._cond:
+            self._refresh()
+            return self.state != OPEN
+
+    def retry_at(self) -> Optional[datetime]:
+        """When an open circuit will next allow a probe."""
+        return self.opened_at + self.cooldown if self.state == OPEN and self.opened_at else None
+
+    def _try_acquire(self) -> bool:
+        """Proceed (True), wait for the probe (False), or raise when open. Holds the lock."""
+        self._refresh()
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            raise CircuitOpenError(f"{self.key}: circuit open until {self.retry_at():%H:%M} UTC")
+        if not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def before_request(self, timeout: float = PROBE_WAIT_SECONDS) -> None:
+        """Block until a request may be sent; raise CircuitOpenError when it may not."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._try_acquire():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CircuitOpenError(f"{self.key}: half-open probe still pending")
+                self._cond.wait(remaining)
+
+    async def before_request_async(self, timeout: float = PROBE_WAIT_SECONDS) -> None:
+        """:meth:`before_request` that yields to the event loop while the probe runs."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self._try_acquire():
+                    return
+            if time.monotonic() >= deadline:
+                raise CircuitOpenError(f"{self.key}: half-open probe still pending")
+            await asyncio.sleep(0.05)
+
+    # ------------------------------------------------------------------
+    # Outcomes
+    # ------------------------------------------------------------------
+
+    def record_success(self) -> None:
+        with self._cond:
+            if self.state != CLOSED:
+                logger.info("circuit %s: closed", self.key)
+            self.state, self._probing = CLOSED, False
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.last_success_at = datetime.utcnow()
+            self._cond.notify_all()
+
+    def record_failure(self, error: str) -> None:
+        with self._cond:
+            self.consecutive_failures += 1
+            self.last_failure_at = datetime.utcnow()
+            self.last_error = error[:500]
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning("circuit %s: open after %d consecutive failures (%s)",
+                                   self.key, self.consecutive_failures, error)
+                self.state, self._probing = OPEN, False
+                self.opened_at = self.last_failure_at
+            self._cond.notify_all()
+
+    def to_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened_at": self.opened_at,
+            "retry_at": self.retry_at(),
+            "last_failure_at": self.last_failure_at,
+            "last_success_at": self.last_success_at,
+            "last_error": self.last_error,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Persistence
+# ---------------------------------------------------------------------------
+
+_COLUMNS = ("state", "consecutive_failures", "opened_at", "last_failure_at",
+            "last_success_at", "last_error")
+
+
+def load_circuits(slugs: Iterable[str], failure_threshold: int = FAILURE_THRESHOLD,
+                  cooldown_seconds: float = COOLDOWN_SECONDS) -> Dict[str, CircuitBreaker]:
+    """A breaker per slug, restored from ``scraper_circuits``. Requires an app context."""
+    from app.models.scraper_circuit import ScraperCircuit
+
+    slugs = [s for s in slugs if s]
+    rows = {r.retailer_slug: r for r in
+            ScraperCircuit.query.filter(ScraperCircuit.retailer_slug.in_(slugs)).all()}
+    breakers = {}
+    for slug in slugs:
+        row = rows.get(slug)
+        saved = {c: getattr(row, c) for c in _COLUMNS} if row is not None else {}
+        breakers[slug] = CircuitBreaker(slug, failure_threshold, cooldown_seconds, **saved)
+    return breakers
+
+
+def save_circuits(breakers: Iterable[CircuitBreaker]) -> None:
+    """Write *breakers* back to ``scraper_circuits``. Requires an app context."""
+    from app.extensions import db
+    from app.models.scraper_circuit import ScraperCircuit
+
+    breakers = list(breakers)
+    rows = {r.retailer_slug: r for r in ScraperCircuit.query.filter(
+        ScraperCircuit.retailer_slug.in_([b.key for b in breakers])).all()}
+    for breaker in breakers:
+        row = rows.get(breaker.key)
+        if row is None:
+            row = ScraperCircuit(retailer_slug=breaker.key)
+            db.session.add(row)
+        with breaker._cond:
+            for column in _COLUMNS:
+                setattr(row, column, getattr(breaker, column))
+    db.session.commit()
+
+
+def circuit_states(cooldown_seconds: float = COOLDOWN_SECONDS) -> Dict[str, dict]:
+    """Persisted state of every circuit, keyed by slug (for the health dashboard)."""
+    from app.models.scraper_circuit import ScraperCircuit
+
+    return {
+        row.retailer_slug: CircuitBreaker(row.retailer_slug, cooldown_seconds=cooldown_seconds,
+                                          **{c: getattr(row, c) for c in _COLUMNS}).to_dict()
+        for row in ScraperCircuit.query.all()
+    }
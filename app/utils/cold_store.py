@@ -0,0 +1,376 @@
+"""
+app/utils/cold_store.py
+
+Cold tier for archived price history: one compressed, columnar file per
+calendar month under COLD_STORE_DIR, kept indefinitely after the rows leave
+the database (see ``export_cold_months`` in app/tasks/archival.py).
+
+File layout (``prices_YYYY_MM.pcol``)::
+
+    b"PCOL\\x01"
+    product block, product block, ...      one per product, rows sorted by
+                                           (retailer_id, scraped_at)
+    footer                                 JSON: rows, currencies and per
+                                           product offset / column sizes /
+                                           first and last timestamp
+    footer length (8 bytes LE) b"PCOLEND\\x01"
+
+A product block is six zlib-compressed columns: retailer_id, scraped_at
+(epoch seconds), price and price_usd (cents; -1 for NULL) as delta-encoded
+int64 arrays, then in_stock (0 / 1 / 2 for NULL) and an index into the
+footer's currency list as byte arrays. Sorted timestamps and slowly moving
+prices delta to mostly-zero words, which zlib shrinks to a few bytes a row.
+
+``ColdStore`` memory-maps the files, so a query by product only pages in and
+inflates that product's block of the months overlapping the range.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PCOL\x01"
+END_MAGIC = b"PCOLEND\x01"
+_TRAILER = struct.Struct("<Q")
+_FILE_NAME = re.compile(r"^prices_(\d{4})_(\d{2})\.pcol$")
+_EPOCH = datetime(1970, 1, 1)
+_NULL_CENTS = -1
+
+# Month files kept memory-mapped at once by one ColdStore.
+OPEN_FILES: int = 24
+
+
+class ColdPrice(NamedTuple):
+    product_id: int
+    retailer_id: int
+    scraped_at: datetime
+    price: Decimal
+    price_usd: Optional[Decimal]
+    currency: Optional[str]
+    in_stock: Optional[bool]
+
+
+class ColdStoreError(Exception):
+    """A cold-store file is missing its trailer or is otherwise unreadable."""
+
+
+# ---------------------------------------------------------------------------
+# Encoding helpers
+# ---------------------------------------------------------------------------
+
+def _field(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def _cents(value) -> int:
+    if value is None:
+        return _NULL_CENTS
+    return int((Decimal(str(value)) * 100).to_integral_value())
+
+
+def _from_cents(cents: int) -> Optional[Decimal]:
+    return None if cents == _NULL_CENTS else Decimal(cents).scaleb(-2)
+
+
+def _delta(values: List[int]) -> bytes:
+    out = array("q", values)
+    for i in range(len(out) - 1, 0, -1):
+        out[i] -= out[i - 1]
+    return zlib.compress(out.tobytes(), 6)
+
+
+def _undelta(blob: bytes) -> List[int]:
+    values = array("q")
+    values.frombytes(zlib.decompress(blob))
+    return list(accumulate(values))
+
+
+def month_file(month: datetime) -> str:
+    return f"prices_{month.year:04d}_{month.month:02d}.pcol"
+
+
+def _month_end(month: datetime) -> datetime:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+
+def write_month(path: str, rows: Iterable) -> int:
+    """
+    Write *rows* (PriceHistory-like objects or column dicts) to *path*.
+
+    The file is written next to *path* and renamed into place, so readers
+    never see a partial file. Returns the number of rows written.
+    """
+    by_product: Dict[int, list] = {}
+    for row in rows:
+        by_product.setdefault(_field(row, "product_id"), []).append(row)
+
+    currencies: Dict[Optional[str], int] = {}
+    products: Dict[str, dict] = {}
+    total = 0
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(MAGIC)
+        for product_id in sorted(by_product):
+            block = sorted(by_product[product_id],
+                           key=lambda r: (_field(r, "retailer_id"), _field(r, "scraped_at")))
+            stamps = [int((_field(r, "scraped_at") - _EPOCH).total_seconds()) for r in block]
+            in_stock = [2 if _field(r, "in_stock") is None else int(bool(_field(r, "in_stock")))
+                        for r in block]
+            codes = [currencies.setdefault(_field(r, "currency"), len(currencies)) for r in block]
+            columns = [
+                _delta([_field(r, "retailer_id") for r in block]),
+                _delta(stamps),
+                _delta([_cents(_field(r, "price")) for r in block]),
+                _delta([_cents(_field(r, "price_usd")) for r in block]),
+                zlib.compress(bytes(in_stock), 6),
+                zlib.compress(bytes(codes), 6),
+            ]
+            products[str(product_id)] = {
+                "offset": fh.tell(),
+                "sizes": [len(col) for col in columns],
+                "rows": len(block),
+                "first": min(stamps),
+                "last": max(stamps),
+            }
+            for col in columns:
+                fh.write(col)
+            total += len(block)
+        if len(currencies) > 255:
+            raise ValueError("cold store: more than 255 currencies in one month")
+        footer = json.dumps({
+            "version": 1,
+            "rows": total,
+            "currencies": sorted(currencies, key=currencies.get),
+            "products": products,
+        }).encode("utf-8")
+        fh.write(footer)
+        fh.write(_TRAILER.pack(len(footer)))
+        fh.write(END_MAGIC)
+    os.replace(tmp, path)
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Reader
+# ---------------------------------------------------------------------------
+
+class _MonthFile:
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # Readers holding the map, and whether the cache has let go of it;
+        # the map is closed once both say so (guarded by ColdStore._lock).
+        self.refs = 0
+        self.retired = False
+        with open(path, "rb") as fh:
+            self.mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        tail = len(END_MAGIC) + _TRAILER.size
+        if self.mm[:len(MAGIC)] != MAGIC or self.mm[-len(END_MAGIC):] != END_MAGIC:
+            self.mm.close()
+            raise ColdStoreError(f"{path}: not a cold-store file")
+        (length,) = _TRAILER.unpack(self.mm[-tail:-len(END_MAGIC)])
+        footer = json.loads(self.mm[-tail - length:-tail].decode("utf-8"))
+        self.rows: int = footer["rows"]
+        self.currencies: List[Optional[str]] = footer["currencies"]
+        self.products: Dict[str, dict] = footer["products"]
+
+    def close(self) -> None:
+        self.mm.close()
+
+    def read(self, product_id: int) -> List[ColdPrice]:
+        meta = self.products.get(str(product_id))
+        if meta is None:
+            return []
+        blobs, offset = [], meta["offset"]
+        for size in meta["sizes"]:
+            blobs.append(self.mm[offset:offset + size])
+            offset += size
+        retailers, stamps, prices, usd = (_undelta(b) for b in blobs[:4])
+        in_stock = zlib.decompress(blobs[4])
+        codes = zlib.decompress(blobs[5])
+        return [
+            ColdPrice(product_id, retailers[i], _EPOCH + timedelta(seconds=stamps[i]),
+                      _from_cents(prices[i]), _from_cents(usd[i]), self.currencies[codes[i]],
+                      None if in_stock[i] == 2 else bool(in_stock[i]))
+            for i in range(meta["rows"])
+        ]
+
+
+class ColdStore:
+    """
+    Month files under *root*, read through a small cache of memory maps.
+
+    Readers lease a map (:meth:`_lease`); a map evicted or replaced while
+    leased stays open until its last reader is done with it.
+    """
+
+    def __init__(self, root: str, open_files: int = OPEN_FILES) -> None:
+        self.root = root
+        self.open_files = open_files
+        self._files: "OrderedDict[str, Tuple[float, _MonthFile]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, month: datetime) -> str:
+        return os.path.join(self.root, month_file(month))
+
+    def has_month(self, month: datetime) -> bool:
+        return os.path.exists(self.path(month))
+
+    def months(self) -> List[datetime]:
+        """Months on disk, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for name in os.listdir(self.root):
+            match = _FILE_NAME.match(name)
+            if match:
+                found.append(datetime(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(found)
+
+    def write_month(self, month: datetime, rows: Iterable) -> int:
+        os.makedirs(self.root, exist_ok=True)
+        written = write_month(self.path(month), rows)
+        logger.info("cold store: wrote %d rows to %s", written, month_file(month))
+        return written
+
+    def _open(self, path: str) -> _MonthFile:
+        """The cached map of *path*, (re)opened if needed, with one reference taken."""
+        mtime = os.stat(path).st_mtime
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and cached[0] == mtime:
+                self._files.move_to_end(path)
+                cached[1].refs += 1
+                return cached[1]
+        month_file_ = _MonthFile(path)
+        with self._lock:
+            month_file_.refs += 1
+            dropped = []
+            stale = self._files.pop(path, None)
+            if stale is not None:
+                dropped.append(stale[1])
+            self._files[path] = (mtime, month_file_)
+            while len(self._files) > self.open_files:
+                _, (_, evicted) = self._files.popitem(last=False)
+                dropped.append(evicted)
+            idle = [self._retire(f) for f in dropped]
+        for f, close in zip(dropped, idle):
+            if close:
+                f.close()
+        return month_file_
+
+    @staticmethod
+    def _retire(month_file_: _MonthFile) -> bool:
+        # Caller holds _lock; True when nobody is reading it and it can close now.
+        month_file_.retired = True
+        return month_file_.refs == 0
+
+    def _release(self, month_file_: _MonthFile) -> None:
+        with self._lock:
+            month_file_.refs -= 1
+            close = month_file_.retired and month_file_.refs == 0
+        if close:
+            month_file_.close()
+
+    @contextlib.contextmanager
+    def _lease(self, path: str) -> Iterator[_MonthFile]:
+        month_file_ = self._open(path)
+        try:
+            yield month_file_
+        finally:
+            self._release(month_file_)
+
+    def read(self, product_id: int, since: Optional[datetime] = None,
+             until: Optional[datetime] = None,
+             retailer_id: Optional[int] = None) -> List[ColdPrice]:
+        """Rows of *product_id* in [*since*, *until*), ordered by scraped_at."""
+        rows: List[ColdPrice] = []
+        for month in self.months():
+            if (since is not None and _month_end(month) <= since) or \
+                    (until is not None and month >= until):
+                continue
+            with self._lease(self.path(month)) as month_file_:
+                month_rows = month_file_.read(product_id)
+            for row in month_rows:
+                if since is not None and row.scraped_at < since:
+                    continue
+                if until is not None and row.scraped_at >= until:
+                    continue
+                if retailer_id is not None and row.retailer_id != retailer_id:
+                    continue
+                rows.append(row)
+        rows.sort(key=lambda r: r.scraped_at)
+        return rows
+
+    def product_ids(self) -> List[int]:
+        ids = set()
+        for month in self.months():
+            with self._lease(self.path(month)) as month_file_:
+                ids.update(int(pid) for pid in month_file_.products)
+        return sorted(ids)
+
+    def close(self) -> None:
+        """Drop every cached map; maps still leased close when their reader finishes."""
+        with self._lock:
+            files, self._files = [f for _, f in self._files.values()], OrderedDict()
+            idle = [self._retire(f) for f in files]
+        for month_file_, close in zip(files, idle):
+            if close:
+                month_file_.close()
+
+
+# ---------------------------------------------------------------------------
+# Flask integration
+# ---------------------------------------------------------------------------
+
+_stores: Dict[str, ColdStore] = {}
+_stores_lock = threading.Lock()
+_warned_unset = False
+
+
+def get_cold_store() -> Optional[ColdStore]:
+    """
+    The app's ColdStore, or None when COLD_STORE_ENABLED is off or
+    COLD_STORE_DIR is unset.
+
+    There is deliberately no default directory: the files are the only copy
+    once the archive is purged, so they must live on persistent storage (a
+    mounted volume), never the container's ephemeral disk.
+    """
+    global _warned_unset
+    from flask import current_app
+
+    if not current_app.config.get("COLD_STORE_ENABLED", True):
+        return None
+    root = current_app.config.get("COLD_STORE_DIR")
+    if not root:
+        if not _warned_unset:
+            logger.warning("COLD_STORE_ENABLED is set but COLD_STORE_DIR is not; "
+                           "cold store off and the price archive is kept")
+            _warned_unset = True
+        return None
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = _stores[root] = ColdStore(root)
+    return store
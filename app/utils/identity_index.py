@@ -0,0 +1,205 @@
+"""
+app/utils/identity_index.py
+
+Process-wide (set_code, product_type) -> product_id and slug/name ->
+retailer_id index.
+
+Every ingestion path resolves the same few hundred identities: the scrape
+persist step, ``/admin/ingest-fuji``, ``/api/prices/upload`` and the price
+sync. Instead of one ``Product.query`` per record, the index loads every
+product and retailer identity with a single UNION ALL query the first time
+it is asked, then answers from memory. All threads share it; loading is
+guarded by a lock so concurrent scrapers trigger one load, not several.
+
+A session that inserts, updates or deletes a Product or Retailer drops the
+index when it flushes and again when it commits, so the next lookup reloads
+and sees the new row. Those events only fire in this process, though:
+rows written by another worker, a cron scraper or ``seed_products.py`` are
+not announced. So the index is only trusted for hits -- a miss falls back
+to a point query and remembers the id when the row exists -- and it is
+reloaded after ``MAX_AGE_SECONDS`` to pick up renames and deletes. Ids are
+never cached across databases: the index remembers which engine it was
+loaded from, and ``create_all`` / ``drop_all`` drop it too.
+
+Usage
+-----
+    from app.utils.identity_index import product_id_for, retailer_id_for
+    pid = product_id_for("OP-05", "box")
+    rid = retailer_id_for(slug="fujicardshop")
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, literal, union_all
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Reload the whole index after this long (changes made by other processes).
+MAX_AGE_SECONDS: float = 300.0
+
+
+class IdentityIndex:
+    """In-memory product / retailer id lookup, loaded lazily and shared."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._engine_key: Optional[str] = None
+        self._loaded_at = 0.0
+        self._products: Dict[Tuple[str, str], int] = {}
+        self._retailer_slugs: Dict[str, int] = {}
+        self._retailer_names: Dict[str, int] = {}
+        self.loads = 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._engine_key = None
+
+    def _fresh(self, key: str) -> bool:
+        return self._engine_key == key and time.monotonic() - self._loaded_at < MAX_AGE_SECONDS
+
+    def _ensure_loaded(self) -> None:
+        key = str(db.engine.url)
+        if self._fresh(key):
+            return
+        with self._lock:
+            if self._fresh(key):
+                return
+            self._load()
+            self._engine_key = key
+            self._loaded_at = time.monotonic()
+
+    def _load(self) -> None:
+        from app.models.product import Product
+        from app.models.retailer import Retailer
+
+        query = union_all(
+            db.select(literal("p"), Product.id, Product.set_code, Product.product_type),
+            db.select(literal("r"), Retailer.id, Retailer.slug, Retailer.name),
+        )
+        products: Dict[Tuple[str, str], int] = {}
+        slugs: Dict[str, int] = {}
+        names: Dict[str, int] = {}
+        for kind, row_id, a, b in db.session.execute(query):
+            if kind == "p":
+                products[(a, b)] = row_id
+            else:
+                slugs[a] = row_id
+                names[b] = row_id
+        self._products, self._retailer_slugs, self._retailer_names = products, slugs, names
+        self.loads += 1
+        logger.debug("identity index: loaded %d products, %d retailers",
+                     len(products), len(slugs))
+
+    def _remember(self, table: Dict, key, row_id: Optional[int], what: str) -> Optional[int]:
+        if row_id is not None:
+            with self._lock:
+                table[key] = row_id
+            logger.debug("identity index: %s %r was added elsewhere", what, key)
+        return row_id
+
+    def product_id(self, set_code: str, product_type: str) -> Optional[int]:
+        from app.models.product import Product
+
+        self._ensure_loaded()
+        key = (set_code, product_type)
+        found = self._products.get(key)
+        if found is not None:
+            return found
+        row_id = (db.session.query(Product.id)
+                  .filter_by(set_code=set_code, product_type=product_type).scalar())
+        return self._remember(self._products, key, row_id, "product")
+
+    def retailer_id(self, slug: Optional[str] = None,
+                    name: Optional[str] = None) -> Optional[int]:
+        """Resolve by slug when given (reliable), otherwise by display name."""
+        from app.models.retailer import Retailer
+
+        self._ensure_loaded()
+        if slug:
+            table, key, column = self._retailer_slugs, slug, Retailer.slug
+        elif name:
+            table, key, column = self._retailer_names, name, Retailer.name
+        else:
+            return None
+        found = table.get(key)
+        if found is not None:
+            return found
+        row_id = db.session.query(Retailer.id).filter(column == key).scalar()
+        return self._remember(table, key, row_id, "retailer")
+
+
+_INDEX = IdentityIndex()
+
+
+def identity_index() -> IdentityIndex:
+    return _INDEX
+
+
+def product_id_for(set_code: str, product_type: str) -> Optional[int]:
+    return _INDEX.product_id(set_code, product_type)
+
+
+def retailer_id_for(slug: Optional[str] = None, name: Optional[str] = None) -> Optional[int]:
+    return _INDEX.retailer_id(slug=slug, name=name)
+
+
+def invalidate_identity_index() -> None:
+    _INDEX.invalidate()
+
+
+# ---------------------------------------------------------------------------
+# Invalidation
+# ---------------------------------------------------------------------------
+
+_SESSION_FLAG = "identity_index_dirty"
+
+
+def _touches_identities(session: Session) -> bool:
+    from app.models.product import Product
+    from app.models.retailer import Retailer
+
+    return any(isinstance(obj, (Product, Retailer))
+               for obj in (*session.new, *session.dirty, *session.deleted))
+
+
+@event.listens_for(Session, "before_flush")
+def _flag_identity_changes(session, flush_context, instances) -> None:
+    if _touches_identities(session):
+        session.info[_SESSION_FLAG] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _drop_on_flush(session, flush_context) -> None:
+    # Lets the same session see a row it just created (e.g. ingest-fuji).
+    if session.info.get(_SESSION_FLAG):
+        _INDEX.invalidate()
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_on_commit(session) -> None:
+    # Other threads only see the row once it is committed; drop again so a
+    # load that raced the flush is not kept.
+    if session.info.pop(_SESSION_FLAG, False):
+        _INDEX.invalidate()
+
+
+@event.listens_for(db.metadata, "after_create")
+@event.listens_for(db.metadata, "after_drop")
+def _drop_on_schema_change(target, connection, **kw) -> None:
+    # create_all / drop_all (fresh databases, tests) can reuse ids for new rows.
+    _INDEX.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_on_rollback(session) -> None:
+    # A load after the flush may have picked up rows that no longer exist.
+    if session.info.pop(_SESSION_FLAG, False):
+        _INDEX.invalidate()
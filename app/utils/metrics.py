@@ -0,0 +1,346 @@
+"""
+app/utils/metrics.py
+
+In-process metrics registry exposed in the Prometheus text format at
+``/metrics`` (app/routes/metrics.py).
+
+Two metric kinds, both labelled:
+
+    FETCH_SECONDS.observe(0.42, retailer="fujicardshop")     # Histogram
+    SHOPIFY_THROTTLED.inc(client="rcj")                       # Counter
+    with PERSIST_SECONDS.time(retailer="ebay"): ...
+
+Multiprocess: gunicorn runs several workers and the scraper runs in its own
+process, so each one only sees its own samples. When METRICS_MULTIPROC_DIR
+(or PROMETHEUS_MULTIPROC_DIR) names a shared directory, every process
+writes its samples to ``metrics_<pid>.json`` there (at most once per
+FLUSH_SECONDS, and at exit) and ``/metrics`` sums the files of all of
+them. Files of exited workers are kept, so counters never go backwards.
+Without a directory the registry is per-process only.
+
+init_app() adds per-endpoint request latency and per-request DB query
+counts to a Flask app.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import glob
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default histogram buckets, seconds.
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                                      2.5, 5.0, 10.0, 30.0)
+
+# Buckets for per-request DB query counts.
+QUERY_BUCKETS: Tuple[float, ...] = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+# Minimum seconds between two snapshot writes of one process.
+FLUSH_SECONDS: float = 1.0
+
+
+# ---------------------------------------------------------------------------
+# Metric families
+# ---------------------------------------------------------------------------
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {sorted(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+        REGISTRY.touched()
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram(_Metric):
+    """Bucketed observations per label set: [bucket counts..., sum, count]."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+        REGISTRY.touched()
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[Tuple[str, ...], list]:
+        with self._lock:
+            return {key: list(row) for key, row in self._values.items()}
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+class Registry:
+    """All metric families of this process, plus the multiprocess snapshot files."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self.multiproc_dir: Optional[str] = None
+        self._flushed_at = 0.0
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+
+    def configure(self, multiproc_dir: Optional[str]) -> None:
+        if multiproc_dir:
+            os.makedirs(multiproc_dir, exist_ok=True)
+        self.multiproc_dir = multiproc_dir or None
+
+    def reset(self) -> None:
+        """Drop this process's samples (after fork, and in tests)."""
+        for metric in list(self._metrics.values()):
+            metric.reset()
+        self._flushed_at = 0.0
+
+    # -- snapshots -------------------------------------------------------
+
+    def _snapshot(self) -> dict:
+        return {
+            name: {json.dumps(key): value for key, value in metric.snapshot().items()}
+            for name, metric in self._metrics.items()
+        }
+
+    def _path(self, pid: Optional[int] = None) -> str:
+        return os.path.join(self.multiproc_dir, f"metrics_{pid or os.getpid()}.json")
+
+    def touched(self) -> None:
+        if self.multiproc_dir and time.monotonic() - self._flushed_at >= FLUSH_SECONDS:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write this process's samples to the shared directory (atomically)."""
+        if not self.multiproc_dir:
+            return
+        self._flushed_at = time.monotonic()
+        path = self._path()
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(self._snapshot(), fh)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning("metrics: could not write %s: %s", path, exc)
+
+    def collect(self) -> Dict[str, dict]:
+        """name → {label key: value}, summed over every process."""
+        merged = self._snapshot()
+        if not self.multiproc_dir:
+            return merged
+        own = self._path()
+        for path in glob.glob(os.path.join(self.multiproc_dir, "metrics_*.json")):
+            if path == own:
+                continue
+            try:
+                with open(path, encoding="utf-8") as fh:
+                    other = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            for name, samples in other.items():
+                target = merged.get(name)
+                if target is None:
+                    continue
+                for key, value in samples.items():
+                    if key not in target:
+                        target[key] = value
+                    elif isinstance(value, list):
+                        target[key] = [a + b for a, b in zip(target[key], value)]
+                    else:
+                        target[key] += value
+        return merged
+
+    # -- exposition ------------------------------------------------------
+
+    def render(self) -> str:
+        """The Prometheus text exposition format (version 0.0.4)."""
+        collected = self.collect()
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key, value in sorted(collected.get(name, {}).items()):
+                labels = list(zip(metric.labelnames, json.loads(key)))
+                if metric.kind == "counter":
+                    lines.append(f"{name}{_labels(labels)} {_num(value)}")
+                    continue
+                for bound, count in zip(metric.buckets, value):
+                    lines.append(f"{name}_bucket{_labels(labels + [('le', _num(bound))])} {count}")
+                lines.append(f"{name}_bucket{_labels(labels + [('le', '+Inf')])} {value[-1]}")
+                lines.append(f"{name}_sum{_labels(labels)} {_num(value[-2])}")
+                lines.append(f"{name}_count{_labels(labels)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+REGISTRY = Registry()
+REGISTRY.configure(os.environ.get("METRICS_MULTIPROC_DIR") or os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+atexit.register(REGISTRY.flush)
+if hasattr(os, "register_at_fork"):
+    # A forked worker starts from zero; its parent's samples stay in the parent's file.
+    os.register_at_fork(after_in_child=REGISTRY.reset)
+
+
+# ---------------------------------------------------------------------------
+# Hot-path metrics
+# ---------------------------------------------------------------------------
+
+FETCH_SECONDS = Histogram(
+    "scraper_fetch_seconds", "BaseScraper.fetch / fetch_async latency, retries included",
+    ["retailer"])
+VALIDATE_SECONDS = Histogram(
+    "scraper_validate_seconds", "Id resolution and price validation of one scraper's results",
+    ["retailer"])
+PERSIST_SECONDS = Histogram(
+    "scraper_persist_seconds", "Bulk upsert of one scraper's accepted records", ["retailer"])
+SHOPIFY_GRAPHQL_SECONDS = Histogram(
+    "shopify_graphql_seconds", "Shopify Admin GraphQL request latency", ["client", "operation"])
+SHOPIFY_THROTTLED = Counter(
+    "shopify_graphql_throttled_total", "Shopify responses that were throttled (429 / THROTTLED)",
+    ["client"])
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Flask request latency per endpoint",
+    ["endpoint", "method", "status"])
+HTTP_REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per Flask request", ["endpoint"],
+    buckets=QUERY_BUCKETS)
+
+
+def is_throttled(status_code: int, body: Optional[dict] = None) -> bool:
+    """A Shopify 429, or a GraphQL body whose errors are all THROTTLED."""
+    if status_code == 429:
+        return True
+    errors = (body or {}).get("errors") if isinstance(body, dict) else None
+    return bool(errors) and isinstance(errors, list) and all(
+        ((e or {}).get("extensions") or {}).get("code") == "THROTTLED" for e in errors)
+
+
+def graphql_operation(query: str) -> str:
+    """Operation name of a GraphQL document, else its first root field."""
+    match = _OPERATION.search(query or "") or _ROOT_FIELD.search(query or "")
+    return match.group(1) if match else "anonymous"
+
+
+_OPERATION = re.compile(r"^\s*(?:query|mutation)\s+(\w+)")
+_ROOT_FIELD = re.compile(r"\{\s*(\w+)")
+
+
+# ---------------------------------------------------------------------------
+# Flask integration
+# ---------------------------------------------------------------------------
+
+_request_state = threading.local()
+
+
+def _count_query(*_args, **_kwargs) -> None:
+    if getattr(_request_state, "queries", None) is not None:
+        _request_state.queries += 1
+
+
+def init_app(app) -> None:
+    """Time every request and count the SQL it runs (METRICS_ENABLED)."""
+    from flask import request
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    REGISTRY.configure(app.config.get("METRICS_MULTIPROC_DIR") or REGISTRY.multiproc_dir)
+    if not event.contains(Engine, "before_cursor_execute", _count_query):
+        event.listen(Engine, "before_cursor_execute", _count_query)
+
+    @app.before_request
+    def _metrics_start():
+        _request_state.started = time.perf_counter()
+        _request_state.queries = 0
+
+    @app.teardown_request
+    def _metrics_stop(_exc=None):
+        started = getattr(_request_state, "started", None)
+        if started is None:
+            return
+        endpoint = request.endpoint or "unmatched"
+        status = getattr(_request_state, "status", None) or (500 if _exc else 200)
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint,
+                                     method=request.method, status=str(status))
+        HTTP_REQUEST_QUERIES.observe(_request_state.queries, endpoint=endpoint)
+        _request_state.started = _request_state.queries = _request_state.status = None
+
+    @app.after_request
+    def _metrics_status(response):
+        _request_state.status = response.status_code
+        return response
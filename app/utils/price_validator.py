@@ -12,6 +12,12 @@ history and flags it when:
     MAX_SINGLE_CARD_USD).
   - A retailer submitted a suspiciously round number that looks like a
     placeholder (e.g. 999.00 or 1000.00) AND it is far from the median.
+  - Optionally, the USD price sits outside a consensus band around the
+    other retailers' current prices for the same product.
+
+History windows are per (product, retailer) and per currency: a CAD
+listing is compared with that retailer's own CAD history, in CAD, so one
+source's box/case mix-up or an FX swing cannot skew another's median.
 
 Usage
 -----
@@ -21,6 +27,10 @@ Usage
     if result.is_anomaly:
         # skip or quarantine the price
         ...
+
+    # One listing, any currency, as (is_valid, reason)
+    ok, reason = PriceValidator().validate_price(
+        product_id=1, retailer_id=2, price=7800, currency="JPY", product_type="box")
 """
 
 from __future__ import annotations
@@ -28,7 +38,9 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass, field
 from statistics import median
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+from app.utils.currency import convert_to_usd
 
 logger = logging.getLogger(__name__)
 
@@ -43,10 +55,21 @@ SPIKE_THRESHOLD_PCT: float = 2.0
 # expensive cards are being tracked.
 MAX_SINGLE_CARD_USD: float = 10_000.0
 
+# Hard lower bound (USD) for a scraped listing; anything cheaper is a parse
+# error (a stray "0.99", a points value) rather than a sealed product.
+MIN_LISTING_USD: float = 1.0
+
 # Minimum number of historical data-points required to compute a median.
 # If fewer are available, deviation checks are skipped.
 MIN_HISTORY_FOR_SPIKE_CHECK: int = 5
 
+# Cross-retailer consensus: flag a price more than this fraction away from the
+# median of the other retailers' current USD prices. None disables the check.
+CONSENSUS_BAND: Optional[float] = None
+
+# Minimum number of other retailers needed before the consensus check applies.
+MIN_RETAILERS_FOR_CONSENSUS: int = 2
+
 # Placeholder prices that retailers sometimes use when they run out of stock.
 _PLACEHOLDER_PRICES = {999.0, 999.99, 1000.0, 9999.0, 9999.99}
 
@@ -61,6 +84,7 @@ class PriceValidationResult:
     reasons: List[str] = field(default_factory=list)
     median_price: Optional[float] = None
     deviation_pct: Optional[float] = None
+    consensus_price: Optional[float] = None
 
     def add_reason(self, msg: str) -> None:
         self.reasons.append(msg)
@@ -100,7 +124,42 @@ def validate_price(
     -------
     PriceValidationResult
     """
+    med = None
+    if historical_prices and len(historical_prices) >= MIN_HISTORY_FOR_SPIKE_CHECK:
+        med = median(historical_prices)
+    return validate_against_median(
+        new_price_usd,
+        med,
+        card_id=card_id,
+        spike_threshold_pct=spike_threshold_pct,
+        max_price_usd=max_price_usd,
+    )
+
+
+def validate_against_median(
+    new_price_usd: float,
+    med: Optional[float],
+    card_id: Optional[int] = None,
+    spike_threshold_pct: float = SPIKE_THRESHOLD_PCT,
+    max_price_usd: float = MAX_SINGLE_CARD_USD,
+    new_price: Optional[float] = None,
+    peer_prices_usd: Optional[List[float]] = None,
+    consensus_band: Optional[float] = None,
+) -> PriceValidationResult:
+    """
+    Same checks as :func:`validate_price`, given the history median up front.
+
+    *med* is None when there is not enough history for a spike check. Used
+    by :class:`app.utils.rolling_median.MedianCache`, which keeps medians
+    current without reloading the history.
+
+    When *new_price* is given, *med* is in the listing's own currency and
+    the spike check compares the two natively; hard bounds still use
+    *new_price_usd*. *peer_prices_usd* / *consensus_band* enable the
+    cross-retailer consensus check.
+    """
     result = PriceValidationResult()
+    native = new_price_usd if new_price is None else float(new_price)
 
     # ------------------------------------------------------------------
     # 1. Hard bounds
@@ -130,28 +189,48 @@ def validate_price(
     # ------------------------------------------------------------------
     # 3. Spike / deviation check (requires enough history)
     # ------------------------------------------------------------------
-    if historical_prices and len(historical_prices) >= MIN_HISTORY_FOR_SPIKE_CHECK:
-        med = median(historical_prices)
+    if med is not None:
         result.median_price = med
 
         if med > 0:
-            deviation = abs(new_price_usd - med) / med
+            deviation = abs(native - med) / med
             result.deviation_pct = round(deviation * 100, 2)
 
             if deviation > spike_threshold_pct:
                 result.add_reason(
                     f"Price deviation {result.deviation_pct:.1f}% exceeds "
                     f"threshold {spike_threshold_pct * 100:.0f}%  "
-                    f"(new={new_price_usd:.4f}, median={med:.4f})"
+                    f"(new={native:.4f}, median={med:.4f})"
                 )
                 logger.warning(
                     "card_id=%s  spike detected  new=%.4f  median=%.4f  deviation=%.1f%%",
                     card_id,
-                    new_price_usd,
+                    native,
                     med,
                     result.deviation_pct,
                 )
 
+    # ------------------------------------------------------------------
+    # 4. Cross-retailer consensus band (optional)
+    # ------------------------------------------------------------------
+    peers = [p for p in (peer_prices_usd or []) if p]
+    if consensus_band is not None and len(peers) >= MIN_RETAILERS_FOR_CONSENSUS:
+        consensus = median(peers)
+        result.consensus_price = consensus
+        spread = abs(new_price_usd - consensus) / consensus
+        if spread > consensus_band:
+            result.add_reason(
+                f"Price {new_price_usd:.2f} USD is {spread * 100:.0f}% from the "
+                f"{len(peers)}-retailer consensus {consensus:.2f} "
+                f"(band {consensus_band * 100:.0f}%)"
+            )
+            logger.warning(
+                "card_id=%s  outside consensus  new=%.4f  consensus=%.4f",
+                card_id,
+                new_price_usd,
+                consensus,
+            )
+
     if not result.is_anomaly:
         logger.debug(
             "card_id=%s  price=%.4f passed validation", card_id, new_price_usd
@@ -168,30 +247,109 @@ def validate_price_for_card(
     product_id: int,
     new_price_usd: float,
     lookback: int = 30,
+    retailer_id: Optional[int] = None,
+    new_price: Optional[float] = None,
+    currency: Optional[str] = None,
+    consensus_band: Optional[float] = CONSENSUS_BAND,
 ) -> PriceValidationResult:
     """
     Convenience wrapper that fetches the last *lookback* prices for
-    *card_id* from the database, then calls :func:`validate_price`.
+    *card_id* from the database, then calls :func:`validate_against_median`.
 
     Requires an active Flask application context.
 
     Parameters
     ----------
-    product_id    : product to look up.
-    new_price_usd : freshly scraped price in USD.
-    lookback      : how many historical prices to consider.
+    product_id     : product to look up.
+    new_price_usd  : freshly scraped price in USD.
+    lookback       : how many historical prices to consider.
+    retailer_id    : judge against this retailer's own history (a range scan
+                     on idx_price_product_retailer_date). Without it the
+                     history is every retailer's USD price, as before.
+    new_price, currency : the listing's native price; with both set (and a
+                     retailer_id) the spike check runs in that currency
+                     against rows in the same currency.
+    consensus_band : enable the cross-retailer consensus check.
     """
-    from app.models.price import PriceHistory  # local import to avoid circular deps
+    from app.models.latest_price import LatestPrice  # local import to avoid circular deps
+    from app.models.price import PriceHistory
+
+    native = retailer_id is not None and new_price is not None and currency is not None
+    column = PriceHistory.price if native else PriceHistory.price_usd
+
+    q = PriceHistory.query.with_entities(column).filter(PriceHistory.product_id == product_id)
+    if retailer_id is not None:
+        q = q.filter(PriceHistory.retailer_id == retailer_id)
+    if native:
+        q = q.filter(PriceHistory.currency == currency)
+    history = q.order_by(PriceHistory.scraped_at.desc()).limit(lookback).all()
+    historical_prices = [float(v) for (v,) in reversed(history) if v]
+
+    peers = None
+    if consensus_band is not None:
+        peer_q = LatestPrice.query.with_entities(LatestPrice.price_usd).filter(
+            LatestPrice.product_id == product_id
+        )
+        if retailer_id is not None:
+            peer_q = peer_q.filter(LatestPrice.retailer_id != retailer_id)
+        peers = [float(v) for (v,) in peer_q.all() if v]
 
-    history = (
-        PriceHistory.query.filter_by(product_id=product_id)
-        .order_by(PriceHistory.scraped_at.desc())
-        .limit(lookback)
-        .all()
-    )
-    historical_prices = [float(p.price_usd) for p in reversed(history) if p.price_usd]
-    return validate_price(
-        new_price_usd=new_price_usd,
-        historical_prices=historical_prices,
+    med = None
+    if len(historical_prices) >= MIN_HISTORY_FOR_SPIKE_CHECK:
+        med = median(historical_prices)
+    return validate_against_median(
+        new_price_usd,
+        med,
         card_id=product_id,
+        new_price=new_price if native else None,
+        peer_prices_usd=peers,
+        consensus_band=consensus_band,
     )
+
+
+# ---------------------------------------------------------------------------
+# Per-listing validator (batch scrapers)
+# ---------------------------------------------------------------------------
+
+class PriceValidator:
+    """
+    ``(is_valid, reason)`` check for one scraped listing in any currency.
+
+    Without *medians* only the hard bounds apply (no history, no DB), which
+    is what the batch scrapers run at parse time. Given a
+    :class:`app.utils.rolling_median.MedianCache` the listing is also judged
+    against that (product, retailer) window, and extends it when accepted.
+    """
+
+    def __init__(self, medians=None, min_price_usd: float = MIN_LISTING_USD,
+                 max_price_usd: float = MAX_SINGLE_CARD_USD) -> None:
+        self._medians = medians
+        self.min_price_usd = min_price_usd
+        self.max_price_usd = max_price_usd
+
+    def validate_price(
+        self,
+        product_id: Optional[int],
+        retailer_id: Optional[int],
+        price: float,
+        currency: str = "USD",
+        product_type: Optional[str] = None,
+    ) -> Tuple[bool, str]:
+        """Return ``(True, "")`` or ``(False, reason)``."""
+        if price is None or float(price) <= 0:
+            return False, f"Non-positive price: {price}"
+
+        price_usd = convert_to_usd(float(price), currency)
+        if price_usd < self.min_price_usd:
+            return False, (f"{product_type or 'listing'} price {price_usd:.4f} USD is "
+                           f"below the {self.min_price_usd:.2f} USD floor")
+
+        if self._medians is not None and product_id is not None and retailer_id is not None:
+            result = self._medians.check_and_add(product_id, retailer_id, price_usd,
+                                                 price=float(price), currency=currency)
+        else:
+            result = validate_against_median(price_usd, None, card_id=product_id,
+                                              max_price_usd=self.max_price_usd)
+        if result.is_anomaly:
+            return False, "; ".join(result.reasons)
+        return True, ""
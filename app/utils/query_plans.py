@@ -0,0 +1,452 @@
+"""
+app/utils/query_plans.py
+
+Query-plan regression checks for the hot read paths.
+
+Each entry of ``HOT_QUERIES`` runs the real code of one hot path (service
+helper or admin view) against a seeded database while an engine listener
+captures the SELECTs it issues. Every distinct statement is then explained
+with its own parameters -- ``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN
+(FORMAT JSON)`` on Postgres -- and a full scan of a large table is reported
+as a regression. The same runs are timed (median of *repeat*) so a baseline
+file can flag a path that still uses its index but got slower.
+
+``seed_synthetic`` builds the dataset: products x retailers with a current
+price each, *history_rows* of price_history spread over ``HISTORY_DAYS`` and
+a price-sync log, followed by ANALYZE so the planner sees realistic
+statistics. ``scripts/check_query_plans.py`` runs it at millions of rows;
+tests/test_query_plans.py at a few thousand.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import statistics
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from unittest import mock
+
+from sqlalchemy import event, text
+
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Days of price_history the synthetic dataset spans.
+HISTORY_DAYS: int = 90
+
+# Reference tables that stay a few dozen rows; scanning them is the cheap plan.
+SMALL_TABLES = {"retailers"}
+
+FUJI_SLUG = "fujicardshop"
+RCJ_SLUG = "rarecardsjapan"
+
+_SEED_BATCH = 20_000
+_VARIANT_BASE = 40_000_000_000
+_SELECT = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?(.*)$")
+_ALIAS_SUFFIX = re.compile(r"_\d+$")
+
+
+# ---------------------------------------------------------------------------
+# Synthetic dataset
+# ---------------------------------------------------------------------------
+
+@dataclass
+class SyntheticDataset:
+    product_ids: List[int]
+    retailer_ids: List[int]
+    fuji_id: int
+    rcj_id: int
+    history_rows: int
+    now: datetime
+
+    @property
+    def product_id(self) -> int:
+        """A product in the middle of the id range (every retailer prices it)."""
+        return self.product_ids[len(self.product_ids) // 2]
+
+    @property
+    def identity(self) -> Tuple[str, str]:
+        """(set_code, product_type) of ``product_id``."""
+        return _set_code(self.product_ids.index(self.product_id)), "box"
+
+
+def _set_code(i: int) -> str:
+    return f"Q{i:05d}"
+
+
+def _insert(table, rows: List[dict]) -> None:
+    if not rows:
+        return
+    for start in range(0, len(rows), _SEED_BATCH):
+        db.session.execute(table.insert(), rows[start:start + _SEED_BATCH])
+    db.session.commit()
+
+
+def seed_synthetic(history_rows: int = 10_000, products: int = 400, retailers: int = 12,
+                   sync_log_rows: Optional[int] = None,
+                   now: Optional[datetime] = None) -> SyntheticDataset:
+    """
+    Fill empty tables with a synthetic dataset shaped like production.
+
+    Every (product, retailer) pair gets a ``latest_prices`` row; price history
+    cycles through the pairs with timestamps spread evenly over the last
+    ``HISTORY_DAYS``; the sync log (default ``history_rows // 20``) repeats
+    one run per product. Runs ANALYZE when done.
+    """
+    from app.models import partitioning
+    from app.models.latest_price import LatestPrice
+    from app.models.price import PriceHistory
+    from app.models.price_sync_log import PriceSyncLog
+    from app.models.product import Product
+    from app.models.retailer import Retailer
+    from app.utils.identity_index import invalidate_identity_index
+
+    now = now or datetime.utcnow()
+    slugs = [FUJI_SLUG, RCJ_SLUG] + [f"synthetic-{i}" for i in range(retailers - 2)]
+    _insert(Retailer.__table__, [
+        {"name": slug.title(), "slug": slug, "base_url": f"https://{slug}.example.com",
+         "currency": "USD", "is_active": True}
+        for slug in slugs
+    ])
+    _insert(Product.__table__, [
+        {"set_code": _set_code(i), "set_name": "SYNTHETIC", "product_type": "box",
+         "is_active": True, "created_at": now, "updated_at": now}
+        for i in range(products)
+    ])
+    retailer_ids = dict(db.session.query(Retailer.slug, Retailer.id))
+    product_ids = [pid for (pid,) in db.session.query(Product.id).order_by(Product.id)]
+    rids = [retailer_ids[slug] for slug in slugs]
+
+    latest = []
+    for i, pid in enumerate(product_ids):
+        for j, rid in enumerate(rids):
+            seen = now - timedelta(hours=(i + j) % 240)
+            latest.append({
+                "product_id": pid, "retailer_id": rid,
+                "price": 100 + (i * 7 + j) % 150, "price_usd": 100 + (i * 7 + j) % 150,
+                "currency": "USD", "in_stock": (i + j) % 4 != 0,
+                "source_url": f"https://{slugs[j]}.example.com/p/{i}",
+                "scraped_at": seen, "last_seen_at": seen,
+            })
+    _insert(LatestPrice.__table__, latest)
+
+    # Partitioned Postgres: a leaf per seeded month, so rows don't pile into the default.
+    start = now - timedelta(days=HISTORY_DAYS)
+    for month in partitioning.months_between(start, now):
+        partitioning.ensure_partitions(0, now=month)
+
+    pairs = len(product_ids) * len(rids)
+    step = HISTORY_DAYS * 86400 / max(history_rows, 1)
+    batch: List[dict] = []
+    for n in range(history_rows):
+        pair = n % pairs
+        batch.append({
+            "product_id": product_ids[pair % len(product_ids)],
+            "retailer_id": rids[pair // len(product_ids)],
+            "price": 100 + n % 150, "price_usd": 100 + n % 150, "currency": "USD",
+            "in_stock": n % 4 != 0, "scraped_at": start + timedelta(seconds=n * step),
+        })
+        if len(batch) == _SEED_BATCH:
+            _insert(PriceHistory.__table__, batch)
+            batch = []
+    _insert(PriceHistory.__table__, batch)
+
+    sync_rows = history_rows // 20 if sync_log_rows is None else sync_log_rows
+    actions = ("skipped", "auto_applied", "held", "skipped", "error")
+    _insert(PriceSyncLog.__table__, [
+        {"set_code": _set_code(n % len(product_ids)), "product_type": "box",
+         "rcj_variant_id": _VARIANT_BASE + n % len(product_ids),
+         "fuji_price": 100, "current_price": 110, "target_price": 99,
+         "action": actions[(n // len(product_ids)) % len(actions)], "reason": "synthetic",
+         "created_at": now - timedelta(minutes=sync_rows - n)}
+        for n in range(sync_rows)
+    ])
+
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+    invalidate_identity_index()
+    logger.info("seed_synthetic: %d products x %d retailers, %d history rows, %d sync rows",
+                len(product_ids), len(rids), history_rows, sync_rows)
+    return SyntheticDataset(product_ids=product_ids, retailer_ids=rids,
+                            fuji_id=retailer_ids[FUJI_SLUG], rcj_id=retailer_ids[RCJ_SLUG],
+                            history_rows=history_rows, now=now)
+
+
+# ---------------------------------------------------------------------------
+# Hot paths
+# ---------------------------------------------------------------------------
+
+def _latest_fuji_price(data: SyntheticDataset) -> Any:
+    from app.services.price_sync_service import _latest_fuji_price
+
+    set_code, product_type = data.identity
+    return _latest_fuji_price(data.fuji_id, set_code, product_type,
+                              data.now - timedelta(days=7))
+
+
+def _cheapest_competitor(data: SyntheticDataset) -> Any:
+    from app.services.email_service import _cheapest_competitor
+
+    return _cheapest_competitor(data.product_id, data.rcj_id)
+
+
+def _avg_market_price(data: SyntheticDataset) -> Any:
+    from app.services.email_service import _avg_market_price
+
+    return _avg_market_price(data.product_id, data.rcj_id)
+
+
+def _get(path: str) -> Any:
+    from flask import current_app
+
+    response = current_app.test_client().get(path)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {path} -> {response.status_code}")
+    return response
+
+
+def _fuji_urls(data: SyntheticDataset) -> Any:
+    return _get("/admin/fuji-urls")
+
+
+def _price_review(data: SyntheticDataset) -> Any:
+    from app.services import rcj_shopify
+
+    # The page also asks Shopify for stock; a plan check never leaves the database.
+    with mock.patch.object(rcj_shopify, "fetch_prices_by_variant_ids", return_value={}):
+        return _get("/admin/price-review")
+
+
+def _chart_raw(data: SyntheticDataset) -> Any:
+    from app.services.chart_service import ChartService
+
+    return ChartService().get_price_chart_data(data.product_id, days=7, resolution="raw")
+
+
+HOT_QUERIES: Dict[str, Callable[[SyntheticDataset], Any]] = {
+    "latest_fuji_price": _latest_fuji_price,
+    "cheapest_competitor": _cheapest_competitor,
+    "avg_market_price": _avg_market_price,
+    "fuji_urls": _fuji_urls,
+    "price_review": _price_review,
+    "chart_raw": _chart_raw,
+}
+
+
+# ---------------------------------------------------------------------------
+# Capture and EXPLAIN
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def capture_statements() -> Iterator[List[Tuple[str, Any]]]:
+    """Collect (sql, parameters) of every SELECT run on ``db.engine`` inside the block."""
+    captured: List[Tuple[str, Any]] = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and _SELECT.match(statement):
+            captured.append((statement, parameters))
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+
+def _plan_nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans") or []:
+        yield from _plan_nodes(child)
+
+
+def explain(statement: str, parameters: Any = None) -> Any:
+    """
+    The plan of *statement*: the ``detail`` lines of EXPLAIN QUERY PLAN on
+    SQLite, the top-level plan node of EXPLAIN (FORMAT JSON) on Postgres.
+    """
+    conn = db.session.connection()
+    params = tuple(parameters) if isinstance(parameters, list) else parameters
+    if conn.dialect.name == "postgresql":
+        raw = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", params).scalar()
+        doc = json.loads(raw) if isinstance(raw, str) else raw
+        return doc[0]["Plan"]
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def _table_name(name: str, tables: Sequence[str]) -> Optional[str]:
+    """Resolve a plan's relation (leaf partition, ``foo_1`` alias) to a metadata table."""
+    from app.models import partitioning
+
+    if partitioning.partition_month(name) is not None and name.startswith(partitioning.PARENT):
+        return partitioning.PARENT
+    if name in tables:
+        return name
+    base = _ALIAS_SUFFIX.sub("", name)
+    return base if base in tables else None
+
+
+def full_scans(plan: Any, tables: Optional[Sequence[str]] = None) -> List[str]:
+    """Tables *plan* reads start to finish without an index, in plan order."""
+    from app.models import partitioning
+
+    tables = list(db.metadata.tables) if tables is None else tables
+    found: List[str] = []
+    if isinstance(plan, dict):
+        for node in _plan_nodes(plan):
+            relation = node.get("Relation Name")
+            # The default partition only catches stray rows and is normally empty.
+            if node.get("Node Type") != "Seq Scan" or relation == partitioning.DEFAULT_PARTITION:
+                continue
+            name = _table_name(relation or "", tables)
+            if name is not None:
+                found.append(name)
+        return found
+    for detail in plan:
+        match = _SQLITE_SCAN.match(detail)
+        if match is None or "USING" in match.group(3):
+            continue
+        name = _table_name(match.group(2) or match.group(1), tables) or \
+            _table_name(match.group(1), tables)
+        if name is not None:
+            found.append(name)
+    return found
+
+
+def plan_lines(plan: Any) -> List[str]:
+    """*plan* as short readable lines (for reports and logs)."""
+    if not isinstance(plan, dict):
+        return list(plan)
+    lines = []
+    for node in _plan_nodes(plan):
+        line = node["Node Type"]
+        if node.get("Relation Name"):
+            line += f" on {node['Relation Name']}"
+        if node.get("Index Name"):
+            line += f" using {node['Index Name']}"
+        lines.append(line)
+    return lines
+
+
+# ---------------------------------------------------------------------------
+# Checks
+# ---------------------------------------------------------------------------
+
+@dataclass
+class StatementPlan:
+    sql: str
+    plan: List[str]
+    scans: List[str]
+
+
+@dataclass
+class QueryReport:
+    name: str
+    statements: List[StatementPlan] = field(default_factory=list)
+    median_ms: float = 0.0
+
+    @property
+    def seq_scans(self) -> List[str]:
+        """Full scans of tables outside ``SMALL_TABLES``."""
+        return sorted({t for s in self.statements for t in s.scans if t not in SMALL_TABLES})
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "median_ms": round(self.median_ms, 3),
+                "seq_scans": self.seq_scans,
+                "statements": [{"sql": s.sql, "plan": s.plan} for s in self.statements]}
+
+
+def check_query(name: str, data: SyntheticDataset, repeat: int = 5) -> QueryReport:
+    """Explain every distinct statement of hot path *name* and time *repeat* runs."""
+    run = HOT_QUERIES[name]
+    report = QueryReport(name)
+
+    db.session.expunge_all()
+    with capture_statements() as captured:
+        run(data)
+    seen = set()
+    for statement, parameters in captured:
+        if statement in seen:
+            continue
+        seen.add(statement)
+        plan = explain(statement, parameters)
+        report.statements.append(StatementPlan(" ".join(statement.split()),
+                                               plan_lines(plan), full_scans(plan)))
+    db.session.rollback()
+
+    timings = []
+    for _ in range(max(repeat, 1)):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        run(data)
+        timings.append((time.perf_counter() - start) * 1000)
+        db.session.rollback()
+    report.median_ms = statistics.median(timings)
+    return report
+
+
+def check_hot_queries(data: SyntheticDataset, repeat: int = 5,
+                      names: Optional[Sequence[str]] = None) -> List[QueryReport]:
+    reports = []
+    for name in names or HOT_QUERIES:
+        report = check_query(name, data, repeat)
+        if report.seq_scans:
+            logger.warning("query plan %s: full scan of %s", name, ", ".join(report.seq_scans))
+        reports.append(report)
+    return reports
+
+
+# ---------------------------------------------------------------------------
+# Timing baseline
+# ---------------------------------------------------------------------------
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_baseline(path: str, dialect: str, history_rows: int,
+                  reports: Sequence[QueryReport]) -> dict:
+    """Record the medians of *reports* under *dialect* in the baseline file at *path*."""
+    baseline = load_baseline(path)
+    baseline[dialect] = {
+        "history_rows": history_rows,
+        "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "median_ms": {r.name: round(r.median_ms, 3) for r in reports},
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(baseline, fh, indent=2, sort_keys=True)
+    return baseline
+
+
+def timing_regressions(reports: Sequence[QueryReport], baseline: dict, dialect: str,
+                       history_rows: int, max_slowdown: float = 2.0,
+                       min_ms: float = 1.0) -> List[str]:
+    """
+    Hot paths more than *max_slowdown* times (and *min_ms*) slower than the
+    baseline. Baselines recorded on a different dataset size are not compared.
+    """
+    recorded = baseline.get(dialect) or {}
+    if recorded.get("history_rows") != history_rows:
+        return []
+    problems = []
+    for report in reports:
+        before = recorded.get("median_ms", {}).get(report.name)
+        if before is None:
+            continue
+        if report.median_ms > before * max_slowdown and report.median_ms - before > min_ms:
+            problems.append(f"{report.name}: {report.median_ms:.2f} ms "
+                            f"(baseline {before:.2f} ms)")
+    return problems
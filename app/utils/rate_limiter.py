@@ -1,36 +1,94 @@
-import time
+import asyncio
 import threading
-from collections import deque
+import time
+from typing import Dict, Optional, Tuple
 
 
 class RateLimiter:
-    """Token bucket rate limiter for web scraping"""
+    """Token bucket rate limiter for web scraping.
+
+    Tokens refill at ``requests_per_minute / 60`` per second, or slower when
+    ``min_delay_seconds`` asks for a wider spacing, and up to ``burst`` tokens
+    can be spent back-to-back. A caller that finds the bucket empty reserves
+    the next token under the lock and then sleeps *outside* it, so other
+    threads are never held up by someone else's wait.
+    """
 
-    def __init__(self, requests_per_minute: int = 10):
-        self.requests_per_minute = requests_per_minute
-        self.min_interval = 60.0 / requests_per_minute
-        self.request_times = deque(maxlen=requests_per_minute)
+    def __init__(self, requests_per_minute: int = 10, min_delay_seconds: float = 0,
+                 burst: int = 1):
         self.lock = threading.Lock()
+        self.configure(requests_per_minute, min_delay_seconds, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
 
-    def wait(self):
-        """Wait if necessary to respect rate limit"""
+    def configure(self, requests_per_minute: int, min_delay_seconds: float = 0,
+                  burst: int = 1) -> None:
+        """Change the limits in place (e.g. after the Retailer row was edited)."""
         with self.lock:
-            now = time.time()
+            self.requests_per_minute = requests_per_minute
+            self.min_delay_seconds = min_delay_seconds or 0
+            self.burst = max(1, int(burst))
+            rate = max(requests_per_minute or 0, 1) / 60.0
+            if self.min_delay_seconds:
+                rate = min(rate, 1.0 / self.min_delay_seconds)
+            self.rate = rate
+            self.min_interval = 1.0 / rate
+
+    def _reserve(self) -> float:
+        """Take a token (possibly one not yet refilled); return seconds to wait."""
+        with self.lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def wait(self) -> float:
+        """Block until a request may be sent; return the time slept."""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    async def wait_async(self) -> float:
+        """:meth:`wait` for the async scrapers; yields to the event loop."""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+
+# ---------------------------------------------------------------------------
+# Per-host registry
+# ---------------------------------------------------------------------------
+
+_HOST_LIMITERS: Dict[str, RateLimiter] = {}
+_HOST_SETTINGS: Dict[str, Tuple[int, float, int]] = {}
+_REGISTRY_LOCK = threading.Lock()
+
 
-            # Clean old entries
-            while self.request_times and now - self.request_times[0] > 60:
-                self.request_times.popleft()
+def limiter_for(host: str, requests_per_minute: int, min_delay_seconds: float = 0,
+                burst: int = 1) -> RateLimiter:
+    """Return the process-wide limiter for *host*, creating or reconfiguring it.
 
-            # Check if we need to wait
-            if len(self.request_times) >= self.requests_per_minute:
-                sleep_time = 60 - (now - self.request_times[0])
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
+    Each host has its own bucket, so a slow retailer never delays another."""
+    settings = (requests_per_minute, min_delay_seconds or 0, burst)
+    with _REGISTRY_LOCK:
+        limiter = _HOST_LIMITERS.get(host)
+        if limiter is None:
+            limiter = _HOST_LIMITERS[host] = RateLimiter(*settings)
+        elif _HOST_SETTINGS.get(host) != settings:
+            limiter.configure(*settings)
+        _HOST_SETTINGS[host] = settings
+        return limiter
 
-            # Minimum interval between requests
-            if self.request_times:
-                time_since_last = now - self.request_times[-1]
-                if time_since_last < self.min_interval:
-                    time.sleep(self.min_interval - time_since_last)
 
-            self.request_times.append(time.time())
+def reset_host_limiters(host: Optional[str] = None) -> None:
+    """Forget one host's bucket, or all of them (tests, config reloads)."""
+    with _REGISTRY_LOCK:
+        if host is None:
+            _HOST_LIMITERS.clear()
+            _HOST_SETTINGS.clear()
+        else:
+            _HOST_LIMITERS.pop(host, None)
+            _HOST_SETTINGS.pop(host, None)
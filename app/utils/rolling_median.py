@@ -0,0 +1,234 @@
+"""
+app/utils/rolling_median.py
+
+Incremental rolling-median windows for price validation.
+
+:class:`RollingMedian` keeps the last *size* prices of one series both in
+arrival order (to know which price to evict) and in sorted order (to read
+the median). A push is a binary search plus a list shift over at most
+*size* floats, and reading the median is O(1). Nothing is re-sorted and the
+database is not touched.
+
+:class:`MedianCache` holds one window per (product_id, retailer_id,
+currency), in that currency, so a listing is only ever compared with the
+same retailer's own prices and FX moves do not count as spikes. It is
+warmed from ``price_history`` with one windowed query when a scrape starts,
+then updated in memory as prices are accepted. Scraper worker threads share
+one cache, so every window carries its own lock. With a consensus band set,
+the cache also keeps each retailer's current USD price per product for the
+cross-retailer check.
+
+Usage
+-----
+    cache = MedianCache(size=30, consensus_band=0.5)
+    cache.warm(retailer_ids=[3, 4])          # needs an app context
+    result = cache.check_and_add(product_id, retailer_id, 54.99,
+                                 price=72.50, currency="CAD")
+    if result.is_anomaly:
+        ...
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.utils.price_validator import (
+    MIN_HISTORY_FOR_SPIKE_CHECK,
+    PriceValidationResult,
+    validate_against_median,
+)
+
+DEFAULT_WINDOW: int = 30
+
+
+class RollingMedian:
+    """Sliding-window median over the last *size* values. Thread-safe."""
+
+    __slots__ = ("size", "_order", "_sorted", "_lock")
+
+    def __init__(self, size: int = DEFAULT_WINDOW, values: Iterable[float] = ()) -> None:
+        self.size = size
+        self._order: deque = deque()
+        self._sorted: list = []
+        self._lock = threading.Lock()
+        for value in values:
+            self._push(value)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def _push(self, value: float) -> None:
+        value = float(value)
+        if len(self._order) >= self.size:
+            oldest = self._order.popleft()
+            del self._sorted[bisect_left(self._sorted, oldest)]
+        self._order.append(value)
+        insort(self._sorted, value)
+
+    def _median(self) -> Optional[float]:
+        n = len(self._sorted)
+        if not n:
+            return None
+        mid = n // 2
+        if n % 2:
+            return self._sorted[mid]
+        return (self._sorted[mid - 1] + self._sorted[mid]) / 2
+
+    def push(self, value: float) -> None:
+        """Add *value*, evicting the oldest value once the window is full."""
+        with self._lock:
+            self._push(value)
+
+    def median(self) -> Optional[float]:
+        """Median of the window (same as statistics.median), or None when empty."""
+        with self._lock:
+            return self._median()
+
+    def check_and_add(self, value: float, card_id: Optional[int] = None,
+                      price_usd: Optional[float] = None,
+                      peer_prices_usd: Optional[List[float]] = None,
+                      consensus_band: Optional[float] = None) -> PriceValidationResult:
+        """
+        Validate *value* against the window and, if it is not an anomaly,
+        push it — atomically, so two threads cannot both judge against the
+        same stale window.
+
+        *value* is in the window's currency; pass *price_usd* when that is
+        not USD so the hard bounds and consensus check see the USD price.
+        """
+        with self._lock:
+            med = self._median() if len(self._order) >= MIN_HISTORY_FOR_SPIKE_CHECK else None
+            result = validate_against_median(
+                value if price_usd is None else price_usd,
+                med,
+                card_id=card_id,
+                new_price=value,
+                peer_prices_usd=peer_prices_usd,
+                consensus_band=consensus_band,
+            )
+            if not result.is_anomaly:
+                self._push(value)
+            return result
+
+
+Key = Tuple[int, int, str]
+
+
+class MedianCache:
+    """One :class:`RollingMedian` per (product_id, retailer_id, currency)."""
+
+    def __init__(self, size: int = DEFAULT_WINDOW,
+                 consensus_band: Optional[float] = None) -> None:
+        self.size = size
+        self.consensus_band = consensus_band
+        self._windows: Dict[Key, RollingMedian] = {}
+        # product_id -> {retailer_id: current price_usd}, for the consensus band
+        self._current: Dict[int, Dict[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def window(self, product_id: int, retailer_id: int, currency: str = "USD") -> RollingMedian:
+        """Return the window for the key, creating an empty one if needed."""
+        key = (product_id, retailer_id, currency)
+        win = self._windows.get(key)
+        if win is None:
+            with self._lock:
+                win = self._windows.setdefault(key, RollingMedian(self.size))
+        return win
+
+    def warm(self, retailer_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        (Re)load every window from ``price_history``: the newest *size*
+        native prices of each (product, retailer, currency), in one windowed
+        query whose partitions follow idx_price_product_retailer_date. With
+        a consensus band, also load every retailer's current USD price from
+        ``latest_prices`` (a second query).
+
+        Limit the windows to *retailer_ids* when given. Requires an active
+        Flask application context. Returns the number of windows loaded.
+        """
+        from sqlalchemy import func
+
+        from app.extensions import db
+        from app.models.latest_price import LatestPrice
+        from app.models.price import PriceHistory
+
+        rn = func.row_number().over(
+            partition_by=(PriceHistory.product_id, PriceHistory.retailer_id,
+                          PriceHistory.currency),
+            order_by=(PriceHistory.scraped_at.desc(), PriceHistory.id.desc()),
+        ).label("rn")
+        ranked = db.session.query(
+            PriceHistory.product_id, PriceHistory.retailer_id, PriceHistory.currency,
+            PriceHistory.price, rn,
+        ).filter(PriceHistory.price.isnot(None))
+        if retailer_ids is not None:
+            ranked = ranked.filter(PriceHistory.retailer_id.in_(list(retailer_ids)))
+        ranked = ranked.subquery()
+
+        rows = (
+            db.session.query(ranked.c.product_id, ranked.c.retailer_id,
+                             ranked.c.currency, ranked.c.price)
+            .filter(ranked.c.rn <= self.size)
+            .order_by(ranked.c.product_id, ranked.c.retailer_id, ranked.c.currency,
+                      ranked.c.rn.desc())
+            .all()
+        )
+
+        history: Dict[Key, list] = {}
+        for product_id, retailer_id, currency, price in rows:
+            if price:
+                history.setdefault((product_id, retailer_id, currency), []).append(float(price))
+
+        current: Dict[int, Dict[int, float]] = {}
+        if self.consensus_band is not None:
+            for product_id, retailer_id, price_usd in db.session.query(
+                LatestPrice.product_id, LatestPrice.retailer_id, LatestPrice.price_usd
+            ).all():
+                if price_usd:
+                    current.setdefault(product_id, {})[retailer_id] = float(price_usd)
+
+        windows = {key: RollingMedian(self.size, values) for key, values in history.items()}
+        with self._lock:
+            self._windows.update(windows)
+            self._current = current
+        return len(windows)
+
+    def median(self, product_id: int, retailer_id: int,
+               currency: str = "USD") -> Optional[float]:
+        return self.window(product_id, retailer_id, currency).median()
+
+    def _peers(self, product_id: int, retailer_id: int) -> Optional[List[float]]:
+        if self.consensus_band is None:
+            return None
+        with self._lock:
+            prices = self._current.get(product_id, {})
+            return [p for rid, p in prices.items() if rid != retailer_id]
+
+    def check_and_add(self, product_id: int, retailer_id: int, price_usd: float,
+                      price: Optional[float] = None,
+                      currency: str = "USD") -> PriceValidationResult:
+        """
+        Validate a listing and record it if accepted.
+
+        *price* / *currency* are the listing's native price; when *price* is
+        omitted the USD price is used and *currency* should stay "USD".
+        """
+        price_usd = float(price_usd)
+        native = price_usd if price is None else float(price)
+        result = self.window(product_id, retailer_id, currency).check_and_add(
+            native,
+            card_id=product_id,
+            price_usd=price_usd,
+            peer_prices_usd=self._peers(product_id, retailer_id),
+            consensus_band=self.consensus_band,
+        )
+        if not result.is_anomaly and self.consensus_band is not None:
+            with self._lock:
+                self._current.setdefault(product_id, {})[retailer_id] = price_usd
+        return result
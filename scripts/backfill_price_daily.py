@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Build the missing days of the price_daily OHLC rollup from price_history.
+
+Usage:
+    python scripts/backfill_price_daily.py                 # everything in history
+    python scripts/backfill_price_daily.py --since 2026-01-01 [--until 2026-02-01]
+
+Run once after deploying the price_daily table; new writes keep it current
+from then on. Safe to re-run: only (product, retailer, day) bars that do not
+exist yet are written, one week per transaction. Existing bars hold the
+unchanged-price scrapes that never reach history, so they are never replaced.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app import create_app
+from app.extensions import db
+import app.models  # noqa: F401  (registers PriceDaily)
+from app.models.schema import ensure_schema
+from app.services.rollup_service import backfill_price_daily
+
+
+def _date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--since", type=_date, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--until", type=_date, help="day after the last one (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    app = create_app(start_scheduler=False)
+    with app.app_context():
+        db.create_all()  # creates price_daily if missing; no-op otherwise
+        ensure_schema()
+        count = backfill_price_daily(since=args.since, until=args.until)
+        print(f"price_daily backfilled: {count} (product, retailer, day) bars")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark PriceService.bulk_upsert: batched ON CONFLICT / COPY path vs the
+row-at-a-time ORM loop.
+
+Usage:
+    python scripts/bench_bulk_upsert.py                      # temp SQLite file
+    python scripts/bench_bulk_upsert.py --database-url postgresql://...
+    python scripts/bench_bulk_upsert.py --sizes 1000 10000 --batch-size 2000
+
+Each run writes into freshly created tables, so point --database-url at a
+scratch database: the benchmark DROPS and recreates every table.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="bulk_upsert throughput benchmark")
+    parser.add_argument("--database-url", help="scratch database (default: temp SQLite file)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--batch-size", type=int, default=None)
+    return parser.parse_args()
+
+
+def _records(n, product_ids, retailer_ids):
+    """n distinct (product, retailer) records — one scrape's worth per pair."""
+    out = []
+    for i in range(n):
+        out.append({
+            "product_id": product_ids[i % len(product_ids)],
+            "retailer_id": retailer_ids[i // len(product_ids)],
+            "price": 100 + (i % 50),
+            "price_usd": 100 + (i % 50),
+            "currency": "USD",
+            "in_stock": bool(i % 3),
+            "source_url": f"https://example.com/p/{i}",
+        })
+    return out
+
+
+def _seed(db, n):
+    from app.models.product import Product
+    from app.models.retailer import Retailer
+
+    n_products = min(n, 1000)
+    n_retailers = -(-n // n_products)
+    products = [Product(set_code=f"B-{i:04d}", set_name="BENCH", product_type="box")
+                for i in range(n_products)]
+    retailers = [Retailer(name=f"Bench {i}", slug=f"bench-{i}", base_url="https://example.com")
+                 for i in range(n_retailers)]
+    db.session.add_all(products + retailers)
+    db.session.commit()
+    return [p.id for p in products], [r.id for r in retailers]
+
+
+def _time(svc, records, fast, batch_size):
+    from app.services import price_service
+
+    start = time.perf_counter()
+    if fast:
+        svc.bulk_upsert(records, batch_size=batch_size)
+    else:
+        # Baseline: the original loop — one ORM object per record.
+        orig = price_service._bulk_upsert_supported
+        price_service._bulk_upsert_supported = lambda: False
+        try:
+            svc.bulk_upsert(records)
+        finally:
+            price_service._bulk_upsert_supported = orig
+    return time.perf_counter() - start
+
+
+def main():
+    args = _parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from app import create_app
+    from app.extensions import db
+    from app.services.price_service import PriceService
+
+    app = create_app("development", start_scheduler=False)
+    print(f"{'rows':>8}  {'orm rows/s':>12}  {'bulk rows/s':>12}  {'speedup':>8}")
+    with app.app_context():
+        svc = PriceService()
+        for n in args.sizes:
+            rates = []
+            for fast in (False, True):
+                db.drop_all()
+                db.create_all()
+                product_ids, retailer_ids = _seed(db, n)
+                records = _records(n, product_ids, retailer_ids)
+                elapsed = _time(svc, records, fast, args.batch_size)
+                rates.append(n / elapsed)
+            print(f"{n:>8}  {rates[0]:>12,.0f}  {rates[1]:>12,.0f}  {rates[1] / rates[0]:>7.1f}x")
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark title classification: the old per-set ``re.search`` loop vs the
+single compiled alternation in app.scrapers.classify (cold and memoised).
+
+Usage:
+    python scripts/bench_classify.py                      # 10k / 50k titles
+    python scripts/bench_classify.py --titles 100000 --distinct 2000
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TEMPLATES = [
+    "One Piece Card Game {name} [{code}] Japanese Booster Box",
+    "{code} {name} Booster Box Case (12 boxes) JPN",
+    "ONE PIECE TCG {name} - {code} Booster Box - JAPANESE",
+    "{name} Booster Box ({code}) English",
+    "Sealed {code_nodash} Japanese Carton",
+    "Premium Card Collection Playmat {name}",
+]
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="title classifier benchmark")
+    parser.add_argument("--titles", type=int, nargs="+", default=[10_000, 50_000],
+                        help="titles classified per run")
+    parser.add_argument("--distinct", type=int, default=5_000,
+                        help="distinct titles in the pool (repeats hit the memo)")
+    return parser.parse_args()
+
+
+def _legacy(title, patterns):
+    """What each scraper used to do: one search per set, then substring checks."""
+    upper = title.upper()
+    set_code = None
+    for code, pattern in patterns.items():
+        if re.search(pattern, upper, re.IGNORECASE):
+            set_code = code
+            break
+    product_type = "case" if "CASE" in upper else ("box" if "BOX" in upper else None)
+    language = "japanese" if ("JAPAN" in upper or "JPN" in upper) else None
+    return set_code, product_type, language
+
+
+def main():
+    args = _parse_args()
+    from app.scrapers.classify import SET_ALIASES, classify
+
+    patterns = {code: code.replace("-", "-?") + "|" + alias for code, alias in SET_ALIASES.items()}
+    names = [alias.replace(r"\s*", " ").split("|")[0].split("(")[0] for alias in SET_ALIASES.values()]
+    rng = random.Random(42)
+    pool = []
+    for i in range(args.distinct):
+        code = rng.choice(list(SET_ALIASES))
+        pool.append(rng.choice(_TEMPLATES).format(
+            name=rng.choice(names), code=code, code_nodash=code.replace("-", "")) + f" #{i}")
+
+    print(f"{'titles':>8}  {'legacy ms':>10}  {'cold ms':>10}  {'memo ms':>10}  {'speedup':>8}")
+    for n in args.titles:
+        titles = [rng.choice(pool) for _ in range(n)]
+
+        start = time.perf_counter()
+        for t in titles:
+            _legacy(t, patterns)
+        t_legacy = time.perf_counter() - start
+
+        classify.cache_clear()
+        start = time.perf_counter()
+        for t in titles:
+            classify.__wrapped__(t)
+        t_cold = time.perf_counter() - start
+
+        classify.cache_clear()
+        start = time.perf_counter()
+        for t in titles:
+            classify(t)
+        t_memo = time.perf_counter() - start
+
+        print(f"{n:>8}  {t_legacy * 1000:>10,.1f}  {t_cold * 1000:>10,.1f}  "
+              f"{t_memo * 1000:>10,.1f}  {t_legacy / t_memo:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTML listing parses: BeautifulSoup (the old per-card select /
+get_text loop) vs the lxml parsers in app.scrapers.html_parse, inline
+(with threads "fetching" alongside) and fanned out to a process pool.
+
+Usage:
+    python scripts/bench_parse_pool.py                    # 20 pages x 200 cards
+    python scripts/bench_parse_pool.py --pages 50 --cards 400 --processes 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_CARD = """<li class="product type-product{stock}">
+  <a href="https://www.fptradingcards.com/product/{slug}/">
+    <h2 class="woocommerce-loop-product__title">{code} Booster {kind} Japanese #{i}</h2></a>
+  <span class="price"><span class="woocommerce-Price-amount amount"><bdi>${price:.2f}</bdi></span></span>
+  <div class="desc">{filler}</div>
+</li>"""
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="HTML parse stage benchmark")
+    parser.add_argument("--pages", type=int, default=20, help="shop pages parsed")
+    parser.add_argument("--cards", type=int, default=200, help="listings per page")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                        help="parse pool workers")
+    return parser.parse_args()
+
+
+def _page(cards):
+    items = [_CARD.format(stock=" outofstock" if i % 7 == 0 else "", slug=f"op-{i % 12 + 1:02d}",
+                          code=f"OP-{i % 12 + 1:02d}", kind="Case" if i % 5 == 0 else "Box",
+                          i=i, price=60 + i % 300, filler="lorem ipsum " * 20)
+             for i in range(cards)]
+    return f"<html><body><ul class='products'>{''.join(items)}</ul></body></html>"
+
+
+def _bs4(html):
+    """What FPTradingCardsScraper._parse_products used to do."""
+    import re
+
+    from bs4 import BeautifulSoup
+
+    from app.scrapers.classify import classify
+
+    records = []
+    for item in BeautifulSoup(html, "lxml").select(".product, .type-product, li.product"):
+        title = item.select_one(".woocommerce-loop-product__title, .product_title, h2, h3")
+        price = item.select_one(".price .amount, .woocommerce-Price-amount, bdi")
+        if not title or not price:
+            continue
+        set_code, product_type, language = classify(title.get_text())
+        match = re.search(r"[\d,]+\.?\d*", price.get_text())
+        if language == "japanese" and set_code and match:
+            records.append((set_code, product_type, float(match.group().replace(",", "")),
+                            "out of stock" not in item.get_text().lower()))
+    return records
+
+
+def _run(label, parse, pages, fetchers=4):
+    """Parse every page while *fetchers* threads simulate network waits."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=fetchers + 1) as threads:
+        waits = [threads.submit(time.sleep, 0.01) for _ in range(fetchers * 10)]
+        records = sum(len(parse(html)) for html in pages)
+        for w in waits:
+            w.result()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22}  {elapsed * 1000:>10,.1f}  {records / elapsed:>12,.0f}")
+
+
+def main():
+    args = _parse_args()
+    from app.scrapers import html_parse
+
+    pages = [_page(args.cards) for _ in range(args.pages)]
+    print(f"{args.pages} pages x {args.cards} cards, {args.processes} parse processes")
+    print(f"{'parser':<22}  {'total ms':>10}  {'records/s':>12}")
+    _run("bs4 (legacy)", _bs4, pages)
+    _run("lxml inline", html_parse.parse_fptradingcards, pages)
+
+    pool = html_parse.parse_pool(args.processes)
+    pool.submit(html_parse.parse_fptradingcards, pages[0]).result()   # warm the workers
+    start = time.perf_counter()
+    futures = [pool.submit(html_parse.parse_fptradingcards, html) for html in pages]
+    records = sum(len(f.result()) for f in futures)
+    elapsed = time.perf_counter() - start
+    print(f"{'lxml process pool':<22}  {elapsed * 1000:>10,.1f}  {records / elapsed:>12,.0f}")
+    html_parse.shutdown_parse_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+End-to-end scrape benchmark: ScraperManager.run_all() for Fuji Card Shop,
+Rare Cards Japan, PVP Shoppe and FP Trading Cards against recorded (or
+synthetic) HTTP traffic replayed by app.scrapers.cassette.
+
+Reports records/s, p50 / p95 fetch latency (as the scrapers see it: rate
+limiting and retries included), DB write time and peak RSS per run.
+
+Usage:
+    python scripts/bench_scrape.py                          # synthetic, 400 listings / store
+    python scripts/bench_scrape.py --listings 2000 --latency-ms 80 300 --fault 429@0.05
+    python scripts/bench_scrape.py --record cassettes/live.jsonl    # real network, saves traffic
+    python scripts/bench_scrape.py --cassette cassettes/live.jsonl  # replay that recording
+
+Recording needs network access and SHOPIFY_ADMIN_TOKEN (RCJ's Admin API).
+Each run writes into a temp SQLite database unless --database-url is given;
+the benchmark DROPS and recreates every table there.
+"""
+
+import argparse
+import logging
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TYPES = ("box", "case")
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="end-to-end scrape benchmark")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--cassette", help="replay this recording (default: synthetic traffic)")
+    source.add_argument("--record", help="scrape the live sites and record to this file")
+    parser.add_argument("--listings", type=int, default=400,
+                        help="synthetic listings per store")
+    parser.add_argument("--latency-ms", type=float, nargs=2, default=[50, 150],
+                        metavar=("P50", "P95"), help="injected replay latency")
+    parser.add_argument("--fault", action="append", default=[],
+                        help="inject errors: 429@0.05 (rate), 503/20 (every 20th), "
+                             "optional :host suffix")
+    parser.add_argument("--rate-limit", type=int, default=0,
+                        help="requests per minute per retailer (0 = unthrottled)")
+    parser.add_argument("--runs", type=int, default=2,
+                        help="runs; the first inserts, later ones are change-only heartbeats")
+    parser.add_argument("--streaming", action="store_true", help="use the streaming pipeline")
+    parser.add_argument("--database-url", help="scratch database (default: temp SQLite file)")
+    parser.add_argument("--verbose", action="store_true", help="keep scraper warnings and errors")
+    return parser.parse_args()
+
+
+def _scrapers():
+    from app.scrapers.fptradingcards_scraper import FPTradingCardsScraper
+    from app.scrapers.fujicardshop_scraper import FujiCardShopScraper
+    from app.scrapers.pvpshoppe_scraper import PVPShoppeScraper
+    from app.scrapers.rarecardsjapan_scraper import RareCardsJapanScraper
+
+    return [FujiCardShopScraper(), RareCardsJapanScraper(), PVPShoppeScraper(),
+            FPTradingCardsScraper()]
+
+
+# ---------------------------------------------------------------------------
+# Synthetic traffic
+# ---------------------------------------------------------------------------
+
+def _listings(n):
+    from app.scrapers.classify import SET_ALIASES
+
+    codes = list(SET_ALIASES)
+    for i in range(n):
+        code = codes[i % len(codes)]
+        kind = _TYPES[(i // len(codes)) % 2]
+        yield (f"{code} Booster {kind.title()} Japanese #{i}", f"{code.lower()}-{kind}-{i}",
+               round(60 + (i % (2 * len(codes))) * 7 + 0.99, 2), i % 9 != 0)
+
+
+def _synthetic(cassette, n):
+    """Answer every request the four scrapers make for *n* listings per store."""
+    from app.services import rcj_shopify
+
+    listings = list(_listings(n))
+    fuji, rcj, pvp, fp = _scrapers()
+
+    # Fuji: WooCommerce Store API, X-WP-TotalPages on every page
+    pages = max(1, -(-n // fuji.per_page))
+    for page in range(1, pages + 1):
+        chunk = listings[(page - 1) * fuji.per_page:page * fuji.per_page]
+        cassette.add_response("GET", fuji._page_url(page), body=[
+            {"name": title, "permalink": f"{fuji.base_url}/product/{slug}/",
+             "is_in_stock": stock,
+             "prices": {"price": str(int(price * 100)), "currency_minor_unit": 2,
+                        "currency_code": "USD"}}
+            for title, slug, price, stock in chunk
+        ], headers={"X-WP-TotalPages": str(pages)})
+
+    # RCJ: Admin GraphQL, 100 products per cursor page
+    endpoint = rcj_shopify._graphql_endpoint()
+    cursor = None
+    for start in range(0, max(n, 1), 100):
+        chunk = listings[start:start + 100]
+        following = f"c{start + 100}" if start + 100 < n else None
+        cassette.add_response("POST", endpoint, request_body={
+            "query": rcj_shopify._PRODUCTS_QUERY, "variables": {"cursor": cursor},
+        }, body={"data": {"products": {
+            "pageInfo": {"hasNextPage": following is not None, "endCursor": following},
+            "nodes": [{"title": title, "handle": slug, "variants": {"nodes": [
+                {"price": f"{price:.2f}", "inventoryQuantity": 3 if stock else 0,
+                 "availableForSale": stock}]}} for title, slug, price, stock in chunk],
+        }}})
+        cursor = following
+
+    # PVP Shoppe: Shopify products.json, requested PAGE_WINDOW pages at a time
+    for collection in pvp.collections:
+        pages = n // pvp.per_page + 1
+        pages += -pages % pvp.PAGE_WINDOW
+        for page in range(1, pages + 1):
+            chunk = listings[(page - 1) * pvp.per_page:page * pvp.per_page]
+            cassette.add_response("GET", pvp._page_url(collection, page), body={"products": [
+                {"title": title, "handle": slug,
+                 "variants": [{"price": f"{price:.2f}", "available": stock}]}
+                for title, slug, price, stock in chunk
+            ]})
+
+    # FP Trading Cards: one WooCommerce shop page
+    items = "".join(
+        f'<li class="product type-product"><a href="https://www.fptradingcards.com/product/{slug}/">'
+        f'<h2 class="woocommerce-loop-product__title">{title}</h2></a>'
+        f'<span class="price"><span class="woocommerce-Price-amount amount"><bdi>${price:.2f}'
+        f'</bdi></span></span>{"" if stock else "<p>Out of stock</p>"}</li>'
+        for title, slug, price, stock in listings
+    )
+    cassette.add_response("GET", fp.SHOP_URL, body=f"<ul class='products'>{items}</ul>",
+                          headers={"Content-Type": "text/html; charset=utf-8"})
+
+
+# ---------------------------------------------------------------------------
+# Instrumentation
+# ---------------------------------------------------------------------------
+
+def _instrument(fetch_times, write_times):
+    """Time every scraper fetch and every manager DB write."""
+    import functools
+
+    from app.scrapers.base_scraper import BaseScraper
+    from app.scrapers.scraper_manager import ScraperManager
+
+    fetch, fetch_async, write = BaseScraper.fetch, BaseScraper.fetch_async, ScraperManager._write
+
+    @functools.wraps(fetch)
+    def timed_fetch(self, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fetch(self, url, **kwargs)
+        finally:
+            fetch_times.append(time.perf_counter() - start)
+
+    @functools.wraps(fetch_async)
+    async def timed_fetch_async(self, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fetch_async(self, url, **kwargs)
+        finally:
+            fetch_times.append(time.perf_counter() - start)
+
+    @functools.wraps(write)
+    def timed_write(records):
+        start = time.perf_counter()
+        try:
+            return write(records)
+        finally:
+            write_times.append(time.perf_counter() - start)
+
+    BaseScraper.fetch, BaseScraper.fetch_async = timed_fetch, timed_fetch_async
+    ScraperManager._write = staticmethod(timed_write)
+
+
+def _seed(db, rate_limit):
+    from app.models.product import Product
+    from app.models.retailer import Retailer
+    from app.scrapers.classify import SET_ALIASES
+
+    db.session.add_all(Product(set_code=code, set_name=code, product_type=kind)
+                       for code in SET_ALIASES for kind in _TYPES)
+    db.session.add_all(Retailer(name=s.retailer_name, slug=s.retailer_slug,
+                                base_url="https://example.com", currency="USD",
+                                requests_per_minute=rate_limit, min_delay_seconds=0)
+                       for s in _scrapers())
+    db.session.commit()
+
+
+def _pct(values, q):
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def main():
+    args = _parse_args()
+    if not args.verbose:
+        logging.disable(logging.ERROR)
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    from app import create_app
+    from app.extensions import db
+    from app.models.schema import ensure_schema
+    from app.scrapers import cassette as cassettes
+    from app.scrapers.scraper_manager import ScraperManager
+    from app.utils import currency
+
+    app = create_app("development", start_scheduler=False)
+    app.config.update(SCRAPER_HTTP_CACHE=False, SCRAPER_STREAMING=args.streaming)
+
+    faults = [cassettes.Fault.parse(spec) for spec in args.fault]
+    latency = cassettes.Latency(*args.latency_ms)
+    if args.record:
+        cassette = cassettes.Cassette(args.record, mode=cassettes.RECORD)
+    else:
+        # Offline: pin FX to the built-in table and give RCJ a placeholder token.
+        # rcj_shopify reads credentials from the environment in worker threads.
+        currency._cache._fetched_at = time.monotonic()
+        os.environ.setdefault("SHOPIFY_ADMIN_TOKEN", "replay")
+        os.environ.setdefault("SHOPIFY_SHOP", app.config["SHOPIFY_SHOP"])
+        os.environ.setdefault("SHOPIFY_API_VERSION", app.config["SHOPIFY_API_VERSION"])
+        cassette = cassettes.Cassette(args.cassette, latency=latency, faults=faults)
+
+    fetch_times, write_times = [], []
+    _instrument(fetch_times, write_times)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        ensure_schema()
+        _seed(db, args.rate_limit)
+        if not args.record and not args.cassette:
+            _synthetic(cassette, args.listings)
+        print(f"source: {args.record or args.cassette or f'synthetic, {args.listings} listings/store'}"
+              f"  ({len(cassette)} recorded responses)")
+        print(f"{'run':>3}  {'records':>8}  {'wall s':>7}  {'rec/s':>9}  {'fetch p50':>9}  "
+              f"{'fetch p95':>9}  {'db write s':>10}  {'peak RSS MB':>11}  {'faults':>6}  "
+              f"{'misses':>6}")
+        for run in range(1, args.runs + 1):
+            fetch_times.clear()
+            write_times.clear()
+            manager = ScraperManager()
+            manager._scrapers = _scrapers()
+            with cassettes.use_cassette(cassette):
+                start = time.perf_counter()
+                results = manager.run_all()
+                wall = time.perf_counter() - start
+            records = sum(len(v) for v in results.values())
+            rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"{run:>3}  {records:>8}  {wall:>7.2f}  {records / wall:>9,.0f}  "
+                  f"{_pct(fetch_times, 50) * 1000:>7.0f}ms  {_pct(fetch_times, 95) * 1000:>7.0f}ms  "
+                  f"{sum(write_times):>10.3f}  {rss_mb:>11.1f}  {cassette.faulted:>6}  "
+                  f"{len(cassette.misses):>6}")
+            if args.record:
+                break
+        if not args.database_url:
+            db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
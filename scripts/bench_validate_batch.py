@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark price validation for one scrape: MedianCache (one windowed
+history query, then check_and_add in memory) vs validate_price_for_card
+per item.
+
+Usage:
+    python scripts/bench_validate_batch.py                      # temp SQLite file
+    python scripts/bench_validate_batch.py --database-url postgresql://...
+    python scripts/bench_validate_batch.py --items 200 1000 --history 60
+
+Point --database-url at a scratch database: the benchmark DROPS and
+recreates every table.
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="batched price validation benchmark")
+    parser.add_argument("--database-url", help="scratch database (default: temp SQLite file)")
+    parser.add_argument("--items", type=int, nargs="+", default=[200, 1_000, 5_000],
+                        help="scraped items per run (one product each)")
+    parser.add_argument("--history", type=int, default=60,
+                        help="price_history rows per product")
+    return parser.parse_args()
+
+
+def _seed(db, n_products, n_history):
+    from app.models.price import PriceHistory
+    from app.models.product import Product
+    from app.models.retailer import Retailer
+
+    products = [Product(set_code=f"B-{i:04d}", set_name="BENCH", product_type="box")
+                for i in range(n_products)]
+    retailer = Retailer(name="Bench", slug="bench", base_url="https://example.com")
+    db.session.add_all(products + [retailer])
+    db.session.flush()
+
+    now = datetime.utcnow()
+    rows = [
+        {"product_id": p.id, "retailer_id": retailer.id, "price": 100 + i % 10,
+         "price_usd": 100 + i % 10, "currency": "USD", "in_stock": True,
+         "scraped_at": now - timedelta(hours=i)}
+        for p in products for i in range(n_history)
+    ]
+    db.session.bulk_insert_mappings(PriceHistory, rows)
+    db.session.commit()
+    return [p.id for p in products], retailer.id
+
+
+def main():
+    args = _parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from app import create_app
+    from app.extensions import db
+    from app.utils.price_validator import validate_price_for_card
+    from app.utils.rolling_median import MedianCache
+
+    app = create_app("development", start_scheduler=False)
+    # Spikes are expected with random prices; keep the table readable.
+    logging.getLogger("app.utils.price_validator").setLevel(logging.ERROR)
+    print(f"{'items':>8}  {'per-item ms':>12}  {'batched ms':>12}  {'speedup':>8}")
+    with app.app_context():
+        for n in args.items:
+            db.drop_all()
+            db.create_all()
+            product_ids, retailer_id = _seed(db, n, args.history)
+            items = [(pid, random.uniform(50, 400)) for pid in product_ids]
+
+            start = time.perf_counter()
+            single = [validate_price_for_card(pid, price, retailer_id=retailer_id,
+                                              new_price=price, currency="USD")
+                      for pid, price in items]
+            t_single = time.perf_counter() - start
+
+            start = time.perf_counter()
+            cache = MedianCache()
+            cache.warm(retailer_ids=[retailer_id])
+            batched = [cache.check_and_add(pid, retailer_id, price) for pid, price in items]
+            t_batch = time.perf_counter() - start
+
+            assert [r.is_anomaly for r in single] == [r.is_anomaly for r in batched]
+            print(f"{n:>8}  {t_single * 1000:>12,.1f}  {t_batch * 1000:>12,.1f}  "
+                  f"{t_single / t_batch:>7.1f}x")
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression check for the hot SQL paths (app/utils/query_plans.py).
+
+Seeds a synthetic dataset, EXPLAINs every statement the hot paths issue and
+fails (exit 1) when one falls back to a full scan of a large table, or when
+a path is more than --max-slowdown times slower than the recorded baseline.
+
+Usage:
+    python scripts/check_query_plans.py                          # temp SQLite file
+    python scripts/check_query_plans.py --database-url postgresql://...
+    python scripts/check_query_plans.py --rows 200000 --plans
+    python scripts/check_query_plans.py --update-baseline        # record timings
+
+Baselines are per dialect and dataset size, in instance/query_plan_baseline.json
+by default. Point --database-url at a scratch database: the check DROPS and
+recreates every table.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 "instance", "query_plan_baseline.json")
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="hot-path query plan regression check")
+    parser.add_argument("--database-url", help="scratch database (default: temp SQLite file)")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="price_history rows to seed")
+    parser.add_argument("--products", type=int, default=400)
+    parser.add_argument("--retailers", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per hot path")
+    parser.add_argument("--baseline", default=_DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="record this run's timings instead of comparing")
+    parser.add_argument("--max-slowdown", type=float, default=2.0)
+    parser.add_argument("--plans", action="store_true", help="print every statement's plan")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "query_plans.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from app import create_app
+    from app.extensions import db
+    from app.models import partitioning
+    from app.models.schema import ensure_schema
+    from app.utils import query_plans
+
+    app = create_app("development", start_scheduler=False)
+    with app.app_context():
+        db.drop_all()
+        partitioning.invalidate()
+        db.create_all()
+        ensure_schema()
+        dialect = db.engine.dialect.name
+
+        start = time.perf_counter()
+        data = query_plans.seed_synthetic(args.rows, products=args.products,
+                                          retailers=args.retailers)
+        print(f"seeded {args.rows:,} history rows on {dialect} "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        reports = query_plans.check_hot_queries(data, repeat=args.repeat)
+        failed = False
+        print(f"{'hot path':<22}  {'median ms':>10}  full scans")
+        for report in reports:
+            print(f"{report.name:<22}  {report.median_ms:>10.2f}  "
+                  f"{', '.join(report.seq_scans) or '-'}")
+            if args.plans or report.seq_scans:
+                for stmt in report.statements:
+                    print(f"    {stmt.sql}")
+                    for line in stmt.plan:
+                        print(f"        {line}")
+            failed = failed or bool(report.seq_scans)
+
+        if args.update_baseline:
+            query_plans.save_baseline(args.baseline, dialect, args.rows, reports)
+            print(f"baseline recorded in {args.baseline}")
+        else:
+            baseline = query_plans.load_baseline(args.baseline)
+            for problem in query_plans.timing_regressions(
+                    reports, baseline, dialect, args.rows, max_slowdown=args.max_slowdown):
+                print(f"SLOWER  {problem}")
+                failed = True
+        db.drop_all()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
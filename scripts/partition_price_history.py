@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Convert price_history to monthly range partitions on scraped_at (Postgres).
+
+Usage:
+    python scripts/partition_price_history.py
+
+Needed once for a database that already holds price history; a fresh
+database is partitioned by ensure_schema(). The rows are copied into the
+partitioned table in one transaction under an exclusive lock, so scrapes and
+price syncs wait until it finishes — run it in a quiet window. Safe to
+re-run: an already partitioned table (or SQLite) is left untouched.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app import create_app
+from app.extensions import db
+import app.models  # noqa: F401
+from app.models.partitioning import monthly_partitions, partition_price_history
+from app.models.schema import ensure_schema
+
+
+def main():
+    app = create_app(start_scheduler=False)
+    with app.app_context():
+        db.create_all()
+        ensure_schema()
+        applied = partition_price_history()
+        if not applied:
+            print("price_history: nothing to do (already partitioned, or not Postgres)")
+            return
+        leaves = monthly_partitions()
+        print(f"price_history partitioned: {len(leaves)} monthly partitions "
+              f"({leaves[0][0]} .. {leaves[-1][0]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Backfill / rebuild the denormalized latest_prices table from price_history.
+
+Usage:
+    python scripts/rebuild_latest_prices.py
+
+Run once after deploying the latest_prices table, and any time it is suspected
+to have drifted from price_history. Safe to re-run: the table is cleared and
+repopulated in a single transaction.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app import create_app
+from app.extensions import db
+import app.models  # noqa: F401  (registers LatestPrice)
+from app.models.schema import ensure_schema
+from app.services.price_service import rebuild_latest_prices
+
+
+def main():
+    app = create_app(start_scheduler=False)
+    with app.app_context():
+        db.create_all()  # creates latest_prices if missing; no-op otherwise
+        ensure_schema()
+        count = rebuild_latest_prices()
+        print(f"latest_prices rebuilt: {count} (product, retailer) rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,7 @@ load_dotenv()
 
 from app import create_app
 from app.extensions import db
+from app.models.schema import ensure_schema
 import app.models  # noqa: F401  (registers all models incl. PriceSyncLog)
 from app.services.price_sync_service import run_price_sync
 
@@ -55,6 +56,7 @@ def main():
     app = create_app(start_scheduler=False)
     with app.app_context():
         db.create_all()  # creates price_sync_log if missing; no-op otherwise
+        ensure_schema()  # additive column/index upgrades on existing tables
 
         print("=" * 60)
         print("RCJ Price Sync")
@@ -18,6 +18,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from app import create_app
+from app.extensions import db
+from app.models.schema import ensure_schema
 from app.models.retailer import Retailer
 from app.scrapers.scraper_manager import ScraperManager
 
@@ -34,6 +36,9 @@ def list_retailers(app):
 def run_scrape(app, retailer_slug=None, limit=None, product_type=None):
     """Run scraping job"""
     with app.app_context():
+        db.create_all()
+        ensure_schema()  # bulk upserts need price_history.scrape_bucket
+
         print("=" * 50)
         print("OPTCG Price Tracker - Manual Scraper")
         print("=" * 50)
@@ -270,3 +270,29 @@ class TestAdminHealth:
         assert resp.status_code == 200
         data = resp.get_json()
         assert data["status"] == "ok"
+
+
+class TestAdminRunScraper:
+    """POST /admin/run-scraper"""
+
+    def test_runs_the_scrape_in_the_background(self, app, client, monkeypatch):
+        import threading
+        from unittest.mock import MagicMock
+
+        from app.scrapers.scraper_manager import ScraperManager
+
+        class _Inline:
+            def __init__(self, target, daemon=None):
+                self.target = target
+
+            def start(self):
+                self.target()
+
+        run_all = MagicMock(return_value={})
+        monkeypatch.setattr(ScraperManager, "run_all", run_all)
+        monkeypatch.setattr(threading, "Thread", _Inline)
+        monkeypatch.setitem(app.config, "SHOPIFY_ADMIN_TOKEN", "k")
+
+        resp = client.post("/admin/run-scraper", headers={"X-Admin-Key": "k"})
+        assert resp.status_code == 200
+        run_all.assert_called_once()
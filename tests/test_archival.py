@@ -0,0 +1,149 @@
+"""
+tests/test_archival.py
+
+Tests for the chunked archival engine (app.tasks.archival).
+
+Covers:
+  - Batches        -- rows move in keyset batches; counts and throughput are reported
+  - Resume         -- an interrupted run continues after its last committed batch
+  - Idempotency    -- rows already in price_archive are not copied twice
+  - Log tables     -- scrape_logs / scrape_runs / price_sync_log retention, scheduler
+                      entry points
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.archival_progress import ArchivalProgress
+from app.models.price import PriceHistory
+from app.models.price_archive import PriceArchive
+from app.tasks import archival
+
+
+def _age_prices(db_session, days, count=None):
+    rows = PriceHistory.query.order_by(PriceHistory.id).all()[:count]
+    for row in rows:
+        row.scraped_at = datetime.utcnow() - timedelta(days=days)
+    db_session.commit()
+    return rows
+
+
+class TestBatches:
+
+    def test_moves_old_prices_in_batches(self, app, db_session, sample_data, monkeypatch):
+        monkeypatch.setitem(app.config, "ARCHIVAL_BATCH_SIZE", 1)
+        _age_prices(db_session, 120, count=3)
+
+        stats = archival.archive_old_prices(90)
+        assert stats["records_removed"] == 3 and PriceHistory.query.count() == 1
+        assert stats["batches"] == 3 and stats["finished"] is True
+        assert stats["rows_per_second"] > 0
+        assert PriceArchive.query.count() == 3
+        assert db_session.get(ArchivalProgress, "price_history").finished_at is not None
+
+    def test_no_full_table_count(self, app, db_session, sample_data):
+        from sqlalchemy import event
+
+        from app.extensions import db
+
+        _age_prices(db_session, 120, count=2)
+        statements = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement.lower())
+
+        event.listen(db.engine, "before_cursor_execute", _record)
+        try:
+            assert archival.archive_old_prices(90)["records_removed"] == 2
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _record)
+        assert not [s for s in statements if "count(" in s and "price_history" in s]
+
+    def test_purge_archive(self, app, db_session, sample_data):
+        _age_prices(db_session, 400, count=2)
+        archival.archive_old_prices(90)
+        assert archival.purge_old_archive(365) == 2
+        assert PriceArchive.query.count() == 0
+
+
+class TestResume:
+
+    def test_interrupted_run_resumes(self, app, db_session, sample_data, monkeypatch):
+        monkeypatch.setitem(app.config, "ARCHIVAL_BATCH_SIZE", 2)
+        _age_prices(db_session, 120)
+        real_move = archival._move_batch
+        calls = []
+
+        def flaky(job, window, postgres):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            return real_move(job, window, postgres)
+
+        monkeypatch.setattr(archival, "_move_batch", flaky)
+        with pytest.raises(RuntimeError):
+            archival.archive_old_prices(90)
+
+        progress = db_session.get(ArchivalProgress, "price_history")
+        assert progress.finished_at is None and progress.rows_done == 2
+        first_cutoff = progress.cutoff
+
+        result = archival.run_job(archival.PRICE_HISTORY_JOB, datetime.utcnow())
+        assert result.resumed and result.finished and result.rows == 2
+        assert result.cutoff == first_cutoff
+        assert PriceHistory.query.count() == 0 and PriceArchive.query.count() == 4
+
+    def test_time_budget_stops_early(self, app, db_session, sample_data, monkeypatch):
+        monkeypatch.setitem(app.config, "ARCHIVAL_BATCH_SIZE", 1)
+        _age_prices(db_session, 120)
+        ticks = iter(range(0, 1000, 10))
+        monkeypatch.setattr(archival.time, "monotonic", lambda: next(ticks))
+
+        result = archival.run_job(archival.PRICE_HISTORY_JOB,
+                                  datetime.utcnow() - timedelta(days=90), max_seconds=25)
+        assert not result.finished and 0 < result.rows < 4
+
+
+class TestIdempotency:
+
+    def test_already_archived_rows_are_skipped(self, app, db_session, sample_data):
+        [row] = _age_prices(db_session, 120, count=1)
+        row_id = row.id
+        db_session.add(PriceArchive(id=row_id, product_id=row.product_id, price=1))
+        db_session.commit()
+
+        assert archival.archive_old_prices(90)["records_removed"] == 1
+        assert PriceArchive.query.count() == 1
+        assert float(db_session.get(PriceArchive, row_id).price) == 1
+
+
+class TestLogTables:
+
+    def test_scrape_and_sync_logs(self, app, db_session, sample_data):
+        from app.models.price_sync_log import PriceSyncLog
+        from app.models.scrape_log import ScrapeLog
+        from app.models.scrape_run import ScrapeRun
+
+        old = datetime.utcnow() - timedelta(days=400)
+        retailer_id = sample_data["retailer_ebay"].id
+        db_session.add_all([
+            ScrapeLog(retailer_id=retailer_id, started_at=old),
+            ScrapeLog(retailer_id=retailer_id, started_at=datetime.utcnow()),
+            PriceSyncLog(set_code="OP-01", action="held", created_at=old),
+            PriceSyncLog(set_code="OP-01", action="held", created_at=datetime.utcnow()),
+            ScrapeRun(run_id="old", retailer_slug="ebay", retailer_name="eBay", started_at=old),
+            ScrapeRun(run_id="new", retailer_slug="ebay", retailer_name="eBay"),
+        ])
+        db_session.commit()
+
+        assert archival.cleanup_stale_scrape_logs(days=90) == 1
+        assert archival.cleanup_price_sync_log() == 1
+        assert archival.cleanup_scrape_runs() == 1
+        assert ScrapeLog.query.count() == 1 and PriceSyncLog.query.count() == 1
+        assert [r.run_id for r in ScrapeRun.query.all()] == ["new"]
+
+    def test_run_archival_task_summary(self, app, db_session, sample_data):
+        summary = archival.run_archival_task()
+        assert set(summary) == {"archived", "archived_rows_per_second", "cold_rows", "purged",
+                                "scrape_logs", "scrape_runs", "price_sync_log"}
@@ -0,0 +1,205 @@
+"""
+tests/test_circuit_breaker.py
+
+Unit tests for the per-retailer circuit breaker (app.utils.circuit_breaker).
+
+Covers:
+  - Transitions    -- threshold opens, cooldown half-opens, probe closes / re-opens
+  - Failure kinds  -- transport errors, 403 / 429 / 5xx count; 404 does not
+  - BaseScraper    -- fetch() fails fast once open; one half-open probe at a time
+  - Manager        -- open circuits skip the run; state persists in scraper_circuits
+  - Health JSON    -- /admin/health/json reports the circuit
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from app.utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    is_failure,
+)
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status}", response=response)
+
+
+def _expire(breaker):
+    breaker.opened_at = datetime.utcnow() - breaker.cooldown - timedelta(seconds=1)
+
+
+class TestTransitions:
+
+    def test_threshold_opens(self):
+        breaker = CircuitBreaker("shop", failure_threshold=3)
+        for _ in range(2):
+            breaker.record_failure("boom")
+        assert breaker.state == CLOSED and breaker.allow_run()
+        breaker.record_failure("boom")
+        assert breaker.state == OPEN and not breaker.allow_run()
+        assert breaker.retry_at() == breaker.opened_at + breaker.cooldown
+
+    def test_success_resets_count(self):
+        breaker = CircuitBreaker("shop", failure_threshold=2)
+        breaker.record_failure("boom")
+        breaker.record_success()
+        breaker.record_failure("boom")
+        assert breaker.state == CLOSED and breaker.consecutive_failures == 1
+
+    def test_cooldown_half_opens_and_probe_decides(self):
+        breaker = CircuitBreaker("shop", failure_threshold=1)
+        breaker.record_failure("boom")
+        _expire(breaker)
+        assert breaker.allow_run() and breaker.state == HALF_OPEN
+
+        breaker.record_failure("still down")
+        assert breaker.state == OPEN          # a bad probe re-opens immediately
+        _expire(breaker)
+        breaker.allow_run()
+        breaker.record_success()
+        assert breaker.state == CLOSED and breaker.consecutive_failures == 0
+
+    def test_failure_kinds(self):
+        assert is_failure(requests.ConnectionError("reset"))
+        assert is_failure(_http_error(403)) and is_failure(_http_error(429))
+        assert is_failure(_http_error(503))
+        assert not is_failure(_http_error(404))
+        assert not is_failure(CircuitOpenError("open"))
+
+    def test_parser_errors_are_neutral(self):
+        import httpx
+
+        assert is_failure(requests.Timeout("slow")) and is_failure(httpx.ConnectTimeout("slow"))
+        assert not is_failure(KeyError("price")) and not is_failure(ValueError("bad json"))
+
+
+class TestScraperIntegration:
+
+    @staticmethod
+    def _scraper(monkeypatch, session):
+        from app.scrapers.fujicardshop_scraper import FujiCardShopScraper
+
+        scraper = FujiCardShopScraper()
+        monkeypatch.setattr(scraper, "_get_session", lambda: session)
+        return scraper
+
+    def test_fetch_fails_fast_when_open(self, monkeypatch):
+        session = MagicMock()
+        session.get.side_effect = requests.ConnectionError("reset")
+        scraper = self._scraper(monkeypatch, session)
+        scraper.attach_circuit(CircuitBreaker("fujicardshop", failure_threshold=2))
+
+        for _ in range(2):
+            with pytest.raises(requests.ConnectionError):
+                scraper.fetch("https://www.fujicardshop.com/x")
+        with pytest.raises(CircuitOpenError):
+            scraper.fetch("https://www.fujicardshop.com/x")
+        assert session.get.call_count == 2
+        assert scraper.get_status()["circuit"]["state"] == OPEN
+
+    def test_run_failure_counted_once(self, monkeypatch):
+        session = MagicMock()
+        session.get.side_effect = requests.ConnectionError("reset")
+        scraper = self._scraper(monkeypatch, session)
+        breaker = CircuitBreaker("fujicardshop")
+        scraper.attach_circuit(breaker)
+        monkeypatch.setattr(scraper, "scrape",
+                            lambda: scraper.fetch("https://www.fujicardshop.com/x"))
+
+        assert scraper.run() == []
+        assert breaker.consecutive_failures == 1
+
+    def test_parser_error_leaves_circuit_closed(self, monkeypatch):
+        scraper = self._scraper(monkeypatch, MagicMock())
+        breaker = CircuitBreaker("fujicardshop", failure_threshold=1)
+        scraper.attach_circuit(breaker)
+
+        def scrape():
+            raise KeyError("price")
+
+        monkeypatch.setattr(scraper, "scrape", scrape)
+        assert scraper.run() == []
+        assert breaker.state == CLOSED and breaker.consecutive_failures == 0
+
+    def test_half_open_lets_one_probe_through(self, monkeypatch):
+        release, in_flight = threading.Event(), []
+
+        def slow_get(url, **kwargs):
+            in_flight.append(url)
+            release.wait(5)
+            return MagicMock(status_code=200)
+
+        session = MagicMock()
+        session.get.side_effect = slow_get
+        scraper = self._scraper(monkeypatch, session)
+        breaker = CircuitBreaker("fujicardshop", failure_threshold=1)
+        breaker.record_failure("down")
+        _expire(breaker)
+        scraper.attach_circuit(breaker)
+
+        threads = [threading.Thread(target=scraper.fetch, args=(f"https://www.fujicardshop.com/{i}",))
+                   for i in range(3)]
+        for t in threads:
+            t.start()
+        time.sleep(0.2)
+        assert len(in_flight) == 1            # the others wait on the probe
+        release.set()
+        for t in threads:
+            t.join(5)
+        assert len(in_flight) == 3 and breaker.state == CLOSED
+
+
+class TestManager:
+
+    def test_open_circuit_skips_run_and_persists(self, app, db_session, sample_data):
+        from app.models.scraper_circuit import ScraperCircuit
+        from app.scrapers.base_scraper import BaseScraper
+        from app.scrapers.scraper_manager import ScraperManager
+
+        calls = []
+
+        class _Down(BaseScraper):
+            retailer_name = "eBay"
+            retailer_slug = "ebay"
+
+            def scrape(self):
+                calls.append(1)
+                raise requests.ConnectionError("reset")
+
+        app.config["SCRAPER_CIRCUIT_FAILURES"] = 2
+        try:
+            for _ in range(3):
+                manager = ScraperManager()
+                manager._scrapers = [_Down()]
+                assert manager.run_all() == {"eBay": []}
+        finally:
+            app.config["SCRAPER_CIRCUIT_FAILURES"] = 5
+
+        assert len(calls) == 2                # the third run was skipped
+        row = db_session.get(ScraperCircuit, "ebay")
+        assert row.state == OPEN and row.consecutive_failures == 2
+        assert "ConnectionError" in row.last_error
+
+    def test_health_json_reports_circuit(self, client, db_session, sample_data):
+        from app.models.scraper_circuit import ScraperCircuit
+
+        db_session.add(ScraperCircuit(retailer_slug="ebay", state=OPEN, consecutive_failures=5,
+                                      opened_at=datetime.utcnow()))
+        db_session.commit()
+
+        data = client.get("/admin/health/json").get_json()
+        circuit = data["eBay"]["circuit"]
+        assert circuit["state"] == OPEN and circuit["consecutive_failures"] == 5
+        assert isinstance(circuit["retry_at"], str)
+        assert client.get("/admin/health").status_code == 200
@@ -0,0 +1,216 @@
+"""
+tests/test_cold_store.py
+
+Tests for the columnar cold tier (app.utils.cold_store) and its use by the
+archival task, the chart service and the export API.
+
+Covers:
+  - Format         -- round trip of every column, NULLs and currencies; size
+  - Reader         -- product / date range / retailer filters; bad files; a map
+                      evicted while leased stays readable
+  - Archival       -- fully archived months are exported before the purge, and
+                      the purge keeps any month the store does not hold
+  - Read paths     -- raw charts and exports include cold rows
+"""
+
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.utils.cold_store import ColdStore, ColdStoreError, month_file
+
+
+def _rows(n, product_id=1, start=datetime(2025, 3, 1)):
+    return [{"product_id": product_id, "retailer_id": 1 + i % 3,
+             "scraped_at": start + timedelta(hours=i), "price": Decimal("55.00") + i % 4,
+             "price_usd": None if i % 5 == 0 else Decimal("55.10"),
+             "currency": "JPY" if i % 2 else "USD", "in_stock": None if i == 7 else i % 3 != 0}
+            for i in range(n)]
+
+
+class TestFormat:
+
+    def test_round_trip(self, tmp_path):
+        store = ColdStore(str(tmp_path))
+        rows = _rows(50) + _rows(10, product_id=2)
+        assert store.write_month(datetime(2025, 3, 1), rows) == 60
+
+        back = store.read(1)
+        assert len(back) == 50
+        expected = sorted(rows[:50], key=lambda r: r["scraped_at"])
+        for got, want in zip(back, expected):
+            assert (got.retailer_id, got.scraped_at, got.price, got.price_usd,
+                    got.currency, got.in_stock) == (
+                want["retailer_id"], want["scraped_at"], want["price"], want["price_usd"],
+                want["currency"], want["in_stock"])
+        assert store.product_ids() == [1, 2]
+
+    def test_compact(self, tmp_path):
+        store = ColdStore(str(tmp_path))
+        store.write_month(datetime(2025, 3, 1), _rows(20000))
+        size = os.path.getsize(tmp_path / month_file(datetime(2025, 3, 1)))
+        assert size < 20000 * 4      # the row store spends well over 50 bytes a row
+
+
+class TestReader:
+
+    def test_filters(self, tmp_path):
+        store = ColdStore(str(tmp_path))
+        store.write_month(datetime(2025, 3, 1), _rows(24 * 31))
+        store.write_month(datetime(2025, 4, 1), _rows(24, start=datetime(2025, 4, 1)))
+
+        since, until = datetime(2025, 3, 31), datetime(2025, 4, 1, 6)
+        rows = store.read(1, since=since, until=until, retailer_id=2)
+        assert rows and all(since <= r.scraped_at < until and r.retailer_id == 2 for r in rows)
+        assert store.read(99) == []
+        assert store.months() == [datetime(2025, 3, 1), datetime(2025, 4, 1)]
+
+    def test_rejects_truncated_file(self, tmp_path):
+        store = ColdStore(str(tmp_path))
+        store.write_month(datetime(2025, 3, 1), _rows(10))
+        path = tmp_path / month_file(datetime(2025, 3, 1))
+        path.write_bytes(path.read_bytes()[:-3])
+        with pytest.raises(ColdStoreError):
+            store.read(1)
+
+
+    def test_evicted_map_outlives_its_reader(self, tmp_path):
+        store = ColdStore(str(tmp_path), open_files=1)
+        march, april = datetime(2025, 3, 1), datetime(2025, 4, 1)
+        store.write_month(march, _rows(24))
+        store.write_month(april, _rows(24, start=april))
+
+        with store._lease(store.path(march)) as leased:
+            assert len(store.read(1)) == 48          # opens April, evicting March
+            assert not leased.mm.closed
+            assert len(leased.read(1)) == 24
+        assert leased.mm.closed
+
+        store.close()
+        assert len(store.read(1)) == 48
+
+    def test_concurrent_reads_past_open_files(self, tmp_path):
+        import threading
+
+        store = ColdStore(str(tmp_path), open_files=1)
+        for m in range(3, 7):
+            store.write_month(datetime(2025, m, 1), _rows(2000, start=datetime(2025, m, 1)))
+        errors = []
+
+        def reader():
+            try:
+                for _ in range(20):
+                    assert len(store.read(1)) == 8000
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+
+        threads = [threading.Thread(target=reader) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+
+
+@pytest.fixture
+def cold_app(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "COLD_STORE_ENABLED", True)
+    monkeypatch.setitem(app.config, "COLD_STORE_DIR", str(tmp_path))
+    return app
+
+
+def _archive_two_months(db_session, sample_data):
+    from app.models.price import PriceHistory
+    from app.tasks import archival
+
+    from app.models.partitioning import add_months, month_start
+
+    pid, rid = sample_data["product_box"].id, sample_data["retailer_ebay"].id
+    for months_back in (7, 6):
+        month = add_months(month_start(datetime.utcnow()), -months_back)
+        for day in range(3):
+            db_session.add(PriceHistory(product_id=pid, retailer_id=rid, price=40 + day,
+                                        currency="USD", scraped_at=month + timedelta(days=day)))
+    db_session.commit()
+    archival.archive_old_prices(90)
+    return archival.export_cold_months(90)
+
+
+class TestArchival:
+
+    def test_exports_archived_months(self, cold_app, db_session, sample_data, tmp_path):
+        from app.models.price_archive import PriceArchive
+        from app.tasks import archival
+
+        from app.models.partitioning import add_months, month_start
+
+        assert _archive_two_months(db_session, sample_data) == 6
+        first = add_months(month_start(datetime.utcnow()), -7)
+        # The two archived months, then empty files up to the archive cutoff.
+        months = ColdStore(str(tmp_path)).months()
+        assert months[:2] == [first, add_months(first, 1)] and len(months) >= 3
+        assert archival.export_cold_months(90) == 0          # already on disk
+
+        archival.purge_old_archive(0)
+        assert PriceArchive.query.count() == 0
+        pid = sample_data["product_box"].id
+        assert len(ColdStore(str(tmp_path)).read(pid)) == 6
+
+    def test_waits_for_unfinished_archival(self, cold_app, db_session, sample_data, tmp_path):
+        from app.models.price import PriceHistory
+        from app.tasks import archival
+
+        _archive_two_months(db_session, sample_data)
+        for f in tmp_path.iterdir():
+            f.unlink()
+        old = datetime.utcnow() - timedelta(days=400)
+        db_session.add(PriceHistory(product_id=sample_data["product_box"].id,
+                                    retailer_id=sample_data["retailer_ebay"].id,
+                                    price=1, scraped_at=old))
+        db_session.commit()
+        assert archival.export_cold_months(90) == 0
+
+
+    def test_purge_keeps_months_missing_from_the_store(self, cold_app, db_session,
+                                                      sample_data, tmp_path):
+        from app.models.partitioning import add_months, month_start
+        from app.models.price_archive import PriceArchive
+        from app.tasks import archival
+
+        _archive_two_months(db_session, sample_data)
+        newer = add_months(month_start(datetime.utcnow()), -6)
+        (tmp_path / month_file(newer)).unlink()       # e.g. lost with an ephemeral disk
+
+        archival.purge_old_archive(0)
+        assert PriceArchive.query.count() == 3
+        assert all(r.scraped_at >= newer for r in PriceArchive.query.all())
+
+    def test_no_directory_means_no_purge(self, cold_app, db_session, sample_data, monkeypatch):
+        from app.models.price_archive import PriceArchive
+        from app.tasks import archival
+        from app.utils.cold_store import get_cold_store
+
+        monkeypatch.setitem(cold_app.config, "COLD_STORE_DIR", None)
+        assert _archive_two_months(db_session, sample_data) == 0
+        assert get_cold_store() is None
+        archival.purge_old_archive(0)
+        assert PriceArchive.query.count() == 6
+
+
+class TestReadPaths:
+
+    def test_chart_and_export(self, cold_app, client, db_session, sample_data):
+        from app.services.chart_service import ChartService
+
+        _archive_two_months(db_session, sample_data)
+        pid = sample_data["product_box"].id
+
+        chart = ChartService().get_price_chart_data(pid, days=400, resolution="raw")
+        ebay = next(ds for ds in chart["datasets"] if ds["label"] == "eBay")
+        assert len(ebay["data"]) == 7           # six cold points + today's fixture row
+
+        rows = client.get(f"/api/export/prices/{pid}.json").get_json()
+        assert len(rows) == 8 and rows[0]["retailer"] == "eBay"
+        assert rows[0]["scraped_at"] < rows[-1]["scraped_at"]
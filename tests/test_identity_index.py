@@ -0,0 +1,163 @@
+"""
+tests/test_identity_index.py
+
+Unit tests for the process-wide identity index (app.utils.identity_index).
+
+Covers:
+  - Lookups        -- products by (set_code, product_type), retailers by slug or name
+  - One load       -- repeated lookups, across threads, cost a single query
+  - Invalidation   -- a new Product is visible to the next lookup
+  - Other writers  -- rows added outside this process are found on a miss
+  - Ingestion      -- ScraperManager._persist and /api/prices/upload use it
+"""
+
+import threading
+
+from sqlalchemy import event
+
+from app.utils.identity_index import identity_index, product_id_for, retailer_id_for
+
+
+def _statements(fn):
+    """Run *fn* and return the SQL statements it sent."""
+    from app.extensions import db as _db
+
+    seen = []
+
+    def _before(conn, cursor, statement, *args, **kwargs):
+        seen.append(statement)
+
+    engine = _db.engine
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+    return seen
+
+
+class TestIdentityIndex:
+
+    def test_resolves_products_and_retailers(self, app, sample_data):
+        with app.app_context():
+            assert product_id_for("OP-01", "box") == sample_data["product_box"].id
+            assert product_id_for("OP-01", "case") == sample_data["product_case"].id
+            assert product_id_for("OP-99", "box") is None
+            assert retailer_id_for(slug="ebay") == sample_data["retailer_ebay"].id
+            assert retailer_id_for(name="Amazon Japan") == sample_data["retailer_amazon"].id
+            assert retailer_id_for(slug="nope") is None
+
+    def test_one_query_for_many_lookups_and_threads(self, app, sample_data):
+        with app.app_context():
+            identity_index().invalidate()
+
+            def _lookups():
+                for _ in range(50):
+                    product_id_for("OP-01", "box")
+                    retailer_id_for(slug="ebay")
+
+            def _threaded():
+                def _worker():
+                    with app.app_context():
+                        _lookups()
+                threads = [threading.Thread(target=_worker) for _ in range(4)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                _lookups()
+
+            assert len(_statements(_threaded)) == 1
+
+    def test_new_product_invalidates(self, app, sample_data, db_session):
+        with app.app_context():
+            from app.models.product import Product
+            assert product_id_for("OP-02", "box") is None
+            product = Product(set_code="OP-02", set_name="PARAMOUNT WAR", product_type="box")
+            db_session.add(product)
+            db_session.commit()
+            assert product_id_for("OP-02", "box") == product.id
+
+
+class TestOtherWriters:
+    """Rows inserted by another process: no session event reaches this index."""
+
+    @staticmethod
+    def _insert_elsewhere(sql, **params):
+        from sqlalchemy import text
+        from app.extensions import db as _db
+
+        with _db.engine.begin() as conn:
+            conn.execute(text(sql), params)
+
+    def test_miss_falls_back_to_the_database(self, app, sample_data):
+        with app.app_context():
+            assert product_id_for("OP-03", "box") is None
+            self._insert_elsewhere(
+                "INSERT INTO products (set_code, set_name, product_type) "
+                "VALUES ('OP-03', 'PILLARS OF STRENGTH', 'box')")
+            self._insert_elsewhere(
+                "INSERT INTO retailers (name, slug, base_url) "
+                "VALUES ('Card Shop', 'card-shop', 'https://example.com')")
+            pid = product_id_for("OP-03", "box")
+            assert pid is not None
+            assert retailer_id_for(slug="card-shop") is not None
+            assert _statements(lambda: product_id_for("OP-03", "box")) == []
+
+    def test_ingest_fuji_reuses_product_added_elsewhere(self, app, client, sample_data):
+        with app.app_context():
+            from app.models.product import Product
+            saved = app.config.get("SHOPIFY_ADMIN_TOKEN")
+            app.config["SHOPIFY_ADMIN_TOKEN"] = "k"
+            try:
+                product_id_for("OP-01", "box")          # warm
+                self._insert_elsewhere(
+                    "INSERT INTO retailers (name, slug, base_url) "
+                    "VALUES ('FujiCardShop', 'fujicardshop', 'https://fujicardshop.com')")
+                self._insert_elsewhere(
+                    "INSERT INTO products (set_code, set_name, product_type) "
+                    "VALUES ('OP-04', 'KINGDOMS OF INTRIGUE', 'box')")
+                resp = client.post("/admin/ingest-fuji", headers={"X-Ingest-Key": "k"},
+                                   json={"fuji": [{"set_code": "OP-04", "product_type": "box",
+                                                   "price_usd": 90.0}]})
+                assert resp.status_code == 200 and resp.get_json()["ingested"] == 1
+                assert Product.query.filter_by(set_code="OP-04").count() == 1
+            finally:
+                app.config["SHOPIFY_ADMIN_TOKEN"] = saved
+
+
+class TestIngestionPaths:
+
+    def test_persist_resolves_from_index(self, app, sample_data):
+        with app.app_context():
+            from app.models.price import PriceHistory
+            from app.scrapers.scraper_manager import ScraperManager
+
+            scraper = type("S", (), {"retailer_name": "eBay", "retailer_slug": "ebay"})()
+            records = [{"set_code": "OP-01", "product_type": pt, "price": 55.0,
+                        "price_usd": 55.0, "currency": "USD"} for pt in ("box", "case")]
+            records.append({"set_code": "OP-99", "product_type": "box", "price": 1.0})
+            before = PriceHistory.query.count()
+            product_id_for("OP-01", "box")          # warm
+
+            manager = ScraperManager()
+            sent = _statements(lambda: manager._persist(scraper, records))
+            assert PriceHistory.query.count() == before + 2
+            # Only the unknown OP-99 misses and is checked against the database.
+            assert len([q for q in sent if "FROM products" in q]) == 1
+            assert not any("FROM retailers" in q for q in sent)
+
+    def test_upload_endpoint_uses_index(self, app, client, sample_data):
+        with app.app_context():
+            from app.models.latest_price import LatestPrice
+            resp = client.post("/api/prices/upload", json={"prices": [
+                {"set_code": "OP-01", "product_type": "box", "retailer_slug": "ebay",
+                 "price": 57.0, "currency": "USD"},
+                {"set_code": "OP-99", "product_type": "box", "retailer_slug": "ebay",
+                 "price": 1.0},
+            ]})
+            assert resp.get_json()["prices_added"] == 1
+            row = LatestPrice.query.filter_by(
+                product_id=sample_data["product_box"].id,
+                retailer_id=sample_data["retailer_ebay"].id).one()
+            assert float(row.price) == 57.0
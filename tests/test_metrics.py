@@ -0,0 +1,134 @@
+"""
+tests/test_metrics.py
+
+Unit tests for the /metrics registry (app.utils.metrics).
+
+Covers:
+  - Exposition     -- counters and cumulative histogram buckets in the text format
+  - Multiprocess   -- /metrics sums the snapshot files of other workers
+  - Flask          -- per-endpoint latency and per-request SQL counts
+  - Hot paths      -- BaseScraper.fetch latency, Shopify GraphQL latency / throttles
+"""
+
+import json
+import os
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from app.utils import metrics
+from app.utils.metrics import REGISTRY
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    saved = REGISTRY.multiproc_dir
+    REGISTRY.configure(None)
+    REGISTRY.reset()
+    yield
+    REGISTRY.configure(saved)
+    REGISTRY.reset()
+
+
+def _sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+class TestExposition:
+
+    def test_histogram_buckets_are_cumulative(self):
+        for value in (0.003, 0.2, 7.0):
+            metrics.FETCH_SECONDS.observe(value, retailer="shop")
+        text = REGISTRY.render()
+        assert "# TYPE scraper_fetch_seconds histogram" in text
+        assert _sample(text, 'scraper_fetch_seconds_bucket{retailer="shop",le="0.005"}') == 1
+        assert _sample(text, 'scraper_fetch_seconds_bucket{retailer="shop",le="0.25"}') == 2
+        assert _sample(text, 'scraper_fetch_seconds_bucket{retailer="shop",le="+Inf"}') == 3
+        assert _sample(text, 'scraper_fetch_seconds_count{retailer="shop"}') == 3
+        assert _sample(text, 'scraper_fetch_seconds_sum{retailer="shop"}') == pytest.approx(7.203)
+
+    def test_counter_and_label_checks(self):
+        metrics.SHOPIFY_THROTTLED.inc(client="rcj")
+        metrics.SHOPIFY_THROTTLED.inc(2, client="rcj")
+        assert _sample(REGISTRY.render(), 'shopify_graphql_throttled_total{client="rcj"}') == 3
+        with pytest.raises(ValueError):
+            metrics.SHOPIFY_THROTTLED.inc(shop="x")
+
+    def test_graphql_operation(self):
+        assert metrics.graphql_operation("query ReportOrders($a: Int) { orders }") == "ReportOrders"
+        assert metrics.graphql_operation("query($cursor: String) {\n  products { id } }") == "products"
+
+
+class TestMultiprocess:
+
+    def test_sums_other_workers(self, tmp_path):
+        REGISTRY.configure(str(tmp_path))
+        metrics.SHOPIFY_THROTTLED.inc(client="report")
+        REGISTRY.flush()
+        assert (tmp_path / f"metrics_{os.getpid()}.json").exists()
+
+        other = {"shopify_graphql_throttled_total": {json.dumps(["report"]): 4.0},
+                 "scraper_fetch_seconds": {json.dumps(["shop"]): [1] * 12 + [0.001, 1]}}
+        (tmp_path / "metrics_999999.json").write_text(json.dumps(other))
+
+        text = REGISTRY.render()
+        assert _sample(text, 'shopify_graphql_throttled_total{client="report"}') == 5
+        assert _sample(text, 'scraper_fetch_seconds_count{retailer="shop"}') == 1
+
+
+class TestFlask:
+
+    def test_request_latency_and_query_count(self, client, db_session, sample_data):
+        assert client.get("/admin/health/json").status_code == 200
+        text = client.get("/metrics").get_data(as_text=True)
+
+        key = 'http_request_duration_seconds_count{endpoint="admin.health_json",method="GET",status="200"}'
+        assert _sample(text, key) == 1
+        queries = _sample(text, 'http_request_db_queries_sum{endpoint="admin.health_json"}')
+        assert queries is not None and queries >= 2
+
+
+class TestHotPaths:
+
+    def test_fetch_observed_per_retailer(self, monkeypatch):
+        from app.scrapers.fujicardshop_scraper import FujiCardShopScraper
+
+        scraper = FujiCardShopScraper()
+        session = MagicMock()
+        monkeypatch.setattr(scraper, "_get_session", lambda: session)
+        scraper.fetch("https://www.fujicardshop.com/x")
+        assert metrics.FETCH_SECONDS.snapshot()[("fujicardshop",)][-1] == 1
+
+    def test_report_client_counts_throttles(self):
+        from app.reporting.sources import ReportSourceError, ShopifyReportClient
+
+        throttled = Mock(status_code=200, headers={"X-Shopify-API-Version": "2026-07"})
+        throttled.json.return_value = {"errors": [{"message": "Throttled",
+                                                   "extensions": {"code": "THROTTLED"}}]}
+        for response in (Mock(status_code=429, headers={}), throttled):
+            session = Mock()
+            session.post.return_value = response
+            client = ShopifyReportClient(shop="example.myshopify.com", token="secret",
+                                         api_version="2026-07", session=session,
+                                         max_retries=0, sleeper=lambda _: None)
+            with pytest.raises(ReportSourceError):
+                client.graphql(ShopifyReportClient.BOOTSTRAP_QUERY)
+
+        assert metrics.SHOPIFY_THROTTLED.snapshot()[("report",)] == 2
+        assert metrics.SHOPIFY_GRAPHQL_SECONDS.snapshot()[("report", "ReportBootstrap")][-1] == 2
+
+    def test_rcj_counts_throttles(self, app, monkeypatch):
+        from app.services import rcj_shopify
+
+        resp = Mock(status_code=200)
+        resp.json.return_value = {"errors": [{"extensions": {"code": "THROTTLED"}}]}
+        http = Mock()
+        http.post.return_value = resp
+        with app.app_context():
+            rcj_shopify._graphql_post(http, "t", rcj_shopify._PRODUCTS_QUERY, {}, timeout=5,
+                                      operation="products")
+        assert metrics.SHOPIFY_THROTTLED.snapshot()[("rcj",)] == 1
+        assert metrics.SHOPIFY_GRAPHQL_SECONDS.snapshot()[("rcj", "products")][-1] == 1
@@ -0,0 +1,114 @@
+"""
+tests/test_partitioning.py
+
+Tests for the monthly price_history partitioning (app.models.partitioning)
+and the partition-aware archival task (app.tasks.archival).
+
+Covers:
+  - Naming         -- month arithmetic, leaf names and their DDL
+  - SQLite         -- every helper falls back to the single-table layout
+  - Bulk writes    -- a partitioned table is written through the month's leaf
+  - Archival       -- old months are detached / dropped instead of copied
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.models import partitioning
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state():
+    partitioning.invalidate()
+    yield
+    partitioning.invalidate()
+
+
+class TestNaming:
+
+    def test_months(self):
+        assert partitioning.add_months(datetime(2026, 11, 1), 3) == datetime(2027, 2, 1)
+        assert partitioning.add_months(datetime(2026, 1, 1), -1) == datetime(2025, 12, 1)
+        assert partitioning.months_between(datetime(2026, 11, 30, 23), datetime(2027, 1, 2)) == [
+            datetime(2026, 11, 1), datetime(2026, 12, 1), datetime(2027, 1, 1)]
+
+    def test_names_round_trip(self):
+        name = partitioning.partition_name(datetime(2026, 10, 17, 5))
+        assert name == "price_history_p2026_10"
+        assert partitioning.partition_month(name) == datetime(2026, 10, 1)
+        assert partitioning.partition_month("price_archive_p2025_02") == datetime(2025, 2, 1)
+        assert partitioning.partition_month("price_history_default") is None
+
+    def test_ddl(self):
+        create, index = partitioning.partition_ddl(datetime(2026, 12, 1))
+        assert "PARTITION OF price_history" in create
+        assert "FROM ('2026-12-01') TO ('2027-01-01')" in create
+        assert "price_history_p2026_12 (product_id, retailer_id, scrape_bucket)" in index
+
+
+class TestSqliteFallback:
+
+    def test_helpers_are_noops(self, app, db_session):
+        from app.models.price import PriceHistory
+        from app.models.schema import ensure_schema
+
+        assert partitioning.is_partitioned() is False
+        assert partitioning.ensure_partitions() == []
+        assert partitioning.partition_price_history() == []
+        assert partitioning.insert_table(datetime.utcnow()) is PriceHistory.__table__
+        assert not any("PARTITION" in stmt for stmt in ensure_schema())
+
+    def test_archival_moves_rows(self, app, db_session, sample_data):
+        from app.models.price import PriceHistory
+        from app.tasks.archival import archive_old_prices
+
+        old = PriceHistory.query.first()
+        old.scraped_at = datetime.utcnow() - timedelta(days=120)
+        db_session.commit()
+
+        assert archive_old_prices(90)["records_removed"] == 1
+        assert PriceHistory.query.count() == 3
+
+
+class TestPartitioned:
+
+    @pytest.fixture
+    def partitioned(self, monkeypatch):
+        leaves = {"price_history_p2026_08", "price_history_p2026_09",
+                  "price_history_p2026_10", "price_history_default"}
+        monkeypatch.setattr(partitioning, "_is_postgres", lambda: True)
+        monkeypatch.setattr(partitioning, "_cached_state", lambda: (True, leaves))
+        return leaves
+
+    def test_insert_table_is_the_leaf(self, app, partitioned):
+        table = partitioning.insert_table(datetime(2026, 10, 17, 12))
+        assert table.name == "price_history_p2026_10"
+        assert {"product_id", "scrape_bucket", "scraped_at"} <= set(table.c.keys())
+
+    def test_ensure_partitions_creates_missing_months(self, app, partitioned, monkeypatch):
+        conn = MagicMock()
+        engine = MagicMock()
+        engine.begin.return_value.__enter__.return_value = conn
+        monkeypatch.setattr(partitioning, "db", MagicMock(engine=engine))
+
+        applied = partitioning.ensure_partitions(2, now=datetime(2026, 10, 17))
+        assert [s for s in applied if s.startswith("CREATE TABLE")] == [
+            s for m in (datetime(2026, 11, 1), datetime(2026, 12, 1))
+            for s in partitioning.partition_ddl(m) if s.startswith("CREATE TABLE")]
+        assert conn.execute.call_count == 4
+
+    def test_archival_detaches_whole_months(self, app, partitioned, monkeypatch):
+        from app.tasks import archival
+
+        session = MagicMock()
+        session.execute.return_value.scalar.return_value = 250.0
+        monkeypatch.setattr(archival, "db", MagicMock(session=session))
+
+        moved = archival._detach_old_partitions(datetime(2026, 10, 5))
+        sql = [str(call.args[0]) for call in session.execute.call_args_list]
+        assert moved == 500
+        assert "ALTER TABLE price_history DETACH PARTITION price_history_p2026_08" in sql
+        assert "ALTER TABLE price_history_p2026_09 RENAME TO price_archive_p2026_09" in sql
+        assert not any("price_history_p2026_10" in s for s in sql)
@@ -0,0 +1,163 @@
+"""
+tests/test_price_daily.py
+
+Tests for the price_daily OHLC rollup (app.services.rollup_service) and the
+chart resolution switch (app.services.chart_service).
+
+Covers:
+  - Incremental    -- writes fold into day bars regardless of arrival order;
+                      a replay inside the close's scrape bucket is not counted twice
+  - Ingestion      -- bulk_upsert (heartbeats included) and /api/prices/upload
+                      maintain the rollup
+  - Backfill       -- missing days are built from price_history; bars kept by
+                      heartbeats on days without history survive a re-run
+  - Charts         -- long windows read the rollup, short ones raw history
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.models.price import PriceHistory
+from app.models.price_daily import PriceDaily
+from app.services.rollup_service import backfill_price_daily, upsert_price_daily
+
+
+def _row(pid, rid, price, at, in_stock=True, bucket=None):
+    return {"product_id": pid, "retailer_id": rid, "price": price, "in_stock": in_stock,
+            "currency": "USD", "scraped_at": at, "scrape_bucket": bucket}
+
+
+class TestIncremental:
+
+    def test_bars_are_order_independent(self, app, db_session, sample_data):
+        pid, rid = sample_data["product_box"].id, sample_data["retailer_ebay"].id
+        day = datetime(2026, 5, 4)
+        writes = [_row(pid, rid, 50, day.replace(hour=9)),
+                  _row(pid, rid, 70, day.replace(hour=12), in_stock=False),
+                  _row(pid, rid, 45, day.replace(hour=15))]
+        # Latest first, then the morning write arrives late in its own call.
+        upsert_price_daily(writes[1:])
+        db_session.commit()
+        upsert_price_daily(writes[:1])
+        db_session.commit()
+
+        bar = db_session.get(PriceDaily, (pid, rid, day.date()))
+        assert (bar.open, bar.high, bar.low, bar.close) == (50, 70, 45, 45)
+        assert bar.min_in_stock == 45 and bar.samples == 3
+        assert bar.avg == Decimal("55")
+
+    def test_bucket_replay_replaces_its_sample(self, app, db_session, sample_data):
+        pid, rid = sample_data["product_box"].id, sample_data["retailer_ebay"].id
+        day = datetime(2026, 5, 5)
+
+        def write(price, hour, bucket):
+            upsert_price_daily([_row(pid, rid, price, day.replace(hour=hour), bucket=bucket)])
+            db_session.commit()
+            db_session.expire_all()
+            return db_session.get(PriceDaily, (pid, rid, day.date()))
+
+        bar = write(50, 9, 100)
+        bar = write(52, 9, 100)                  # only sample of the day: replaced
+        assert (bar.open, bar.high, bar.low, bar.close, bar.samples) == (52, 52, 52, 52, 1)
+
+        write(60, 11, 102)
+        for _ in range(2):
+            bar = write(62, 11, 102)             # replays of the 11:00 scrape
+        assert (bar.open, bar.close, bar.samples, bar.price_sum) == (52, 62, 2, 114)
+
+
+class TestIngestion:
+
+    def test_bulk_upsert_and_upload(self, app, client, db_session, sample_data):
+        from app.services.price_service import PriceService
+
+        pid, rid = sample_data["product_case"].id, sample_data["retailer_ebay"].id
+        PriceService().bulk_upsert([{"product_id": pid, "retailer_id": rid, "price": 610.0,
+                                     "currency": "USD", "in_stock": True}])
+        resp = client.post("/api/prices/upload", json={"prices": [
+            {"set_code": "OP-01", "product_type": "case", "retailer_slug": "ebay",
+             "price": 590.0, "currency": "USD"}]})
+        assert resp.status_code == 200
+
+        [bar] = PriceDaily.query.filter_by(product_id=pid, retailer_id=rid).all()
+        assert bar.samples == 2 and bar.high == 610 and bar.close == 590
+
+    def test_unchanged_scrapes_are_samples(self, app, db_session, sample_data):
+        from app.services.price_service import PriceService, reset_latest_state_cache
+
+        reset_latest_state_cache()
+        pid, rid = sample_data["product_case"].id, sample_data["retailer_ebay"].id
+        rec = {"product_id": pid, "retailer_id": rid, "price": 610.0,
+               "currency": "USD", "in_stock": True}
+        svc = PriceService()
+        svc.bulk_upsert([rec])
+        # Pretend that write was an hour earlier (previous scrape bucket).
+        [bar] = PriceDaily.query.filter_by(product_id=pid, retailer_id=rid).all()
+        bar.last_bucket -= 1
+        db_session.commit()
+
+        history = PriceHistory.query.filter_by(product_id=pid, retailer_id=rid).count()
+        for _ in range(2):                       # heartbeat, then its replay
+            svc.bulk_upsert([rec])
+        assert PriceHistory.query.filter_by(product_id=pid, retailer_id=rid).count() == history
+        db_session.expire_all()
+        [bar] = PriceDaily.query.filter_by(product_id=pid, retailer_id=rid).all()
+        assert bar.samples == 2 and bar.price_sum == 1220 and bar.close == 610
+        reset_latest_state_cache()
+
+
+class TestBackfill:
+
+    def test_backfill_matches_history(self, app, db_session, sample_data):
+        pid, rid = sample_data["product_box"].id, sample_data["retailer_ebay"].id
+        start = datetime.utcnow() - timedelta(days=10)
+        for i in range(10):
+            db_session.add(PriceHistory(product_id=pid, retailer_id=rid, price=40 + i,
+                                        currency="USD", scraped_at=start + timedelta(days=i)))
+        db_session.commit()
+
+        assert backfill_price_daily(window_days=3) >= 10
+        bars = PriceDaily.query.filter_by(product_id=pid, retailer_id=rid).all()
+        assert len(bars) == 11        # ten seeded days + today's fixture row
+        total = PriceDaily.query.count()
+        assert backfill_price_daily(window_days=3) == 0
+        assert PriceDaily.query.count() == total
+
+    def test_heartbeat_days_survive(self, app, db_session, sample_data):
+        pid, rid = sample_data["product_box"].id, sample_data["retailer_ebay"].id
+        start = datetime(2026, 5, 1, 9)
+        # One price change, then four days of unchanged scrapes (no history rows).
+        db_session.add(PriceHistory(product_id=pid, retailer_id=rid, price=50,
+                                    currency="USD", scraped_at=start))
+        upsert_price_daily([_row(pid, rid, 50, start + timedelta(days=i)) for i in range(5)])
+        db_session.commit()
+
+        assert backfill_price_daily(since=start, until=start + timedelta(days=5)) == 0
+        bars = (PriceDaily.query.filter_by(product_id=pid, retailer_id=rid)
+                .order_by(PriceDaily.day).all())
+        assert [b.day for b in bars] == [(start + timedelta(days=i)).date() for i in range(5)]
+        assert all(b.close == 50 and b.samples == 1 for b in bars)
+
+
+class TestChartResolution:
+
+    def test_long_window_uses_rollup(self, app, db_session, sample_data):
+        from app.services.chart_service import ChartService
+
+        pid, rid = sample_data["product_box"].id, sample_data["retailer_ebay"].id
+        old = datetime.utcnow() - timedelta(days=60)
+        upsert_price_daily([_row(pid, rid, 48, old), _row(pid, rid, 52, old + timedelta(hours=1))])
+        db_session.commit()
+
+        data = ChartService().get_price_chart_data(pid, days=90)
+        assert data["resolution"] == "daily"
+        [point] = next(ds for ds in data["datasets"] if ds["label"] == "eBay")["data"]
+        assert (point["o"], point["c"], point["x"]) == (48, 52, old.date().isoformat())
+
+        assert ChartService().get_price_chart_data(pid, days=7)["resolution"] == "raw"
+
+    def test_falls_back_to_raw_without_rollup(self, app, client, db_session, sample_data):
+        pid = sample_data["product_box"].id
+        data = client.get(f"/api/prices/{pid}?days=365").get_json()
+        assert data["resolution"] == "raw" and data["datasets"]
+        assert client.get(f"/api/prices/{pid}?resolution=hourly").status_code == 400
@@ -0,0 +1,87 @@
+"""
+tests/test_query_plans.py
+
+Tests for the hot-path query plan checks (app.utils.query_plans).
+
+Covers:
+  - Detection      -- full scans in SQLite and Postgres plans, aliases and leaves
+  - Hot paths      -- every hot path stays on an index over a seeded dataset
+  - Regressions    -- dropping an index the fuji-urls path needs is reported
+  - Baseline       -- timings round-trip and slower paths are flagged
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app.utils import query_plans
+from app.utils.query_plans import QueryReport
+
+
+class TestDetection:
+
+    def test_sqlite_plan(self):
+        plan = [
+            "SCAN price_history",
+            "SEARCH latest_prices USING INDEX sqlite_autoindex_latest_prices_1 (product_id=?)",
+            "SCAN price_sync_log USING INDEX ix_price_sync_log_rcj_variant_id",
+            "SCAN anon_1",
+            "SCAN products_1",
+            "SCAN CONSTANT ROW",
+        ]
+        assert query_plans.full_scans(plan) == ["price_history", "products"]
+
+    def test_postgres_plan(self):
+        plan = {"Node Type": "Append", "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": "price_history_p2026_10"},
+            {"Node Type": "Seq Scan", "Relation Name": "price_history_default"},
+            {"Node Type": "Nested Loop", "Plans": [
+                {"Node Type": "Index Scan", "Relation Name": "latest_prices",
+                 "Index Name": "latest_prices_pkey"},
+                {"Node Type": "Seq Scan", "Relation Name": "retailers"},
+            ]},
+        ]}
+        assert query_plans.full_scans(plan) == ["price_history", "retailers"]
+        assert "Index Scan on latest_prices using latest_prices_pkey" in query_plans.plan_lines(plan)
+
+    def test_small_tables_are_allowed(self):
+        report = QueryReport("x", [query_plans.StatementPlan("SELECT 1", [], ["retailers"])])
+        assert report.seq_scans == []
+
+
+class TestHotPaths:
+
+    @pytest.fixture
+    def dataset(self, db_session):
+        return query_plans.seed_synthetic(history_rows=5000, products=60)
+
+    def test_no_full_scans(self, dataset):
+        reports = query_plans.check_hot_queries(dataset, repeat=1)
+        assert [r.name for r in reports] == list(query_plans.HOT_QUERIES)
+        for report in reports:
+            assert report.statements, report.name
+            assert report.seq_scans == [], report.to_dict()
+
+    def test_dropped_index_is_reported(self, dataset, db_session):
+        db_session.execute(text("DROP INDEX ix_latest_prices_retailer_id"))
+        db_session.execute(text("ANALYZE"))
+        db_session.commit()
+
+        report = query_plans.check_query("fuji_urls", dataset, repeat=1)
+        assert report.seq_scans == ["latest_prices"]
+
+
+class TestBaseline:
+
+    def test_round_trip_and_regressions(self, tmp_path):
+        path = str(tmp_path / "baseline.json")
+        query_plans.save_baseline(path, "sqlite", 1000, [QueryReport("a", median_ms=2.0),
+                                                         QueryReport("b", median_ms=0.1)])
+        baseline = query_plans.load_baseline(path)
+        assert baseline["sqlite"]["median_ms"] == {"a": 2.0, "b": 0.1}
+
+        now = [QueryReport("a", median_ms=5.0), QueryReport("b", median_ms=0.5)]
+        # "b" is 5x slower but under the 1 ms noise floor.
+        assert query_plans.timing_regressions(now, baseline, "sqlite", 1000) == [
+            "a: 5.00 ms (baseline 2.00 ms)"]
+        assert query_plans.timing_regressions(now, baseline, "sqlite", 2000) == []
+        assert query_plans.timing_regressions(now, baseline, "postgresql", 1000) == []
@@ -0,0 +1,88 @@
+"""
+tests/test_rate_limiter.py
+
+Unit tests for the per-host token bucket (app.utils.rate_limiter).
+
+Covers:
+  - Bursts          -- `burst` requests go out immediately, then pacing applies
+  - min_delay       -- a wider min_delay_seconds slows the refill rate
+  - No lock sleeps  -- a waiting thread does not block the others' reservations
+  - Per-host        -- one host's bucket never delays another's
+  - BaseScraper     -- fetch() waits on the configured bucket
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.utils.rate_limiter import RateLimiter, limiter_for, reset_host_limiters
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    reset_host_limiters()
+    yield
+    reset_host_limiters()
+
+
+class TestTokenBucket:
+
+    def test_burst_then_paced(self):
+        limiter = RateLimiter(requests_per_minute=600, burst=3)   # 0.1 s per token
+        waits = [limiter._reserve() for _ in range(5)]
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3] == pytest.approx(0.1, abs=0.02)
+        assert waits[4] == pytest.approx(0.2, abs=0.02)
+
+    def test_min_delay_caps_rate(self):
+        limiter = RateLimiter(requests_per_minute=600, min_delay_seconds=2)
+        assert limiter.min_interval == 2
+        limiter._reserve()
+        assert limiter._reserve() == pytest.approx(2, abs=0.02)
+
+    def test_sleep_happens_outside_lock(self):
+        limiter = RateLimiter(requests_per_minute=60)   # 1 s per token
+        limiter.wait()                                  # spend the only token
+
+        sleeper = threading.Thread(target=limiter.wait)
+        sleeper.start()                                 # ~1 s sleep, lock released
+        time.sleep(0.05)
+        start = time.monotonic()
+        acquired = limiter.lock.acquire(timeout=0.5)
+        assert acquired and time.monotonic() - start < 0.1
+        limiter.lock.release()
+        sleeper.join()
+
+    def test_hosts_are_independent(self):
+        slow = limiter_for("slow.test", 1)
+        slow._reserve()
+        assert slow._reserve() > 30
+        assert limiter_for("fast.test", 1)._reserve() == 0.0
+
+    def test_registry_reconfigures(self):
+        first = limiter_for("a.test", 10)
+        again = limiter_for("a.test", 30, 0, 2)
+        assert again is first and first.requests_per_minute == 30 and first.burst == 2
+
+
+class TestScraperIntegration:
+
+    def test_fetch_waits_on_configured_bucket(self, monkeypatch):
+        from app.scrapers.fujicardshop_scraper import FujiCardShopScraper
+        from app.utils import rate_limiter
+
+        scraper = FujiCardShopScraper()
+        session = MagicMock()
+        monkeypatch.setattr(scraper, "_get_session", lambda: session)
+
+        scraper.fetch("https://www.fujicardshop.com/x")
+        assert "www.fujicardshop.com" not in rate_limiter._HOST_LIMITERS
+
+        scraper.configure_rate_limit(6, 2, burst=2)
+        waits = []
+        monkeypatch.setattr(rate_limiter.time, "sleep", waits.append)
+        for _ in range(3):
+            scraper.fetch("https://www.fujicardshop.com/x")
+        assert len(waits) == 1 and waits[0] == pytest.approx(10, abs=0.1)
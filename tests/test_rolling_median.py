@@ -0,0 +1,179 @@
+"""
+tests/test_rolling_median.py
+
+Unit tests for the rolling-median validation cache.
+
+Covers:
+  - RollingMedian      -- matches statistics.median over a sliding window
+  - check_and_add()    -- same verdicts as validate_price, anomalies not recorded
+  - MedianCache.warm() -- one query, per-(product, retailer, currency) windows
+  - Batched path       -- warm + check_and_add match validate_price_for_card per item
+  - Consensus band     -- cross-retailer check against current prices
+  - Thread safety      -- concurrent pushes keep the window consistent
+"""
+
+import random
+import threading
+from datetime import datetime, timedelta
+from statistics import median
+
+from app.utils.price_validator import validate_price
+from app.utils.rolling_median import MedianCache, RollingMedian
+
+
+# ---------------------------------------------------------------------------
+# RollingMedian
+# ---------------------------------------------------------------------------
+
+class TestRollingMedian:
+
+    def test_empty_window_has_no_median(self):
+        assert RollingMedian(5).median() is None
+
+    def test_matches_statistics_median_while_sliding(self):
+        rng = random.Random(7)
+        win = RollingMedian(size=30)
+        seen = []
+        for _ in range(500):
+            value = round(rng.uniform(1, 500), 2)
+            win.push(value)
+            seen.append(value)
+            assert win.median() == median(seen[-30:])
+        assert len(win) == 30
+
+    def test_check_and_add_matches_validate_price(self):
+        history = [50.0, 52.0, 51.0, 49.0, 53.0, 50.5]
+        for price in (51.0, 400.0, 999.0, -3.0, 10.0):
+            win = RollingMedian(30, history)
+            got = win.check_and_add(price)
+            want = validate_price(price, history)
+            assert (got.is_anomaly, got.reasons, got.median_price, got.deviation_pct) == \
+                   (want.is_anomaly, want.reasons, want.median_price, want.deviation_pct)
+
+    def test_anomaly_is_not_recorded(self):
+        win = RollingMedian(30, [50.0] * 6)
+        assert win.check_and_add(900.0).is_anomaly
+        assert len(win) == 6
+        assert not win.check_and_add(55.0).is_anomaly
+        assert len(win) == 7
+
+    def test_short_history_skips_spike_check(self):
+        win = RollingMedian(30, [50.0] * 4)
+        assert not win.check_and_add(900.0).is_anomaly
+
+    def test_concurrent_pushes(self):
+        win = RollingMedian(size=100)
+
+        def _worker(seed):
+            rng = random.Random(seed)
+            for _ in range(2000):
+                win.push(rng.uniform(1, 100))
+
+        threads = [threading.Thread(target=_worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(win) == 100
+        assert win._sorted == sorted(win._order)
+
+
+# ---------------------------------------------------------------------------
+# MedianCache
+# ---------------------------------------------------------------------------
+
+class TestMedianCache:
+
+    def test_warm_builds_per_retailer_windows(self, app, sample_data):
+        from app.extensions import db
+        from app.models.price import PriceHistory
+
+        box = sample_data["product_box"]
+        ebay = sample_data["retailer_ebay"]
+        amazon = sample_data["retailer_amazon"]
+        now = datetime.utcnow()
+        for i in range(40):
+            db.session.add(PriceHistory(product_id=box.id, retailer_id=ebay.id,
+                                        price=60 + i, price_usd=60 + i, currency="USD",
+                                        scraped_at=now - timedelta(hours=i + 1)))
+        db.session.commit()
+
+        cache = MedianCache(size=30)
+        assert cache.warm() == 4
+        # eBay: the seeded 55.00 row plus the 29 newest of 60..99
+        assert cache.median(box.id, ebay.id) == median([55.0] + [60.0 + i for i in range(29)])
+        # Amazon JP windows hold yen, not converted dollars
+        assert cache.median(box.id, amazon.id, "JPY") == 7800
+        assert cache.median(box.id, amazon.id) is None
+
+        assert cache.warm(retailer_ids=[amazon.id]) == 2
+
+    def test_matches_per_card_validation(self, app, sample_data):
+        from app.extensions import db
+        from app.models.price import PriceHistory
+        from app.utils.price_validator import validate_price_for_card
+
+        box = sample_data["product_box"]
+        ebay, amazon = sample_data["retailer_ebay"], sample_data["retailer_amazon"]
+        now = datetime.utcnow()
+        for i in range(40):
+            db.session.add(PriceHistory(product_id=box.id, retailer_id=ebay.id,
+                                        price=60 + i % 7, price_usd=60 + i % 7, currency="USD",
+                                        scraped_at=now - timedelta(hours=i + 1)))
+        db.session.commit()
+
+        listings = [(ebay.id, price, "USD") for price in (10.0, 62.0, 400.0, 999.0, -1.0)]
+        listings += [(amazon.id, price, "JPY") for price in (7800.0, 93600.0)]
+        for rid, price, currency in listings:
+            cache = MedianCache(size=30)
+            cache.warm()
+            got = cache.check_and_add(box.id, rid, price, price=price, currency=currency)
+            want = validate_price_for_card(box.id, price, retailer_id=rid, new_price=price,
+                                           currency=currency, consensus_band=None)
+            assert (got.is_anomaly, got.reasons, got.median_price, got.deviation_pct) == \
+                   (want.is_anomaly, want.reasons, want.median_price, want.deviation_pct)
+
+    def test_check_and_add_updates_window(self, app, sample_data):
+        cache = MedianCache(size=30)
+        pid, rid = sample_data["product_box"].id, sample_data["retailer_ebay"].id
+        for price in (50.0, 51.0, 52.0, 53.0, 54.0):
+            assert not cache.check_and_add(pid, rid, price).is_anomaly
+        assert cache.median(pid, rid) == 52.0
+        assert cache.check_and_add(pid, rid, 400.0).is_anomaly
+
+    def test_native_currency_comparison(self, app, sample_data):
+        cache = MedianCache(size=30)
+        pid, rid = sample_data["product_box"].id, sample_data["retailer_amazon"].id
+        for yen in (7600, 7700, 7800, 7900, 8000):
+            cache.check_and_add(pid, rid, yen / 150, price=yen, currency="JPY")
+        # Same yen price after a big FX move: not a spike in the retailer's currency
+        assert not cache.check_and_add(pid, rid, 7800 / 60, price=7800, currency="JPY").is_anomaly
+        # A case listed as a box (12x) is a spike
+        assert cache.check_and_add(pid, rid, 93600 / 150, price=93600, currency="JPY").is_anomaly
+
+    def test_consensus_band(self, app, sample_data):
+        from app.extensions import db
+        from app.models.retailer import Retailer
+        from app.services.price_service import rebuild_latest_prices, upsert_latest_prices
+
+        box = sample_data["product_box"]
+        third = Retailer(name="Third", slug="third", base_url="https://example.com")
+        db.session.add(third)
+        db.session.flush()
+        rebuild_latest_prices()
+        upsert_latest_prices([{"product_id": box.id, "retailer_id": third.id, "price": 54,
+                               "price_usd": 54, "currency": "USD", "in_stock": True, "source_url": None,
+                               "scraped_at": datetime.utcnow()}])
+        db.session.commit()
+
+        cache = MedianCache(size=30, consensus_band=0.5)
+        cache.warm()
+        # Peers for a new retailer: Amazon 52.26, eBay 55.00, Third 54.00
+        fourth = third.id + 1
+        result = cache.check_and_add(box.id, fourth, 200.0)
+        assert result.is_anomaly and result.consensus_price == 54.0
+        assert not cache.check_and_add(box.id, fourth, 60.0).is_anomaly
+
+        # Band off: same price passes
+        assert not MedianCache(size=30).check_and_add(box.id, fourth, 200.0).is_anomaly
@@ -0,0 +1,140 @@
+"""
+tests/test_scrape_telemetry.py
+
+Tests for the scrape_runs telemetry (app.scrapers.telemetry) and the
+health snapshot built from it (app.services.health_service).
+
+Covers:
+  - Run rows      -- run_all records pages, bytes, parsed / accepted / rejected, timings
+  - Failures      -- a scrape that raises is recorded as a failed run with its error
+  - Health        -- one grouped snapshot: totals, consecutive failures, last run,
+                     all over the RECENT_RUNS_DAYS window
+  - TTL cache     -- snapshots are reused until they expire or a run is recorded
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from app.models.scrape_run import ScrapeRun
+from app.services.health_service import invalidate_health_cache, scraper_health
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    invalidate_health_cache()
+    yield
+    invalidate_health_cache()
+
+
+def _ebay(scrape):
+    from app.scrapers.base_scraper import BaseScraper
+
+    class _Scraper(BaseScraper):
+        retailer_name = "eBay"
+        retailer_slug = "ebay"
+
+        def scrape(self):
+            return scrape(self)
+
+    return _Scraper()
+
+
+def _rec(product_type="box", price=55.0, set_code="OP-01"):
+    return {"set_code": set_code, "product_type": product_type, "price": price,
+            "price_usd": price, "currency": "USD", "in_stock": True}
+
+
+def _run(scraper):
+    from app.scrapers.scraper_manager import ScraperManager
+
+    manager = ScraperManager()
+    manager._scrapers = [scraper]
+    return manager.run_all()
+
+
+class TestRunTelemetry:
+
+    def test_run_all_records_a_row(self, app, db_session, sample_data):
+        session = MagicMock()
+        session.get.return_value = MagicMock(status_code=200, content=b"x" * 2048)
+
+        def scrape(self):
+            self.fetch("https://www.ebay.com/a")
+            self.fetch("https://www.ebay.com/b")
+            return [_rec("box"), _rec("case", 120.0), _rec(set_code="OP-99")]
+
+        scraper = _ebay(scrape)
+        scraper._get_session = lambda: session
+        _run(scraper)
+
+        [row] = ScrapeRun.query.all()
+        assert (row.retailer_slug, row.mode, row.status) == ("ebay", "batch", "completed")
+        assert (row.pages_fetched, row.bytes_fetched) == (2, 4096)
+        assert (row.records_parsed, row.records_accepted, row.records_rejected) == (3, 2, 1)
+        assert row.db_seconds > 0 and row.finished_at >= row.started_at
+
+    def test_failed_scrape_is_recorded(self, app, db_session, sample_data):
+        def scrape(self):
+            raise requests.ConnectionError("reset by peer")
+
+        _run(_ebay(scrape))
+        [row] = ScrapeRun.query.all()
+        assert row.status == "failed" and "reset by peer" in row.error
+        assert row.records_parsed == 0
+
+
+class TestHealthSnapshot:
+
+    @staticmethod
+    def _add_runs(db_session, *statuses):
+        start = datetime.utcnow() - timedelta(hours=len(statuses))
+        for i, status in enumerate(statuses):
+            at = start + timedelta(hours=i)
+            db_session.add(ScrapeRun(run_id=f"r{i}", retailer_slug="ebay", retailer_name="eBay",
+                                     status=status, started_at=at, finished_at=at,
+                                     records_parsed=4, records_accepted=3, records_rejected=1,
+                                     error="HTTP 503" if status == "failed" else None))
+        db_session.commit()
+
+    def test_grouped_counts(self, app, db_session, sample_data):
+        self._add_runs(db_session, "failed", "completed", "failed", "failed")
+
+        health = scraper_health()
+        ebay, amazon = health["eBay"], health["Amazon Japan"]
+        assert (ebay["total_runs"], ebay["total_successes"], ebay["total_failures"]) == (4, 1, 3)
+        assert ebay["consecutive_failures"] == 2
+        assert ebay["last_success"] < ebay["last_failure"]
+        assert len(ebay["recent_errors"]) == 3
+        assert ebay["last_run_stats"]["records_rejected"] == 1
+        assert amazon["total_runs"] == 0 and amazon["last_run_stats"] is None
+
+    def test_counts_cover_recent_runs_only(self, app, db_session, sample_data):
+        from app.services.health_service import RECENT_RUNS_DAYS
+
+        old = datetime.utcnow() - timedelta(days=RECENT_RUNS_DAYS + 1)
+        db_session.add(ScrapeRun(run_id="old", retailer_slug="ebay", retailer_name="eBay",
+                                 status="completed", started_at=old, finished_at=old))
+        self._add_runs(db_session, "failed", "failed")
+
+        ebay = scraper_health()["eBay"]
+        assert (ebay["total_runs"], ebay["total_successes"], ebay["total_failures"]) == (2, 0, 2)
+        assert ebay["consecutive_failures"] == 2 and ebay["last_success"] is None
+
+    def test_cache_reused_until_invalidated(self, app, db_session, sample_data):
+        self._add_runs(db_session, "completed")
+        assert scraper_health(ttl=60)["eBay"]["total_runs"] == 1
+
+        self._add_runs(db_session, "completed")
+        assert scraper_health(ttl=60)["eBay"]["total_runs"] == 1
+        invalidate_health_cache()
+        assert scraper_health(ttl=60)["eBay"]["total_runs"] == 2
+
+    def test_health_json(self, client, db_session, sample_data):
+        self._add_runs(db_session, "completed")
+        data = client.get("/admin/health/json").get_json()
+        assert isinstance(data["eBay"]["last_run"], str)
+        assert data["eBay"]["last_run_stats"]["records_accepted"] == 3
+        assert client.get("/admin/health").status_code == 200
@@ -7,6 +7,8 @@ All network I/O is mocked -- these tests exercise only the HTML-parsing code
 and URL-generation logic without hitting any real web servers.
 """
 
+import os
+
 import pytest
 from unittest.mock import MagicMock
 from bs4 import BeautifulSoup
@@ -339,3 +341,880 @@ class TestPriceValidator:
             price=50000, currency="USD", product_type="box"
         )
         assert is_valid is False
+
+
+# ---------------------------------------------------------------------------
+# Async fetch layer (app.scrapers.async_http)
+# ---------------------------------------------------------------------------
+
+def _fuji_product(n, set_code="OP-01"):
+    return {
+        "name": f"One Piece {set_code} Booster BOX Japanese #{n}",
+        "permalink": f"https://www.fujicardshop.com/p/{n}",
+        "is_in_stock": True,
+        "prices": {"price": "12000", "currency_minor_unit": 2, "currency_code": "USD"},
+    }
+
+
+def _patch_fetcher(monkeypatch, handler):
+    """Route every AsyncFetcher through an httpx.MockTransport."""
+    import functools
+    import httpx
+    from app.scrapers import async_http
+
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(
+        async_http, "AsyncFetcher",
+        functools.partial(async_http.AsyncFetcher, transport=transport),
+    )
+
+
+class TestAsyncFetcher:
+
+    def test_per_host_concurrency_limit(self):
+        import asyncio
+        import httpx
+        from app.scrapers.async_http import AsyncFetcher
+
+        state = {"now": 0, "peak": 0}
+
+        async def handler(request):
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+            await asyncio.sleep(0.01)
+            state["now"] -= 1
+            return httpx.Response(200, json=[])
+
+        async def main():
+            async with AsyncFetcher(per_host_concurrency=3,
+                                    transport=httpx.MockTransport(handler)) as http:
+                await asyncio.gather(*(http.get(f"https://a.test/{i}") for i in range(12)))
+
+        asyncio.run(main())
+        assert state["peak"] == 3
+
+    def test_retries_retryable_status(self, monkeypatch):
+        import asyncio
+        import httpx
+        from app.scrapers import async_http
+
+        monkeypatch.setattr(async_http, "BACKOFF_FACTOR", 0)
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503 if len(calls) < 3 else 200, json={"ok": True})
+
+        async def main():
+            async with async_http.AsyncFetcher(transport=httpx.MockTransport(handler)) as http:
+                return await http.get("https://a.test/x")
+
+        resp = asyncio.run(main())
+        assert resp.json() == {"ok": True}
+        assert len(calls) == 3
+
+    def test_hop_by_hop_headers_dropped(self):
+        from app.scrapers.async_http import AsyncFetcher
+        cleaned = AsyncFetcher._clean_headers({"Connection": "keep-alive", "Accept": "*/*"})
+        assert cleaned == {"Accept": "*/*"}
+
+    def test_fuji_fetches_all_pages_concurrently(self, monkeypatch):
+        import httpx
+        from app.scrapers.fujicardshop_scraper import FujiCardShopScraper
+
+        seen = []
+
+        def handler(request):
+            page = int(request.url.params["page"])
+            seen.append(page)
+            return httpx.Response(200, json=[_fuji_product(page)],
+                                  headers={"X-WP-TotalPages": "4"})
+
+        _patch_fetcher(monkeypatch, handler)
+        results = FujiCardShopScraper().scrape()   # sync contract still works
+        assert sorted(seen) == [1, 2, 3, 4]
+        assert len(results) == 4
+        assert results[0]["set_code"] == "OP-01" and results[0]["price_usd"] == 120.0
+
+    def test_fuji_walks_pages_without_total_header(self, monkeypatch):
+        import httpx
+        from app.scrapers.fujicardshop_scraper import FujiCardShopScraper
+
+        monkeypatch.setattr(FujiCardShopScraper, "PER_PAGE", 1)
+
+        def handler(request):
+            page = int(request.url.params["page"])
+            return httpx.Response(200, json=[_fuji_product(page)] if page <= 2 else [])
+
+        _patch_fetcher(monkeypatch, handler)
+        assert len(FujiCardShopScraper().scrape()) == 2
+
+    def test_rcj_collections_fetched_in_windows(self, monkeypatch):
+        import httpx
+        from app.scrapers.rarecardsjapan_scraper import RareCardsJapanScraper
+
+        def handler(request):
+            page = int(request.url.params.get("page", 1))
+            start = 0 if "booster-boxes" in request.url.path else 1000
+            if page > 4:
+                return httpx.Response(200, json={"products": []})
+            size = 250 if page < 4 else 10
+            ids = range(start + page * 300, start + page * 300 + size)
+            return httpx.Response(200, json={"products": [{"id": i} for i in ids]})
+
+        _patch_fetcher(monkeypatch, handler)
+        products = RareCardsJapanScraper()._fetch_all_products()
+        assert len(products) == 2 * (3 * 250 + 10)
+
+    def test_manager_persists_async_scraper(self, app, db_session, monkeypatch):
+        import httpx
+        from app.models.price import PriceHistory
+        from app.models.product import Product
+        from app.models.retailer import Retailer
+        from app.scrapers.fujicardshop_scraper import FujiCardShopScraper
+        from app.scrapers.scraper_manager import ScraperManager
+
+        db_session.add_all([
+            Product(set_code="OP-01", set_name="ROMANCE DAWN", product_type="box"),
+            Retailer(name="FujiCardShop", slug="fujicardshop", base_url="https://x", currency="USD"),
+        ])
+        db_session.commit()
+
+        def handler(request):
+            return httpx.Response(200, json=[_fuji_product(1)], headers={"X-WP-TotalPages": "1"})
+
+        _patch_fetcher(monkeypatch, handler)
+        manager = ScraperManager()
+        manager._scrapers = [FujiCardShopScraper()]
+        results = manager.run_all()
+
+        assert len(results["FujiCardShop"]) == 1
+        assert PriceHistory.query.count() == 1
+
+
+# ---------------------------------------------------------------------------
+# Conditional-GET cache (app.scrapers.http_cache)
+# ---------------------------------------------------------------------------
+
+class TestHttpCache:
+
+    @staticmethod
+    def _etag_handler(body, calls):
+        import httpx
+
+        def handler(request):
+            calls.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=body,
+                                  headers={"ETag": '"v1"', "X-WP-TotalPages": "1"})
+        return handler
+
+    def test_fuji_second_run_skips_parse(self, tmp_path, monkeypatch):
+        from app.scrapers.fujicardshop_scraper import FujiCardShopScraper
+        from app.scrapers.http_cache import HttpCache
+
+        calls = []
+        _patch_fetcher(monkeypatch, self._etag_handler([_fuji_product(1)], calls))
+        cache = HttpCache(str(tmp_path))
+
+        first = FujiCardShopScraper()
+        first.enable_http_cache(cache)
+        first_records = first.scrape()
+        assert len(first_records) == 1
+
+        second = FujiCardShopScraper()
+        second.enable_http_cache(cache)
+        monkeypatch.setattr(second, "_parse_api_product",
+                            MagicMock(side_effect=AssertionError("re-parsed")))
+        records = second.scrape()
+
+        assert calls == [None, '"v1"']
+        assert records == first_records
+        assert cache.hits == 1
+
+    def test_identical_body_without_validators_is_not_modified(self, tmp_path):
+        from app.scrapers.http_cache import HttpCache
+
+        cache = HttpCache(str(tmp_path))
+        url = "https://a.test/p"
+        *_, changed = cache.on_response(url, 200, {}, b"same")
+        assert changed is False
+        cache.store_parsed(url, [{"x": 1}])
+        *_, not_modified = cache.on_response(url, 200, {}, b"same")
+        assert not_modified and cache.parsed(url) == [{"x": 1}]
+        *_, not_modified = cache.on_response(url, 200, {}, b"different")
+        assert not not_modified and cache.parsed(url) is None
+
+    def test_new_parser_version_reparses(self, tmp_path, monkeypatch):
+        from app.scrapers.fujicardshop_scraper import FujiCardShopScraper
+        from app.scrapers.http_cache import HttpCache
+
+        calls = []
+        _patch_fetcher(monkeypatch, self._etag_handler([_fuji_product(1)], calls))
+        cache = HttpCache(str(tmp_path))
+        first = FujiCardShopScraper()
+        first.enable_http_cache(cache)
+        first_records = first.scrape()
+
+        monkeypatch.setattr(FujiCardShopScraper, "PARSE_VERSION", 2)
+        second = FujiCardShopScraper()
+        second.enable_http_cache(cache)
+        parse = MagicMock(wraps=second._parse_api_product)
+        monkeypatch.setattr(second, "_parse_api_product", parse)
+
+        assert second.scrape() == first_records
+        assert calls == [None, '"v1"'] and parse.called
+        assert cache.parsed(second._page_url(1), second.parse_version) is not None
+
+    def test_sync_fetch_replays_304(self, tmp_path, monkeypatch):
+        import requests
+        from app.scrapers.fptradingcards_scraper import FPTradingCardsScraper
+        from app.scrapers.http_cache import HttpCache
+
+        def _resp(status, body=b"", headers=None):
+            r = requests.Response()
+            r.status_code, r._content = status, body
+            r.headers = requests.structures.CaseInsensitiveDict(headers or {})
+            return r
+
+        sent = []
+
+        def _get(url, headers=None, **kwargs):
+            sent.append(headers.get("If-Modified-Since"))
+            if headers.get("If-Modified-Since"):
+                return _resp(304)
+            return _resp(200, b"<html>page</html>",
+                         {"Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT",
+                          "Content-Type": "text/html; charset=utf-8"})
+
+        scraper = FPTradingCardsScraper()
+        scraper.enable_http_cache(HttpCache(str(tmp_path)))
+        monkeypatch.setattr(scraper, "_get_session", lambda: MagicMock(get=_get))
+
+        assert scraper.fetch("https://a.test/").not_modified is False
+        again = scraper.fetch("https://a.test/")
+        assert again.status_code == 200 and again.not_modified
+        assert again.text == "<html>page</html>"
+        assert sent == [None, "Wed, 01 Jan 2025 00:00:00 GMT"]
+
+        # Body file lost behind the validators: the 304 triggers a full GET.
+        for name in os.listdir(tmp_path):
+            if name.endswith(".body"):
+                os.unlink(tmp_path / name)
+        third = scraper.fetch("https://a.test/")
+        assert third.status_code == 200 and third.text == "<html>page</html>"
+        assert sent[2:] == ["Wed, 01 Jan 2025 00:00:00 GMT", None]
+
+    def test_async_fetch_refetches_lost_body(self, tmp_path, monkeypatch):
+        from app.scrapers.fujicardshop_scraper import FujiCardShopScraper
+        from app.scrapers.http_cache import HttpCache
+
+        calls = []
+        _patch_fetcher(monkeypatch, self._etag_handler([_fuji_product(1)], calls))
+        cache = HttpCache(str(tmp_path))
+        first = FujiCardShopScraper()
+        first.enable_http_cache(cache)
+        assert len(first.scrape()) == 1
+
+        for name in os.listdir(tmp_path):
+            if name.endswith(".body"):
+                os.unlink(tmp_path / name)
+        second = FujiCardShopScraper()
+        second.enable_http_cache(cache)
+
+        assert len(second.scrape()) == 1
+        assert calls == [None, '"v1"', None]
+
+
+# ---------------------------------------------------------------------------
+# Title classifier
+# ---------------------------------------------------------------------------
+
+class TestClassify:
+    """app.scrapers.classify — one pass, one answer for every scraper."""
+
+    @pytest.mark.parametrize("title,expected", [
+        ("OP-09 Emperors in the New World Japanese Booster Box", ("OP-09", "box", "japanese")),
+        ("Kingdom of Intrigue JPN Booster Box", ("OP-04", "box", "japanese")),
+        ("Kingdoms of Intrigue Booster Box", ("OP-04", "box", None)),
+        ("ONE PIECE THE BEST VOL.2 JP BOX", ("PRB-02", "box", "japanese")),
+        ("Premium Booster The Best Japanese Case", ("PRB-01", "case", "japanese")),
+        ("OP10 Royal Blood 12 Box Carton", ("OP-10", "case", None)),
+        ("EB01 Memorial Collection English Booster Box", ("EB-01", "box", "english")),
+        ("Simplified Chinese OP-05 Booster Box", ("OP-05", "box", "chinese")),
+        ("Starter Deck ST-21 Japanese", (None, None, "japanese")),
+    ])
+    def test_titles(self, title, expected):
+        from app.scrapers.classify import classify
+        assert tuple(classify(title)) == expected
+
+    @pytest.mark.parametrize("title", [
+        "Awakening Dragon Playmat",
+        "Yu-Gi-Oh Emperors Collection Binder",
+        "Emperor Penguin Plush Box",
+        "Kamisama Deluxe Figure Box",
+        "Kami Sama Kiss Artbook",
+        "Memorial Day Sale Mystery Box",
+    ])
+    def test_near_miss_titles_have_no_set(self, title):
+        from app.scrapers.classify import classify
+        assert classify(title).set_code is None, title
+
+    @pytest.mark.parametrize("title,code", [
+        ("Four Emperors Booster Box", "OP-09"),
+        ("Adventure on Kami's Island Japanese Box", "OP-15"),
+        ("Awakening of the New Era Booster Box", "OP-05"),
+    ])
+    def test_full_set_names(self, title, code):
+        from app.scrapers.classify import classify
+        assert classify(title).set_code == code
+
+    def test_explicit_code_beats_alias(self):
+        from app.scrapers.classify import classify
+        assert classify("Awakening of the New Era reprint (OP-13) box").set_code == "OP-13"
+
+    def test_scrapers_share_the_classifier(self):
+        from app.scrapers.fujicardshop_scraper import FujiCardShopScraper
+        from app.scrapers.rarecardsjapan_scraper import RareCardsJapanScraper
+
+        rcj = RareCardsJapanScraper()
+        assert rcj._detect_set_code("Kingdom of Intrigue Booster Box") == "OP-04"
+        assert rcj._detect_product_type("OP-04 Booster Box") == "box"
+        rec = FujiCardShopScraper()._parse_api_product({
+            "name": "One Piece Kingdoms of Intrigue Booster Box Case &#8211; Japanese",
+            "prices": {"price": "150000", "currency_minor_unit": 2, "currency_code": "USD"},
+            "is_in_stock": True, "permalink": "https://www.fujicardshop.com/p",
+        })
+        assert (rec["set_code"], rec["product_type"]) == ("OP-04", "case")
+
+
+# ---------------------------------------------------------------------------
+# Streaming pipeline
+# ---------------------------------------------------------------------------
+
+def _ebay_scraper(pages=None, records=None, is_async=False):
+    """A BaseScraper for the sample_data 'ebay' retailer yielding *pages* (or list *records*)."""
+    from app.scrapers.base_scraper import BaseScraper
+
+    class _Scraper(BaseScraper):
+        retailer_name = "eBay"
+        retailer_slug = "ebay"
+
+        def scrape(self):
+            return list(records or [])
+
+    if pages is not None and is_async:
+        async def scrape_pages_async(self):
+            for page in pages:
+                yield page
+        _Scraper.scrape_async = lambda self: None   # mark as async-capable
+        _Scraper.scrape_pages_async = scrape_pages_async
+    elif pages is not None:
+        _Scraper.scrape_pages = lambda self: iter(pages)
+    return _Scraper()
+
+
+def _ebay_rec(product_type="box", price=55.0):
+    return {"set_code": "OP-01", "product_type": product_type, "price": price,
+            "price_usd": price, "currency": "USD", "in_stock": True}
+
+
+class TestScrapePipeline:
+
+    def test_backpressure_blocks_producer(self):
+        import threading
+        from app.scrapers.pipeline import ScrapePipeline
+
+        release = threading.Event()
+        pipeline = ScrapePipeline(
+            validate=lambda name, recs: recs,
+            write=lambda recs: release.wait(5) and len(recs),
+            queue_size=1, persist_batch=1,
+        ).start()
+
+        submitted = []
+
+        def _produce():
+            for n in range(10):
+                pipeline.submit("x", [{"n": n}])
+                submitted.append(n)
+
+        producer = threading.Thread(target=_produce)
+        producer.start()
+        producer.join(0.5)
+        # persist is stuck on the first batch: 1 in write + 1 per queue + 1 in validate
+        assert producer.is_alive() and len(submitted) < 10
+        release.set()
+        producer.join(5)
+        pipeline.finish("x")
+        results = pipeline.close()
+        assert len(results["x"]) == 10 and pipeline.stats["x"]["written"] == 10
+
+    def test_first_page_written_before_scrape_ends(self):
+        import threading
+        from app.scrapers.pipeline import ScrapePipeline
+
+        written = threading.Event()
+        pipeline = ScrapePipeline(
+            validate=lambda name, recs: recs,
+            write=lambda recs: written.set() or len(recs),
+            persist_batch=1,
+        ).start()
+        pipeline.submit("x", [{"n": 1}])
+        assert written.wait(2)           # no need to wait for the scraper to finish
+        pipeline.submit("x", [{"n": 2}])
+        pipeline.finish("x")
+        assert len(pipeline.close()["x"]) == 2
+
+    def test_failed_write_keeps_draining(self):
+        from app.scrapers.pipeline import ScrapePipeline
+
+        def _write(recs):
+            raise RuntimeError("db down")
+
+        pipeline = ScrapePipeline(validate=lambda name, recs: recs, write=_write,
+                                  queue_size=1, persist_batch=1).start()
+        for n in range(5):
+            pipeline.submit("x", [{"n": n}])
+        pipeline.finish("x")
+        pipeline.close()
+        assert pipeline.stats["x"] == {"scraped": 5, "accepted": 5, "written": 0}
+
+    def test_list_scraper_adapter(self):
+        scraper = _ebay_scraper(records=[_ebay_rec(), _ebay_rec("case")])
+        assert not scraper.supports_streaming
+        pages = []
+        assert scraper.run_stream(pages.append) == 2
+        assert len(pages) == 1 and len(pages[0]) == 2
+
+    def test_run_streaming_persists_all_scraper_kinds(self, app, sample_data, monkeypatch):
+        with app.app_context():
+            from app.models.price import PriceHistory
+            from app.scrapers.scraper_manager import ScraperManager
+
+            manager = ScraperManager()
+            manager._scrapers = [
+                _ebay_scraper(records=[_ebay_rec("box", 56.0)]),
+                _ebay_scraper(pages=[[_ebay_rec("box", 57.0)], [_ebay_rec("case", 700.0)]]),
+                _ebay_scraper(pages=[[_ebay_rec("case", 710.0)]], is_async=True),
+            ]
+            assert manager._scrapers[1].supports_streaming
+            assert manager._scrapers[2].supports_async
+            before = PriceHistory.query.count()
+
+            app.config["SCRAPER_STREAMING"] = True
+            try:
+                results = manager.run_all()
+            finally:
+                app.config["SCRAPER_STREAMING"] = False
+
+            assert len(results["eBay"]) == 4
+            # one row per (product, retailer) within the scrape bucket
+            assert PriceHistory.query.count() == before + 2
+
+    def test_fuji_streams_pages(self, monkeypatch):
+        import httpx
+        from app.scrapers.fujicardshop_scraper import FujiCardShopScraper
+
+        def handler(request):
+            page = int(request.url.params["page"])
+            return httpx.Response(200, json=[_fuji_product(page)],
+                                  headers={"X-WP-TotalPages": "3"})
+
+        _patch_fetcher(monkeypatch, handler)
+        scraper = FujiCardShopScraper()
+        assert scraper.supports_streaming
+        pages = []
+        assert scraper.run_sync(lambda: scraper.run_stream_async(
+            scraper._http, _collect_async(pages))) == 3
+        assert [len(p) for p in pages] == [1, 1, 1]
+
+
+def _collect_async(pages):
+    async def _emit(page):
+        pages.append(page)
+    return _emit
+
+
+# ---------------------------------------------------------------------------
+# Batched per-product scrapers (app.scrapers.batch_scraper)
+# ---------------------------------------------------------------------------
+
+def _refs(*keys):
+    from app.scrapers.batch_scraper import ProductRef
+    return [ProductRef(i, set_code, ptype) for i, (set_code, ptype) in enumerate(keys, 1)]
+
+
+AHF_CATALOG_HTML = """
+<html><body>
+  <div class="product-item"><a href="https://www.ahiddenfortress.com/p/op01">One Piece OP-01
+    Romance Dawn Booster Box Japanese</a><span class="price">$95.00</span></div>
+  <div class="product-item"><a href="https://www.ahiddenfortress.com/p/op02">One Piece OP-02
+    Paramount War Booster Box Japanese</a><span class="price">$0.50</span></div>
+  <div class="product-item"><a href="https://www.ahiddenfortress.com/p/op09">One Piece OP-09
+    Booster Case Japanese</a><span class="price">$990.00</span></div>
+</body></html>
+"""
+
+
+class TestBatchScrapers:
+
+    def test_collection_fetched_and_parsed_once(self, monkeypatch):
+        from app.scrapers.ahiddenfortress_scraper import AHiddenFortressScraper
+
+        scraper = AHiddenFortressScraper()
+        calls = {"fetch": 0, "parse": 0}
+        page = MagicMock(text=AHF_CATALOG_HTML, not_modified=False)
+
+        def _fetch(url, **kwargs):
+            calls["fetch"] += 1
+            return page
+
+        parse = scraper.parse_collection
+
+        def _parse(soup):
+            calls["parse"] += 1
+            return parse(soup)
+
+        monkeypatch.setattr(scraper, "fetch", _fetch)
+        monkeypatch.setattr(scraper, "parse_collection", _parse)
+        products = _refs(("OP-01", "box"), ("OP-02", "box"), ("OP-09", "case"), ("OP-05", "box"))
+        results = scraper.scrape_all_products(products)
+
+        assert calls == {"fetch": 1, "parse": 1}
+        # OP-02's price is implausible, OP-05 is not listed
+        assert [(r["product_id"], r["price"]) for r in results] == [(1, 95.0), (3, 990.0)]
+        assert results[0]["source_url"] == "https://www.ahiddenfortress.com/p/op01"
+
+    def test_search_fans_out_under_host_budget(self, monkeypatch):
+        import asyncio
+        import httpx
+        from app.scrapers.tcgrepublic_scraper import TCGRepublicScraper
+
+        state = {"now": 0, "peak": 0, "calls": 0}
+
+        async def handler(request):
+            state["now"] += 1
+            state["calls"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+            await asyncio.sleep(0.01)
+            state["now"] -= 1
+            set_code = request.url.params["q"].split()[2]
+            return httpx.Response(200, text=TCGREPUBLIC_SEARCH_HTML.replace("OP-01", set_code))
+
+        _patch_fetcher(monkeypatch, handler)
+        products = _refs(*((f"OP-{n:02d}", "box") for n in range(1, 11)))
+        scraper = TCGRepublicScraper()
+        assert scraper.supports_async and scraper.supports_streaming
+        results = scraper.scrape_all_products(products)
+
+        assert state["calls"] == 10
+        assert 1 < state["peak"] <= 4          # concurrent, within the per-host limit
+        assert sorted(r["product_id"] for r in results) == list(range(1, 11))
+        assert all(r["in_stock"] for r in results)
+
+    def test_ebay_api_then_html_fallback(self, monkeypatch):
+        import httpx
+        from app.scrapers import ebay_scraper
+
+        seen = []
+        api = {"status": 200}
+
+        def handler(request):
+            seen.append(request.url.host)
+            if request.url.host == "api.ebay.com":
+                assert request.headers["Authorization"] == "Bearer tok"
+                return httpx.Response(api["status"], json={"itemSummaries": [
+                    {"title": "OP-01 Japanese Booster Box", "price": {"value": "61.00"},
+                     "itemWebUrl": "https://www.ebay.com/itm/1"},
+                ]})
+            return httpx.Response(200, text=EBAY_SEARCH_HTML)
+
+        _patch_fetcher(monkeypatch, handler)
+        monkeypatch.setattr(ebay_scraper, "_ebay_token_cache", None)
+        scraper = ebay_scraper.EbayScraper()
+        scraper.access_token = "tok"
+
+        [rec] = scraper.scrape_all_products(_refs(("OP-01", "box")))
+        assert rec["price"] == 61.0 and rec["source_url"] == "https://www.ebay.com/itm/1"
+        assert seen == ["api.ebay.com"]
+
+        api["status"] = 401                  # expired token -> HTML search
+        [rec] = scraper.scrape_all_products(_refs(("OP-01", "box")))
+        assert rec["price"] == 58.0
+        assert seen[1:] == ["api.ebay.com", "www.ebay.com"]
+
+    def test_manager_hands_products_to_batch_scrapers(self, app, sample_data):
+        with app.app_context():
+            from app.scrapers.batch_scraper import BatchScraper
+            from app.scrapers.scraper_manager import ScraperManager
+
+            manager = ScraperManager()
+            batch = [s for s in manager._scrapers if isinstance(s, BatchScraper)]
+            assert len(batch) == 5
+            manager._prepare_run()
+            keys = {(p.set_code, p.product_type) for p in batch[0].products()}
+            assert keys == {("OP-01", "box"), ("OP-01", "case")}
+            assert all(s.products() == batch[0].products() for s in batch)
+
+
+# ---------------------------------------------------------------------------
+# JSON catalogue engines (app.scrapers.catalog_scraper)
+# ---------------------------------------------------------------------------
+
+def _shopify_product(handle, title, *variants):
+    return {"handle": handle, "title": title, "body_html": "<p>" + "x" * 500 + "</p>",
+            "variants": [{"price": price, "available": available} for price, available in variants]}
+
+
+class TestCatalogScrapers:
+
+    def test_shopify_pages_collections_and_dedupes(self, monkeypatch):
+        import httpx
+        from app.scrapers.catalog_scraper import ShopifyCatalogScraper
+
+        pages = {
+            ("boxes", 1): [_shopify_product("op01", "OP-01 Booster Box Japanese",
+                                            ("130.00", False), ("120.00", True)),
+                           _shopify_product("sleeves", "Card Sleeves", ("9.00", True))],
+            ("boxes", 2): [_shopify_product("op02", "OP-02 Booster Case Japanese", ("900", False))],
+            ("all", 1): [_shopify_product("op01", "OP-01 Booster Box Japanese", ("120.00", True))],
+        }
+        seen = []
+
+        def handler(request):
+            collection = request.url.path.split("/")[2]
+            page = int(request.url.params["page"])
+            seen.append((collection, page))
+            return httpx.Response(200, json={"products": pages.get((collection, page), [])})
+
+        _patch_fetcher(monkeypatch, handler)
+        scraper = ShopifyCatalogScraper({"name": "Shop", "slug": "shop",
+                                         "base_url": "https://shop.test/",
+                                         "collections": ["boxes", "all"], "per_page": 2})
+        records = sorted(scraper.scrape(), key=lambda r: r["set_code"])
+
+        assert [(r["set_code"], r["product_type"], r["price"], r["in_stock"]) for r in records] == [
+            ("OP-01", "box", 120.0, True), ("OP-02", "case", 900.0, False)]
+        assert records[0]["source_url"] == "https://shop.test/products/op01"
+        # boxes: window of 3 pages, stopped by the short page 2; all: one window
+        assert sorted(seen) == [("all", 1), ("all", 2), ("all", 3),
+                                ("boxes", 1), ("boxes", 2), ("boxes", 3)]
+
+    def test_config_only_retailer_is_scraped(self, app, db_session, monkeypatch):
+        import httpx
+        from app.models.latest_price import LatestPrice
+        from app.models.product import Product
+        from app.models.retailer import Retailer
+        from app.scrapers.catalog_scraper import WooStoreApiScraper
+        from app.scrapers.scraper_manager import ScraperManager
+
+        db_session.add_all([
+            Product(set_code="OP-01", set_name="ROMANCE DAWN", product_type="box"),
+            Retailer(name="New Woo Store", slug="newwoo", base_url="https://woo.test",
+                     currency="USD", scraper_config='{"engine": "woocommerce"}'),
+            Retailer(name="Fuji", slug="fujicardshop", base_url="https://x",
+                     scraper_config='{"engine": "woocommerce"}'),   # has a class already
+            Retailer(name="Plain", slug="plain", base_url="https://p", scraper_config="{}"),
+        ])
+        db_session.commit()
+
+        manager = ScraperManager()
+        manager._load_configured_scrapers()
+        [scraper] = manager._configured        # fujicardshop has its own class
+        assert isinstance(scraper, WooStoreApiScraper) and scraper.retailer_slug == "newwoo"
+        manager._load_configured_scrapers()    # rebuilt, not duplicated
+        assert manager._scrapers.count(manager._configured[0]) == 1
+        assert len(manager._scrapers) == len(ScraperManager()._scrapers) + 1
+
+        def handler(request):
+            if request.url.host != "woo.test":
+                return httpx.Response(403)
+            return httpx.Response(200, json=[_fuji_product(1)], headers={"X-WP-TotalPages": "1"})
+
+        _patch_fetcher(monkeypatch, handler)
+        manager = ScraperManager()
+        manager._scrapers = []
+        results = manager.run_all()
+
+        assert len(results["New Woo Store"]) == 1
+        assert LatestPrice.query.count() == 1
+
+    def test_pvpshoppe_falls_back_to_html(self, monkeypatch):
+        import httpx
+        from app.scrapers.pvpshoppe_scraper import PVPShoppeScraper
+
+        html = """<div class="product-card"><a href="/products/op05"></a>
+            <div class="product-card__title">OP-05 Booster Box Japanese</div>
+            <span class="price">$150.00</span></div>"""
+
+        def handler(request):
+            if request.url.path.endswith("products.json"):
+                return httpx.Response(403)
+            return httpx.Response(200, text=html)
+
+        _patch_fetcher(monkeypatch, handler)
+        [rec] = PVPShoppeScraper().scrape()
+        assert (rec["set_code"], rec["currency"], rec["price"]) == ("OP-05", "CAD", 150.0)
+        assert rec["source_url"] == "https://pvpshoppe.com/products/op05"
+
+
+# ---------------------------------------------------------------------------
+# HTML parse stage (app/scrapers/html_parse.py)
+# ---------------------------------------------------------------------------
+
+FP_SHOP_HTML = """
+<ul class="products">
+  <li class="product type-product">
+    <a href="https://www.fptradingcards.com/product/op-01-box/">
+      <h2 class="woocommerce-loop-product__title">OP-01 Romance Dawn Booster Box Japanese</h2>
+    </a>
+    <span class="price"><span class="woocommerce-Price-amount amount"><bdi>$1,120.00</bdi></span></span>
+  </li>
+  <li class="product type-product outofstock">
+    <a href="https://www.fptradingcards.com/product/op-02-box/">
+      <h2 class="woocommerce-loop-product__title">OP-02 Paramount War Booster Box Japanese</h2>
+    </a>
+    <span class="price"><span class="woocommerce-Price-amount amount"><bdi>$95.00</bdi></span></span>
+    <span class="stock">Out of stock</span>
+  </li>
+  <li class="product"><h2>OP-03 Booster Box English</h2><span class="price">$80.00</span></li>
+</ul>
+"""
+
+
+class TestHtmlParse:
+    def test_fptradingcards_records(self):
+        from app.scrapers.html_parse import parse_fptradingcards
+
+        [rec] = parse_fptradingcards(FP_SHOP_HTML)
+        assert rec == {
+            "set_code": "OP-02", "product_type": "box", "price": 95.0, "price_usd": 95.0,
+            "currency": "USD", "in_stock": False,
+            "source_url": "https://www.fptradingcards.com/product/op-02-box/",
+        }
+
+    def test_pvpshoppe_converts_with_given_rate(self):
+        from app.scrapers.html_parse import parse_pvpshoppe
+
+        html = """<div class="card-wrapper"><a href="/products/op06"></a>
+            <h3 class="card-information__text">OP-06 Booster Box Japanese</h3>
+            <div class="price__regular">$200.00 CAD</div><span>Sold out</span></div>"""
+        [rec] = parse_pvpshoppe(html, 0.7)
+        assert (rec["set_code"], rec["price"], rec["price_usd"]) == ("OP-06", 200.0, 140.0)
+        assert rec["in_stock"] is False
+        assert rec["source_url"] == "https://pvpshoppe.com/products/op06"
+
+    def test_scraper_parses_in_pool(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from app.scrapers.fptradingcards_scraper import FPTradingCardsScraper
+
+        scraper = FPTradingCardsScraper()
+        response = MagicMock(text=FP_SHOP_HTML, not_modified=False)
+        monkeypatch.setattr(scraper, "fetch", lambda url: response)
+        inline = scraper.scrape()
+
+        pool = MagicMock(wraps=ThreadPoolExecutor(max_workers=1))
+        scraper.enable_parse_pool(pool)
+        assert scraper.scrape() == inline and len(inline) == 1
+        assert pool.submit.called
+
+    def test_process_pool_round_trip(self):
+        from app.scrapers import html_parse
+
+        pool = html_parse.parse_pool(1)
+        try:
+            assert html_parse.parse_pool(0) is None
+            assert html_parse.parse_pool(1) is pool
+            result = pool.submit(html_parse.parse_fptradingcards, FP_SHOP_HTML).result(timeout=60)
+            assert result == html_parse.parse_fptradingcards(FP_SHOP_HTML)
+        finally:
+            html_parse.shutdown_parse_pool()
+
+
+# ---------------------------------------------------------------------------
+# Record / replay harness (app/scrapers/cassette.py)
+# ---------------------------------------------------------------------------
+
+class TestCassette:
+    def test_record_then_replay_async(self, tmp_path):
+        import asyncio
+
+        import httpx
+        from app.scrapers import cassette
+        from app.scrapers.async_http import AsyncFetcher
+
+        path = str(tmp_path / "run.jsonl")
+        live = httpx.MockTransport(lambda request: httpx.Response(
+            200, json={"page": request.url.params["page"]}, headers={"X-WP-TotalPages": "2"}))
+        recorder = cassette.Cassette(path, mode=cassette.RECORD)
+
+        async def _get(http, page):
+            return await http.get(f"https://shop.test/api?page={page}&per_page=10")
+
+        async def _record():
+            async with AsyncFetcher(transport=cassette.CassetteTransport(recorder, live)) as http:
+                return [(await _get(http, n)).json() for n in (1, 2)]
+
+        assert asyncio.run(_record()) == [{"page": "1"}, {"page": "2"}]
+        recorder.save()
+
+        replay = cassette.Cassette(path)
+        assert len(replay) == 2
+
+        async def _replay():
+            async with AsyncFetcher() as http:
+                hit = await http.get("https://shop.test/api?per_page=10&page=2")
+                with pytest.raises(httpx.HTTPStatusError):
+                    await _get(http, 3)
+                return hit
+
+        with cassette.use_cassette(replay):
+            hit = asyncio.run(_replay())
+        assert hit.json() == {"page": "2"} and hit.headers["X-WP-TotalPages"] == "2"
+        assert replay.served == 1 and len(replay.misses) == 1
+
+    def test_sync_fetch_retries_injected_throttle(self):
+        from app.scrapers import cassette
+        from app.scrapers.fptradingcards_scraper import FPTradingCardsScraper
+
+        tape = cassette.Cassette(faults=[cassette.Fault(429, every=2, retry_after=0)])
+        tape.add_response("GET", "https://a.test/shop/", body="<html>ok</html>",
+                          headers={"Content-Type": "text/html; charset=utf-8"})
+
+        with cassette.use_cassette(tape):
+            scraper = FPTradingCardsScraper()
+            pages = [scraper.fetch("https://a.test/shop/").text for _ in range(2)]
+        assert pages == ["<html>ok</html>"] * 2
+        assert (tape.faulted, tape.served) == (1, 2)
+
+    def test_rcj_admin_pages_replay_by_cursor(self, app, monkeypatch):
+        from app.scrapers import cassette
+        from app.services import rcj_shopify
+
+        monkeypatch.setitem(app.config, "SHOPIFY_ADMIN_TOKEN", "token")
+        tape = cassette.Cassette(latency=0.001)
+        for cursor, following, title in ((None, "c2", "OP-01 Box"), ("c2", None, "OP-02 Box")):
+            tape.add_response("POST", rcj_shopify._graphql_endpoint(), request_body={
+                "query": rcj_shopify._PRODUCTS_QUERY, "variables": {"cursor": cursor},
+            }, body={"data": {"products": {
+                "pageInfo": {"hasNextPage": following is not None, "endCursor": following},
+                "nodes": [{"title": title, "handle": title.lower(), "variants": {"nodes": [
+                    {"price": "100.00", "inventoryQuantity": 1, "availableForSale": True}]}}],
+            }}})
+
+        with cassette.use_cassette(tape):
+            products = rcj_shopify.fetch_products_admin()
+        assert [p["title"] for p in products] == ["OP-01 Box", "OP-02 Box"]
+        assert not tape.misses
+
+    def test_fault_spec(self):
+        from app.scrapers.cassette import Fault
+
+        assert Fault.parse("429@0.05") == Fault(429, rate=0.05, retry_after=0)
+        assert Fault.parse("503/10:pvpshoppe") == Fault(503, every=10, match="pvpshoppe",
+                                                         retry_after=0)
+        with pytest.raises(ValueError):
+            Fault.parse("500")
@@ -3,6 +3,10 @@ tests/test_services.py
 
 Unit tests for the service layer:
   - PriceService   (get_latest_prices, get_dashboard_summary, get_best_price, bulk_upsert)
+  - latest_price_rows (query count stays flat as products/retailers grow)
+  - change-only writes (unchanged scrapes bump last_seen_at only; charts,
+    exports and freshness still cover a steady price)
+  - validate_price_for_card (history per retailer and currency)
   - ChartService   (get_price_chart_data)
   - AlertService   (create_alert, get_alerts, evaluate_alerts, delete_alert)
 """
@@ -78,6 +82,322 @@ class TestPriceService:
             count = svc.bulk_upsert([])
             assert count == 0
 
+    def test_bulk_upsert_replay_does_not_duplicate(self, svc, sample_data, app):
+        with app.app_context():
+            from app.models.price import PriceHistory
+            pid = sample_data["product_box"].id
+            rid = sample_data["retailer_ebay"].id
+            before = PriceHistory.query.count()
+            rec = {"product_id": pid, "retailer_id": rid, "price": 60.0,
+                   "price_usd": 60.0, "currency": "USD", "in_stock": True}
+            svc.bulk_upsert([rec])
+            svc.bulk_upsert([{**rec, "price": 62.0, "price_usd": 62.0}])
+            assert PriceHistory.query.count() == before + 1
+            newest = (PriceHistory.query.filter_by(product_id=pid, retailer_id=rid)
+                      .order_by(PriceHistory.scraped_at.desc()).first())
+            assert float(newest.price) == 62.0
+
+    def test_bulk_upsert_batches(self, svc, sample_data, app):
+        with app.app_context():
+            from app.models.price import PriceHistory
+            pid = sample_data["product_box"].id
+            recs = [{"product_id": pid, "retailer_id": rid, "price": 50.0}
+                    for rid in (sample_data["retailer_ebay"].id, sample_data["retailer_amazon"].id)]
+            assert svc.bulk_upsert(recs, batch_size=1) == 2
+            assert PriceHistory.query.filter(PriceHistory.scrape_bucket.isnot(None)).count() == 2
+
+    def test_bulk_upsert_refreshes_latest_prices(self, svc, sample_data, app):
+        with app.app_context():
+            from app.extensions import db as _db
+            from app.models.latest_price import LatestPrice
+            pid = sample_data["product_box"].id
+            rid = sample_data["retailer_ebay"].id
+            svc.bulk_upsert([{"product_id": pid, "retailer_id": rid, "price": 61.0,
+                              "price_usd": 61.0, "currency": "USD", "in_stock": False}])
+            row = _db.session.get(LatestPrice, (pid, rid))
+            assert float(row.price) == 61.0
+            assert row.in_stock is False
+
+    def test_latest_prices_ignores_older_write(self, svc, sample_data, app):
+        with app.app_context():
+            from app.extensions import db as _db
+            from app.models.latest_price import LatestPrice
+            from app.models.price import PriceHistory
+            from app.services.price_service import upsert_latest_prices
+            pid = sample_data["product_box"].id
+            rid = sample_data["retailer_ebay"].id
+            svc.bulk_upsert([{"product_id": pid, "retailer_id": rid, "price": 61.0,
+                              "price_usd": 61.0, "currency": "USD"}])
+            stale = PriceHistory(product_id=pid, retailer_id=rid, price=10, price_usd=10,
+                                 currency="USD", in_stock=True,
+                                 scraped_at=datetime.utcnow() - timedelta(days=1))
+            upsert_latest_prices([stale])
+            _db.session.commit()
+            _db.session.expire_all()
+            assert float(_db.session.get(LatestPrice, (pid, rid)).price) == 61.0
+
+    def test_rebuild_latest_prices_from_history(self, sample_data, app):
+        with app.app_context():
+            from app.models.latest_price import LatestPrice
+            from app.services.price_service import rebuild_latest_prices
+            assert rebuild_latest_prices() == 4
+            assert LatestPrice.query.count() == 4
+
+
+class TestChangeOnlyPersistence:
+    """PriceService.bulk_upsert with PRICE_CHANGE_ONLY: history logs changes only."""
+
+    @pytest.fixture
+    def svc(self, app):
+        from app.services.price_service import PriceService, reset_latest_state_cache
+        reset_latest_state_cache()
+        with app.app_context():
+            yield PriceService()
+        reset_latest_state_cache()
+
+    @staticmethod
+    def _rec(sample_data, price=60.0, in_stock=True):
+        return {"product_id": sample_data["product_box"].id,
+                "retailer_id": sample_data["retailer_ebay"].id,
+                "price": price, "price_usd": price, "currency": "USD",
+                "in_stock": in_stock, "source_url": "https://ebay.com/op01"}
+
+    @staticmethod
+    def _age_latest(sample_data, hours):
+        """Pretend the last write happened *hours* ago, in an earlier bucket."""
+        from app.extensions import db as _db
+        from app.models.latest_price import LatestPrice
+        from app.models.price import PriceHistory
+        row = _db.session.get(LatestPrice, (sample_data["product_box"].id,
+                                            sample_data["retailer_ebay"].id))
+        row.scraped_at = row.last_seen_at = datetime.utcnow() - timedelta(hours=hours)
+        PriceHistory.query.update({"scrape_bucket": None})
+        _db.session.commit()
+        return row
+
+    def test_unchanged_price_only_bumps_last_seen(self, svc, sample_data, app):
+        with app.app_context():
+            from app.models.price import PriceHistory
+            svc.bulk_upsert([self._rec(sample_data)])
+            row = self._age_latest(sample_data, 72)
+            first_written = row.scraped_at
+            before = PriceHistory.query.count()
+
+            assert svc.bulk_upsert([self._rec(sample_data)]) == 1
+            assert PriceHistory.query.count() == before
+            assert row.scraped_at == first_written
+            assert row.last_seen_at > datetime.utcnow() - timedelta(minutes=1)
+
+    def test_price_or_stock_change_is_written(self, svc, sample_data, app):
+        with app.app_context():
+            from app.models.price import PriceHistory
+            svc.bulk_upsert([self._rec(sample_data)])
+            self._age_latest(sample_data, 72)
+            before = PriceHistory.query.count()
+
+            svc.bulk_upsert([self._rec(sample_data, price=61.0)])
+            svc.bulk_upsert([self._rec(sample_data, price=61.0, in_stock=False)])
+            assert PriceHistory.query.count() == before + 1   # same bucket: one row, updated
+            newest = PriceHistory.query.order_by(PriceHistory.id.desc()).first()
+            assert float(newest.price) == 61.0 and newest.in_stock is False
+
+    def test_stale_cache_entry_is_corrected(self, svc, sample_data, app):
+        with app.app_context():
+            from app.extensions import db as _db
+            from app.models.latest_price import LatestPrice
+            from app.models.price import PriceHistory
+            svc.bulk_upsert([self._rec(sample_data)])
+            row = self._age_latest(sample_data, 72)
+            row.price = 58.0                 # changed behind the cache's back
+            _db.session.commit()
+            before = PriceHistory.query.count()
+
+            svc.bulk_upsert([self._rec(sample_data)])   # cache still says 60.0
+            assert PriceHistory.query.count() == before + 1
+            _db.session.expire_all()
+            assert float(_db.session.get(LatestPrice, (row.product_id, row.retailer_id)).price) == 60.0
+
+    def test_disabled_writes_every_scrape(self, svc, sample_data, app):
+        with app.app_context():
+            from app.models.price import PriceHistory
+            app.config["PRICE_CHANGE_ONLY"] = False
+            try:
+                svc.bulk_upsert([self._rec(sample_data)])
+                self._age_latest(sample_data, 72)
+                before = PriceHistory.query.count()
+                svc.bulk_upsert([self._rec(sample_data)])
+                assert PriceHistory.query.count() == before + 1
+            finally:
+                app.config["PRICE_CHANGE_ONLY"] = True
+
+    def test_state_cache_is_bounded(self):
+        from app.services.price_service import _LatestStateCache, state_signature
+        cache = _LatestStateCache(size=2)
+        for pid in range(3):
+            cache.put((pid, 1), state_signature(10, "USD", True))
+        assert len(cache) == 2 and cache.get((0, 1)) is None
+        assert state_signature(10, "USD", True) == state_signature("10.001", "USD", 1)
+
+    def test_freshness_reads_last_seen(self, svc, sample_data, app):
+        with app.app_context():
+            from app.services.email_service import _cheapest_competitor
+            svc.bulk_upsert([self._rec(sample_data)])
+            self._age_latest(sample_data, 24 * 10)      # first written 10 days ago
+            pid = sample_data["product_box"].id
+            amazon = sample_data["retailer_amazon"].id
+            assert _cheapest_competitor(pid, amazon) == (None, None)
+
+            svc.bulk_upsert([self._rec(sample_data)])   # seen again, unchanged
+            assert _cheapest_competitor(pid, amazon) == (60.0, "eBay")
+
+    def test_steady_price_charts_and_exports(self, svc, sample_data, app, client):
+        """Eleven daily scrapes of one price: one history row, still a full window."""
+        with app.app_context():
+            from app.extensions import db as _db
+            from app.models.price import PriceHistory
+            from app.services.chart_service import ChartService
+            pid, ebay = sample_data["product_box"].id, sample_data["retailer_ebay"].id
+            PriceHistory.query.filter_by(product_id=pid).delete()
+            _db.session.commit()
+
+            svc.bulk_upsert([self._rec(sample_data)])
+            first = self._age_latest(sample_data, 24 * 10)
+            PriceHistory.query.filter_by(product_id=pid).update({"scraped_at": first.scraped_at})
+            _db.session.commit()
+            for _ in range(10):
+                svc.bulk_upsert([self._rec(sample_data)])
+            assert PriceHistory.query.filter_by(product_id=pid).count() == 1
+
+            chart = ChartService().get_price_chart_data(pid, days=7)
+            (dataset,) = chart["datasets"]
+            assert dataset["label"] == "eBay"
+            assert [point["y"] for point in dataset["data"]] == [60.0, 60.0]
+
+            since = (datetime.utcnow() - timedelta(days=7)).isoformat()
+            rows = client.get(f"/api/export/prices/{pid}.json?since={since}").get_json()
+            assert [(r["retailer"], r["price"]) for r in rows] == [("eBay", 60.0)]
+
+            (latest,) = [p for p in svc.get_latest_prices(pid) if p["retailer_id"] == ebay]
+            assert datetime.fromisoformat(latest["scraped_at"]) > datetime.utcnow() - timedelta(minutes=1)
+
+
+class TestLatestPriceResolver:
+    """Query-count guarantees for app.services.price_service.latest_price_rows."""
+
+    @staticmethod
+    def _seed(db_session, n_products, n_retailers):
+        from app.models.product import Product
+        from app.models.retailer import Retailer
+        from app.models.price import PriceHistory
+
+        products = [
+            Product(set_code=f"OP-{i:02d}", set_name=f"SET {i}", product_type="box")
+            for i in range(n_products)
+        ]
+        retailers = [
+            Retailer(name=f"Retailer {i}", slug=f"retailer-{i}", base_url="https://example.com")
+            for i in range(n_retailers)
+        ]
+        db_session.add_all(products + retailers)
+        db_session.flush()
+
+        now = datetime.utcnow()
+        for p in products:
+            for r in retailers:
+                db_session.add(PriceHistory(product_id=p.id, retailer_id=r.id, price=100,
+                                            price_usd=100, in_stock=True,
+                                            scraped_at=now - timedelta(hours=6)))
+                db_session.add(PriceHistory(product_id=p.id, retailer_id=r.id, price=90 + r.id,
+                                            price_usd=90 + r.id, in_stock=True, scraped_at=now))
+        db_session.commit()
+        return products, retailers
+
+    @staticmethod
+    def _reset(db_session):
+        from app.models.product import Product
+        from app.models.retailer import Retailer
+        from app.models.price import PriceHistory
+        db_session.query(PriceHistory).delete()
+        db_session.query(Product).delete()
+        db_session.query(Retailer).delete()
+        db_session.commit()
+
+    @staticmethod
+    def _count_queries(app, fn):
+        from sqlalchemy import event
+        from app.extensions import db as _db
+
+        statements = []
+
+        def _before(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = _db.engine
+        event.listen(engine, "before_cursor_execute", _before)
+        try:
+            fn()
+        finally:
+            event.remove(engine, "before_cursor_execute", _before)
+        return len(statements)
+
+    def test_resolver_returns_latest_row_per_pair(self, app, db_session):
+        from app.services.price_service import latest_price_rows
+        products, retailers = self._seed(db_session, 3, 2)
+        matrix = latest_price_rows()
+        assert len(matrix) == 6
+        for (pid, rid), row in matrix.items():
+            assert float(row.price) == 90 + rid
+
+    def test_api_products_query_count_constant(self, app, client, db_session):
+        self._seed(db_session, 2, 2)
+        small = self._count_queries(app, lambda: client.get("/api/products"))
+
+        self._reset(db_session)
+
+        self._seed(db_session, 12, 6)
+        large = self._count_queries(app, lambda: client.get("/api/products"))
+        assert large == small
+
+    def test_dashboard_summary_query_count_constant(self, app, db_session):
+        from app.services.price_service import PriceService
+        svc = PriceService()
+        self._seed(db_session, 2, 2)
+        small = self._count_queries(app, svc.get_dashboard_summary)
+        self._reset(db_session)
+
+        self._seed(db_session, 12, 6)
+        large = self._count_queries(app, svc.get_dashboard_summary)
+        # Matrix, products and the last_seen_at lookup (seen_times).
+        assert large == small <= 3
+
+
+class TestCardValidation:
+    """app.utils.price_validator.validate_price_for_card history windows."""
+
+    def test_per_retailer_history(self, app, sample_data):
+        from app.extensions import db
+        from app.models.price import PriceHistory
+        from app.utils.price_validator import validate_price_for_card
+
+        box = sample_data["product_box"]
+        amazon, ebay = sample_data["retailer_amazon"], sample_data["retailer_ebay"]
+        now = datetime.utcnow()
+        for i in range(1, 12):
+            # eBay listed the case as the box: poisons a product-wide median
+            db.session.add(PriceHistory(product_id=box.id, retailer_id=ebay.id, price=600,
+                                        price_usd=600, currency="USD",
+                                        scraped_at=now - timedelta(hours=i)))
+        for i in range(1, 8):
+            db.session.add(PriceHistory(product_id=box.id, retailer_id=amazon.id, price=7800,
+                                        price_usd=52, currency="JPY",
+                                        scraped_at=now - timedelta(hours=i)))
+        db.session.commit()
+
+        assert validate_price_for_card(box.id, 52.0).median_price == 600
+        own = validate_price_for_card(box.id, 52.0, retailer_id=amazon.id,
+                                      new_price=7800, currency="JPY")
+        assert not own.is_anomaly and own.median_price == 7800
+
 
 # ---------------------------------------------------------------------------
 # ChartService
@@ -127,6 +447,14 @@ class TestChartService:
             result = svc.get_price_chart_data(product_id, days=0)
             assert result["datasets"] == []
 
+    def test_get_comparison_data_reads_latest_prices(self, svc, sample_data, app):
+        with app.app_context():
+            from app.services.price_service import rebuild_latest_prices
+            rebuild_latest_prices()
+            result = svc.get_comparison_data(sample_data["product_box"].id)
+            names = {c["retailer"] for c in result["comparisons"]}
+            assert names == {"Amazon Japan", "eBay"}
+
     def test_get_price_chart_data_retailer_filter(self, svc, sample_data, app):
         with app.app_context():
             product_id = sample_data["product_box"].id